@@ -3,13 +3,15 @@ from tkinter import ttk, filedialog, messagebox
 import os, sys, subprocess
 from pathlib import Path
 
-from Executable.drawing import start_embed_server
+from Executable.drawing import start_embed_server, replay_trace
 from Executable.pi_executor import PiExecutor, translate_runtime_to_pi
-from frontend.parser import parse_text
+from frontend.incremental import IncrementalParser
 from frontend.semantics import analyze
 from frontend.exporter import save_ast_json, save_diags_txt
+from frontend.astbin import save_ast_bin
 from frontend.ast_viewer_tk import AstViewer
-from optimizer.ASTOptimizer import ASTOptimizer
+from optimizer.PassManager import PassManager, LEVELS
+from optimizer.PartialEval import NotStatic, evaluate
 from IR.IntermediateCodeGen import IntermediateCodeGen
 from IR_to_ASM.AssemblyGen import AssemblyGen
 from Executable.build_native import build_and_link
@@ -27,6 +29,9 @@ class App(tk.Tk):
     # Almacenar AST y AST optimizado para comparación
     self.original_ast = None
     self.optimized_ast = None
+    # Parser incremental del editor: entre compilaciones solo se reparsean
+    # las sentencias de nivel superior que cambiaron
+    self.incremental_parser = IncrementalParser()
     # Pi connection state
     self.pi_executor = None
     self.pi_ip = "192.168.1.100"
@@ -53,12 +58,19 @@ class App(tk.Tk):
     for text, cmd in [
         ("Compilar", self._compile_code),
         ("Mostrar AST", self._show_ast),
+        ("Exportar JSON", self._export_ast_json),
         ("Ejecutar", self._run_code),
         ("Cargar Archivo", self._load_file),
     ]:
       button = ttk.Button(self.button_bar, text=text, command=cmd)
       button.pack(side=tk.LEFT, padx=5)
 
+    # Nivel de optimización (optimizer/PassManager.py)
+    ttk.Label(self.button_bar, text="Optimización:").pack(side=tk.LEFT, padx=(15, 2))
+    self.opt_level_var = tk.StringVar(value="-O2")
+    ttk.Combobox(self.button_bar, textvariable=self.opt_level_var, width=5, state="readonly",
+                 values=[f"-O{level}" for level in LEVELS]).pack(side=tk.LEFT)
+
   def _create_paned_window(self: "App") -> None:
     """
     Crea la ventana dividida principal.
@@ -212,7 +224,7 @@ class App(tk.Tk):
               return
 
           # 2. Parsear el texto → AST
-          self.original_ast = parse_text(source_code)
+          self.original_ast = self.incremental_parser.update(source_code)
 
           # 3. Analizar semánticamente (AST original)
           diags = analyze(self.original_ast)
@@ -223,9 +235,8 @@ class App(tk.Tk):
               return
 
           # 4. Optimizar el AST
-          optimizer = ASTOptimizer()
-          self.optimized_ast = optimizer.optimize(self.original_ast)
-          optimization_stats = optimizer.get_optimization_stats()
+          pass_manager = PassManager(self.opt_level_var.get())
+          self.optimized_ast = pass_manager.run(self.original_ast)
 
           # 5. Generar IR
           try:
@@ -251,25 +262,45 @@ class App(tk.Tk):
               self._log_output(str(ir_error))
               raise
 
-          # 6. Generar ASM
-          asm_generator = AssemblyGen("out/output.ll", "out/output.s")
-          asm_path = asm_generator.generate()
-
-          exe_path = build_and_link(asm_path, out_dir="out", exe_name="turtle")
-          exe_path = Path(exe_path).resolve()
-
-          # 7. Guardar resultados en carpeta out/
+          # 6. Evaluación parcial: si el programa no depende del runtime
+          #    (AZAR, ...) su dibujo queda en out/trace.txt y "Ejecutar" lo
+          #    reproduce sin ensamblar, enlazar ni lanzar el ejecutable
+          trace_path = os.path.join("out", "trace.txt")
+          try:
+              trace = evaluate(self.optimized_ast)
+              trace.save(trace_path)
+              trace_note = f"traza de {len(trace)} entradas ({trace.steps} pasos): {trace_path}"
+          except NotStatic as reason:
+              trace = None
+              trace_note = f"se compila: {reason}"
+              if os.path.exists(trace_path):
+                  os.remove(trace_path)
+
+          # 7. Generar ASM y ejecutable (solo sin traza)
+          if trace is None:
+              asm_generator = AssemblyGen("out/output.ll", "out/output.s")
+              asm_path = asm_generator.generate()
+
+              exe_path = build_and_link(asm_path, out_dir="out", exe_name="turtle")
+              exe_path = Path(exe_path).resolve()
+
+          # 8. Guardar resultados en carpeta out/
           os.makedirs("out", exist_ok=True)
 
-          save_ast_json(self.original_ast, "out/ast.json")
-          save_ast_json(self.optimized_ast, "out/ast_optimized.json")
+          # ast.json solo con "Exportar JSON"; el visor lee el .bin
+          save_ast_bin(self.original_ast, "out/ast.bin")
+          save_ast_bin(self.optimized_ast, "out/ast_optimized.bin")
           save_diags_txt(diags, "out/diagnostics.txt")
 
-          # 8. Mostrar feedback en consola GUI
+          # 9. Mostrar feedback en consola GUI
           self._clear_output()
           self._log_output("=== Compilación completada ===")
           self._log_output("\n-- Diagnósticos --")
           self._log_output(diags.pretty())
+          self._log_output("\n-- Optimización --")
+          self._log_output(pass_manager.format_report())
+          self._log_output("\n-- Evaluación parcial --")
+          self._log_output(trace_note)
           # Marcar compilación exitosa y generar comandos runtime para envío a Pi
           try:
             self.compiled = True
@@ -290,16 +321,33 @@ class App(tk.Tk):
           self._log_output(f"Error en compilación: {e}")
 
 
+  def _export_ast_json(self):
+    """
+    Exporta el AST original y el optimizado de la última compilación a
+    out/ast.json y out/ast_optimized.json.
+    """
+    if self.original_ast is None:
+        messagebox.showwarning("Advertencia", "No hay AST para exportar. Compile primero el código.")
+        return
+    try:
+        save_ast_json(self.original_ast, "out/ast.json")
+        self._log_output("AST exportado: out/ast.json")
+        if self.optimized_ast is not None:
+            save_ast_json(self.optimized_ast, "out/ast_optimized.json")
+            self._log_output("AST optimizado exportado: out/ast_optimized.json")
+    except Exception as e:
+        messagebox.showerror("Error al exportar", str(e))
+
   def _show_ast(self):
     """
     Muestra el AST permitiendo elegir entre original y optimizado.
     """
-    if not os.path.exists("out/ast.json"):
+    if not os.path.exists("out/ast.bin"):
         messagebox.showwarning("Advertencia", "No hay AST para mostrar. Compile primero el código.")
         return
     
     # Si hay AST optimizado, mostrar opciones
-    if self.optimized_ast is not None and os.path.exists("out/ast_optimized.json"):
+    if self.optimized_ast is not None and os.path.exists("out/ast_optimized.bin"):
         # Crear ventana de selección personalizada
         selection_window = tk.Toplevel(self)
         selection_window.title("Seleccionar AST")
@@ -340,13 +388,13 @@ class App(tk.Tk):
         
         # Procesar la elección
         if choice.get() == "original":
-            viewer = AstViewer(self, json_path="out/ast.json", title="AST Original")
+            viewer = AstViewer(self, json_path="out/ast.bin", title="AST Original")
         elif choice.get() == "optimized":
-            viewer = AstViewer(self, json_path="out/ast_optimized.json", title="AST Optimizado")
+            viewer = AstViewer(self, json_path="out/ast_optimized.bin", title="AST Optimizado")
 
     else:
         # Solo hay AST original
-        viewer = AstViewer(self, json_path="out/ast.json")
+        viewer = AstViewer(self, json_path="out/ast.bin")
         viewer.title("AST Original")
 
   def _set_exec_button_enabled(self, enabled: bool):
@@ -498,6 +546,14 @@ class App(tk.Tk):
           try:
               out_dir = Path("out");
               out_dir.mkdir(exist_ok=True)
+
+              # programa determinista: se reproduce su traza (ver _compile_code)
+              trace_path = out_dir / "trace.txt"
+              if trace_path.exists():
+                  n = replay_trace(trace_path, self.canvas)
+                  self._log_output(f"Reproduciendo traza: {n} entradas ({trace_path})\n")
+                  return
+
               exe_path = (out_dir / ("turtle.exe" if os.name == "nt" else "turtle")).resolve()
               if not exe_path.exists():
                   self._log_output(f"❌ No existe el ejecutable: {exe_path}\n")
@@ -128,6 +128,16 @@ class Turtle:
         ny = self.y - d * math.sin(math.radians(self.h))
         self._draw_to(nx, ny)
 
+    def goto_step(self, tx, ty, d):
+        # avanza hasta d píxeles hacia (tx, ty); devuelve lo que falta
+        rem = math.hypot(tx - self.x, ty - self.y)
+        if d >= rem:
+            self._draw_to(tx, ty)
+            return 0.0
+        f = d / rem
+        self._draw_to(self.x + (tx - self.x) * f, self.y + (ty - self.y) * f)
+        return rem - d
+
     def turn_step(self, deg):
         self.h = (self.h + deg) % 360.0
         self._ensure_sprite()
@@ -263,6 +273,28 @@ def start_embed_server(canvas, host="127.0.0.1", port=0):
 
     return addr, p
 
+def _coord(tok, size):
+    # coordenada de una traza: "c-12.5" es relativa al centro del lienzo
+    return size / 2 + float(tok[1:]) if tok[0] == "c" else float(tok)
+
+def replay_trace(path, canvas=None):
+    """Reproduce una traza de optimizer/PartialEval.py (out/trace.txt): con
+    canvas, en la tortuga embebida; sin canvas, en una ventana propia.
+    Devuelve cuántas entradas encoló."""
+    with open(path, encoding="utf-8") as f:
+        lines = [s.strip() for s in f]
+    lines = [s for s in lines if s and not s.startswith("#")]
+    if canvas is None:
+        t = Turtle(None)
+        for s in lines:
+            t.cmd_q.put(s)
+        main(t)
+    else:
+        start_embed_server(canvas)
+        for s in lines:
+            _EMBED_TURTLE.cmd_q.put(s)
+    return len(lines)
+
 def main(t=None):
     # si no se pasa tortuga (standalone)
     if t is None:
@@ -282,6 +314,10 @@ def main(t=None):
         state["action"] = ("turn", abs(float(d)), s)
         state["last_ts"] = time.time()
 
+    def start_goto(x, y):
+        state["action"] = ("goto", x, y)
+        state["last_ts"] = time.time()
+
     def start_wait(ms):
         state["action"] = ("wait", float(ms))
         state["last_ts"] = time.time()
@@ -323,6 +359,11 @@ def main(t=None):
                         rem -= d
                     state["action"] = None if rem <= 1e-6 else ("turn", rem, s)
 
+                elif kind == "goto":
+                    step = SPEED_PX_PER_SEC * dt
+                    if step > 0 and t.goto_step(a[1], a[2], step) <= 1e-6:
+                        state["action"] = None
+
                 elif kind == "wait":
                     rem = a[1] - dt * 1000.0
                     state["action"] = None if rem <= 0 else ("wait", rem)
@@ -369,7 +410,7 @@ def main(t=None):
                     elif cmd == "POSY":
                         t.set_y(int(parts[1]))
                     elif cmd == "HEADING":
-                        t.set_heading(int(parts[1]))
+                        t.set_heading(float(parts[1]))
                     elif cmd == "COLOR":
                         t.set_color(int(parts[1]))
                     elif cmd == "COLORNAME":
@@ -386,6 +427,11 @@ def main(t=None):
                         TURN_DEG_PER_SEC = max(1.0, float(parts[1]))
                     elif cmd == "DELAY":
                         start_wait(float(parts[1]))
+                    # trazas (replay_trace): coordenadas absolutas
+                    elif cmd == "MOVETO":
+                        start_goto(_coord(parts[1], t.W), _coord(parts[2], t.H))
+                    elif cmd == "JUMP":
+                        t.set_pos(_coord(parts[1], t.W), _coord(parts[2], t.H))
 
         except Exception:
             # opcional: print("tick error:", e)
@@ -400,4 +446,9 @@ def main(t=None):
 
 
 if __name__ == "__main__":
-    main()
+    # python drawing.py            comandos por stdin (el runtime)
+    # python drawing.py traza.txt  reproduce una traza
+    if len(sys.argv) > 1:
+        replay_trace(sys.argv[1])
+    else:
+        main()
@@ -1,6 +1,9 @@
 from llvmlite import ir
 import os
 from frontend.parser import Node
+from frontend.resolver import resolve
+from frontend.callgraph import build_call_graph
+from frontend.visitor import run
 
 INT = ir.IntType(32)
 FLOAT = ir.FloatType()
@@ -17,10 +20,15 @@ class IntermediateCodeGen:
         self.INT = ir.IntType(32)
         self.int_typeType = ir.IntType  # Used for isinstance checks
 
-        # symbol tables: stack per function to support locals
-        self.symstack = []  # list of dicts: name -> alloca
+        # variables: addresses come from frontend/resolver.py (Node.addr =
+        # (depth, slot)); each frame is a list slot -> pointer, filled lazily
+        self.global_scope = None   # resolver.Scope of the main program
+        self.global_frame = []
+        self.scope = None          # scope/frame of the function being generated
+        self.frame = []
         self.func_table = {}  # name -> ir.Function
         self.current_function = None
+        self.callgraph = None  # frontend/callgraph.py, armado en generate()
 
         # declare main and runtime stubs
         self._declare_runtime_functions()
@@ -53,8 +61,9 @@ class IntermediateCodeGen:
             "ESPERA": ("delay_ms", ir.FunctionType(ir.VoidType(), [INT])),
             "AZAR": ("rand_int", ir.FunctionType(INT, [INT])),
             "CENTRO": ("center_turtle", ir.FunctionType(ir.VoidType(), [])),
-            # helpers:
-            "POW": ("pow_int", ir.FunctionType(INT, [INT, INT])),  # integer pow
+            # POW no llama a pow_int: el runtime le pregunta el resultado a
+            # drawing.py por un archivo temporal (>= 10 ms); se genera en
+            # línea (_gen_pow)
         }
 
 
@@ -69,61 +78,108 @@ class IntermediateCodeGen:
         # main returns void; entry block set as current builder context
         fnty = ir.FunctionType(self.INT, [])
         f = ir.Function(self.module, fnty, name="main")
-        block = f.append_basic_block(name="entry")
+        f.append_basic_block(name="entry")  # allocas; generate() closes it
+        block = f.append_basic_block(name="main.body")
         self.builder = ir.IRBuilder(block)
         self.current_function = f
-        self.symstack.append({})  # push global/local table for main
         self.func_table["main_func"] = f
 
     def generate(self, ast_root):
+        self.global_scope = resolve(ast_root)
+        self.global_frame = [None] * len(self.global_scope)
+        self.scope, self.frame = self.global_scope, self.global_frame
+        self.callgraph = build_call_graph(ast_root)
+        self._gen_procedures()
         self.builder.call(self.func_table["rt_init"], [])
         self._gen_node(ast_root)
         # ensure main returns
         if not self.builder.block.is_terminated:
             self.builder.call(self.func_table["rt_shutdown"], [])
             self.builder.ret(ir.Constant(self.INT, 0))
+        main = self.func_table["main_func"]
+        ir.IRBuilder(main.entry_basic_block).branch(main.blocks[1])
         return str(self.module)
 
+    def _gen_procedures(self):
+        # Todas las funciones se declaran antes de generar código, así una
+        # llamada puede aparecer antes que su PARA. Solo se compilan las
+        # alcanzables desde main, en el orden del grafo: cada procedimiento
+        # después de los que llama (las componentes recursivas, juntas).
+        procs = self.callgraph.reachable()
+        for info in procs:
+            fnty = ir.FunctionType(ir.VoidType(), [self.INT] * len(info.node.children[1].children))
+            self.func_table[info.name] = ir.Function(self.module, fnty, name=info.name)
+        for info in procs:
+            run(self._gen_proc(info.node), self._gen)
+
+    def _gen_proc(self, node):
+        name_node, params_node, body_node = node.children
+        fn = self.func_table[name_node.value]
+
+        entry = fn.append_basic_block(name="entry")
+        body_bb = fn.append_basic_block(name="body.entry")
+
+        save_builder, save_current = self.builder, self.current_function
+        save_scope, save_frame = self.scope, self.frame
+        self.current_function = fn
+
+        # frame propio: parámetros y locales según el resolver
+        self.scope = name_node.sym.scope
+        self.frame = [None] * len(self.scope)
+        slots = [self._var_ptr(p) for p in params_node.children]
+        self.builder = ir.IRBuilder(entry)
+        for arg, slot in zip(fn.args, slots):
+            self.builder.store(arg, slot)
+
+        self.builder.branch(body_bb)
+        self.builder.position_at_end(body_bb)
+        yield body_node
+        if not self.builder.block.is_terminated:
+            self.builder.ret_void()
+        self.builder = save_builder
+        self.current_function = save_current
+        self.scope, self.frame = save_scope, save_frame
+
     # ----------------------
     # Helpers
     # ----------------------
-    def _push_scope(self):
-        self.symstack.append({})
-
-    def _pop_scope(self):
-        self.symstack.pop()
-
-    def _current_symtab(self):
-        return self.symstack[-1]
-
-    def _get_var_alloca(self, name):
-        # search from top scope downwards
-        for st in reversed(self.symstack):
-            if name in st:
-                return st[name]
-        return None
-
-    def _create_var_alloca(self, name, llvm_type=None):
+    def _entry_alloca(self, name, llvm_type=None):
+        # allocas always in the entry block (mem2reg-friendly, and a loop body
+        # doesn't grow the stack on every iteration). self.builder never sits
+        # in an entry block while code is generated, so its position stays valid.
         if llvm_type is None:
             llvm_type = self.INT
-
-        # 1) No dupliques: si ya existe en el scope actual, reúsalo
-        symtab = self._current_symtab()
-        if name in symtab:
-            return symtab[name]
-
-        # 2) Siempre usa un builder NUEVO y posiciónalo al INICIO del entry
         entry = self.current_function.entry_basic_block
-
-        slot = self.builder.alloca(llvm_type, name=name)
-        symtab[name] = slot
-        return slot
-
-    def _ensure_var(self, name):
-        a = self._get_var_alloca(name)
-        if a is None:
-            a = self._create_var_alloca(name, INT)
-        return a
+        b = ir.IRBuilder(entry)
+        if entry.is_terminated:
+            b.position_before(entry.terminator)
+        else:
+            b.position_at_end(entry)
+        return b.alloca(llvm_type, name=name)
+
+    def _var_ptr(self, ident):
+        # O(1): the resolver already chose the scope and slot
+        if ident.addr is None:
+            raise NameError(f"Variable '{ident.value}' not declared or in scope")
+        depth, slot = ident.addr
+        if depth:
+            scope, frame = self.scope, self.frame
+        else:
+            scope, frame = self.global_scope, self.global_frame
+        ptr = frame[slot]
+        if ptr is None:
+            sym = scope.slots[slot]
+            if sym.captured:
+                # global used from a procedure: a module-level variable
+                gv = ir.GlobalVariable(self.module, self.INT,
+                                       name=self.module.get_unique_name(f"var.{sym.name}"))
+                gv.linkage = "internal"
+                gv.initializer = ir.Constant(self.INT, 0)
+                ptr = gv
+            else:
+                ptr = self._entry_alloca(sym.name)
+            frame[slot] = ptr
+        return ptr
 
     def _is_true(self, val):
         # take an i1 or an int32 where non-zero means true
@@ -142,8 +198,8 @@ class IntermediateCodeGen:
     def _eval_bexpr(self, node):
         kind = node.kind
         if kind == "RELOP":
-            left = self._gen_node(node.children[0])
-            right = self._gen_node(node.children[1])
+            left = yield node.children[0]
+            right = yield node.children[1]
             op = node.value
             if op in ("IGUALES", "==", "="):
                 return self.builder.icmp_signed("==", left, right)
@@ -154,8 +210,8 @@ class IntermediateCodeGen:
             raise NotImplementedError(f"RELOP operator {op}")
 
         if kind == "BOOLBIN":
-            left = self._eval_bexpr(node.children[0])
-            right = self._eval_bexpr(node.children[1])
+            left = yield self._eval_bexpr(node.children[0])
+            right = yield self._eval_bexpr(node.children[1])
             op = node.value
             if op == "Y":  # logical and
                 # i1 and i1
@@ -164,13 +220,86 @@ class IntermediateCodeGen:
                 return self.builder.or_(left, right)
             raise NotImplementedError(f"BOOLBIN operator {op}")
 
+        # constante que dejó el optimizador (MIENTRAS cierto, ...)
+        if kind == "BOOL":
+            return ir.Constant(ir.IntType(1), 1 if node.value else 0)
+
         # parenthesized boolexpr or raw expr treated as truthy numeric
         if kind in ("expr", "NUM", "BINOP", "NEG", "ID", "CALL", "POW"):
-            v = self._gen_node(node)
+            v = yield node
             return self._ensure_i1(v)
 
         raise NotImplementedError(f"Unhandled boolean node kind: {kind}")
 
+    # ----------------------
+    # POTENCIA en línea
+    # ----------------------
+    def _gen_pow(self, base, exp):
+        # entero en i32, como optimizer/ASTUtils.pow_i32: exponente
+        # constante -> cuadrado y multiplicación sin bucle; si no, el mismo
+        # algoritmo en un bucle
+        if isinstance(exp, ir.Constant):
+            return self._pow_const(base, exp.constant)
+        return self._pow_loop(base, exp)
+
+    def _pow_const(self, base, n):
+        b = self.builder
+        one = ir.Constant(self.INT, 1)
+        if n < 0:
+            # 1 si base = 1, (-1)^n si base = -1, si no 0
+            minus = ir.Constant(self.INT, 1 if n % 2 == 0 else -1)
+            res = b.select(b.icmp_signed("==", base, ir.Constant(self.INT, -1)), minus,
+                           ir.Constant(self.INT, 0))
+            return b.select(b.icmp_signed("==", base, one), one, res, name="powtmp")
+        result = None
+        square = base
+        while n:
+            if n & 1:
+                result = square if result is None else b.mul(result, square)
+            n >>= 1
+            if n:
+                square = b.mul(square, square)
+        return one if result is None else result
+
+    def _pow_loop(self, base, exp):
+        b = self.builder
+        fn = self.current_function
+        zero, one = ir.Constant(self.INT, 0), ir.Constant(self.INT, 1)
+        neg = b.icmp_signed("<", exp, zero)
+        # exponente negativo: 1, -1 o 0 según la base (sin bucle)
+        odd = b.icmp_signed("!=", b.and_(exp, one), zero)
+        minus = b.select(odd, ir.Constant(self.INT, -1), one)
+        neg_res = b.select(b.icmp_signed("==", base, one), one,
+                           b.select(b.icmp_signed("==", base, ir.Constant(self.INT, -1)), minus, zero))
+        start = b.select(neg, zero, exp)
+        pre_bb = b.block
+        head_bb = fn.append_basic_block("pow_head")
+        body_bb = fn.append_basic_block("pow_body")
+        end_bb = fn.append_basic_block("pow_end")
+        b.branch(head_bb)
+
+        b.position_at_end(head_bb)
+        acc = b.phi(self.INT, name="pow_acc")
+        sq = b.phi(self.INT, name="pow_sq")
+        k = b.phi(self.INT, name="pow_k")
+        b.cbranch(b.icmp_signed("!=", k, zero), body_bb, end_bb)
+
+        b.position_at_end(body_bb)
+        bit = b.icmp_signed("!=", b.and_(k, one), zero)
+        acc_next = b.select(bit, b.mul(acc, sq), acc)
+        sq_next = b.mul(sq, sq)
+        k_next = b.lshr(k, one)
+        b.branch(head_bb)
+        acc.add_incoming(one, pre_bb)
+        acc.add_incoming(acc_next, body_bb)
+        sq.add_incoming(base, pre_bb)
+        sq.add_incoming(sq_next, body_bb)
+        k.add_incoming(start, pre_bb)
+        k.add_incoming(k_next, body_bb)
+
+        b.position_at_end(end_bb)
+        return b.select(neg, neg_res, acc, name="powtmp")
+
     def _dump_ast(self, node, indent=0, label=""):
         pad = "  " * indent
         kind = getattr(node, "kind", type(node).__name__)
@@ -185,6 +314,11 @@ class IntermediateCodeGen:
     # Main generator: parses the AST and return an IR
     # ----------------------
     def _gen_node(self, node):
+        # _gen y _eval_bexpr son generadores: `yield hijo` genera el hijo y
+        # devuelve su valor LLVM; run() los ejecuta con una pila explícita
+        return run(self._gen(node), self._gen)
+
+    def _gen(self, node):
         # If it's not an AST Node, assume it's a literal/LLVM value and return as-is
         if not isinstance(node, Node):
             return node
@@ -201,13 +335,13 @@ class IntermediateCodeGen:
         # ----- Containers / program -----
         if kind == "PROGRAM":
             for c in node.children:
-                self._gen_node(c)
+                yield c
             return None
 
         if kind in ("STMTS", "PARAMS", "ARGS"):
             results = []
             for c in node.children:
-                results.append(self._gen_node(c))
+                results.append((yield c))
             return results
 
         # ----- Literals / identifiers -----
@@ -224,46 +358,37 @@ class IntermediateCodeGen:
             return gv.bitcast(ir.IntType(8).as_pointer())
 
         if kind == "ID":
-            varname = node.value
-            alloca = self._get_var_alloca(varname) if hasattr(self, "_get_var_alloca") else None
-            if alloca is None:
-                raise NameError(f"Variable '{varname}' not declared or in scope")
-            return self.builder.load(alloca, name=f"{varname}_val")
+            return self.builder.load(self._var_ptr(node), name=f"{node.value}_val")
 
         # ----- Declarations / assignments -----
         if kind == "INIC":
             name_node = node.children[0]
             expr_node = node.children[1]
-            name = name_node.value
-            val = self._gen_node(expr_node)
-            alloca = self._create_var_alloca(name, self.INT)
-            self.builder.store(val, alloca)
+            val = yield expr_node
+            self.builder.store(val, self._var_ptr(name_node))
             return None
 
         if kind == "ASSIGN":
-            name = node.children[0].value
-            val = self._gen_node(node.children[1])
-            alloca = getattr(self, "_ensure_var")(name)
-            self.builder.store(val, alloca)
+            val = yield node.children[1]
+            self.builder.store(val, self._var_ptr(node.children[0]))
             return None
 
         if kind == "INC":
             idnode = node.children[0]
-            name = idnode.value
-            alloca = getattr(self, "_ensure_var")(name)
+            alloca = self._var_ptr(idnode)
             cur = self.builder.load(alloca)
             if len(node.children) == 1:
                 inc_val = ir.Constant(self.INT, 1)
             else:
-                inc_val = self._gen_node(node.children[1])
+                inc_val = yield node.children[1]
             res = self.builder.add(cur, inc_val)
             self.builder.store(res, alloca)
             return None
 
         # ----- Arithmetic -----
         if kind == "BINOP":
-            left = self._gen_node(node.children[0])
-            right = self._gen_node(node.children[1])
+            left = yield node.children[0]
+            right = yield node.children[1]
             op = node.value
             if op == '+':
                 return self.builder.add(left, right)
@@ -276,16 +401,13 @@ class IntermediateCodeGen:
             raise NotImplementedError(f"BINOP operator {op}")
 
         if kind == "NEG":
-            v = self._gen_node(node.children[0])
+            v = yield node.children[0]
             return self.builder.sub(ir.Constant(self.INT, 0), v)
 
         if kind == "POW":
-            base = self._gen_node(node.children[0])
-            exp = self._gen_node(node.children[1])
-            fn = self.func_table.get("POW") or self.func_table.get("pow_int")
-            if fn is None:
-                raise NameError("pow_int runtime function not declared")
-            return self.builder.call(fn, [base, exp], name="powtmp")
+            base = yield node.children[0]
+            exp = yield node.children[1]
+            return self._gen_pow(base, exp)
 
         # ----- Calls (user procedures or builtins) -----
         if kind == "CALL":
@@ -313,14 +435,16 @@ class IntermediateCodeGen:
             # Genera valores LLVM de los args
             args = []
             for i, n in enumerate(args_nodes):
-                v = self._gen_node(n)
+                v = yield n
                 args.append(v)
 
             # Primero busca funciones de usuario
             fn = self.func_table.get(fn_key)
 
             if fn is not None:
-                call_val = self.builder.call(fn, args)
+                # llamada de cola según el grafo: LLVM puede reusar el frame
+                site = self.callgraph.site(node)
+                call_val = self.builder.call(fn, args, tail=site is not None and site.tail)
                 return call_val
 
             # Si no está, intenta builtins (ej. AZAR)
@@ -339,7 +463,7 @@ class IntermediateCodeGen:
 
         # ----- Turtle / primitives -----
         if kind in ("AV", "RE", "GD", "GI"):
-            arg = self._gen_node(node.children[0])
+            arg = yield node.children[0]
             fn = self.func_table.get(kind) or self.func_table.get(kind.upper())
             if fn is None:
                 raise NameError(f"Runtime function for {kind} not declared")
@@ -347,33 +471,33 @@ class IntermediateCodeGen:
             return None
 
         if kind == "PONPOS":
-            x = self._gen_node(node.children[0])
-            y = self._gen_node(node.children[1])
+            x = yield node.children[0]
+            y = yield node.children[1]
             fn = self.func_table["PONPOS"]
             self.builder.call(fn, [x, y])
             return None
 
         if kind == "PONXY":
-            x = self._gen_node(node.children[0])
-            y = self._gen_node(node.children[1])
+            x = yield node.children[0]
+            y = yield node.children[1]
             fn = self.func_table["PONXY"]
             self.builder.call(fn, [x, y])
             return None
 
         if kind == "PONX":
-            x = self._gen_node(node.children[0])
+            x = yield node.children[0]
             fn = self.func_table.get("PONX") or self.func_table.get("set_x")
             self.builder.call(fn, [x])
             return None
 
         if kind == "PONY":
-            y = self._gen_node(node.children[0])
+            y = yield node.children[0]
             fn = self.func_table.get("PONY") or self.func_table.get("set_y")
             self.builder.call(fn, [y])
             return None
 
         if kind == "PONRUMBO":
-            v = self._gen_node(node.children[0])
+            v = yield node.children[0]
             fn = self.func_table.get("PONRUMBO") or self.func_table.get("set_heading")
             self.builder.call(fn, [v])
             return None
@@ -392,67 +516,37 @@ class IntermediateCodeGen:
             if isinstance(arg, Node) and arg.kind.upper() == "STR":
                 color_val = color_map.get(arg.value, 0)
             else:
-                color_val = self._gen_node(arg)
+                color_val = yield arg
             fn = self.func_table.get("PONCL") or self.func_table.get("set_color")
             self.builder.call(fn, [ir.Constant(INT, color_val)])
             return None
 
         if kind == "ESPERA":
-            t = self._gen_node(node.children[0])
+            t = yield node.children[0]
             fn = self.func_table.get("ESPERA") or self.func_table.get("sleep_ms")
             self.builder.call(fn, [t])
             return None
 
         # ----- Procedure definition -----
         if kind == "PARA":
-            name_node, params_node, body_node = node.children
-            fname = name_node.value
-            param_count = len(params_node.children)
-            fnty = ir.FunctionType(ir.VoidType(), [self.INT] * param_count)
-            fn = ir.Function(self.module, fnty, name=fname)
-            self.func_table[fname] = fn
-
-            entry = fn.append_basic_block(name="entry")
-            body_bb = fn.append_basic_block(name="body.entry")
-
-            save_builder, save_current = self.builder, self.current_function
-            self.current_function = fn
-            self.builder = ir.IRBuilder(entry)
-
-
-
-            self._push_scope()
-            # --- Allocations de parámetros (usando un builder separado y fijo) ---
-            self.builder.position_at_start(entry)
-            for p in params_node.children:
-                self._create_var_alloca(p.value, self.INT)
-
-            self.builder.position_at_end(entry)
-            # --- Ahora sí, usa self.builder (en una posición independiente) para los stores ---
-            for i, pname_node in enumerate(params_node.children):
-                slot = self._current_symtab()[pname_node.value]
-                self.builder.store(fn.args[i], slot)
-
-
-            self.builder.position_at_end(entry)
-
-            self.builder.branch(body_bb)
-            self.builder.position_at_end(body_bb)
-            self._gen_node(body_node)
-            if not self.builder.block.is_terminated:
-                self.builder.ret_void()
-            self._pop_scope()
-            self.builder = save_builder
-            self.current_function = save_current
+            # los cuerpos se generan antes, desde el grafo de llamadas
+            # (_gen_procedures); aquí solo queda la posición en el programa
             return None
 
         # ----- Control / loops -----
+        if kind == "EVAL":
+            # lo que queda de un store muerto (optimizer/DeadStore.py): las
+            # llamadas se hacen igual y el valor se descarta
+            for c in node.children:
+                yield c
+            return None
+
         if kind == "EJECUTA":
-            self._gen_node(node.children[0])
+            yield node.children[0]
             return None
 
         if kind == "REPITE":
-            count_val = self._gen_node(node.children[0])
+            count_val = yield node.children[0]
             body = node.children[1]
 
             if isinstance(count_val, int):
@@ -464,12 +558,8 @@ class IntermediateCodeGen:
             suffix = self._unique("rep") if hasattr(self, "_unique") else str(id(node))
             counter_name = f"__rep_counter_{suffix}"
 
-            try:
-                # Intentar buscar el contador en el símbolo actual (por seguridad)
-                counter_alloca = self._current_symtab()[counter_name]
-            except KeyError:
-                # Si no existe, créalo (el helper lo pondrá al inicio del entry)
-                counter_alloca = self._create_var_alloca(counter_name, self.INT)
+            # el contador no es una variable del programa: no pasa por el resolver
+            counter_alloca = self._entry_alloca(counter_name)
 
             # === Crear bloques únicos ===
             start_bb = fn.append_basic_block(name=f"rep_start.{suffix}")
@@ -488,7 +578,7 @@ class IntermediateCodeGen:
 
             # === Cuerpo del bucle ===
             self.builder.position_at_end(loop_bb)
-            self._gen_node(body)
+            yield body
             counter = self.builder.load(counter_alloca)
             next_counter = self.builder.add(counter, ir.Constant(self.INT, 1))
             self.builder.store(next_counter, counter_alloca)
@@ -500,21 +590,20 @@ class IntermediateCodeGen:
 
         if kind == "SI":
             cond_node, then_node = node.children[:2]
-            cond_i1 = self._eval_bexpr(cond_node) if hasattr(self, "_eval_bexpr") else self._ensure_i1(
-                self._gen_node(cond_node))
+            cond_i1 = yield self._eval_bexpr(cond_node)
             fn = self.current_function
             then_bb, else_bb, end_bb = fn.append_basic_block(name="if_then"), fn.append_basic_block(
                 name="if_else"), fn.append_basic_block(name="if_end")
 
             self.builder.cbranch(cond_i1, then_bb, else_bb)
             self.builder.position_at_end(then_bb)
-            self._gen_node(then_node)
+            yield then_node
             if not self.builder.block.is_terminated:
                 self.builder.branch(end_bb)
 
             self.builder.position_at_end(else_bb)
             if len(node.children) > 2:
-                self._gen_node(node.children[2])
+                yield node.children[2]
             if not self.builder.block.is_terminated:
                 self.builder.branch(end_bb)
 
@@ -529,12 +618,11 @@ class IntermediateCodeGen:
 
             self.builder.branch(cond_bb)
             self.builder.position_at_end(cond_bb)
-            cond_i1 = self._eval_bexpr(cond_node) if hasattr(self, "_eval_bexpr") else self._ensure_i1(
-                self._gen_node(cond_node))
+            cond_i1 = yield self._eval_bexpr(cond_node)
             self.builder.cbranch(cond_i1, body_bb, end_bb)
 
             self.builder.position_at_end(body_bb)
-            self._gen_node(body_node)
+            yield body_node
             if not self.builder.block.is_terminated:
                 self.builder.branch(cond_bb)
 
@@ -549,13 +637,12 @@ class IntermediateCodeGen:
 
             self.builder.branch(loop_bb)
             self.builder.position_at_end(loop_bb)
-            self._gen_node(body_node)
+            yield body_node
             if not self.builder.block.is_terminated:
                 self.builder.branch(cond_bb)
 
             self.builder.position_at_end(cond_bb)
-            cond_i1 = self._eval_bexpr(cond_node) if hasattr(self, "_eval_bexpr") else self._ensure_i1(
-                self._gen_node(cond_node))
+            cond_i1 = yield self._eval_bexpr(cond_node)
             self.builder.cbranch(cond_i1, end_bb, loop_bb)
             self.builder.position_at_end(end_bb)
             return None
@@ -568,26 +655,24 @@ class IntermediateCodeGen:
 
             self.builder.branch(loop_bb)
             self.builder.position_at_end(loop_bb)
-            self._gen_node(body_node)
+            yield body_node
             if not self.builder.block.is_terminated:
                 self.builder.branch(cond_bb)
 
             self.builder.position_at_end(cond_bb)
-            cond_i1 = self._eval_bexpr(cond_node) if hasattr(self, "_eval_bexpr") else self._ensure_i1(
-                self._gen_node(cond_node))
+            cond_i1 = yield self._eval_bexpr(cond_node)
             self.builder.cbranch(cond_i1, loop_bb, end_bb)
             self.builder.position_at_end(end_bb)
             return None
 
         if kind == "HAZ":
             idnode = node.children[0]
-            name = idnode.value
-            alloca = getattr(self, "_ensure_var")(name)
+            alloca = self._var_ptr(idnode)
             cur = self.builder.load(alloca)
             if len(node.children) == 1:
                 inc_val = ir.Constant(self.INT, 1)
             else:
-                inc_val = self._gen_node(node.children[1])
+                inc_val = yield node.children[1]
             res = self.builder.add(cur, inc_val)
             self.builder.store(res, alloca)
             return None
@@ -0,0 +1,113 @@
+# benchmarks/ast_bench.py
+"""
+Memoria y tiempo de un AST de ~1M nodos: Node con __slots__ vs. la
+dataclass original vs. el AST plano (frontend/flatast.py).
+
+Uso: python -m benchmarks.ast_bench [n_nodos]   (por defecto 1_000_000)
+
+El árbol imita a un programa generado: STMTS con muchas sentencias
+`AV (a + 1)` / `INIC x = 2 * y`, es decir mayoría de hojas NUM/ID.
+"""
+from __future__ import annotations
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, List
+
+from frontend.ast import Node
+from frontend.flatast import FlatAST, KIND_CODE
+
+@dataclass
+class DataclassNode:
+    """La definición de Node antes de __slots__, para comparar."""
+    kind: str
+    value: Any = None
+    children: List["DataclassNode"] = field(default_factory=list)
+    line: int = 0
+
+def build(cls, n_nodes: int):
+    stmts = []
+    line = 1
+    # cada sentencia aporta 5 nodos
+    for i in range(n_nodes // 5):
+        if i & 1:
+            stmt = cls("AV", None, [cls("BINOP", "+", [cls("ID", "a", [], line), cls("NUM", 1, [], line)], line)], line)
+        else:
+            stmt = cls("INIC", None, [cls("ID", "x", [], line),
+                                      cls("BINOP", "*", [cls("NUM", 2, [], line), cls("ID", "y", [], line)], line)], line)
+        stmts.append(stmt)
+        line += 1
+    return cls("PROGRAM", None, [cls("STMTS", None, stmts)])
+
+def count_kind(root, kind: str) -> int:
+    n = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.kind == kind:
+            n += 1
+        stack.extend(node.children)
+    return n
+
+def _timed(fn, runs: int = 5):
+    # mínimo de varias corridas con el GC pausado: el recolector cíclico
+    # recorre todo el árbol y domina el ruido con 1M de objetos vivos
+    times = []
+    for _ in range(runs):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+        finally:
+            gc.enable()
+        del result
+    return min(times)
+
+def _memory(cls, n_nodes: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        root = build(cls, n_nodes)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del root
+    return size
+
+def main(argv: list[str]):
+    n_nodes = int(argv[0]) if argv else 1_000_000
+    print(f"AST de {n_nodes:,} nodos")
+    for name, cls in (("dataclass", DataclassNode), ("slots", Node)):
+        mem = _memory(cls, n_nodes)
+        t_build = _timed(lambda: build(cls, n_nodes))
+        root = build(cls, n_nodes)
+        t_walk = _timed(lambda: count_kind(root, "NUM"))
+        print(f"  {name:9s}: {mem / (1 << 20):7.1f} MB ({mem / n_nodes:5.1f} B/nodo)  "
+              f"construcción {t_build * 1000:7.1f} ms  recorrido {t_walk * 1000:7.1f} ms")
+        del root
+
+    # AST plano: la memoria cuenta solo los arreglos (los valores se comparten con el árbol)
+    root = build(Node, n_nodes)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        flat = FlatAST.from_node(root)
+        mem, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    t_conv = _timed(lambda: FlatAST.from_node(root))
+    t_back = _timed(lambda: flat.to_node())
+    code = KIND_CODE["NUM"]
+    kinds = flat.kinds
+    t_iter = _timed(lambda: sum(1 for i in flat.preorder() if kinds[i] == code))
+    t_scan = _timed(lambda: kinds.count(code))
+    print(f"  {'plano':9s}: {mem / (1 << 20):7.1f} MB ({mem / n_nodes:5.1f} B/nodo)  "
+          f"desde Node {t_conv * 1000:7.1f} ms  a Node {t_back * 1000:7.1f} ms")
+    print(f"  {'':9s}  recorrido preorder() {t_iter * 1000:7.1f} ms  barrido lineal {t_scan * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,60 @@
+# benchmarks/astbin_bench.py
+"""
+Exportar/cargar un AST grande: ast.json (save_ast_json + JNode.from_dict,
+lo que hacen App y AstViewer) vs. el formato binario de frontend/astbin.py.
+
+Uso: python -m benchmarks.astbin_bench [repeticiones]   (por defecto 20000)
+
+Con el valor por defecto el programa tiene ~900k nodos. Los tiempos se
+miden con el GC activo, como corren en la IDE.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+import tempfile
+import time
+
+from frontend.parser import parse_text
+from frontend.exporter import save_ast_json
+from frontend.astbin import save_ast_bin, load_ast_bin
+from frontend.hashcons import structural_size
+from frontend.ast_viewer_tk import JNode
+
+_UNIT = (
+    "para cuadro [lado]\n"
+    "  repite 4 [ av lado * 2 gd 90 ]\n"
+    "fin\n"
+    "inic tam = 10\n"
+    "repite 3 [ cuadro [tam + 5] gd 120 ]\n"
+    "si tam mayorque? 3 [ av SUMA tam 1 ] \n"
+)
+
+def _time(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+def _load_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return JNode.from_dict(json.load(f))
+
+def main(argv: list[str]):
+    reps = int(argv[0]) if argv else 20000
+    tree = parse_text(_UNIT * reps, "rd")
+    print(f"{reps} repeticiones, {structural_size(tree):,} nodos")
+    with tempfile.TemporaryDirectory() as tmp:
+        jpath = os.path.join(tmp, "ast.json")
+        bpath = os.path.join(tmp, "ast.bin")
+        t_jw = _time(lambda: save_ast_json(tree, jpath))
+        t_bw = _time(lambda: save_ast_bin(tree, bpath))
+        t_jr = _time(lambda: _load_json(jpath))
+        t_br = _time(lambda: load_ast_bin(bpath, JNode))
+        j_size, b_size = os.path.getsize(jpath), os.path.getsize(bpath)
+    print(f"  {'':8s} {'exportar':>10s} {'cargar':>10s} {'tamaño':>10s}")
+    print(f"  {'json':8s} {t_jw * 1000:8.0f} ms {t_jr * 1000:8.0f} ms {j_size / (1 << 20):7.1f} MB")
+    print(f"  {'binario':8s} {t_bw * 1000:8.0f} ms {t_br * 1000:8.0f} ms {b_size / (1 << 20):7.1f} MB")
+    print(f"  aceleración: exportar x{t_jw / t_bw:.1f}, cargar x{t_jr / t_br:.1f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,107 @@
+# benchmarks/cse_bench.py
+"""
+Pase "cse" (optimizer/CommonSubexpr.py) en código generado de verdad: cada
+programa se compila con el JIT de llvmlite (benchmarks/runtime_trace.py)
+con -O2 sin "cse" y con -O2, y se mide main() (mejor de 5, GC pausado).
+Cuenta las operaciones aritméticas y los load del IR y verifica que los
+comandos mandados al runtime sean los mismos.
+
+Uso: python -m benchmarks.cse_bench [vueltas]   (por defecto 1000000)
+
+Los valores de partida salen de AZAR para que "constprop" no resuelva todo
+en compilación; los AZAR que se repiten en el mismo programa se tienen que
+quedar separados.
+"""
+from __future__ import annotations
+import gc
+import re
+import sys
+import time
+
+from frontend.parser import parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+from benchmarks.runtime_trace import compile_main, trace
+
+_PROGRAMS = {
+    # la misma expresión en varias sentencias seguidas del cuerpo
+    "sentencias": (
+        "// cse\n"
+        "inic a = AZAR 10 inic b = AZAR 10 inic i = 0 inic s = 0 inic t = 0\n"
+        "mientras MENORQUE? i {n} [\n"
+        "  inc [s (i + a) * (i + b) - POTENCIA (i - a) 5]\n"
+        "  inc [t (a + i) * (b + i) + POTENCIA (i - a) 5]\n"
+        "  inc [i]\n"
+        "]\n"
+        "av (s + t) / 1000\n"
+    ),
+    # procedimiento con los mismos productos en sus comandos
+    "procedimiento": (
+        "// cse + inline\n"
+        "inic i = 0 inic s = 0 inic k = AZAR 10\n"
+        "para paso [u v]\n"
+        "  haz s s + u * u - v * v + u * v\n"
+        "  inc [s (u * v + v * u) / 2 - u * u]\n"
+        "fin\n"
+        "mientras MENORQUE? i {n} [ paso [i k] inc [i] ]\n"
+        "av s / 1000\n"
+    ),
+    # AZAR repetido: no se junta
+    "azar": (
+        "// cse + azar\n"
+        "inic i = 0 inic s = 0\n"
+        "mientras MENORQUE? i {m} [\n"
+        "  inc [s AZAR 10 + AZAR 10]\n"
+        "  inc [i]\n"
+        "]\n"
+        "av s / 1000\n"
+    ),
+}
+
+_VERSIONS = (("-O2 sin cse", ("cse",)), ("-O2", ()))
+
+_ARITH = re.compile(r" = (?:add|sub|mul|sdiv) ")
+
+
+def _ir_counts(tree):
+    text = IntermediateCodeGen().generate(tree)
+    return len(_ARITH.findall(text)), text.count(" = load ")
+
+def _time(main, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            main()
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best
+
+def main(argv: list[str]):
+    n = int(argv[0]) if argv else 1000000
+    ok = True
+    for name, src in _PROGRAMS.items():
+        print(f"{name} ({n:,} vueltas)")
+        ref = None
+        base = None
+        for label, disable in _VERSIONS:
+            tree, _ = optimize(parse_text(src.format(n=n, m=max(1, n // 1000)), "ply"), 2, disable)
+            ops, loads = _ir_counts(tree)
+            fn = compile_main(tree)
+            cmds = list(trace(tree, fn))    # _time() vuelve a correr main()
+            if ref is None:
+                ref = cmds
+            same = cmds == ref
+            ok &= same
+            t = _time(fn)
+            base = base or t
+            print(f"  {label:12s} {t * 1000:8.2f} ms  {base / t:5.2f}x  "
+                  f"IR: {ops:3d} operaciones {loads:3d} load  mismos comandos: {'sí' if same else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
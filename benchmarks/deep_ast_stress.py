@@ -0,0 +1,74 @@
+# benchmarks/deep_ast_stress.py
+"""
+Prueba de estrés de profundidad: todos los pases sobre ASTs con 100k niveles.
+
+Uso: python -m benchmarks.deep_ast_stress [profundidad]   (por defecto 100_000)
+
+Dos programas:
+- bloques: REPITE / SI anidados alternadamente `profundidad` veces;
+- expresión: `AV SUMA SUMA ... x 1 1 ...` con `profundidad` SUMAs.
+
+Se parsean con el motor "ply" (el LR de PLY usa su propia pila; el motor
+"rd" es recursivo) y luego se corren Node.pretty, ast_to_dict, analyze,
+ASTOptimizer.optimize y la generación de IR, todos sin recursión en Python
+(pretty con a lo sumo PRETTY_MAX_DEPTH niveles).
+Cualquier RecursionError hace fallar la prueba (código de salida 1).
+"""
+from __future__ import annotations
+import sys
+import time
+
+from frontend.parser import parse_text
+from frontend.exporter import ast_to_dict
+from frontend.semantics import analyze
+from optimizer.ASTOptimizer import ASTOptimizer
+from IR.IntermediateCodeGen import IntermediateCodeGen
+
+# la salida de pretty() crece con profundidad² (indentación): más allá de
+# esto se imprime un árbol más bajo, que igual supera el límite de recursión
+PRETTY_MAX_DEPTH = 10_000
+
+def nested_blocks(depth: int) -> str:
+    opens = []
+    for i in range(depth):
+        opens.append("REPITE 2 [ " if i % 2 == 0 else "SI MAYORQUE? x 0 [ ")
+    return "INIC x = 1\n" + "".join(opens) + "AV x" + " ]" * depth + "\n"
+
+def suma_chain(depth: int) -> str:
+    return "INIC x = 1\nAV " + "SUMA " * depth + "x" + " 1" * depth + "\n"
+
+def _phase(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"    {label:14s} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+    return result
+
+def stress(name: str, make, depth: int) -> None:
+    print(f"  {name}:")
+    tree = _phase("parse (ply)", lambda: parse_text(make(depth), "ply"))
+    if depth <= PRETTY_MAX_DEPTH:
+        _phase("pretty", tree.pretty)
+    else:
+        small = parse_text(make(PRETTY_MAX_DEPTH), "ply")
+        _phase(f"pretty ({PRETTY_MAX_DEPTH // 1000}k)", small.pretty)
+    _phase("ast_to_dict", lambda: ast_to_dict(tree))
+    diags = _phase("analyze", lambda: analyze(tree))
+    if diags.has_errors():
+        raise AssertionError(diags.pretty())
+    opt = _phase("optimize", lambda: ASTOptimizer().optimize(tree))
+    _phase("IR", lambda: IntermediateCodeGen().generate(opt))
+
+def main(argv: list[str]) -> int:
+    depth = int(argv[0]) if argv else 100_000
+    print(f"profundidad {depth:,} (límite de recursión {sys.getrecursionlimit()})")
+    try:
+        stress("bloques", nested_blocks, depth)
+        stress("expresión", suma_chain, depth)
+    except RecursionError as e:
+        print(f"FALLO: {e!r}")
+        return 1
+    print("ok")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,80 @@
+# benchmarks/dse_bench.py
+"""
+Pase "dse" (optimizer/DeadStore.py) sobre los ejemplos: para cada programa
+reporta los stores muertos que sacó (sus reescrituras) y cuenta los alloca
+y store del IR con -O2 sin "dse" y con -O2. Compila los dos con el JIT de
+llvmlite (benchmarks/runtime_trace.py) y verifica que manden los mismos
+comandos al runtime, incluidos los de AZAR (RANDINT), que no dibujan pero
+no se pueden perder. Sale con 1 si algo cambia.
+
+Uso: python -m benchmarks.dse_bench [archivo.logo ...]
+     (por defecto examples/*.logo, optimizer/tests/*.logo y dos programas
+     de acá)
+"""
+from __future__ import annotations
+import glob
+import os
+import sys
+
+from frontend.parser import parse_file, parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+from benchmarks.runtime_trace import trace
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROGRAMS = {
+    # variables que "constprop" deja sin leer y un AZAR que no se usa
+    "constantes": (
+        "// dse\n"
+        "inic lado = 40 inic giro = 90 inic semilla = AZAR 100\n"
+        "inic n = 0\n"
+        "repite 4 [ av lado gd giro inc [n] ]\n"
+        "inic lado = lado / 2\n"
+        "repite 4 [ av lado gd giro ]\n"
+    ),
+    # stores pisados antes de leerse y locales sin usar en un procedimiento
+    "pisados": (
+        "// dse\n"
+        "inic i = 0 inic x = AZAR 10\n"
+        "para paso [d] inic tmp = d * 3 inic tmp = d av tmp gd 45 fin\n"
+        "mientras MENORQUE? i 8 [ inic x = AZAR 5 inic x = i * 2 paso [x] inc [i] ]\n"
+    ),
+}
+
+
+def _ir_counts(tree):
+    text = IntermediateCodeGen().generate(tree)
+    return text.count(" = alloca "), text.count("store ")
+
+def _sources(argv):
+    if argv:
+        return [(os.path.relpath(p, _ROOT), lambda p=p: parse_file(p)) for p in argv]
+    files = sorted(glob.glob(os.path.join(_ROOT, "examples", "*.logo"))) + \
+        sorted(glob.glob(os.path.join(_ROOT, "optimizer", "tests", "*.logo")))
+    return [(os.path.relpath(p, _ROOT), lambda p=p: parse_file(p)) for p in files] + \
+        [(name, lambda src=src: parse_text(src, "ply")) for name, src in _PROGRAMS.items()]
+
+def main(argv: list[str]):
+    ok = True
+    print(f"{'programa':32s} {'muertos':>10s} {'alloca':>10s} {'store':>10s}  mismos comandos")
+    for name, load in _sources(argv):
+        try:
+            tree = load()
+            before, _ = optimize(tree, 2, ("dse",))
+            after, pm = optimize(tree, 2)
+            dead = pm.stats["dse"].rewrites
+            a0, s0 = _ir_counts(before)
+            a1, s1 = _ir_counts(after)
+            same = list(trace(before)) == list(trace(after))
+        except Exception as e:
+            print(f"{name:32s}  (no compila: {type(e).__name__}: {e})")
+            continue
+        ok &= same
+        print(f"{name:32s} {dead:10d} {a0:4d} -> {a1:<4d} {s0:4d} -> {s1:<4d}  "
+              f"{'sí' if same else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+# benchmarks/hashcons_bench.py
+"""
+Hash-consing del AST en un programa generado con subárboles repetidos.
+
+Uso: python -m benchmarks.hashcons_bench [repeticiones]   (por defecto 2000)
+
+Reporta nodos totales vs. únicos (con y sin línea en la clave), memoria
+retenida por el árbol y el costo de comparar dos árboles iguales:
+estructural (Node.__eq__) vs. consado (identidad).
+
+Se parsea con el motor "rd": el LRParser de PLY retiene el último resultado
+en su pila y falsearía la memoria medida.
+"""
+from __future__ import annotations
+import gc
+import sys
+import time
+import tracemalloc
+
+from frontend.parser import parse_text
+from frontend.hashcons import HashConsFactory, structural_size
+
+_UNIT = (
+    "para cuadro [lado]\n"
+    "  repite 4 [ av lado * 2 gd 90 ]\n"
+    "fin\n"
+    "inic tam = 10\n"
+    "repite 3 [ cuadro [tam + 5] gd 120 ]\n"
+    "si tam mayorque? 3 [ av SUMA tam 1 ] \n"
+)
+
+def _retained(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def _time(fn, runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main(argv: list[str]):
+    reps = int(argv[0]) if argv else 2000
+    text = _UNIT * reps
+    tree, mem_tree = _retained(lambda: parse_text(text, "rd"))
+    other = parse_text(text, "rd")
+    total = structural_size(tree)
+    print(f"{reps} repeticiones, {total:,} nodos; árbol Node: {mem_tree / (1 << 20):.1f} MB")
+    for lines in (True, False):
+        factory = HashConsFactory(lines=lines)
+        consed, mem = _retained(lambda: factory.intern(parse_text(text, "rd")))
+        t = _time(lambda: HashConsFactory(lines=lines).intern(tree), runs=3)
+        label = "con líneas" if lines else "sin líneas"
+        print(f"  {label}: {len(factory):,} nodos únicos ({100 * len(factory) / total:.1f}%), "
+              f"{mem / (1 << 20):.1f} MB (árbol + tabla), intern {t * 1000:.0f} ms, size={consed.size:,}")
+    factory = HashConsFactory()
+    a, b = factory.intern(tree), factory.intern(other)
+    t_struct = _time(lambda: tree == other)
+    t_cons = _time(lambda: a == b)
+    print(f"  igualdad estructural: {t_struct * 1000:8.2f} ms   consada: {t_cons * 1e6:6.2f} µs")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,58 @@
+# benchmarks/incremental_bench.py
+"""
+Reparseo incremental vs. parseo completo en un programa grande.
+
+Uso: python -m benchmarks.incremental_bench [n_lineas]   (por defecto 10000)
+
+Simula ediciones de una tecla en posiciones al azar (cambiar un número) y
+compara el tiempo de IncrementalParser.update con parse_text del buffer
+completo. También verifica que ambos AST sean iguales.
+"""
+from __future__ import annotations
+import random
+import re
+import statistics
+import sys
+import time
+
+from frontend.incremental import IncrementalParser
+from frontend.parser import parse_text
+
+_UNIT = (
+    "para cuadro [lado]\n"
+    "  repite 4 [ av lado gd 90 ]\n"
+    "fin\n"
+    "inic tam = 10\n"
+    "cuadro [tam * 2]\n"
+    "si tam mayorque? 3 [ poncl \"rojo\" ]\n"
+)
+
+def main(argv: list[str]):
+    n_lines = int(argv[0]) if argv else 10_000
+    text = "// programa grande\n" + _UNIT * (n_lines // _UNIT.count("\n"))
+    digits = [m.start() for m in re.finditer(r"\d", text)]
+    rng = random.Random(0)
+
+    inc = IncrementalParser()
+    t0 = time.perf_counter()
+    inc.update(text)
+    print(f"{text.count(chr(10)):,} líneas, {len(inc.items):,} ítems; parseo inicial {1000 * (time.perf_counter() - t0):.1f} ms")
+
+    full, incr = [], []
+    for _ in range(30):
+        i = rng.choice(digits)
+        text = text[:i] + str(rng.randrange(1, 10)) + text[i + 1:]
+        t0 = time.perf_counter()
+        ast = inc.update(text)
+        incr.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        ref = parse_text(text, "rd", "fast")
+        full.append(time.perf_counter() - t0)
+        if ast != ref:
+            sys.exit("el AST incremental difiere del parseo completo")
+    print(f"  completo   : mediana {statistics.median(full) * 1000:8.2f} ms")
+    print(f"  incremental: mediana {statistics.median(incr) * 1000:8.2f} ms  "
+          f"({inc.last_reparsed} ítem(s) reparseados, {inc.last_reused:,} reutilizados)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,100 @@
+# benchmarks/inline_bench.py
+"""
+Pase "inline" (optimizer/Inliner.py) en código generado de verdad: cada
+programa se compila con el JIT de llvmlite (benchmarks/runtime_trace.py)
+con -O2 sin "inline" y con -O2, y se mide main() (mejor de 5, GC pausado).
+Reporta los procedimientos compilados y las llamadas a ellos del IR, y
+verifica que los comandos mandados al runtime sean los mismos.
+
+Uso: python -m benchmarks.inline_bench [vueltas]   (por defecto 100000)
+"""
+from __future__ import annotations
+import gc
+import re
+import sys
+import time
+
+from frontend.parser import parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+from benchmarks.runtime_trace import compile_main, trace
+
+_PROGRAMS = {
+    # procedimiento chico llamado en un bucle grande
+    "chico": (
+        "// inline\n"
+        "inic s = 0 inic i = 0 inic k = AZAR 10\n"
+        "para paso [a b]\n"
+        "  haz s a * b + 1\n"
+        "fin\n"
+        "mientras MENORQUE? i {n} [ paso [i k] inc [i] ]\n"
+        "av s / 100000\n"
+    ),
+    # dos niveles de procedimientos chicos
+    "anidado": (
+        "// inline\n"
+        "inic s = 0 inic i = 0\n"
+        "para acumula [x] haz s x fin\n"
+        "para doble [x] acumula [x] acumula [x] fin\n"
+        "mientras MENORQUE? i {n} [ doble [i] inc [i] ]\n"
+        "av s / 100000\n"
+    ),
+    # recursivo con argumentos constantes: se especializa
+    "recursivo": (
+        "// clones\n"
+        "inic s = 0 inic i = 0\n"
+        "para cuenta [n t]\n"
+        "  si MAYORQUE? n 0 [ haz s t cuenta [n - 1 t + 1] cuenta [n - 1 t * 2] ]\n"
+        "fin\n"
+        "mientras MENORQUE? i {m} [ cuenta [6 1] inc [i] ]\n"
+        "av s / 100000\n"
+    ),
+}
+
+_VERSIONS = (("-O2 sin inline", ("inline",)), ("-O2", ()))
+
+
+def _ir_counts(tree):
+    text = IntermediateCodeGen().generate(tree)
+    procs = set(re.findall(r'^define void @"?([^"(]+)"?\(', text, re.M))
+    calls = sum(1 for name in re.findall(r'call void @"?([^"(]+)"?\(', text) if name in procs)
+    return len(procs), calls
+
+def _time(main, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            main()
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best
+
+def main(argv: list[str]):
+    n = int(argv[0]) if argv else 100000
+    ok = True
+    for name, src in _PROGRAMS.items():
+        print(f"{name} ({n:,} vueltas)")
+        ref = None
+        base = None
+        for label, disable in _VERSIONS:
+            tree, _ = optimize(parse_text(src.format(n=n, m=max(1, n // 100)), "ply"), 2, disable)
+            defs, calls = _ir_counts(tree)
+            fn = compile_main(tree)
+            cmds = list(trace(tree, fn))    # _time() vuelve a correr main()
+            if ref is None:
+                ref = cmds
+            same = cmds == ref
+            ok &= same
+            t = _time(fn)
+            base = base or t
+            print(f"  {label:16s} {t * 1000:8.2f} ms  {base / t:5.2f}x  "
+                  f"IR: {defs} procedimientos, {calls} llamadas  mismos comandos: {'sí' if same else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+# benchmarks/json_export_bench.py
+"""
+Exportar ast.json: json.dump(ast_to_dict(...)) (lo de antes) vs. el
+escritor en streaming de frontend/exporter.py (indentado, compacto, gzip).
+
+Uso: python -m benchmarks.json_export_bench [repeticiones]   (por defecto 3000)
+
+Reporta tiempo, pico de memoria extra durante la exportación (tracemalloc,
+sin contar el árbol ya construido) y tamaño del archivo; además verifica
+que la salida indentada sea byte a byte la de json.dump.
+"""
+from __future__ import annotations
+import filecmp
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from frontend.parser import parse_text
+from frontend.exporter import ast_to_dict, save_ast_json
+from frontend.hashcons import structural_size
+
+_UNIT = (
+    "para cuadro [lado]\n"
+    "  repite 4 [ av lado * 2 gd 90 ]\n"
+    "fin\n"
+    "inic tam = 10\n"
+    "repite 3 [ cuadro [tam + 5] gd 120 ]\n"
+    "si tam mayorque? 3 [ av SUMA tam 1 ] \n"
+)
+
+def _old_save(root, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(ast_to_dict(root), f, ensure_ascii=False, indent=2)
+
+def _measure(fn):
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+def main(argv: list[str]):
+    reps = int(argv[0]) if argv else 3000
+    tree = parse_text(_UNIT * reps, "rd")
+    print(f"{reps} repeticiones, {structural_size(tree):,} nodos")
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [
+            ("json.dump", "old.json", lambda p: _old_save(tree, p)),
+            ("stream", "ast.json", lambda p: save_ast_json(tree, p)),
+            ("compacto", "compact.json", lambda p: save_ast_json(tree, p, compact=True)),
+            ("gzip", "ast.json.gz", lambda p: save_ast_json(tree, p)),
+            ("compacto+gz", "compact.json.gz", lambda p: save_ast_json(tree, p, compact=True)),
+        ]
+        for label, name, save in runs:
+            path = os.path.join(tmp, name)
+            elapsed, peak = _measure(lambda: save(path))
+            print(f"  {label:12s} {elapsed * 1000:8.0f} ms   pico {peak / (1 << 20):7.2f} MB   "
+                  f"archivo {os.path.getsize(path) / (1 << 20):7.2f} MB")
+        same = filecmp.cmp(os.path.join(tmp, "old.json"), os.path.join(tmp, "ast.json"), shallow=False)
+        print(f"  salida idéntica a json.dump: {'sí' if same else 'NO'}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,96 @@
+# benchmarks/lexer_bench.py
+"""
+Throughput y memoria del lexer: PLY (regex maestra + callback por token),
+FastLexer y el flujo en columnas de frontend/tokenstream.py.
+
+Uso: python -m benchmarks.lexer_bench [n_tokens]   (por defecto 1M)
+
+Antes de medir se verifica que todos los modos producen los mismos tokens
+(tipo, valor, línea y posición). El programa se genera repitiendo unas pocas
+sentencias con los mismos identificadores, como los programas generados por
+máquina.
+"""
+from __future__ import annotations
+import statistics
+import sys
+import time
+import tracemalloc
+
+from frontend.lexer import build_lexer, LEXER_MODES
+from frontend.tokenstream import tokenize
+
+_UNIT = (
+    "inic lado = 10\n"
+    "repite 4 [ av lado * 2 gd 90 inc [lado 1.5] ]\n"
+    "si lado mayorque? 3 [ poncl \"rojo\" ] // comentario\n"
+    "HAZ contador SUMA contador - 1 2\n"
+)
+
+def make_program(n_tokens: int) -> str:
+    lex = build_lexer("fast")
+    lex.input(_UNIT)
+    per_unit = sum(1 for _ in lex)
+    return _UNIT * max(1, n_tokens // per_unit)
+
+def _lex_all(mode: str, text: str) -> int:
+    lex = build_lexer(mode)
+    lex.input(text)
+    n = 0
+    token = lex.token
+    while token() is not None:
+        n += 1
+    return n
+
+def _token_tuples(mode: str, text: str) -> list[tuple]:
+    lex = build_lexer(mode)
+    lex.input(text)
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in iter(lex.token, None)]
+
+def _median_time(fn, runs: int = 3):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+def _bytes_per_token(build) -> float:
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size / len(result)
+
+def main(argv: list[str]):
+    n_tokens = int(argv[0]) if argv else 1_000_000
+    text = make_program(n_tokens)
+    ref = _token_tuples("ply", text)
+    arrays = [(t.type, t.value, t.lineno, t.lexpos) for t in tokenize(text).lextokens()]
+    if _token_tuples("fast", text) != ref or arrays != ref:
+        sys.exit("FastLexer/tokenize no producen los mismos tokens que PLY")
+    del ref, arrays
+    print(f"programa: {len(text):,} bytes")
+    print("tiempo")
+    for mode in LEXER_MODES:
+        t, n = _median_time(lambda: _lex_all(mode, text))
+        print(f"  {mode:8s}: {n:,} tokens en {t * 1000:8.1f} ms  {n / t:12,.0f} tokens/s")
+    t, arr = _median_time(lambda: tokenize(text))
+    print(f"  {'columnas':8s}: {len(arr):,} tokens en {t * 1000:8.1f} ms  {len(arr) / t:12,.0f} tokens/s")
+    print("memoria por token")
+    lex_bytes = _bytes_per_token(lambda: list(iter(_fresh_fast(text).token, None)))
+    arr_bytes = _bytes_per_token(lambda: tokenize(text))
+    print(f"  lista de LexToken: {lex_bytes:6.1f} bytes/token")
+    print(f"  columnas         : {arr_bytes:6.1f} bytes/token")
+    idx = arr.line_index
+    t, _ = _median_time(lambda: [idx.position(o) for o in arr.starts])
+    print(f"offset -> (línea, col) con bisect: {t / len(arr) * 1e9:.0f} ns/consulta")
+
+def _fresh_fast(text: str):
+    lex = build_lexer("fast")
+    lex.input(text)
+    return lex
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
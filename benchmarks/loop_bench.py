@@ -0,0 +1,105 @@
+# benchmarks/loop_bench.py
+"""
+Pases "licm" y "unroll" (optimizer/LoopOpt.py) en código generado de
+verdad: cada programa se compila con el JIT de llvmlite
+(benchmarks/runtime_trace.py) con -O2 sin los dos pases, solo con "licm" y
+con los dos, y se mide main() (mejor de 5, GC pausado). También cuenta
+las instrucciones load/store del IR y verifica que los comandos mandados
+al runtime sean los mismos.
+
+Uso: python -m benchmarks.loop_bench [vueltas]   (por defecto 20000)
+
+Los programas casi no dibujan (cada comando es una llamada a Python): lo
+que se mide es el costo de los bucles. Los valores de partida salen de
+AZAR para que "constprop" no resuelva todo en compilación.
+"""
+from __future__ import annotations
+import gc
+import sys
+import time
+
+from frontend.parser import parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+from benchmarks.runtime_trace import compile_main, trace
+
+_PROGRAMS = {
+    # invariante en el cuerpo de un MIENTRAS
+    "invariante": (
+        "// licm\n"
+        "inic lado = AZAR 10 inic paso = AZAR 5 inic i = 0 inic s = 0\n"
+        "mientras MENORQUE? i {n} [\n"
+        "  inc [s PRODUCTO lado lado + paso * (lado - 1)]\n"
+        "  inc [i]\n"
+        "]\n"
+        "av s / 1000\n"
+    ),
+    # REPITE chicos anidados en un bucle grande
+    "repite chico": (
+        "// unroll\n"
+        "inic i = 0 inic s = 0 inic k = AZAR 10\n"
+        "mientras MENORQUE? i {n} [\n"
+        "  repite 4 [ inc [s k * k] ]\n"
+        "  repite 3 [ inc [s 1] ]\n"
+        "  inc [i]\n"
+        "]\n"
+        "av s / 1000\n"
+    ),
+    # invariante de un bucle de afuera usada en uno de adentro
+    "anidados": (
+        "// licm + unroll\n"
+        "inic a = AZAR 10 inic b = AZAR 10 inic i = 0 inic s = 0\n"
+        "mientras MENORQUE? i {n} [\n"
+        "  inic j = 0\n"
+        "  mientras MENORQUE? j 8 [ inc [s (a * a + b * b) / 5] inc [j] ]\n"
+        "  inc [i]\n"
+        "]\n"
+        "av s / 1000\n"
+    ),
+}
+
+_VERSIONS = (("-O2 sin licm/unroll", ("licm", "unroll")), ("solo licm", ("unroll",)), ("licm+unroll", ()))
+
+
+def _ir_counts(tree):
+    text = IntermediateCodeGen().generate(tree)
+    return text.count(" = load "), text.count("store ")
+
+def _time(main, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            main()
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best
+
+def main(argv: list[str]):
+    n = int(argv[0]) if argv else 20000
+    ok = True
+    for name, src in _PROGRAMS.items():
+        print(f"{name} ({n:,} vueltas)")
+        ref = None
+        base = None
+        for label, disable in _VERSIONS:
+            tree, _ = optimize(parse_text(src.format(n=n), "ply"), 2, disable)
+            loads, stores = _ir_counts(tree)
+            fn = compile_main(tree)
+            cmds = list(trace(tree, fn))    # _time() vuelve a correr main()
+            if ref is None:
+                ref = cmds
+            same = cmds == ref
+            ok &= same
+            t = _time(fn)
+            base = base or t
+            print(f"  {label:20s} {t * 1000:8.2f} ms  {base / t:5.2f}x  "
+                  f"IR: {loads:3d} load {stores:3d} store  mismos comandos: {'sí' if same else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+# benchmarks/optimizer_bench.py
+"""
+ASTOptimizer: estrategia "fixpoint" (recorrer todo el árbol hasta que no
+haya cambios, lo de antes) vs. "worklist" (una pasada; solo se vuelven a
+optimizar los nodos reescritos). También mide los niveles -O1/-O2 de
+optimizer/PassManager.py, con un pase por grupo de reglas.
+
+Uso: python -m benchmarks.optimizer_bench [repeticiones...]   (por defecto 500 2000 8000)
+
+Primero corre los programas de optimizer/tests y después un corpus sintético
+escalado. Reporta el mejor de 5 tiempos (GC pausado), recorridos completos
+del árbol, nodos nuevos creados (los que no estaban en el árbol original) y
+verifica que ambas estrategias den el mismo árbol.
+"""
+from __future__ import annotations
+import gc
+import glob
+import os
+import sys
+import time
+
+from frontend.parser import parse_text
+from frontend.hashcons import structural_size
+from optimizer.ASTOptimizer import ASTOptimizer
+from optimizer.PassManager import PassManager
+
+_TESTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "optimizer", "tests")
+
+# Mezcla de código que no cambia con reescrituras que encadenan reglas
+# (GI -> GD -> normalizar, SI constante -> bloque, plegados anidados).
+_UNIT = (
+    "inic tam = 10\n"
+    "para cuadro{i} [lado]\n"
+    "  repite 4 [ av lado * 2 gd 90 ]\n"
+    "fin\n"
+    "repite 3 [ cuadro{i} [tam + 5] gd 120 ]\n"
+    "si MAYORQUE? tam 3 [ av tam * 1 re 0 gi 30 ]\n"
+    "si 2 + 2 iguales? 4 [ gi 45 av (3 + 4) * (2 - 2) + tam ]\n"
+    "mientras MENORQUE? tam 20 [ inc [tam 2] re tam ]\n"
+    "ponpos [tam tam + 0]\n"
+)
+
+def _new_nodes(before, after) -> int:
+    seen = set()
+    stack = [before]
+    while stack:
+        n = stack.pop()
+        seen.add(id(n))
+        stack.extend(c for c in n.children if c is not None)
+    count = 0
+    stack = [after] if after is not None else []
+    while stack:
+        n = stack.pop()
+        count += id(n) not in seen
+        stack.extend(c for c in n.children if c is not None)
+    return count
+
+def _best(make, run, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            opt = make()
+            t0 = time.perf_counter()
+            out = run(opt)
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best, out, opt
+
+def _run(tree, strategy: str):
+    return _best(lambda: ASTOptimizer(strategy), lambda opt: opt.optimize(tree))
+
+def _compare(label: str, tree, n: int):
+    results = {}
+    for strategy in ("fixpoint", "worklist"):
+        results[strategy] = _run(tree, strategy)
+    (t_fix, out_fix, opt_fix), (t_wl, out_wl, opt_wl) = results["fixpoint"], results["worklist"]
+    same = out_fix == out_wl
+    print(f"{label}: {n:,} nodos")
+    for strategy, (t, out, opt) in results.items():
+        print(f"  {strategy:9s} {t * 1000:8.2f} ms  {opt.passes} recorrido(s)  "
+              f"{opt.optimizations_applied:,} reescrituras  {_new_nodes(tree, out):,} nodos nuevos")
+    print(f"  aceleración {t_fix / t_wl:5.2f}x   mismo árbol: {'sí' if same else 'NO'}")
+    for level in (1, 2):
+        t, _, pm = _best(lambda: PassManager(level), lambda pm: pm.run(tree))
+        runs = sum(st.runs for st in pm.stats.values())
+        print(f"  -O{level}       {t * 1000:8.2f} ms  {runs} corrida(s) de pases  {pm.rewrites:,} reescrituras")
+    return same
+
+def main(argv: list[str]):
+    sizes = [int(a) for a in argv] or [500, 2000, 8000]
+    ok = True
+
+    files = sorted(glob.glob(os.path.join(_TESTS, "*.logo")))
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            tree = parse_text(f.read(), "ply")
+        ok &= _compare(os.path.relpath(path, os.path.dirname(_TESTS)), tree, structural_size(tree))
+
+    for reps in sizes:
+        tree = parse_text("// sintético\n" + "".join(_UNIT.format(i=i) for i in range(reps)), "ply")
+        ok &= _compare(f"sintético x{reps}", tree, structural_size(tree))
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+# benchmarks/parser_bench.py
+"""
+Latencia del frontend: arranque en frío vs. parseo en caliente.
+
+Uso: python -m benchmarks.parser_bench [archivo.logo ...]
+
+- cold/sin caché: proceso nuevo con la carpeta de caché vacía (PLY genera las tablas LALR)
+- cold/con caché: proceso nuevo leyendo las tablas desde disco
+- warm: parseos repetidos dentro del mismo proceso (parser y lexer ya construidos)
+"""
+from __future__ import annotations
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = r"""
+import sys, time
+t0 = time.perf_counter()
+from frontend.parser import parse_text
+parse_text(open(sys.argv[1], encoding="utf-8").read())
+print(time.perf_counter() - t0)
+"""
+
+def _cold(path: str, cache: str, runs: int, clear: bool) -> list[float]:
+    env = dict(os.environ, LOGOTEC_CACHE_DIR=cache)
+    out = []
+    for _ in range(runs):
+        if clear:
+            for f in glob.glob(os.path.join(cache, "*")):
+                os.remove(f)
+        res = subprocess.run([sys.executable, "-c", _CHILD, path], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+        out.append(float(res.stdout.strip().splitlines()[-1]))
+    return out
+
+def _warm(path: str, runs: int) -> list[float]:
+    from frontend.parser import parse_text
+    text = open(path, encoding="utf-8").read()
+    parse_text(text)
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        parse_text(text)
+        out.append(time.perf_counter() - t0)
+    return out
+
+def _fmt(xs: list[float]) -> str:
+    return f"mediana {statistics.median(xs) * 1000:8.2f} ms  (min {min(xs) * 1000:.2f})"
+
+def main(paths: list[str]):
+    paths = paths or sorted(glob.glob(os.path.join(ROOT, "examples", "*.logo")))
+    with tempfile.TemporaryDirectory() as cache:
+        os.environ["LOGOTEC_CACHE_DIR"] = cache
+        for p in paths:
+            try:
+                warm = _warm(p, 200)
+            except SyntaxError as e:
+                print(f"{os.path.basename(p)}: omitido ({e})")
+                continue
+            print(os.path.basename(p))
+            print("  cold/sin caché :", _fmt(_cold(p, cache, 5, clear=True)))
+            print("  cold/con caché :", _fmt(_cold(p, cache, 5, clear=False)))
+            print("  warm           :", _fmt(warm))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,102 @@
+# benchmarks/parser_engines.py
+"""
+Comparación de los motores de parser: PLY (LALR) vs. descendente recursivo.
+
+Uso: python -m benchmarks.parser_engines [archivo.logo ...]
+
+1) Diferencial: ambos motores deben producir el mismo AST (o el mismo error de
+   sintaxis) para cada programa de examples/ y optimizer/tests/, y para
+   variantes mutadas de ellos (tokens borrados o duplicados).
+2) Throughput: sentencias por segundo sobre un programa grande generado
+   repitiendo los ejemplos válidos.
+"""
+from __future__ import annotations
+import glob
+import os
+import random
+import statistics
+import sys
+import time
+
+from frontend.parser import parse_text, PARSER_ENGINES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MUTATIONS_PER_FILE = 200
+TARGET_STMTS = 50_000
+
+def _outcome(text: str, engine: str):
+    try:
+        return "ok", parse_text(text, engine)
+    except SyntaxError as e:
+        return "error", str(e)
+
+def _mutations(text: str, rng: random.Random, n: int):
+    words = text.split()
+    for _ in range(n):
+        w = list(words)
+        for _ in range(rng.randint(1, 3)):
+            i = rng.randrange(len(w))
+            if rng.random() < 0.5:
+                del w[i]
+            else:
+                w.insert(i, w[rng.randrange(len(w))])
+            if not w:
+                break
+        yield " ".join(w)
+
+def differential(paths: list[str]) -> int:
+    rng = random.Random(0)
+    failures = 0
+    for p in paths:
+        text = open(p, encoding="utf-8").read()
+        ref = _outcome(text, "ply")
+        same = _outcome(text, "rd") == ref
+        muts = list(_mutations(text, rng, MUTATIONS_PER_FILE)) if text.split() else []
+        bad = [m for m in muts if _outcome(m, "ply") != _outcome(m, "rd")]
+        failures += (not same) + len(bad)
+        status = "OK " if same and not bad else "MAL"
+        print(f"  {status} {os.path.relpath(p, ROOT):32s} ({ref[0]}, {len(muts) - len(bad)}/{len(muts)} mutaciones)")
+        for m in bad[:3]:
+            print(f"      difiere: {m[:120]!r}")
+    return failures
+
+def _count_stmts(node) -> int:
+    n = len(node.children) if node.kind == "STMTS" else 0
+    return n + sum(_count_stmts(c) for c in node.children)
+
+def throughput(paths: list[str]):
+    valid = []
+    for p in paths:
+        text = open(p, encoding="utf-8").read()
+        if _outcome(text, "ply")[0] == "ok":
+            valid.append(text)
+    if not valid:
+        print("  sin programas válidos")
+        return
+    unit = "\n".join(valid)
+    per_unit = _count_stmts(parse_text(unit, "ply"))
+    big = "\n".join([unit] * max(1, TARGET_STMTS // per_unit))
+    n_stmts = _count_stmts(parse_text(big, "ply"))
+    print(f"  programa: {n_stmts} sentencias, {len(big.splitlines())} líneas")
+    for engine in PARSER_ENGINES:
+        times = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            parse_text(big, engine)
+            times.append(time.perf_counter() - t0)
+        t = statistics.median(times)
+        print(f"  {engine:4s}: {t * 1000:8.1f} ms  {n_stmts / t:12,.0f} sentencias/s")
+
+def main(paths: list[str]):
+    paths = paths or sorted(glob.glob(os.path.join(ROOT, "examples", "*.logo"))
+                            + glob.glob(os.path.join(ROOT, "optimizer", "tests", "*.logo")))
+    print("Diferencial PLY vs RD")
+    failures = differential(paths)
+    print("Throughput")
+    throughput(paths)
+    if failures:
+        print(f"{failures} diferencias entre motores")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
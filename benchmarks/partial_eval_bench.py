@@ -0,0 +1,147 @@
+# benchmarks/partial_eval_bench.py
+"""
+Evaluación parcial (optimizer/PartialEval.py) contra la compilación nativa.
+
+Uso: python -m benchmarks.partial_eval_bench [archivo.logo ...]
+     (por defecto examples/*.logo, optimizer/tests/*.logo y dos programas
+     de acá)
+
+Para cada programa optimizado con -O2 mide (mejor de 5, GC pausado):
+
+- evaluar: evaluate() y guardar la traza en un archivo temporal;
+- compilar: generar el IR y el código objeto con llvmlite. Es una cota
+  baja de lo que hace App sin la traza: falta llc, el compilador de C, el
+  enlazador y lanzar el ejecutable.
+
+Y verifica que la traza dibuje lo mismo que el programa compilado: los
+comandos que manda el código del JIT (benchmarks/runtime_trace.py) se
+pasan por peephole_bench.drawing() y la traza por el mismo lienzo (con
+el centro en el origen, como ahí). Los programas que el evaluador no puede
+resolver reportan el motivo. Sale con 1 si algún dibujo cambia.
+"""
+from __future__ import annotations
+import gc
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import llvmlite.binding as llvm
+
+from frontend.parser import parse_file, parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+from optimizer.PartialEval import NotStatic, evaluate
+from benchmarks import runtime_trace
+from benchmarks.peephole_bench import _continues, _key, drawing
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROGRAMS = {
+    # espiral de cuadrados: muchos tramos, ningún valor del runtime
+    "espiral": (
+        "// espiral\n"
+        "inic lado = 2\n"
+        "bajalapiz\n"
+        "repite 200 [ av lado gd 89 inc [lado 2] si iguales? lado 100 [ poncl \"rojo\" ] ]\n"
+    ),
+    # procedimiento recursivo (árbol binario)
+    "arbol": (
+        "// arbol\n"
+        "para rama [n l]\n"
+        "  si mayorque? n 0 [ av l gi 25 rama [n - 1 l * 3 / 4] gd 50 rama [n - 1 l * 3 / 4] gi 25 re l ]\n"
+        "fin\n"
+        "bajalapiz rama [9 80]\n"
+    ),
+}
+
+
+def trace_drawing(entries):
+    """drawing() de peephole_bench, pero leyendo una traza."""
+    x = y = 0.0
+    h = 0.0
+    pen, color, visible = False, 0, True
+    lines = []
+    for entry in entries:
+        op, *args = entry.split()
+        if op in ("MOVETO", "JUMP"):
+            nx, ny = (float(a.lstrip("c")) for a in args)
+            if op == "MOVETO" and pen and (nx, ny) != (x, y):
+                seg = (color, _key(x), _key(y), _key(nx), _key(ny))
+                if lines and _continues(lines[-1], seg):
+                    lines[-1] = (color, *lines[-1][1:3], *seg[3:])
+                else:
+                    lines.append(seg)
+            x, y = nx, ny
+        elif op == "HEADING":
+            h = float(args[0])
+        elif op == "PENUP":
+            pen = True
+        elif op == "PENDOWN":
+            pen = False
+        elif op == "HIDE":
+            visible = not visible
+        elif op == "COLOR":
+            color = int(args[0]) if int(args[0]) in range(6) else 0
+    return lines, (_key(x), _key(y), _key(h), pen, color, visible)
+
+def _compile_object(tree):
+    target = llvm.Target.from_default_triple().create_target_machine()
+    gen = IntermediateCodeGen()
+    gen.module.triple = llvm.get_default_triple()
+    mod = llvm.parse_assembly(gen.generate(tree))
+    return target.emit_object(mod)
+
+def _evaluate_and_save(tree, path):
+    evaluate(tree).save(path)
+
+def _time(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            fn(*args)
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best
+
+def _sources(argv):
+    if argv:
+        return [(os.path.relpath(p, _ROOT), lambda p=p: parse_file(p)) for p in argv]
+    files = sorted(glob.glob(os.path.join(_ROOT, "examples", "*.logo"))) + \
+        sorted(glob.glob(os.path.join(_ROOT, "optimizer", "tests", "*.logo")))
+    return [(os.path.relpath(p, _ROOT), lambda p=p: parse_file(p)) for p in files] + \
+        [(name, lambda src=src: parse_text(src, "ply")) for name, src in _PROGRAMS.items()]
+
+def main(argv: list[str]):
+    runtime_trace._init()
+    ok = True
+    out = os.path.join(tempfile.mkdtemp(), "trace.txt")
+    print(f"{'programa':32s} {'entradas':>9s} {'evaluar':>10s} {'compilar':>10s}  mismo dibujo")
+    for name, load in _sources(argv):
+        try:
+            tree, _ = optimize(load(), 2)
+            cmds = list(runtime_trace.trace(tree))
+        except Exception as e:
+            print(f"{name:32s}  (no compila: {type(e).__name__}: {e})")
+            continue
+        try:
+            trace = evaluate(tree)
+        except NotStatic as e:
+            print(f"{name:32s}  se compila: {e}")
+            continue
+        same = trace_drawing(trace.entries) == drawing(cmds)
+        ok &= same
+        t_eval = _time(_evaluate_and_save, tree, out)
+        t_comp = _time(_compile_object, tree)
+        print(f"{name:32s} {len(trace):9,} {t_eval * 1000:8.2f}ms {t_comp * 1000:8.2f}ms  "
+              f"{'sí' if same else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
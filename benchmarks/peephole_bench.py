@@ -0,0 +1,115 @@
+# benchmarks/peephole_bench.py
+"""
+Pase "peephole" (optimizer/TurtlePeephole.py): comandos que el programa le
+manda a drawing.py antes y después de juntarlos.
+
+Uso: python -m benchmarks.peephole_bench [archivo.logo ...]
+     (por defecto examples/*.logo y optimizer/tests/*.logo)
+
+Cada programa se compila y se corre con el JIT (benchmarks/runtime_trace.py)
+en tres versiones: -O0, -O2 sin "peephole" y -O2. Reporta cuántos comandos
+manda cada una y verifica que las tres dibujen lo mismo: se simula el
+lienzo de drawing.py (lápiz, color, rumbo, posición) y se comparan los
+trazos, juntando los segmentos seguidos que siguen la misma recta con el
+mismo color (AV 10 AV 20 y AV 30 dibujan la misma raya). Los programas que
+no compilan se saltan. Sale con 1 si algún dibujo cambia.
+"""
+from __future__ import annotations
+import glob
+import math
+import os
+import sys
+
+from frontend.parser import parse_file
+from optimizer.PassManager import optimize
+from benchmarks.runtime_trace import trace
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_VERSIONS = (("-O0", 0, ()), ("-O2 sin peephole", 2, ("peephole",)), ("-O2", 2, ()))
+
+
+def _key(v: float) -> float:
+    return round(v, 6) + 0.0     # sin -0.0
+
+def drawing(cmds):
+    """(trazos, estado final) de una lista de comandos, como los dibuja
+    drawing.py. Un trazo es (color, x0, y0, x1, y1)."""
+    x = y = 0.0
+    h = 0.0
+    pen, color, visible = False, 0, True
+    lines = []
+    for cmd in cmds:
+        op, *args = cmd.split()
+        if op in ("FORWARD", "BACK"):
+            d = int(args[0]) * (1 if op == "FORWARD" else -1)
+            nx = x + d * math.cos(math.radians(h))
+            ny = y - d * math.sin(math.radians(h))
+            if pen and d:
+                seg = (color, _key(x), _key(y), _key(nx), _key(ny))
+                if lines and _continues(lines[-1], seg):
+                    lines[-1] = (color, *lines[-1][1:3], *seg[3:])
+                else:
+                    lines.append(seg)
+            x, y = nx, ny
+        elif op in ("LEFT", "RIGHT"):
+            h = (h + int(args[0]) * (1 if op == "LEFT" else -1)) % 360.0
+        elif op == "HEADING":
+            h = int(args[0]) % 360.0
+        elif op == "POS":
+            x, y = float(args[0]), float(args[1])
+        elif op == "POSX":
+            x = float(args[0])
+        elif op == "POSY":
+            y = float(args[0])
+        elif op == "CENTER":
+            x = y = 0.0
+        elif op == "PENUP":
+            pen = True
+        elif op == "PENDOWN":
+            pen = False
+        elif op == "HIDE":
+            visible = not visible
+        elif op == "COLOR":
+            color = int(args[0]) if int(args[0]) in range(6) else 0
+    return lines, (_key(x), _key(y), _key(h), pen, color, visible)
+
+def _continues(a, b) -> bool:
+    """¿b sigue a a en la misma dirección y con el mismo color?"""
+    if a[0] != b[0] or a[3:] != b[1:3]:
+        return False
+    ax, ay = a[3] - a[1], a[4] - a[2]
+    bx, by = b[3] - b[1], b[4] - b[2]
+    return abs(ax * by - ay * bx) < 1e-6 * (abs(ax) + abs(ay)) * (abs(bx) + abs(by)) and ax * bx + ay * by > 0
+
+def _files(argv):
+    if argv:
+        return argv
+    return sorted(glob.glob(os.path.join(_ROOT, "examples", "*.logo"))) + \
+        sorted(glob.glob(os.path.join(_ROOT, "optimizer", "tests", "*.logo")))
+
+def main(argv: list[str]):
+    ok = True
+    totals = [0] * len(_VERSIONS)
+    print(f"{'programa':32s}" + "".join(f"{label:>18s}" for label, _, _ in _VERSIONS) + "  mismo dibujo")
+    for path in _files(argv):
+        name = os.path.relpath(path, _ROOT)
+        counts, drawings = [], []
+        try:
+            for _, level, disable in _VERSIONS:
+                tree, _ = optimize(parse_file(path), level, disable)
+                cmds = trace(tree)
+                counts.append(len(cmds))
+                drawings.append(drawing(cmds))
+        except Exception as e:
+            print(f"{name:32s}  (no compila: {type(e).__name__}: {e})")
+            continue
+        same = all(d == drawings[0] for d in drawings)
+        ok &= same
+        totals = [t + c for t, c in zip(totals, counts)]
+        print(f"{name:32s}" + "".join(f"{c:18,}" for c in counts) + f"  {'sí' if same else 'NO'}")
+    print(f"{'total':32s}" + "".join(f"{t:18,}" for t in totals))
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,105 @@
+# benchmarks/pow_bench.py
+"""
+POTENCIA en línea (pase "strength" y IntermediateCodeGen._gen_pow) contra
+la llamada a pow_int del runtime. Cada programa se compila con el JIT de
+llvmlite (benchmarks/runtime_trace.py) de tres formas:
+
+- runtime: -O2, pero POTENCIA llama a pow_int como antes (acá es una
+  llamada a Python; el runtime de verdad le pregunta a drawing.py por un
+  archivo temporal y espera 10 ms o más cada vez);
+- -O2 sin strength: POTENCIA en línea, sin reescribir;
+- -O2.
+
+Mide main() (mejor de 5, GC pausado) y verifica que los comandos de
+dibujo sean los mismos (sin contar los POWINT de la primera forma).
+
+Uso: python -m benchmarks.pow_bench [vueltas]   (por defecto 20000)
+"""
+from __future__ import annotations
+import gc
+import sys
+import time
+
+from llvmlite import ir
+
+from frontend.parser import parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+from benchmarks.runtime_trace import compile_main, trace
+
+_PROGRAMS = {
+    # exponentes constantes: cuadrados, cubos y uno más grande
+    "constante": (
+        "// potencias\n"
+        "inic i = 0 inic s = 0 inic k = AZAR 10\n"
+        "mientras MENORQUE? i {n} [\n"
+        "  inc [s POTENCIA i 2 + POTENCIA k 3 - POTENCIA (i - k) 5]\n"
+        "  inc [i]\n"
+        "]\n"
+        "av s / 1000\n"
+    ),
+    # exponente variable
+    "variable": (
+        "// potencias\n"
+        "inic i = 0 inic s = 0 inic b = AZAR 5 + 2\n"
+        "mientras MENORQUE? i {n} [\n"
+        "  inc [s POTENCIA b i / 1000]\n"
+        "  inc [i]\n"
+        "]\n"
+        "av s / 1000\n"
+    ),
+}
+
+
+class _RuntimePow(IntermediateCodeGen):
+    """Genera POTENCIA como antes: una llamada a pow_int."""
+
+    def _gen_pow(self, base, exp):
+        fn = self.module.globals.get("pow_int")
+        if fn is None:
+            fn = ir.Function(self.module, ir.FunctionType(self.INT, [self.INT, self.INT]), "pow_int")
+        return self.builder.call(fn, [base, exp])
+
+
+_VERSIONS = (("runtime", (), _RuntimePow), ("-O2 sin strength", ("strength",), None), ("-O2", (), None))
+
+
+def _time(main, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            main()
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best
+
+def main(argv: list[str]):
+    n = int(argv[0]) if argv else 20000
+    ok = True
+    for name, src in _PROGRAMS.items():
+        print(f"{name} ({n:,} vueltas)")
+        ref = None
+        base = None
+        for label, disable, gen in _VERSIONS:
+            tree, _ = optimize(parse_text(src.format(n=n), "ply"), 2, disable)
+            fn = compile_main(tree, gen and gen())
+            out = list(trace(tree, fn))    # _time() vuelve a correr main()
+            calls = sum(1 for c in out if c.startswith("POWINT"))
+            cmds = [c for c in out if not c.startswith("POWINT")]
+            if ref is None:
+                ref = cmds
+            same = cmds == ref
+            ok &= same
+            t = _time(fn)
+            base = base or t
+            print(f"  {label:18s} {t * 1000:8.2f} ms  {base / t:7.2f}x  "
+                  f"pow_int: {calls:7,}  mismos comandos: {'sí' if same else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
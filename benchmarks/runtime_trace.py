@@ -0,0 +1,178 @@
+# benchmarks/runtime_trace.py
+"""
+Corre un programa compilado (IR/IntermediateCodeGen.py) con el JIT de
+llvmlite y anota los comandos que el runtime (Executable/runtime.c) le
+mandaría a drawing.py, sin socket ni ventana.
+
+Uso: python -m benchmarks.runtime_trace [-O0|-O1|-O2] archivo.logo
+     (imprime los comandos, uno por línea, y el total)
+
+Desde código: trace(tree) -> lista de strings con el mismo formato que
+send_cmd ("FORWARD 10", "RIGHT 90", "PENUP", ...). Las consultas que el
+runtime le hace a drawing.py (RANDINT, GETHEADING) también son comandos;
+acá contestan en el acto: AZAR con un generador fijo (mismo programa, misma
+secuencia) y RUMBO con el rumbo acumulado. Sirve para contar comandos y
+para comparar dos versiones de un programa (p. ej. antes y después de
+optimizar). POTENCIA se genera en línea; pow_int (POWINT, la potencia en
+i32) solo lo llama un generador que lo pida (compile_main(tree, gen)).
+
+El programa corre de verdad: si no termina, trace() tampoco (una
+excepción en un callback de ctypes no puede cortar el código generado).
+"""
+from __future__ import annotations
+import ctypes
+import sys
+from typing import Callable, List, Optional
+
+import llvmlite.binding as llvm
+
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.ASTUtils import pow_i32
+
+
+_I32 = ctypes.c_int32
+_SIGNATURES = {
+    # nombre en el runtime: (tipo ctypes, formato del comando o None)
+    "rt_init": (ctypes.CFUNCTYPE(None), None),
+    "rt_shutdown": (ctypes.CFUNCTYPE(None), None),
+    "move_forward": (ctypes.CFUNCTYPE(None, _I32), "FORWARD {}"),
+    "move_backward": (ctypes.CFUNCTYPE(None, _I32), "BACK {}"),
+    "turn_right": (ctypes.CFUNCTYPE(None, _I32), "RIGHT {}"),
+    "turn_left": (ctypes.CFUNCTYPE(None, _I32), "LEFT {}"),
+    "set_position": (ctypes.CFUNCTYPE(None, _I32, _I32), "POS {} {}"),
+    "set_xy": (ctypes.CFUNCTYPE(None, _I32, _I32), "POS {} {}"),
+    "set_x": (ctypes.CFUNCTYPE(None, _I32), "POSX {}"),
+    "set_y": (ctypes.CFUNCTYPE(None, _I32), "POSY {}"),
+    "set_heading": (ctypes.CFUNCTYPE(None, _I32), "HEADING {}"),
+    "pen_up": (ctypes.CFUNCTYPE(None), "PENUP"),
+    "pen_down": (ctypes.CFUNCTYPE(None), "PENDOWN"),
+    "hide_turtle": (ctypes.CFUNCTYPE(None), "HIDE"),
+    "set_color": (ctypes.CFUNCTYPE(None, _I32), "COLOR {}"),
+    "delay_ms": (ctypes.CFUNCTYPE(None, _I32), "DELAY {}"),
+    "center_turtle": (ctypes.CFUNCTYPE(None), "CENTER"),
+    "get_heading": (ctypes.CFUNCTYPE(_I32), None),
+    "rand_int": (ctypes.CFUNCTYPE(_I32, _I32), None),
+    "pow_int": (ctypes.CFUNCTYPE(_I32, _I32, _I32), None),
+}
+
+
+class _Runtime:
+    """Los callbacks del runtime; uno solo por proceso (LLVM resuelve los
+    símbolos globalmente) que cada trace() reinicia."""
+
+    def __init__(self):
+        self.out: List[str] = []
+        self.heading = 0
+        self.seed = 1
+        self._keep = []         # los CFUNCTYPE tienen que seguir vivos
+        for name, (cty, fmt) in _SIGNATURES.items():
+            fn = cty(self._make(name, fmt))
+            self._keep.append(fn)
+            llvm.add_symbol(name, ctypes.cast(fn, ctypes.c_void_p).value)
+
+    def reset(self):
+        self.out = []
+        self.heading = 0
+        self.seed = 1
+
+    def _send(self, cmd: str):
+        self.out.append(cmd)
+
+    def _make(self, name: str, fmt: Optional[str]) -> Callable:
+        if name == "turn_right" or name == "turn_left":
+            sign = 1 if name == "turn_right" else -1
+            def turn(d):
+                self.heading = (self.heading + sign * d) % 360
+                self._send(fmt.format(d))
+            return turn
+        if name == "set_heading":
+            def set_heading(h):
+                self.heading = h % 360
+                self._send(fmt.format(h))
+            return set_heading
+        if name == "get_heading":
+            def get_heading():
+                self._send("GETHEADING")
+                return self.heading
+            return get_heading
+        if name == "rand_int":
+            def rand_int(n):
+                self._send(f"RANDINT {n}")
+                self.seed = (self.seed * 1103515245 + 12345) & 0x7FFFFFFF
+                return self.seed % n if n > 0 else 0
+            return rand_int
+        if name == "pow_int":
+            def pow_int(a, b):
+                self._send(f"POWINT {a} {b}")
+                return pow_i32(a, b)
+            return pow_int
+        if fmt is None:
+            return lambda *args: None
+        return lambda *args: self._send(fmt.format(*args))
+
+
+_runtime: Optional[_Runtime] = None
+_engines = []       # cada motor JIT queda vivo: liberarlos rompe al siguiente
+
+
+def _init() -> _Runtime:
+    global _runtime
+    if _runtime is None:
+        try:
+            llvm.initialize()
+        except RuntimeError:
+            pass        # llvmlite >= 0.44 se inicializa solo
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+        _runtime = _Runtime()
+    return _runtime
+
+
+def compile_main(tree, gen: Optional[IntermediateCodeGen] = None) -> Callable[[], int]:
+    """Genera el IR de `tree` (con `gen`, si se da otro generador), lo
+    compila para esta máquina y devuelve main."""
+    _init()
+    target = llvm.Target.from_default_triple().create_target_machine()
+    gen = gen or IntermediateCodeGen()
+    gen.module.triple = llvm.get_default_triple()
+    gen.module.data_layout = str(target.target_data)
+    mod = llvm.parse_assembly(gen.generate(tree))
+    mod.verify()
+    engine = llvm.create_mcjit_compiler(mod, target)
+    engine.finalize_object()
+    _engines.append(engine)
+    return ctypes.CFUNCTYPE(_I32)(engine.get_function_address("main"))
+
+
+def trace(tree, main: Optional[Callable[[], int]] = None) -> List[str]:
+    """Los comandos que manda el programa, en orden. `main` (de
+    compile_main) evita volver a compilar el mismo árbol."""
+    rt = _init()
+    if main is None:
+        main = compile_main(tree)
+    rt.reset()
+    main()
+    return rt.out
+
+
+def main(argv: list[str]):
+    from frontend.parser import parse_file
+    from optimizer.PassManager import optimize
+
+    level = 0
+    args = []
+    for a in argv:
+        if a.startswith("-O"):
+            level = a
+        else:
+            args.append(a)
+    if len(args) != 1:
+        print("uso: python -m benchmarks.runtime_trace [-O0|-O1|-O2] archivo.logo")
+        sys.exit(2)
+    tree, _ = optimize(parse_file(args[0]), level)
+    cmds = trace(tree)
+    print("\n".join(cmds))
+    print(f"-- {len(cmds)} comandos")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+# benchmarks/semantics_bench.py
+"""
+Throughput del análisis semántico (frontend/semantics.analyze) sobre un
+programa grande generado.
+
+Uso: python -m benchmarks.semantics_bench [repeticiones]   (por defecto 5000)
+
+Reporta nodos/segundo (mejor de 5 corridas, GC pausado) y cuántos nodos
+quedaron anotados con tipo (Node.ty) y símbolo (Node.sym).
+"""
+from __future__ import annotations
+import gc
+import sys
+import time
+
+from frontend.parser import parse_text
+from frontend.semantics import analyze
+from frontend.hashcons import structural_size
+
+# {i}: cada repetición define su propio procedimiento
+_UNIT = (
+    "inic tam = 10\n"
+    "inic paso = tam * 2 + 1\n"
+    "para cuadro{i} [lado]\n"
+    "  repite 4 [ av lado * 2 gd 90 ]\n"
+    "fin\n"
+    "repite 3 [ cuadro{i} [tam + 5] gd 120 ]\n"
+    "si (tam mayorque? 3) y (paso menorque? 100) [ av SUMA tam PRODUCTO paso 2 ]\n"
+    "mientras tam menorque? 20 [ inc [tam 2] re -(tam - 1) ]\n"
+    "ponpos [tam paso]\n"
+)
+
+def main(argv: list[str]):
+    reps = int(argv[0]) if argv else 5000
+    tree = parse_text("".join(_UNIT.format(i=i) for i in range(reps)), "rd")
+    n = structural_size(tree)
+    best = float("inf")
+    for _ in range(5):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            diags = analyze(tree)
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    typed = syms = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        typed += getattr(node, "ty", None) is not None
+        syms += getattr(node, "sym", None) is not None
+        stack.extend(node.children)
+    print(f"{reps} repeticiones, {n:,} nodos, {len(diags.items)} diagnósticos")
+    print(f"  analyze: {best * 1000:7.1f} ms  ({n / best / 1e6:.2f} M nodos/s)")
+    print(f"  anotados: {typed:,} con tipo, {syms:,} con símbolo")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
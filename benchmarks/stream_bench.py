@@ -0,0 +1,70 @@
+# benchmarks/stream_bench.py
+"""
+Memoria pico del lexing por trozos vs. leer el archivo completo.
+
+Uso: python -m benchmarks.stream_bench [MB ...]   (por defecto 8 32)
+
+Para cada tamaño se genera un .logo temporal y se cuentan sus tokens:
+- completo: f.read() + FastLexer.input(texto)
+- stream:   frontend.lexer.stream_tokens(path)
+La memoria pico del modo stream no debe crecer con el tamaño del archivo.
+"""
+from __future__ import annotations
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_UNIT = (
+    "inic lado = 10\n"
+    "repite 4 [ av lado * 2 gd 90 inc [lado 1.5] ]   // comentario\n"
+    "si lado mayorque? 3 [ poncl \"rojo\" ]\n"
+)
+
+# Cada modo corre en un proceso nuevo para medir su RSS pico (ru_maxrss, KB en Linux)
+_CHILD = r"""
+import resource, sys, time
+from frontend.lexer import FastLexer, stream_tokens
+path, mode = sys.argv[1], sys.argv[2]
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+if mode == "stream":
+    n = sum(1 for _ in stream_tokens(path))
+else:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    lex = FastLexer()
+    lex.input(text)
+    n = sum(1 for _ in lex)
+t = time.perf_counter() - t0
+print(n, t, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base)
+"""
+
+def _write_program(path: str, mb: int):
+    reps = (mb << 20) // len(_UNIT) + 1
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(0, reps, 1000):
+            f.write(_UNIT * 1000)
+
+def _measure(path: str, mode: str):
+    res = subprocess.run([sys.executable, "-c", _CHILD, path, mode], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    n, t, kb = res.stdout.split()
+    return int(n), float(t), int(kb) * 1024
+
+def main(argv: list[str]):
+    sizes = [int(a) for a in argv] or [8, 32]
+    with tempfile.TemporaryDirectory() as d:
+        for mb in sizes:
+            path = os.path.join(d, f"big{mb}.logo")
+            _write_program(path, mb)
+            print(f"{os.path.getsize(path) / (1 << 20):.1f} MB")
+            for mode in ("completo", "stream"):
+                n, t, peak = _measure(path, mode)
+                print(f"  {mode:8s}: {n:,} tokens en {t:6.2f} s  pico +{peak / (1 << 20):7.2f} MB")
+            os.remove(path)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
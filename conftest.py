@@ -0,0 +1,4 @@
+# conftest.py
+# server_test.py es un servidor de prueba a mano (escucha en :9000), no un
+# test de pytest
+collect_ignore = ["server_test.py"]
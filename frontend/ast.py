@@ -1,27 +1,115 @@
 # frontend/ast.py
 from __future__ import annotations
-from dataclasses import dataclass, field
+import sys
 from typing import List, Any
 
-@dataclass
+class _NoChildren(list):
+    """Lista vacía compartida por todas las hojas (NUM, ID, STR, ...).
+
+    Es inmutable: para agregar hijos a un nodo usar Node.add(), que la
+    reemplaza por una lista propia.
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("los hijos de una hoja son compartidos; usar Node.add()")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+    def __repr__(self):
+        return "[]"
+
+NO_CHILDREN: List["Node"] = _NoChildren()
+
+# Kinds conocidos; cualquier otro se interna al construir el nodo, así que
+# las comparaciones `node.kind == "NUM"` resuelven por identidad.
+KINDS = frozenset(sys.intern(k) for k in (
+    "PROGRAM", "STMTS", "PARAMS", "ARGS",
+    "AV", "RE", "GD", "GI", "INIC", "INC", "PONPOS", "PONXY", "PONX", "PONY",
+    "PONRUMBO", "RUMBO", "BL", "SB", "OT", "PONCL", "ESPERA", "PARA", "CALL",
+    "CENTRO", "EJECUTA", "REPITE", "SI", "HAZ", "MIENTRAS", "HAZ_HASTA", "HAZ_MIENTRAS",
+    "BINOP", "NEG", "NUM", "STR", "ID", "POW", "RELOP", "BOOLBIN", "BOOL", "EMPTY",
+))
+_kind_table = {k: k for k in KINDS}
+
+def intern_kind(kind: str) -> str:
+    k = _kind_table.get(kind)
+    return k if k is not None else sys.intern(kind)
+
 class Node:
-    kind: str
-    value: Any = None
-    children: List["Node"] = field(default_factory=list)
-    line: int = 0
+    """Nodo del AST: kind, value, children, line.
+
+    Misma API que la dataclass original (constructor posicional o por nombre,
+    igualdad estructural, repr), pero con __slots__, kinds internados y una
+    lista de hijos vacía compartida entre hojas.
+
+    `ty`, `sym` y `addr` son anotaciones del análisis (frontend/semantics.py y
+    frontend/resolver.py): el tipo resuelto de una expresión, el Symbol al que
+    se refiere un ID y su dirección (profundidad, slot). Valen None hasta que
+    corre analyze()/resolve() y no participan de la igualdad.
+    """
+    __slots__ = ("kind", "value", "children", "line", "ty", "sym", "addr")
+    __hash__ = None  # igualdad estructural y mutable, como la dataclass
+
+    def __init__(self, kind: str, value: Any = None, children: List["Node"] | None = None, line: int = 0):
+        self.kind = _kind_table.get(kind) or intern_kind(kind)
+        self.value = value
+        self.children = children if children else NO_CHILDREN
+        self.line = line
+        self.ty = None
+        self.sym = None
+        self.addr = None
+
+    def __eq__(self, other):
+        if not isinstance(other, Node):
+            return NotImplemented
+        # pares de nodos con pila explícita: la profundidad no la limita la
+        # pila de Python
+        stack = [(self, other)]
+        pop, push = stack.pop, stack.extend
+        while stack:
+            a, b = pop()
+            if a is b:
+                continue
+            if a.__class__ is not Node or b.__class__ is not Node:
+                if a != b:          # None (u otra cosa) en una lista de hijos
+                    return False
+                continue
+            if (a.kind != b.kind or a.value != b.value or a.line != b.line
+                    or len(a.children) != len(b.children)):
+                return False
+            push(zip(a.children, b.children))
+        return True
+
+    def __repr__(self):
+        return f"Node(kind={self.kind!r}, value={self.value!r}, children={self.children!r}, line={self.line!r})"
 
     def add(self, *nodes: "Node"):
+        children = self.children
+        if children is NO_CHILDREN:
+            children = self.children = []
         for n in nodes:
             if n is not None:
-                self.children.append(n)
+                children.append(n)
         return self
 
     def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        head = f"{pad}{self.kind}"
-        if self.value is not None:
-            head += f"({self.value})"
-        lines = [head]
-        for c in self.children:
-            lines.append(c.pretty(indent + 1))
+        # preorden con pila explícita; la sangría
+        # de cada profundidad se arma una sola vez
+        lines = []
+        pads = []
+        stack = [(self, indent)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node, depth = pop()
+            while len(pads) <= depth:
+                pads.append("  " * len(pads))
+            if node.value is not None:
+                lines.append(f"{pads[depth]}{node.kind}({node.value})")
+            else:
+                lines.append(pads[depth] + node.kind)
+            children = node.children
+            for i in range(len(children) - 1, -1, -1):
+                push((children[i], depth + 1))
         return "\n".join(lines)
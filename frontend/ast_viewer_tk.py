@@ -7,6 +7,9 @@ from typing import Any, Dict, List, Optional, Tuple
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+from .astbin import MAGIC, load_ast_bin
+from .exporter import open_ast_json
+
 # -----------------------------------------------------------
 # Modelo y utilidades
 # -----------------------------------------------------------
@@ -105,7 +108,7 @@ class AstViewer(tk.Toplevel):
         bar = ttk.Frame(self)
         bar.pack(side=tk.TOP, fill=tk.X, padx=8, pady=6)
 
-        self.btn_open = ttk.Button(bar, text="Abrir ast.json", command=self.open_json_dialog)
+        self.btn_open = ttk.Button(bar, text="Abrir AST", command=self.open_json_dialog)
         self.btn_open.pack(side=tk.LEFT)
 
         self.btn_reset = ttk.Button(bar, text="Re-centrar", command=self.reset_view)
@@ -148,20 +151,42 @@ class AstViewer(tk.Toplevel):
         self._pan_start: Optional[Tuple[int,int]] = None
 
         if json_path:
-            self.load_json(json_path)
+            self.load(json_path)
 
     # ---------- IO ----------
     def open_json_dialog(self):
         path = filedialog.askopenfilename(
-            title="Abrir ast.json",
-            filetypes=[("JSON","*.json"), ("Todos","*.*")]
+            title="Abrir AST",
+            filetypes=[("AST", "*.json *.json.gz *.bin"), ("JSON","*.json *.json.gz"), ("AST binario","*.bin"), ("Todos","*.*")]
         )
         if path:
+            self.load(path)
+
+    def load(self, path: str):
+        """Abre ast.json (plano o gzip) o el formato binario (frontend/astbin.py)
+        según la marca del archivo."""
+        try:
+            with open(path, "rb") as f:
+                is_bin = f.read(len(MAGIC)) == MAGIC
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo abrir el AST:\n{e}")
+            return
+        if is_bin:
+            self.load_bin(path)
+        else:
             self.load_json(path)
 
+    def load_bin(self, path: str):
+        try:
+            self.root_node = load_ast_bin(path, JNode)
+            self.redraw()
+            self.reset_view()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir AST binario:\n{e}")
+
     def load_json(self, path: str):
         try:
-            with open(path, "r", encoding="utf-8") as f:
+            with open_ast_json(path) as f:   # .json o .json.gz
                 data = json.load(f)
             self.root_node = JNode.from_dict(data)
             self.redraw()
@@ -0,0 +1,272 @@
+# frontend/astbin.py
+"""
+Formato binario compacto del AST (out/ast.bin), junto a ast.json.
+
+Los nodos van en preorden y cada campo se guarda como una columna, así la
+lectura decodifica arreglos enteros en vez de campo por campo:
+
+    MAGIC (b"LAST") VERSION (1 byte)
+    n_nodos
+    tabla de strings: columna de longitudes + blob utf-8 concatenado
+    kinds      índice en la tabla de strings, uno por nodo
+    tags       tipo del valor, uno por nodo (T_*)
+    lines      0 si el nodo no tiene línea; si no, 1 + zigzag(línea - la
+               última línea distinta de 0 en preorden)
+    counts     cantidad de hijos, uno por nodo
+    ints       valores int (zigzag), en orden de aparición
+    strs       índices en la tabla de strings de los valores str
+    floats     valores float, 8 bytes little-endian cada uno
+
+Cada columna es `varint(cantidad) varint(bytes) datos`; todos los enteros
+son varints LEB128 sin signo. Si una columna ocupa un byte por valor (el
+caso común: kinds, tags, counts y casi todas las líneas) se codifica y
+decodifica con bytes()/list() sin recorrerla en Python.
+
+La tabla de strings guarda una sola vez cada kind, identificador, operador
+y literal. La escritura parte del AST plano (frontend/flatast.py), que ya
+numera los nodos en preorden, y la lectura es iterativa: la profundidad no
+importa.
+"""
+from __future__ import annotations
+import gc
+import os
+import sys
+from array import array
+from typing import Any, Callable, List, Optional
+
+from .ast import Node
+from .flatast import FlatAST, KIND_NAMES
+
+MAGIC = b"LAST"
+VERSION = 1
+
+T_NONE, T_INT, T_STR, T_FLOAT, T_FALSE, T_TRUE = range(6)
+
+# build(kind, value, line, children) -> nodo; el orden es el de JNode
+Builder = Callable[[str, Any, int, List[Any]], Any]
+
+
+# ---------- varints ----------
+def _pack_uvarints(values: List[int]) -> bytes:
+    if not values:
+        return b""
+    if max(values) < 0x80:
+        return bytes(values)
+    out = bytearray()
+    app = out.append
+    for v in values:
+        while v >= 0x80:
+            app((v & 0x7F) | 0x80)
+            v >>= 7
+        app(v)
+    return bytes(out)
+
+def _unpack_uvarints(buf: bytes, count: int) -> List[int]:
+    if len(buf) == count:          # un byte por valor
+        return list(buf)
+    out = []
+    app = out.append
+    acc = shift = 0
+    for b in buf:
+        if b < 0x80:
+            app(acc | (b << shift))
+            acc = shift = 0
+        else:
+            acc |= (b & 0x7F) << shift
+            shift += 7
+    return out
+
+def _unzigzag(z: int) -> int:
+    return z >> 1 if not z & 1 else -((z + 1) >> 1)
+
+def _uvarint(v: int) -> bytes:
+    return _pack_uvarints([v])
+
+def _read_uvarint(data, pos: int) -> tuple[int, int]:
+    acc = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        if b < 0x80:
+            return acc | (b << shift), pos
+        acc |= (b & 0x7F) << shift
+        shift += 7
+
+
+# ---------- escritura ----------
+def encode_ast(root: Node) -> bytes:
+    return encode_flat(FlatAST.from_node(root))
+
+def encode_flat(flat: FlatAST) -> bytes:
+    """Las columnas salen de los arreglos de FlatAST, que ya están en
+    preorden: kinds, valores y líneas se recorren como listas y la cantidad
+    de hijos sale de first_child/next_sibling."""
+    table: dict[str, int] = {}
+    tags = bytearray()
+    lines: List[int] = []
+    ints: List[int] = []
+    strs: List[int] = []
+    floats = array('d')
+
+    # un índice de la tabla por código de kind (en orden de aparición, como
+    # los valores str: la tabla es compartida)
+    names = KIND_NAMES
+    by_code: dict[int, int] = {}
+    kinds: List[int] = []
+    prev_line = 0
+    for code, v, line in zip(flat.kinds, flat.values, flat.lines):
+        idx = by_code.get(code)
+        if idx is None:
+            k = names[code]
+            idx = table.get(k)
+            if idx is None:
+                idx = table[k] = len(table)
+            by_code[code] = idx
+        kinds.append(idx)
+
+        cls = v.__class__
+        if v is None:
+            tags.append(T_NONE)
+        elif cls is int:
+            tags.append(T_INT)
+            ints.append(v << 1 if v >= 0 else ((-v) << 1) - 1)
+        elif cls is str:
+            tags.append(T_STR)
+            idx = table.get(v)
+            if idx is None:
+                idx = table[v] = len(table)
+            strs.append(idx)
+        elif cls is bool:
+            tags.append(T_TRUE if v else T_FALSE)
+        elif cls is float:
+            tags.append(T_FLOAT)
+            floats.append(v)
+        else:
+            raise TypeError(f"valor no serializable en {names[code]}: {v!r}")
+
+        if line:
+            d = line - prev_line
+            lines.append((d << 1 if d >= 0 else ((-d) << 1) - 1) + 1)
+            prev_line = line
+        else:
+            lines.append(0)         # NEG, STMTS, ... no rompen la racha
+
+    counts = flat.child_counts()
+
+    blobs = [s.encode("utf-8") for s in table]
+    if sys.byteorder != "little":
+        floats.byteswap()
+    parts = [MAGIC, bytes([VERSION]), _uvarint(len(kinds))]
+
+    def column(count: int, payload: bytes):
+        parts.append(_uvarint(count))
+        parts.append(_uvarint(len(payload)))
+        parts.append(payload)
+
+    column(len(blobs), _pack_uvarints([len(b) for b in blobs]))
+    column(len(blobs), b"".join(blobs))
+    column(len(kinds), _pack_uvarints(kinds))
+    column(len(tags), bytes(tags))
+    column(len(lines), _pack_uvarints(lines))
+    column(len(counts), _pack_uvarints(counts))
+    column(len(ints), _pack_uvarints(ints))
+    column(len(strs), _pack_uvarints(strs))
+    column(len(floats), floats.tobytes())
+    return b"".join(parts)
+
+def save_ast_bin(root: Node, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(encode_ast(root))
+
+
+# ---------- lectura ----------
+def decode_ast(data: bytes, build: Optional[Builder] = None) -> Any:
+    """Reconstruye el árbol; `build` decide el tipo de nodo (Node por defecto)."""
+    if data[:4] != MAGIC:
+        raise ValueError("no es un AST binario (falta la marca LAST)")
+    if data[4] != VERSION:
+        raise ValueError(f"versión de AST binario no soportada: {data[4]}")
+    data = memoryview(data)
+    n, pos = _read_uvarint(data, 5)
+
+    def column():
+        nonlocal pos
+        count, pos = _read_uvarint(data, pos)
+        size, pos = _read_uvarint(data, pos)
+        chunk = bytes(data[pos:pos + size])
+        pos += size
+        return count, chunk
+
+    count, chunk = column()
+    lengths = _unpack_uvarints(chunk, count)
+    _, blob = column()
+    table: List[str] = []
+    off = 0
+    for size in lengths:
+        table.append(blob[off:off + size].decode("utf-8"))
+        off += size
+
+    count, chunk = column()
+    kinds = [table[i] for i in _unpack_uvarints(chunk, count)]
+    _, tags = column()
+    count, chunk = column()
+    line_codes = _unpack_uvarints(chunk, count)
+    count, chunk = column()
+    counts = _unpack_uvarints(chunk, count)
+    count, chunk = column()
+    ints = iter([_unzigzag(z) for z in _unpack_uvarints(chunk, count)])
+    count, chunk = column()
+    strs = iter([table[i] for i in _unpack_uvarints(chunk, count)])
+    _, chunk = column()
+    floats = array('d', chunk)
+    if sys.byteorder != "little":
+        floats.byteswap()
+    floats = iter(floats)
+    if len(kinds) != n or len(tags) != n or len(counts) != n:
+        raise ValueError("AST binario truncado o corrupto")
+
+    none, false, true = (lambda: None), (lambda: False), (lambda: True)
+    getters = (none, ints.__next__, strs.__next__, floats.__next__, false, true)
+    values = [getters[t]() for t in tags]
+
+    lines: List[int] = []
+    app = lines.append
+    line = 0
+    for z in line_codes:
+        if z:
+            z -= 1
+            line += z >> 1 if not z & 1 else -((z + 1) >> 1)
+            app(line)
+        else:
+            app(0)
+
+    # de atrás hacia adelante: al llegar a un nodo sus hijos están en el
+    # tope de la pila, el primero arriba. El GC cíclico se pausa mientras
+    # tanto: con millones de nodos nuevos recorrería el árbol parcial una y
+    # otra vez sin encontrar nada que liberar.
+    stack: List[Any] = []
+    push = stack.append
+    rev = reversed
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for kind, value, line, k in zip(rev(kinds), rev(values), rev(lines), rev(counts)):
+            if k:
+                children = stack[-k:]
+                del stack[-k:]
+                children.reverse()
+            else:
+                children = None if build is None else []
+            if build is None:
+                push(Node(kind, value, children, line))
+            else:
+                push(build(kind, value, line, children))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return stack[0]
+
+def load_ast_bin(path: str, build: Optional[Builder] = None) -> Any:
+    with open(path, "rb") as f:
+        return decode_ast(f.read(), build)
@@ -0,0 +1,242 @@
+# frontend/callgraph.py
+"""
+Tabla de procedimientos y grafo de llamadas.
+
+build_call_graph(root) trabaja en dos pasos:
+
+1. recorre las sentencias del programa y junta la firma de cada PARA
+   (nombre, parámetros, aridad, línea), esté donde esté, y cada llamada
+   (CALL de sentencia y EJECUTA nombre) con el procedimiento que la
+   contiene (None = programa principal) y si está en posición de cola: lo
+   último que ejecuta el cuerpo antes de volver. Una segunda definición
+   con el mismo nombre queda en `duplicates` y no entra a la tabla;
+2. con la tabla ya completa, enlaza las llamadas: así una llamada anterior
+   a su PARA también encuentra su destino.
+
+Con eso arma el grafo y sus componentes fuertemente conexas (Tarjan, sin
+recursión). `sccs` va en orden topológico inverso: cada componente aparece
+después de las que llama, así que compilar en ese orden deja cada llamado
+definido antes que quien lo llama, y una componente con más de un
+procedimiento (o uno que se llama a sí mismo) es recursiva.
+
+El análisis semántico lo usa para verificar llamadas anteriores a su
+definición y el generador de IR para declarar todas las funciones antes de
+generar código, el orden de compilación, descartar procedimientos que main
+nunca alcanza y marcar las llamadas de cola.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+
+from .ast import Node
+
+
+class CallSite:
+    """Una llamada: quién llama (None = main), a quién, y si es de cola."""
+    __slots__ = ("caller", "callee", "node", "line", "tail")
+
+    def __init__(self, caller: Optional[str], callee: str, node: Node, tail: bool):
+        self.caller = caller
+        self.callee = callee
+        self.node = node
+        self.line = node.line
+        self.tail = tail
+
+    def __repr__(self):
+        return f"CallSite({self.caller or 'main'} -> {self.callee}, línea {self.line}{', cola' if self.tail else ''})"
+
+
+class ProcInfo:
+    """Firma y vecinos de un procedimiento."""
+    __slots__ = ("name", "node", "params", "arity", "line", "sites", "callees", "callers",
+                 "scc", "recursive")
+
+    def __init__(self, name: str, node: Node):
+        self.name = name
+        self.node = node                                    # el PARA
+        self.params = [str(p.value) for p in node.children[1].children if p.kind == "ID"]
+        self.arity = len(self.params)
+        self.line = node.line
+        self.sites: List[CallSite] = []                     # llamadas hechas desde su cuerpo
+        self.callees: List[str] = []                        # sin repetir, en orden de aparición
+        self.callers: List[str] = []                        # ídem; "main" no aparece
+        self.scc = -1                                       # índice en CallGraph.sccs
+        self.recursive = False
+
+    @property
+    def sym(self):
+        """El Symbol del procedimiento (lo pone frontend/resolver.py)."""
+        return self.node.children[0].sym
+
+    def __repr__(self):
+        return f"ProcInfo({self.name}/{self.arity}, línea {self.line})"
+
+
+class CallGraph:
+    def __init__(self):
+        self.procs: Dict[str, ProcInfo] = {}
+        self.duplicates: List[Node] = []        # PARA con un nombre ya definido
+        self.main_sites: List[CallSite] = []    # llamadas desde el programa principal
+        self.sccs: List[List[ProcInfo]] = []    # llamados antes que quien los llama
+        self._sites: Dict[int, CallSite] = {}   # id(nodo de la llamada) -> CallSite
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.procs
+
+    def get(self, name: str) -> Optional[ProcInfo]:
+        return self.procs.get(name)
+
+    def site(self, node: Node) -> Optional[CallSite]:
+        """El CallSite de un nodo CALL/EJECUTA de este árbol (None si no es llamada)."""
+        return self._sites.get(id(node))
+
+    def is_recursive(self, name: str) -> bool:
+        info = self.procs.get(name)
+        return info is not None and info.recursive
+
+    def compile_order(self) -> List[ProcInfo]:
+        return [p for scc in self.sccs for p in scc]
+
+    def reachable(self) -> List[ProcInfo]:
+        """Procedimientos alcanzables desde main, en orden de compilación."""
+        seen = set()
+        todo = [s.callee for s in self.main_sites]
+        while todo:
+            name = todo.pop()
+            if name in seen or name not in self.procs:
+                continue
+            seen.add(name)
+            todo.extend(self.procs[name].callees)
+        return [p for p in self.compile_order() if p.name in seen]
+
+
+def _valid_para(n: Node) -> bool:
+    # misma forma que acepta resolver.py: el cuerpo de un árbol optimizado
+    # puede ser una sentencia suelta en vez de STMTS
+    ch = n.children
+    return len(ch) >= 3 and ch[1].kind == "PARAMS"
+
+# Dónde hay sentencias: índices de los hijos que son bloques (None = todos).
+# Las llamadas y los PARA son sentencias, así que las expresiones no se
+# recorren. En un árbol optimizado el bloque puede ser una sentencia suelta.
+_BLOCKS = {
+    "PROGRAM": None, "STMTS": None,
+    "SI": (1, 2), "MIENTRAS": (1,), "REPITE": (1,),
+    "HAZ_HASTA": (0,), "HAZ_MIENTRAS": (0,), "EJECUTA": (0,),
+}
+# ...y cuáles heredan la posición de cola (los bucles vuelven a empezar)
+_TAIL_BLOCKS = {"SI", "EJECUTA"}
+
+def build_call_graph(root: Node) -> CallGraph:
+    g = CallGraph()
+    calls = []          # (procedimiento que llama, nombre llamado, nodo, cola)
+
+    # ---------- 1) firmas y llamadas, en orden de programa ----------
+    # (nodo, procedimiento que lo contiene, ¿en posición de cola?)
+    work = [(root, None, False)]
+    pop, push = work.pop, work.append
+    while work:
+        n, owner, tail = pop()
+        k = n.kind
+        ch = n.children
+        if k == "CALL":
+            if n.value is None and ch and ch[0].kind == "ID":
+                calls.append((owner, str(ch[0].value), n, tail))
+            continue
+        if k == "PARA":
+            if not _valid_para(n):
+                continue
+            name = str(ch[0].value)
+            if name in g.procs:
+                g.duplicates.append(n)      # el cuerpo de un duplicado no se compila
+            else:
+                info = g.procs[name] = ProcInfo(name, n)
+                push((ch[2], info, True))
+            continue
+        if k == "EJECUTA" and ch and ch[0].kind == "ID":
+            calls.append((owner, str(ch[0].value), n, tail))
+            continue
+        if k not in _BLOCKS or not ch:
+            continue
+        blocks = _BLOCKS[k]
+        keep = tail and (blocks is None or k in _TAIL_BLOCKS)
+        last = len(ch) - 1
+        for i in range(last, -1, -1):
+            if blocks is None:
+                push((ch[i], owner, keep and i == last))
+            elif i in blocks:
+                push((ch[i], owner, keep))
+
+    # ---------- 2) aristas, con la tabla ya completa ----------
+    for owner, callee, node, tail in calls:
+        _add_site(g, owner, callee, node, tail)
+
+    _tarjan(g)
+    return g
+
+def _add_site(g: CallGraph, owner: Optional[ProcInfo], callee: str, node: Node, tail: bool):
+    site = CallSite(owner.name if owner else None, callee, node, tail)
+    g._sites[id(node)] = site
+    if owner is None:
+        g.main_sites.append(site)
+        return
+    owner.sites.append(site)
+    if callee not in owner.callees:
+        owner.callees.append(callee)
+    target = g.procs.get(callee)
+    if target is not None and owner.name not in target.callers:
+        target.callers.append(owner.name)
+
+
+def _tarjan(g: CallGraph):
+    """Componentes fuertemente conexas, iterativo. Tarjan las completa en
+    orden topológico inverso (una componente sale después de todas las que
+    alcanza), que es justo el orden de compilación."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    counter = 0
+
+    def succ(name: str) -> Iterable[str]:
+        return [c for c in g.procs[name].callees if c in g.procs]
+
+    for start in g.procs:
+        if start in index:
+            continue
+        # pila de (nodo, iterador de sucesores)
+        work = [(start, iter(succ(start)))]
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(succ(w))))
+                    break
+                if w in on_stack:
+                    low[v] = min(low[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+                if low[v] == index[v]:
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        comp.append(g.procs[w])
+                        if w == v:
+                            break
+                    comp.reverse()
+                    n = len(g.sccs)
+                    for p in comp:
+                        p.scc = n
+                        p.recursive = len(comp) > 1 or p.name in p.callees
+                    g.sccs.append(comp)
@@ -1,23 +1,159 @@
 # frontend/exporter.py
 from __future__ import annotations
+import gzip
 import json
 import os
-from typing import Any, Dict
+from json.encoder import encode_basestring
+from typing import Any, Dict, Optional, TextIO
 from .ast import Node
 from .diagnostics import Diagnostics
 
 def ast_to_dict(n: Node) -> Dict[str, Any]:
-    return {
-        "kind": n.kind,
-        "value": n.value,
-        "line": n.line,
-        "children": [ast_to_dict(c) for c in n.children],
-    }
-
-def save_ast_json(root: Node, path: str):
+    # preorden con pila explícita: cada dict se cuelga de la lista de hijos
+    # de su padre al crearse (los hermanos se apilan al revés, así que se
+    # agregan en orden)
+    out: list = []
+    stack = [(n, out)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node, siblings = pop()
+        children: list = []
+        siblings.append({
+            "kind": node.kind,
+            "value": node.value,
+            "line": node.line,
+            "children": children,
+        })
+        kids = node.children
+        for i in range(len(kids) - 1, -1, -1):
+            push((kids[i], children))
+    return out[0]
+
+def _json_scalar(value: Any) -> str:
+    """Lo mismo que json.dumps(value, ensure_ascii=False) para los valores
+    que aparecen en el AST."""
+    if value is None:
+        return "null"
+    cls = value.__class__
+    if cls is str:
+        return encode_basestring(value)
+    if cls is bool:
+        return "true" if value else "false"
+    if cls is int:
+        return int.__repr__(value)
+    if cls is float:
+        if value != value:
+            return "NaN"
+        if value in (_INF, -_INF):
+            return "Infinity" if value > 0 else "-Infinity"
+        return float.__repr__(value)
+    return json.dumps(value, ensure_ascii=False)
+
+_INF = float("inf")
+_FLUSH_EVERY = 4096        # piezas acumuladas antes de escribir
+
+def write_ast_json(root: Node, fp: TextIO, compact: bool = False):
+    """
+    Escribe el AST como JSON directamente desde un recorrido, sin armar el
+    árbol de dicts de ast_to_dict. La salida es byte a byte la de
+    json.dump(ast_to_dict(root), fp, ensure_ascii=False, indent=2), o con
+    compact=True la de separators=(",", ":") sin indentación.
+
+    La pila guarda nodos pendientes y los cierres ya formateados; la memoria
+    extra es proporcional a la profundidad (y a los hermanos pendientes),
+    no al tamaño del árbol.
+    """
+    pads: list[str] = []
+
+    def pad(level: int) -> str:
+        while len(pads) <= level:
+            pads.append("\n" + "  " * len(pads))
+        return pads[level]
+
+    buf: list[str] = []
+    out = buf.append
+    stack: list = [(root, 0)]
+    pop, push = stack.pop, stack.append
+    scalar = _json_scalar
+    while stack:
+        item = pop()
+        if item.__class__ is str:
+            out(item)
+            continue
+        node, depth = item
+        if compact:
+            out('{"kind":')
+            out(scalar(node.kind))
+            out(',"value":')
+            out(scalar(node.value))
+            out(',"line":')
+            out(scalar(node.line))
+            out(',"children":')
+            kids = node.children
+            if not kids:
+                out("[]}")
+            else:
+                out("[")
+                push("]}")
+                for i in range(len(kids) - 1, -1, -1):
+                    push((kids[i], depth + 1))
+                    if i:
+                        push(",")
+        else:
+            field = pad(2 * depth + 1)
+            out("{")
+            out(field)
+            out('"kind": ')
+            out(scalar(node.kind))
+            out(",")
+            out(field)
+            out('"value": ')
+            out(scalar(node.value))
+            out(",")
+            out(field)
+            out('"line": ')
+            out(scalar(node.line))
+            out(",")
+            out(field)
+            out('"children": ')
+            kids = node.children
+            if not kids:
+                out("[]")
+                out(pad(2 * depth))
+                out("}")
+            else:
+                item_pad = pad(2 * depth + 2)
+                out("[")
+                push(field + "]" + pad(2 * depth) + "}")
+                sep = "," + item_pad
+                for i in range(len(kids) - 1, -1, -1):
+                    push((kids[i], depth + 1))
+                    push(sep if i else item_pad)
+        if len(buf) >= _FLUSH_EVERY:
+            fp.write("".join(buf))
+            buf.clear()
+    fp.write("".join(buf))
+
+def save_ast_json(root: Node, path: str, compact: bool = False, compress: Optional[bool] = None):
+    """Guarda el AST como JSON en streaming. compress=None comprime con gzip
+    si la ruta termina en .gz."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(ast_to_dict(root), f, ensure_ascii=False, indent=2)
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    else:
+        f = open(path, "w", encoding="utf-8")
+    with f:
+        write_ast_json(root, f, compact)
+
+def open_ast_json(path: str) -> TextIO:
+    """Abre un ast.json, comprimido con gzip o no (según la marca del archivo)."""
+    with open(path, "rb") as f:
+        gz = f.read(2) == b"\x1f\x8b"
+    if gz:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
 
 def save_diags_txt(diags: Diagnostics, path: str):
     os.makedirs(os.path.dirname(path), exist_ok=True)
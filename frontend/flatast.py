@@ -0,0 +1,207 @@
+# frontend/flatast.py
+"""
+AST plano (struct-of-arrays).
+
+Cada nodo es un índice; sus campos viven en arreglos paralelos:
+
+- kinds:        código del kind (array 'H') = índice en KIND_NAMES
+- values:       valor del nodo (mismos objetos que en el Node original)
+- lines:        línea (array 'I')
+- first_child:  índice del primer hijo, -1 si es hoja (array 'i')
+- next_sibling: índice del siguiente hermano, -1 si es el último (array 'i')
+
+Los nodos se numeran en preorden (la raíz es 0 y el primer hijo de i, si
+existe, es i + 1), así que un recorrido de todo el programa en preorden es
+simplemente `range(len(flat))` y el subárbol de i es
+`range(i, flat.subtree_end(i))`. Para recorridos con estructura están
+preorder(), postorder() y events() (entrada/salida), todos sin recursión.
+"""
+from __future__ import annotations
+from array import array
+from typing import Iterator
+
+from .ast import Node, KINDS, intern_kind
+
+# Códigos de kind: los conocidos en orden fijo; los desconocidos se agregan
+# al final la primera vez que aparecen (estables dentro del proceso).
+KIND_NAMES: list[str] = sorted(KINDS)
+KIND_CODE: dict[str, int] = {k: i for i, k in enumerate(KIND_NAMES)}
+
+def kind_code(kind: str) -> int:
+    code = KIND_CODE.get(kind)
+    if code is None:
+        kind = intern_kind(kind)
+        code = KIND_CODE[kind] = len(KIND_NAMES)
+        KIND_NAMES.append(kind)
+    return code
+
+
+class FlatAST:
+    __slots__ = ("kinds", "values", "lines", "first_child", "next_sibling")
+
+    def __init__(self):
+        self.kinds = array('H')
+        self.values: list = []
+        self.lines = array('I')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def kind(self, i: int) -> str:
+        return KIND_NAMES[self.kinds[i]]
+
+    def children(self, i: int) -> Iterator[int]:
+        c = self.first_child[i]
+        ns = self.next_sibling
+        while c != -1:
+            yield c
+            c = ns[c]
+
+    def child_list(self, i: int) -> list[int]:
+        return list(self.children(i))
+
+    def child_counts(self) -> list[int]:
+        """Cantidad de hijos de cada nodo."""
+        fc, ns = self.first_child, self.next_sibling
+        counts = [0] * len(fc)
+        for i, c in enumerate(fc):
+            if c != -1:
+                k = 1
+                c = ns[c]
+                while c != -1:
+                    k += 1
+                    c = ns[c]
+                counts[i] = k
+        return counts
+
+    # ---------- recorridos ----------
+    def preorder(self, root: int = 0) -> Iterator[int]:
+        fc, ns = self.first_child, self.next_sibling
+        yield root
+        i = fc[root]
+        pending = []          # hermano con el que seguir al terminar cada subárbol
+        while i != -1:
+            yield i
+            c = fc[i]
+            if c != -1:
+                pending.append(ns[i])
+                i = c
+            else:
+                i = ns[i]
+                while i == -1 and pending:
+                    i = pending.pop()
+
+    def postorder(self, root: int = 0) -> Iterator[int]:
+        fc, ns = self.first_child, self.next_sibling
+        ancestors = []
+        i = root
+        while True:
+            while fc[i] != -1:
+                ancestors.append(i)
+                i = fc[i]
+            yield i
+            while True:
+                if i == root:
+                    return
+                s = ns[i]
+                if s != -1:
+                    i = s
+                    break
+                i = ancestors.pop()
+                yield i
+
+    def events(self, root: int = 0) -> Iterator[tuple[int, bool]]:
+        """(índice, True) al entrar a cada nodo y (índice, False) al salir."""
+        fc, ns = self.first_child, self.next_sibling
+        ancestors = []
+        i = root
+        while True:
+            yield i, True
+            c = fc[i]
+            if c != -1:
+                ancestors.append(i)
+                i = c
+                continue
+            while True:
+                yield i, False
+                if i == root:
+                    return
+                s = ns[i]
+                if s != -1:
+                    i = s
+                    break
+                i = ancestors.pop()
+
+    # ---------- conversión ----------
+    @classmethod
+    def from_node(cls, root: Node) -> "FlatAST":
+        # 1) preorden iterativo: numera los nodos y anota cuántos hijos tiene cada uno
+        order: list[Node] = []
+        stack = [root]
+        push, pop, visit = stack.extend, stack.pop, order.append
+        while stack:
+            node = pop()
+            visit(node)
+            ch = node.children
+            if ch:
+                push(reversed(ch))
+        n = len(order)
+        flat = cls()
+        codes = KIND_CODE
+        kinds = [codes.get(x.kind, -1) for x in order]
+        if -1 in kinds:
+            kinds = [kind_code(x.kind) for x in order]
+        flat.kinds = array('H', kinds)
+        flat.values = [x.value for x in order]
+        flat.lines = array('I', [x.line for x in order])
+        # 2) tamaños de subárbol de atrás hacia adelante; con el preorden el
+        #    primer hijo de i es i + 1 y el hermano siguiente de j es j + size[j]
+        size = [1] * n
+        fc = array('i', [-1]) * n
+        ns = array('i', [-1]) * n
+        for i in range(n - 1, -1, -1):
+            k = len(order[i].children)
+            if k:
+                fc[i] = j = i + 1
+                total = 1
+                for _ in range(k - 1):
+                    ns[j] = nxt = j + size[j]
+                    total += size[j]
+                    j = nxt
+                size[i] = total + size[j]
+        flat.first_child, flat.next_sibling = fc, ns
+        return flat
+
+    def subtree_end(self, root: int = 0) -> int:
+        """Índice siguiente al último descendiente de root (preorden contiguo)."""
+        fc, ns = self.first_child, self.next_sibling
+        i = root
+        while True:
+            # bajar siempre por el último hijo
+            c = fc[i]
+            if c == -1:
+                return i + 1
+            while ns[c] != -1:
+                c = ns[c]
+            i = c
+
+    def to_node(self, root: int = 0) -> Node:
+        names = KIND_NAMES
+        kinds, values, lines = self.kinds, self.values, self.lines
+        fc, ns = self.first_child, self.next_sibling
+        end = self.subtree_end(root)
+        built: list = [None] * (end - root)
+        # de atrás hacia adelante: los hijos (índices mayores) ya están construidos
+        for i in range(end - 1, root - 1, -1):
+            node = Node(names[kinds[i]], values[i], None, lines[i])
+            c = fc[i]
+            if c != -1:
+                children = []
+                while c != -1:
+                    children.append(built[c - root])
+                    c = ns[c]
+                node.children = children
+            built[i - root] = node
+        return built[0]
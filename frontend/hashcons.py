@@ -0,0 +1,123 @@
+# frontend/hashcons.py
+"""
+Hash-consing opcional para el AST.
+
+Un HashConsFactory devuelve un único objeto por cada subárbol estructuralmente
+distinto: dos llamadas a make() con el mismo kind, valor (mismo tipo), línea e
+hijos devuelven el mismo ConsNode. Como los hijos ya están consados, la clave
+de un nodo compara a sus hijos por identidad y construirlo es O(#hijos).
+
+Cada ConsNode guarda su hash estructural y su tamaño (nodos del subárbol).
+Entre nodos de la misma fábrica la igualdad es identidad (O(1)); contra
+cualquier otro Node se cae a la comparación estructural de siempre.
+
+Los ConsNode se comparten entre varios padres, así que son inmutables por
+contrato: add() falla y los pases deben construir nodos nuevos (como ya hace
+ASTOptimizer). Las anotaciones de analyze() (ty, sym) sí se escriben, pero
+un subárbol compartido queda con las de su último uso.
+
+Con lines=False la línea no forma parte de la clave: se comparten más
+subárboles (p. ej. el mismo cuerpo de REPITE en líneas distintas) pero cada
+nodo conserva la línea de su primera aparición.
+"""
+from __future__ import annotations
+from typing import Any, List
+
+from .ast import Node, NO_CHILDREN
+
+
+class ConsNode(Node):
+    __slots__ = ("_hash", "_size", "_factory")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, ConsNode):
+            if other._factory is self._factory:
+                return False      # canónicos distintos: estructura distinta
+            if other._hash != self._hash:
+                return False
+        return Node.__eq__(self, other)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def add(self, *nodes: Node):
+        raise TypeError("ConsNode es inmutable (compartido); construir un nodo nuevo")
+
+
+class HashConsFactory:
+    """Tabla de nodos canónicos. Una por compilación/árbol; guarda referencias
+    fuertes a todo lo que creó."""
+
+    def __init__(self, lines: bool = True):
+        self.lines = lines
+        self._table: dict[tuple, ConsNode] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def make(self, kind: str, value: Any = None, children: List[Node] | None = None,
+             line: int = 0) -> ConsNode:
+        if children:
+            children = [c if c.__class__ is ConsNode and c._factory is self else self.intern(c)
+                        for c in children]
+            # los hijos van en la clave como objetos: su hash está cacheado y
+            # la comparación de tuplas resuelve por identidad
+            key = (kind, value.__class__, value, line if self.lines else None, *children)
+        else:
+            children = NO_CHILDREN
+            key = (kind, value.__class__, value, line if self.lines else None)
+        node = self._table.get(key)
+        if node is not None:
+            self.hits += 1
+            return node
+        self.misses += 1
+        node = ConsNode(kind, value, children, line)
+        node._factory = self
+        if children:
+            node._hash = hash((node.kind, value, line, *[c._hash for c in children]))
+            node._size = 1 + sum(c._size for c in children)
+        else:
+            node._hash = hash((node.kind, value, line))
+            node._size = 1
+        self._table[key] = node
+        return node
+
+    def intern(self, root: Node) -> ConsNode:
+        """Versión consada de un árbol de Node (recorrido iterativo en postorden)."""
+        if root.__class__ is ConsNode and root._factory is self:
+            return root
+        done: dict[int, ConsNode] = {}
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node.__class__ is ConsNode and node._factory is self:
+                done[id(node)] = node
+                continue
+            if not expanded and node.children:
+                stack.append((node, True))
+                stack.extend((c, False) for c in node.children)
+                continue
+            kids = [done[id(c)] for c in node.children]
+            done[id(node)] = self.make(node.kind, node.value, kids, node.line)
+        return done[id(root)]
+
+
+def structural_size(node: Node) -> int:
+    """Tamaño del subárbol; O(1) para ConsNode."""
+    if isinstance(node, ConsNode):
+        return node._size
+    n = 0
+    stack = [node]
+    while stack:
+        x = stack.pop()
+        n += 1
+        stack.extend(x.children)
+    return n
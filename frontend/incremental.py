@@ -0,0 +1,163 @@
+# frontend/incremental.py
+"""
+Reparseo incremental para el editor.
+
+El programa se ve como una lista de ítems de nivel superior (sentencias del
+STMTS raíz, incluidos los bloques PARA ... FIN). Ante un texto nuevo:
+
+1. Se calcula la región cambiada (prefijo y sufijo comunes con el texto anterior).
+2. Se vuelve a lexear/parsear desde el ítem anterior al primero afectado
+   (un ítem puede mirar un token más allá de su final, así que el anterior
+   también puede cambiar).
+3. Se parsea sentencia por sentencia hasta que un token cae justo en el
+   inicio de un ítem viejo que está completo en el sufijo sin cambios; desde
+   ahí el resto del texto es idéntico y esos ítems se reutilizan tal cual.
+
+Los ítems reutilizados conservan su identidad (mismos objetos Node); solo se
+corren sus números de línea si la edición agregó o quitó saltos de línea.
+El PROGRAM y el STMTS raíz también se conservan: se reemplaza el tramo de
+hijos afectado.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+
+from .ast import Node
+from .lexer import FastLexer
+from .rdparser import RDParser
+
+
+def _common_prefix(a: str, b: str) -> int:
+    # búsqueda binaria comparando solo la mitad nueva en cada paso: O(n)
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.startswith(b[lo:mid], lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    la, lb = len(a), len(b)
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.endswith(b[lb - mid:lb - lo], 0, la - lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _shift_lines(node: Node, delta: int):
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if n.line:
+            n.line += delta
+        stack.extend(n.children)
+
+
+class IncrementalParser:
+    """Mantiene el AST de un buffer y lo actualiza reparseando solo lo editado.
+
+    Uso:
+        inc = IncrementalParser()
+        ast = inc.update(texto)      # primera vez: parseo completo
+        ast = inc.update(texto2)     # solo los ítems afectados
+    Si el texto nuevo tiene un error de sintaxis se lanza SyntaxError y el
+    estado anterior queda intacto.
+    """
+
+    def __init__(self):
+        self.text: str | None = None
+        self.root: Node | None = None
+        self._starts: list[int] = []   # offset del primer token de cada ítem
+        self._lines: list[int] = []    # línea de ese token
+        self.last_reparsed = 0
+        self.last_reused = 0
+
+    @property
+    def items(self) -> list[Node]:
+        return self.root.children[0].children if self.root is not None else []
+
+    def reset(self):
+        self.__init__()
+
+    def update(self, text: str) -> Node:
+        if self.root is None:
+            return self._full_parse(text)
+        old = self.text
+        if text == old:
+            self.last_reparsed, self.last_reused = 0, len(self._starts)
+            return self.root
+
+        p = _common_prefix(old, text)
+        s = _common_suffix(old, text, min(len(old), len(text)) - p)
+        old_end = len(old) - s
+        delta = len(text) - len(old)
+        line_delta = text.count('\n', p, len(text) - s) - old.count('\n', p, old_end)
+
+        starts, lines = self._starts, self._lines
+        k = bisect_left(starts, p) - 1        # último ítem que empieza antes del cambio
+        first = k - 1 if k >= 1 else 0
+        if k < 0:
+            lex_pos, lex_line = 0, 1          # el cambio está antes del primer ítem
+        else:
+            lex_pos, lex_line = starts[first], lines[first]
+
+        lexer = FastLexer()
+        lexer.lineno = lex_line
+        lexer.input(text, lex_pos)
+        parser = RDParser(iter(lexer.token, None))
+
+        n_old = len(starts)
+        cand = bisect_left(starts, old_end)   # primer ítem viejo íntegro en el sufijo
+        new_items, new_starts, new_lines = [], [], []
+        while not parser.at_end():
+            tok = parser.tok
+            pos = tok.lexpos
+            while cand < n_old and starts[cand] + delta < pos:
+                cand += 1
+            if cand < n_old and starts[cand] + delta == pos:
+                break
+            new_starts.append(pos)
+            new_lines.append(tok.lineno)
+            new_items.append(parser.parse_statement())
+        else:
+            cand = n_old
+        if not new_items and first == 0 and cand == n_old:
+            parser.parse_statement()  # programa vacío: mismo error que parse_text
+
+        # éxito: aplicar los cambios
+        for i in range(cand, n_old):
+            starts[i] += delta
+            if line_delta:
+                lines[i] += line_delta
+                _shift_lines(self.items[i], line_delta)
+        self.items[first:cand] = new_items
+        starts[first:cand] = new_starts
+        lines[first:cand] = new_lines
+        self.text = text
+        self.last_reparsed = len(new_items)
+        self.last_reused = len(starts) - len(new_items)
+        return self.root
+
+    def _full_parse(self, text: str) -> Node:
+        lexer = FastLexer()
+        lexer.input(text)
+        parser = RDParser(iter(lexer.token, None))
+        items, starts, lines = [], [], []
+        while True:
+            tok = parser.tok
+            starts.append(tok.lexpos)
+            lines.append(tok.lineno)
+            items.append(parser.parse_statement())
+            if parser.at_end():
+                break
+        self.root = Node("PROGRAM", None, [Node("STMTS", None, items)])
+        self.text = text
+        self._starts, self._lines = starts, lines
+        self.last_reparsed, self.last_reused = len(items), 0
+        return self.root
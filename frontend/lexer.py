@@ -3,6 +3,9 @@ from __future__ import annotations
 import sys
 import os
 import re
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator
 import ply.lex as lex
 
 # --- Palabras reservadas (en minúscula) ---
@@ -99,45 +102,51 @@ def t_STRING(t):
 # Permitimos típicos IDs de lenguajes: letra/underscore inicial, luego alfanum/underscore.
 def t_ID(t):
     r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_]+)?\??'
-    lexeme = t.value
-    lexeme_lower = t.value.lower()
+    t.type = _id_type(t.value)
+    if t.type == 'ID':
+        setattr(t.lexer, 'seen_variable', True)
+    return t
+
+def _id_type(lexeme: str) -> str:
+    """Tipo de token de un lexema con forma de identificador (palabra clave o 'ID').
+
+    Lanza SyntaxError si es un identificador de usuario inválido.
+    """
+    lexeme_lower = lexeme.lower()
     # normalizamos las claves con y sin acento para 'división'
     if lexeme_lower == 'división':
         lexeme_lower = 'division'
     # Palabras con punto y signo de pregunta (p.ej. "haz.hasta", "iguales?")
     # Las dejamos como están y comparamos en minúscula:
     if lexeme_lower in _reserved:
-        t.type = _reserved[lexeme_lower]
-    else:
-        if '.' in lexeme or '?' in lexeme:
-            raise SyntaxError(
-                f"Identificador inválido '{lexeme}': "
-                "las variables no pueden contener '.' ni '?'."
-            )
-
-            # 2.2 Debe iniciar en minúscula
-        if not lexeme[0].islower():
-            raise SyntaxError(
-                f"Identificador inválido '{lexeme}': "
-                "debe iniciar con una letra minúscula."
-            )
-
-            # 2.3 Longitud máxima 10
-        if len(lexeme) > 10:
-            raise SyntaxError(
-                f"Identificador inválido '{lexeme}': "
-                "longitud máxima permitida es 10 caracteres."
-            )
-
-            # 2.4 Solo letras, dígitos, '_', '&', '@'
-        if not re.fullmatch(r'[a-z][A-Za-z0-9_&@]{0,9}', lexeme):
-            raise SyntaxError(
-                f"Identificador inválido '{lexeme}': "
-                "solo se permiten letras, dígitos, y '_', '&', '@' (después del primero)."
-            )
-        t.type = 'ID'
-        setattr(t.lexer, 'seen_variable', True)
-    return t
+        return _reserved[lexeme_lower]
+    if '.' in lexeme or '?' in lexeme:
+        raise SyntaxError(
+            f"Identificador inválido '{lexeme}': "
+            "las variables no pueden contener '.' ni '?'."
+        )
+
+        # 2.2 Debe iniciar en minúscula
+    if not lexeme[0].islower():
+        raise SyntaxError(
+            f"Identificador inválido '{lexeme}': "
+            "debe iniciar con una letra minúscula."
+        )
+
+        # 2.3 Longitud máxima 10
+    if len(lexeme) > 10:
+        raise SyntaxError(
+            f"Identificador inválido '{lexeme}': "
+            "longitud máxima permitida es 10 caracteres."
+        )
+
+        # 2.4 Solo letras, dígitos, '_', '&', '@'
+    if not re.fullmatch(r'[a-z][A-Za-z0-9_&@]{0,9}', lexeme):
+        raise SyntaxError(
+            f"Identificador inválido '{lexeme}': "
+            "solo se permiten letras, dígitos, y '_', '&', '@' (después del primero)."
+        )
+    return 'ID'
 
 # --- Errores léxicos ---
 def t_error(t):
@@ -145,25 +154,204 @@ def t_error(t):
     msg = f"Carácter inesperado '{t.value[0]}' en línea {t.lexer.lineno}, col {col}"
     raise SyntaxError(msg)
 
-# Utilidad: columna aproximada (para mensajes)
+# Utilidad: columna (para mensajes). El índice de líneas se arma una vez por
+# texto y queda en el lexer junto al lexdata del que sale.
 def _column(t):
-    last_nl = t.lexer.lexdata.rfind('\n', 0, t.lexpos)
-    return t.lexpos - (last_nl + 1)
+    lexer = t.lexer
+    cached = getattr(lexer, "line_index", None)
+    if cached is None or cached[0] is not lexer.lexdata:
+        cached = lexer.line_index = (lexer.lexdata, LineIndex.from_text(lexer.lexdata))
+    return cached[1].position(t.lexpos)[1]
+
+
+class LineIndex:
+    """Offsets donde empieza cada línea; traduce offset -> (línea, columna)."""
+
+    __slots__ = ("starts",)
+
+    def __init__(self, starts: array | None = None):
+        self.starts = starts if starts is not None else array('I', [0])
+
+    @classmethod
+    def from_text(cls, text: str) -> "LineIndex":
+        starts = array('I', [0])
+        find = text.find
+        i = find('\n')
+        while i >= 0:
+            starts.append(i + 1)
+            i = find('\n', i + 1)
+        return cls(starts)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """(línea 1-based, columna 0-based) del offset."""
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1]
+
+# --- Scanner rápido ---
+# Una sola regex con todas las reglas en el mismo orden que PLY (funciones
+# t_* por línea de definición, luego literales) y una alternativa final que
+# captura cualquier carácter inválido. Los espacios (t_ignore) se consumen
+# como prefijo de cada match, así que hay un match por token. Produce los
+# mismos tipos, valores y líneas que el lexer PLY, sin callback por token.
+_FAST_RE = re.compile(r"""
+    [ \t]*
+    (?:
+        (//[^\n]*)                                    # 1 comentario
+      | (\n+)                                         # 2 saltos de línea
+      | (\d+(?:\.\d+)?)                               # 3 NUM
+      | ("(?:[^"\n]|\\.)*")                           # 4 STRING
+      | ([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_]+)?\??)   # 5 ID / palabra clave
+      | ([()\[\],=+\-*/])                              # 6 literales
+      | ([^ \t])                                      # 7 carácter inválido
+      | (\Z)                                          # 8 espacios al final
+    )
+""", re.VERBOSE)
+_G_COMMENT, _G_NL, _G_NUM, _G_STRING, _G_ID, _G_LIT, _G_ERR, _G_END = range(1, 9)
+
+# Caché lexema -> tipo (solo lexemas válidos). Arranca con todas las palabras
+# clave en minúscula y mayúscula; el resto se valida una vez por lexema.
+_ID_CACHE_MAX = 1 << 16
+_KEYWORD_TYPES = {**_reserved, **{k.upper(): v for k, v in _reserved.items()}}
+_id_cache: dict[str, str] = dict(_KEYWORD_TYPES)
+
+class FastLexer:
+    """Lexer compatible con la interfaz de PLY (input/token/clone, lineno,
+    lexpos, lexdata) que escanea el buffer completo con `_FAST_RE`."""
+
+    def __init__(self):
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lineno = 1
+        self._next = iter(()).__next__
+
+    def input(self, data: str, pos: int = 0):
+        """Como PLY; `pos` permite empezar en un offset que sea inicio de token
+        (la línea de ese offset se fija antes en `lineno`)."""
+        self.lexdata = data
+        self.lexpos = pos
+        self._next = self._scan(data, pos=pos).__next__
+
+    def input_stream(self, chunks: Iterable[str]):
+        """Entrada por trozos (ver stream_tokens); lexdata queda vacío."""
+        self.lexdata = ''
+        self.lexpos = 0
+        self._next = self._scan_chunks(chunks).__next__
+
+    def token(self):
+        try:
+            return self._next()
+        except StopIteration:
+            return None
+
+    def clone(self):
+        c = FastLexer()
+        c.lineno = self.lineno
+        return c
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    def _scan_chunks(self, chunks: Iterable[str]):
+        # Ningún token cruza un salto de línea (los strings y comentarios
+        # terminan antes del '\n'), así que se escanea cada trozo solo hasta
+        # su último '\n' y el resto se arrastra al siguiente. Cada porción
+        # empieza en inicio de línea: lexpos y columnas salen con `base`.
+        pending = ''
+        base = 0
+        for chunk in chunks:
+            pending += chunk
+            cut = pending.rfind('\n') + 1
+            if cut:
+                yield from self._scan(pending[:cut], base)
+                base += cut
+                pending = pending[cut:]
+        if pending:
+            yield from self._scan(pending, base)
+
+    def _scan(self, data: str, base: int = 0, pos: int = 0):
+        LexToken = lex.LexToken
+        cache = _id_cache
+        lineno = self.lineno
+        for m in _FAST_RE.finditer(data, pos):
+            g = m.lastindex
+            if g == _G_ID:
+                value = m.group(g)
+                ttype = cache.get(value)
+                if ttype is None:
+                    ttype = _id_type(value)
+                    if len(cache) >= _ID_CACHE_MAX:
+                        cache.clear()
+                        cache.update(_KEYWORD_TYPES)
+                    cache[value] = ttype
+                if ttype == 'ID':
+                    self.seen_variable = True
+            elif g == _G_LIT:
+                value = ttype = m.group(g)
+            elif g == _G_NL:
+                lineno += m.end() - m.start(g)
+                self.lineno = lineno
+                continue
+            elif g == _G_NUM:
+                ttype = 'NUM'
+                value = m.group(g)
+                value = float(value) if '.' in value else int(value)
+            elif g == _G_STRING:
+                ttype = 'STRING'
+                value = bytes(m.group(g)[1:-1], "utf-8").decode("unicode_escape")
+            elif g == _G_ERR:
+                at = m.start(g)
+                self.lexpos = base + at
+                col = at - (data.rfind('\n', 0, at) + 1)
+                raise SyntaxError(f"Carácter inesperado '{m.group(g)}' en línea {lineno}, col {col}")
+            else:  # comentario o espacios finales
+                continue
+            tok = LexToken()
+            tok.type = ttype
+            tok.value = value
+            tok.lineno = lineno
+            tok.lexpos = base + m.start(g)
+            self.lexpos = base + m.end()
+            yield tok
+        self.lexpos = base + len(data)
+
+# --- Lexing por trozos para archivos grandes ---
+STREAM_CHUNK_SIZE = 1 << 20  # caracteres por lectura
+
+def read_chunks(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """Lee un archivo de texto UTF-8 en trozos de `chunk_size` caracteres."""
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def stream_tokens(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[lex.LexToken]:
+    """Genera los tokens de un archivo sin cargarlo completo en memoria.
+
+    La memoria usada es O(chunk_size + línea más larga), sin importar el
+    tamaño del archivo. Mismos tokens, líneas y lexpos que FastLexer/PLY.
+    """
+    lexer = FastLexer()
+    lexer.input_stream(read_chunks(path, chunk_size))
+    return iter(lexer.token, None)
 
 # --- Builder del lexer ---
-def build_lexer(**kwargs):
+# LOGOTEC_LEXER=fast usa FastLexer por defecto; "ply" mantiene el lexer de PLY.
+LEXER_MODES = ("ply", "fast")
+DEFAULT_LEXER = os.environ.get("LOGOTEC_LEXER", "ply")
+
+def build_lexer(mode: str | None = None, **kwargs):
+    mode = mode or DEFAULT_LEXER
+    if mode == "fast":
+        return FastLexer()
+    if mode != "ply":
+        raise ValueError(f"Modo de lexer desconocido: {mode!r} (opciones: {', '.join(LEXER_MODES)})")
     return lex.lex(**kwargs)
 
 # --- Modo script para probar rápido ---
 def _run_cli(path: str):
-    with open(path, 'r', encoding='utf-8') as f:
-        data = f.read()
-    lexer = build_lexer()
-    lexer.input(data)
-    while True:
-        tok = lexer.token()
-        if not tok:
-            break
+    for tok in stream_tokens(path):
         print(f"{tok.type:<10} {repr(tok.value):<12} (line {tok.lineno})")
 
 if __name__ == '__main__':
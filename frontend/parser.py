@@ -1,11 +1,18 @@
 # frontend/parser.py
 from __future__ import annotations
+import copy
+import hashlib
+import os
 import sys
+import tempfile
+import threading
+import ply
 import ply.yacc as yacc
 from ply.yacc import PlyLogger
 
-from .lexer import build_lexer, tokens
+from .lexer import build_lexer, tokens, FastLexer, DEFAULT_LEXER, read_chunks, STREAM_CHUNK_SIZE
 from .ast import Node
+from .rdparser import parse_tokens, lexer_tokens
 
 # Precedencias
 precedence = (
@@ -302,25 +309,155 @@ def p_error(t):
     else:
         raise SyntaxError("Error de sintaxis: fin de entrada inesperado")
 
+# ---------------------------------------------------------------
+# Caché de tablas LALR
+# ---------------------------------------------------------------
+# Las tablas se generan una sola vez por proceso y se guardan en disco
+# (pickle de PLY). El nombre del archivo incluye la versión de PLY y un
+# hash de la gramática, así que cualquier cambio en las producciones,
+# precedencias o tokens genera un archivo nuevo; además PLY valida la
+# firma al leerlo.
+
+_CACHE_ENV = "LOGOTEC_CACHE_DIR"
+_TABLE_PREFIX = "parsetab"
+
+_build_lock = threading.Lock()
+_proto_parser = None   # LRParser con tablas ya construidas
+_proto_lexer = None    # lexer "limpio" a partir del cual se clonan los demás
+_local = threading.local()
+
+def _grammar_digest() -> str:
+    """Hash de todo lo que influye en las tablas LALR."""
+    h = hashlib.sha1()
+    h.update(repr(precedence).encode("utf-8"))
+    h.update(repr(tokens).encode("utf-8"))
+    g = globals()
+    for name in sorted(k for k in g if k.startswith("p_") and callable(g[k])):
+        h.update(name.encode("utf-8"))
+        h.update((g[name].__doc__ or "").encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def cache_dir() -> str | None:
+    """Carpeta del caché en disco (None si está deshabilitado con LOGOTEC_CACHE_DIR="")."""
+    d = os.environ.get(_CACHE_ENV)
+    if d is not None:
+        return d or None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "logotec")
+
+def table_cache_path() -> str | None:
+    d = cache_dir()
+    if d is None:
+        return None
+    return os.path.join(d, f"{_TABLE_PREFIX}-ply{ply.__version__}-{_grammar_digest()}.pickle")
+
+def _build_tables():
+    logger = PlyLogger(sys.stdout)
+    module = sys.modules[__name__]
+    path = table_cache_path()
+    if path is not None:
+        if os.path.exists(path):
+            try:
+                return yacc.yacc(module=module, debug=False, write_tables=False,
+                                 errorlog=logger, picklefile=path)
+            except Exception:
+                # archivo corrupto o a medio escribir: se regenera abajo
+                pass
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=_TABLE_PREFIX, suffix=".tmp", dir=os.path.dirname(path))
+            os.close(fd)
+            os.remove(tmp)  # PLY debe crear el archivo; mkstemp solo reserva el nombre
+            parser = yacc.yacc(module=module, debug=False, write_tables=False,
+                               errorlog=logger, picklefile=tmp)
+            os.replace(tmp, path)  # escritura atómica
+            return parser
+        except OSError:
+            pass  # caché no escribible: seguimos solo en memoria
+    return yacc.yacc(module=module, debug=False, write_tables=False, errorlog=logger)
+
+def _prototypes():
+    global _proto_parser, _proto_lexer
+    if _proto_parser is None:
+        with _build_lock:
+            if _proto_parser is None:
+                _proto_lexer = build_lexer("ply")
+                _proto_parser = _build_tables()
+    return _proto_parser, _proto_lexer
+
+def clone_lexer(mode: str | None = None):
+    """Lexer nuevo (línea 1, sin entrada) que comparte las regex ya compiladas.
+
+    Cada hilo (o cada parseo concurrente) debe usar su propio clon.
+    mode: "ply" o "fast" (por defecto LOGOTEC_LEXER, ver frontend/lexer.py).
+    """
+    if (mode or DEFAULT_LEXER) == "fast":
+        return FastLexer()
+    if mode not in (None, "ply"):
+        return build_lexer(mode)  # modo desconocido: ValueError
+    return _prototypes()[1].clone()
+
+def get_parser():
+    """Parser del hilo actual. Las tablas LALR se comparten entre hilos;
+    solo el estado de la pila del LRParser es propio de cada uno."""
+    proto = _prototypes()[0]
+    if getattr(_local, "proto", None) is not proto:
+        _local.proto = proto
+        _local.parser = copy.copy(proto)
+    return _local.parser
+
+def reset_parser_cache(remove_file: bool = False):
+    """Olvida el parser construido en este proceso (y opcionalmente el archivo en disco)."""
+    global _proto_parser, _proto_lexer
+    with _build_lock:
+        _proto_parser = None
+        _proto_lexer = None
+        path = table_cache_path()
+        if remove_file and path is not None and os.path.exists(path):
+            os.remove(path)
+
 # Runner
-def build_parser():
-    lex = build_lexer()
+# Motores disponibles: "ply" (tablas LALR) y "rd" (descendente recursivo,
+# frontend/rdparser.py). Ambos construyen el mismo AST.
+PARSER_ENGINES = ("ply", "rd")
+DEFAULT_ENGINE = os.environ.get("LOGOTEC_PARSER", "ply")
+
+def _new_lexer(lexer: str | None = None):
+    lex = clone_lexer(lexer)
     if getattr(lex, "seen_variable", False):
         raise SyntaxError("No hay variables declaradaso")
-    else:
-        logger = PlyLogger(sys.stdout)
-        parser = yacc.yacc(debug=False, write_tables=False, errorlog=logger)
-        return parser, lex
-
-def parse_text(text: str):
-    parser, lex = build_parser()
+    return lex
+
+def build_parser(lexer: str | None = None):
+    lex = _new_lexer(lexer)
+    return get_parser(), lex
+
+def parse_text(text: str, engine: str | None = None, lexer: str | None = None):
+    engine = engine or DEFAULT_ENGINE
+    if engine == "rd":
+        lex = _new_lexer(lexer)
+        lex.input(text)
+        return parse_tokens(lexer_tokens(lex))
+    if engine != "ply":
+        raise ValueError(f"Motor de parser desconocido: {engine!r} (opciones: {', '.join(PARSER_ENGINES)})")
+    parser, lex = build_parser(lexer)
     return parser.parse(text, lexer=lex)
 
+def parse_file(path: str, engine: str | None = None, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Parsea un archivo leyéndolo por trozos (FastLexer.input_stream) en vez
+    de cargar todo el texto; el AST resultante es el mismo que con parse_text."""
+    engine = engine or DEFAULT_ENGINE
+    lex = FastLexer()
+    lex.input_stream(read_chunks(path, chunk_size))
+    if engine == "rd":
+        return parse_tokens(lexer_tokens(lex))
+    if engine != "ply":
+        raise ValueError(f"Motor de parser desconocido: {engine!r} (opciones: {', '.join(PARSER_ENGINES)})")
+    return get_parser().parse(lexer=lex)
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Uso: python -m frontend.parser <archivo.logo>")
         sys.exit(1)
-    with open(sys.argv[1], "r", encoding="utf-8") as f:
-        text = f.read()
-    ast = parse_text(text)
+    ast = parse_file(sys.argv[1])
     print(ast.pretty())
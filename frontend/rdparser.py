@@ -0,0 +1,398 @@
+# frontend/rdparser.py
+"""
+Parser descendente recursivo (Pratt para expresiones) equivalente a la
+gramática PLY de frontend/parser.py.
+
+Construye exactamente el mismo AST (mismos kinds, valores y líneas) que las
+acciones p_* de PLY, incluyendo cómo PLY resuelve los conflictos de la tabla
+LALR (ver parser.out generado con debug=True):
+
+- Los operadores en palabra (PRODUCTO, SUMA, ..., AZAR) toman sus operandos
+  de forma "golosa": `PRODUCTO a b + c` es PRODUCTO a (b + c).
+- En los contextos donde un expr va seguido de otro expr (PRODUCTO expr expr,
+  PONXY expr expr, PONPOS [expr expr], IGUALES? expr expr, ...), un '-'
+  después del primer operando es ambiguo. PLY decide con el token que sigue
+  al operando de '-': si puede continuar una expresión es resta binaria,
+  si no, es un menos unario que forma el segundo operando.
+- Tras el segundo operando de una comparación, PLY siempre desplaza los
+  operadores aritméticos (no están en el FOLLOW de bexpr), así que ese operando
+  es un expr completo pese a la precedencia de IGUALES/MENORQ/MAYORQ.
+"""
+from __future__ import annotations
+from typing import Iterator
+
+from .ast import Node
+
+# Niveles de precedencia (los mismos de `precedence` en parser.py)
+_BINARY_LEVEL = {'+': 3, '-': 3, '*': 4, '/': 4}
+_UMINUS_LEVEL = 5
+_BOOL_LEVEL = {'O': 1, 'Y': 2}
+
+_RELOPS = frozenset(('IGUALES', 'MENORQ', 'MAYORQ'))
+_WORD_BINOPS = {
+    'PRODUCTO': '*',
+    'SUMA': '+',
+    'DIFERENCIA': '-',
+    'DIVISION': '/',
+}
+# Tokens con los que puede empezar un expr
+_EXPR_START = frozenset(('-', '(', 'NUM', 'STRING', 'ID', 'AZAR', 'POTENCIA') + tuple(_WORD_BINOPS))
+# Tokens después de los cuales PLY reduce "expr - expr" como resta (estado 127)
+_BINARY_MINUS_FOLLOW = _EXPR_START | {'+'}
+
+_MOVES = frozenset(('AV', 'RE', 'GD', 'GI'))
+_SIMPLE_STMTS = frozenset(('RUMBO', 'BL', 'SB', 'OT', 'CENTRO'))
+_ONE_EXPR_STMTS = frozenset(('PONX', 'PONY', 'PONRUMBO', 'ESPERA'))
+
+
+class _EOF:
+    type = '$end'
+    value = None
+    lineno = 0
+    lexpos = -1
+
+
+_EOF_TOKEN = _EOF()
+
+
+def _syntax_error(tok) -> SyntaxError:
+    if tok is _EOF_TOKEN:
+        return SyntaxError("Error de sintaxis: fin de entrada inesperado")
+    return SyntaxError(f"Error de sintaxis cerca de '{tok.value}' (token {tok.type}) en línea {tok.lineno}")
+
+
+class RDParser:
+    """Parser de un solo uso sobre un flujo de tokens (objetos con type/value/lineno)."""
+
+    def __init__(self, tokens: Iterator):
+        self._next_tok = iter(tokens).__next__
+        self.tok = None
+        self._advance()
+
+    # ---------- tokens ----------
+    def _advance(self):
+        prev = self.tok
+        try:
+            self.tok = self._next_tok()
+        except StopIteration:
+            self.tok = _EOF_TOKEN
+        return prev
+
+    def _expect(self, ttype: str):
+        tok = self.tok
+        if tok.type != ttype:
+            raise _syntax_error(tok)
+        self._advance()
+        return tok
+
+    # ---------- programa / sentencias ----------
+    def parse_program(self) -> Node:
+        stmts = self._stmt_list()
+        if self.tok is not _EOF_TOKEN:
+            raise _syntax_error(self.tok)
+        return Node("PROGRAM", None, [stmts])
+
+    def at_end(self) -> bool:
+        return self.tok is _EOF_TOKEN
+
+    def parse_statement(self) -> Node:
+        """Una sola sentencia desde el token actual (para el parseo incremental,
+        que recorre el programa sentencia por sentencia de nivel superior)."""
+        return self._stmt()
+
+    def _stmt_list(self) -> Node:
+        children = [self._stmt()]
+        stmt = self._stmt
+        while self.tok.type in _STMT_DISPATCH:
+            children.append(stmt())
+        return Node("STMTS", None, children)
+
+    def _block(self) -> Node:
+        self._expect('[')
+        body = self._stmt_list()
+        self._expect(']')
+        return body
+
+    def _stmt(self) -> Node:
+        handler = _STMT_DISPATCH.get(self.tok.type)
+        if handler is None:
+            raise _syntax_error(self.tok)
+        return handler(self)
+
+    def _id_node(self) -> Node:
+        tok = self._expect('ID')
+        return Node("ID", tok.value, [], tok.lineno)
+
+    def _s_move(self) -> Node:
+        tok = self._advance()
+        return Node(tok.type, None, [self._expr()], tok.lineno)
+
+    def _s_simple(self) -> Node:
+        tok = self._advance()
+        return Node(tok.type, None, [], tok.lineno)
+
+    def _s_one_expr(self) -> Node:
+        tok = self._advance()
+        return Node(tok.type, None, [self._expr()], tok.lineno)
+
+    def _s_inic(self) -> Node:
+        tok = self._advance()
+        name = self._id_node()
+        self._expect('=')
+        return Node("INIC", None, [name, self._expr()], tok.lineno)
+
+    def _s_inc(self) -> Node:
+        tok = self._advance()
+        self._expect('[')
+        name = self._id_node()
+        if self.tok.type == ']':
+            self._advance()
+            return Node("INC", None, [name], tok.lineno)
+        delta = self._expr()
+        self._expect(']')
+        return Node("INC", None, [name, delta], tok.lineno)
+
+    def _s_ponpos(self) -> Node:
+        tok = self._advance()
+        self._expect('[')
+        x, y = self._expr_pair()
+        self._expect(']')
+        return Node("PONPOS", None, [x, y], tok.lineno)
+
+    def _s_ponxy(self) -> Node:
+        tok = self._advance()
+        x, y = self._expr_pair()
+        return Node("PONXY", None, [x, y], tok.lineno)
+
+    def _s_poncl(self) -> Node:
+        tok = self._advance()
+        arg = self.tok
+        if arg.type == 'ID':
+            child = Node("ID", arg.value, [], arg.lineno)
+        elif arg.type == 'STRING':
+            child = Node("STR", arg.value, [], arg.lineno)
+        else:
+            raise _syntax_error(arg)
+        self._advance()
+        return Node("PONCL", None, [child], tok.lineno)
+
+    def _s_para(self) -> Node:
+        tok = self._advance()
+        name = self._id_node()
+        self._expect('[')
+        params = []
+        while self.tok.type == 'ID':
+            p = self._advance()
+            params.append(Node("ID", p.value, [], p.lineno))
+        self._expect(']')
+        body = self._stmt_list()
+        self._expect('FIN')
+        return Node("PARA", None, [name, Node("PARAMS", None, params), body], tok.lineno)
+
+    def _s_call(self) -> Node:
+        tok = self._advance()
+        name = Node("ID", tok.value, [], tok.lineno)
+        if self.tok.type != '[':
+            return Node("CALL", None, [name], tok.lineno)
+        self._advance()
+        args = []
+        if self.tok.type in _EXPR_START:
+            # arg_values: la resta entre argumentos siempre es binaria (estado 87)
+            args.append(self._expr())
+            while self.tok.type in _EXPR_START:
+                args.append(self._expr())
+        self._expect(']')
+        return Node("CALL", None, [name, Node("ARGS", None, args)], tok.lineno)
+
+    def _s_ejecuta(self) -> Node:
+        tok = self._advance()
+        return Node("EJECUTA", None, [self._block()], tok.lineno)
+
+    def _s_repite(self) -> Node:
+        tok = self._advance()
+        count = self._expr()
+        return Node("REPITE", None, [count, self._block()], tok.lineno)
+
+    def _s_si(self) -> Node:
+        tok = self._advance()
+        cond, is_bool = self._bexpr_or_expr(0)
+        if is_bool:
+            return Node("SI", None, [cond, self._block()], tok.lineno)
+        # stmt : SI expr HAZ stmt_list FIN
+        self._expect('HAZ')
+        body = self._stmt_list()
+        self._expect('FIN')
+        return Node("SI", None, [cond, body], tok.lineno)
+
+    def _s_haz(self) -> Node:
+        tok = self._advance()
+        name = self._id_node()
+        return Node("HAZ", None, [name, self._expr()], tok.lineno)
+
+    def _s_mientras(self) -> Node:
+        tok = self._advance()
+        cond = self._bexpr()
+        return Node("MIENTRAS", None, [cond, self._block()], tok.lineno)
+
+    def _s_haz_hasta(self) -> Node:
+        tok = self._advance()
+        body = self._block()
+        self._expect('HASTA')
+        return Node("HAZ_HASTA", None, [body, self._bexpr()], tok.lineno)
+
+    def _s_haz_mientras(self) -> Node:
+        tok = self._advance()
+        body = self._block()
+        self._expect('MIENTRAS')
+        return Node("HAZ_MIENTRAS", None, [body, self._bexpr()], tok.lineno)
+
+    # ---------- expresiones ----------
+    def _expr(self, min_level: int = 0) -> Node:
+        return self._expr_tail(self._expr_head(), min_level)
+
+    def _expr_head(self) -> Node:
+        tok = self.tok
+        t = tok.type
+        if t == 'NUM':
+            self._advance()
+            return Node("NUM", tok.value, [], tok.lineno)
+        if t == 'ID':
+            self._advance()
+            return Node("ID", tok.value, [], tok.lineno)
+        if t == 'STRING':
+            self._advance()
+            return Node("STR", tok.value, [], tok.lineno)
+        if t == '-':
+            self._advance()
+            return Node("NEG", None, [self._expr(_UMINUS_LEVEL)])
+        if t == '(':
+            self._advance()
+            inner = self._expr()
+            self._expect(')')
+            return inner
+        if t in _WORD_BINOPS:
+            self._advance()
+            a, b = self._expr_pair()
+            return Node("BINOP", _WORD_BINOPS[t], [a, b], tok.lineno)
+        if t == 'POTENCIA':
+            self._advance()
+            a, b = self._expr_pair()
+            return Node("POW", None, [a, b], tok.lineno)
+        if t == 'AZAR':
+            self._advance()
+            return Node("CALL", "AZAR", [self._expr()], tok.lineno)
+        raise _syntax_error(tok)
+
+    def _expr_tail(self, left: Node, min_level: int) -> Node:
+        """Continúa `left` con operadores binarios de nivel > min_level (asociatividad izquierda)."""
+        while True:
+            op = self.tok
+            level = _BINARY_LEVEL.get(op.type)
+            if level is None or level <= min_level:
+                return left
+            self._advance()
+            right = self._expr(level)
+            left = Node("BINOP", op.value, [left, right], op.lineno)
+
+    def _expr_pair(self, second_level: int = 0):
+        """Dos expr yuxtapuestos, resolviendo el '-' ambiguo como lo hace PLY."""
+        first = self._expr_head()
+        while True:
+            first = self._expr_tail_no_minus(first)
+            if self.tok.type != '-':
+                break
+            op = self._advance()
+            operand = self._expr(_BINARY_LEVEL['-'])
+            if self.tok.type in _BINARY_MINUS_FOLLOW:
+                first = Node("BINOP", op.value, [first, operand], op.lineno)
+                continue
+            return first, Node("NEG", None, [operand])
+        return first, self._expr(second_level)
+
+    def _expr_tail_no_minus(self, left: Node) -> Node:
+        # Igual que _expr_tail(left, 0) pero se detiene ante un '-' de nivel superior.
+        while True:
+            op = self.tok
+            t = op.type
+            if t == '-' or t not in _BINARY_LEVEL:
+                return left
+            self._advance()
+            level = _BINARY_LEVEL[t]
+            right = self._expr(level)
+            left = Node("BINOP", op.value, [left, right], op.lineno)
+
+    # ---------- booleanas ----------
+    def _bexpr(self) -> Node:
+        node, is_bool = self._bexpr_or_expr(0)
+        if not is_bool:
+            raise _syntax_error(self.tok)
+        return node
+
+    def _bexpr_or_expr(self, min_level: int):
+        """bexpr (con Y/O) o, si no hay comparación, un expr simple (para `SI expr HAZ`)."""
+        left, is_bool = self._bprimary()
+        while True:
+            op = self.tok
+            level = _BOOL_LEVEL.get(op.type)
+            if level is None or level <= min_level:
+                return left, is_bool
+            if not is_bool:
+                raise _syntax_error(op)
+            self._advance()
+            right, rbool = self._bexpr_or_expr(level)
+            if not rbool:
+                raise _syntax_error(self.tok)
+            left = Node("BOOLBIN", op.value, [left, right], op.lineno)
+
+    def _bprimary(self):
+        tok = self.tok
+        t = tok.type
+        if t in _RELOPS:
+            self._advance()
+            a, b = self._expr_pair()
+            return Node("RELOP", t, [a, b], tok.lineno), True
+        if t == '(':
+            self._advance()
+            inner, is_bool = self._bexpr_or_expr(0)
+            self._expect(')')
+            if is_bool:
+                return inner, True
+            left = self._expr_tail(inner, 0)
+        else:
+            left = self._expr()
+        op = self.tok
+        if op.type in _RELOPS:
+            self._advance()
+            right = self._expr()
+            return Node("RELOP", op.value, [left, right], op.lineno), True
+        return left, False
+
+
+_STMT_DISPATCH = {
+    'INIC': RDParser._s_inic,
+    'INC': RDParser._s_inc,
+    'PONPOS': RDParser._s_ponpos,
+    'PONXY': RDParser._s_ponxy,
+    'PONCL': RDParser._s_poncl,
+    'PARA': RDParser._s_para,
+    'ID': RDParser._s_call,
+    'EJECUTA': RDParser._s_ejecuta,
+    'REPITE': RDParser._s_repite,
+    'SI': RDParser._s_si,
+    'HAZ': RDParser._s_haz,
+    'MIENTRAS': RDParser._s_mientras,
+    'HAZ_HASTA': RDParser._s_haz_hasta,
+    'HAZ_MIENTRAS': RDParser._s_haz_mientras,
+}
+_STMT_DISPATCH.update({k: RDParser._s_move for k in _MOVES})
+_STMT_DISPATCH.update({k: RDParser._s_simple for k in _SIMPLE_STMTS})
+_STMT_DISPATCH.update({k: RDParser._s_one_expr for k in _ONE_EXPR_STMTS})
+
+
+def lexer_tokens(lexer) -> Iterator:
+    """Adapta un lexer estilo PLY (método token()) a un iterador."""
+    return iter(lexer.token, None)
+
+
+def parse_tokens(tokens: Iterator) -> Node:
+    return RDParser(tokens).parse_program()
@@ -0,0 +1,211 @@
+# frontend/resolver.py
+"""
+Resolución de nombres: cada variable recibe una dirección léxica fija.
+
+resolve(root) recorre el programa una vez, en orden de programa, y deja en
+cada referencia a variable (ID en expresiones, el ID de INIC/HAZ/INC y los
+parámetros de PARA):
+
+- Node.addr: (profundidad, slot). Profundidad 0 es el scope global
+  (el programa principal); 1 es el scope del PARA que contiene la
+  referencia. El slot indexa la lista de variables de ese scope.
+  None si el nombre no está al alcance en ese punto.
+- Node.sym:  el Symbol, si la variable ya estaba declarada en ese punto
+  (INIC, HAZ o parámetro). Un INC sobre un nombre nunca declarado crea la
+  variable (así la trata el código generado) pero deja sym en None.
+
+Es la única definición de qué hay al alcance dentro de un PARA: sus
+parámetros, sus variables locales y las globales declaradas antes. Un PARA
+anidado no ve las locales del que lo contiene (en ejecución son funciones
+distintas). Las globales que se usan desde un procedimiento quedan marcadas
+(Symbol.captured) para que el generador de IR las emita como variables
+globales de LLVM en vez de allocas de main.
+
+INIC siempre declara en el scope actual; HAZ e INC modifican la variable
+visible (local o global) y solo declaran en el scope actual si no hay
+ninguna. semantics.analyze() y IntermediateCodeGen.generate() llaman a
+resolve() sobre el árbol que reciben, así que las direcciones siempre
+corresponden a ese árbol (ASTOptimizer comparte hojas entre el árbol
+original y el optimizado: vale la última resolución).
+
+El recorrido usa una pila explícita, como el resto de los pases.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+from .ast import Node
+
+GLOBAL, LOCAL = 0, 1
+
+Addr = Tuple[int, int]
+
+
+class Symbol:
+    """Una variable, parámetro o procedimiento declarado."""
+    __slots__ = ("name", "kind", "ty", "line", "arity", "addr", "captured", "scope")
+
+    def __init__(self, name: str, kind: str, ty: str = "unknown", line: int = 0,
+                 arity: Optional[int] = None):
+        self.name = name
+        self.kind = kind        # "var" | "param" | "implicit" (solo INC) | "proc"
+        self.ty = ty
+        self.line = line
+        self.arity = arity      # procedimientos
+        self.addr: Optional[Addr] = None      # variables: (profundidad, slot)
+        self.captured = False   # global usada desde un procedimiento
+        self.scope: Optional[Scope] = None    # procedimientos: sus locales
+
+    def __repr__(self):
+        return f"Symbol({self.kind} {self.name}: {self.ty}, línea {self.line})"
+
+
+class Scope:
+    """Variables de un nivel: el programa principal o un PARA."""
+    __slots__ = ("owner", "depth", "names", "slots")
+
+    def __init__(self, owner: Optional[Symbol] = None):
+        self.owner = owner                      # el procedimiento; None = global
+        self.depth = GLOBAL if owner is None else LOCAL
+        self.names: Dict[str, Symbol] = {}
+        self.slots: List[Symbol] = []           # slot -> símbolo
+
+    def declare(self, name: str, kind: str, line: int = 0) -> Symbol:
+        # redeclarar en el mismo scope es la misma variable (mismo slot)
+        sym = self.names.get(name)
+        if sym is None:
+            sym = self.names[name] = Symbol(name, kind, line=line)
+            sym.addr = (self.depth, len(self.slots))
+            self.slots.append(sym)
+        elif sym.kind == "implicit" and kind != "implicit":
+            sym.kind = kind
+        return sym
+
+    def __len__(self):
+        return len(self.slots)
+
+
+class Resolver:
+    def __init__(self):
+        self.globals = Scope()
+        self.scope = self.globals
+        self._push = None
+
+    def resolve(self, root: Node) -> Scope:
+        special = {
+            "INIC": self._visit_assign, "HAZ": self._visit_assign,
+            "INC": self._visit_inc, "PARA": self._enter,
+            "CALL": self._visit_call, "EJECUTA": self._visit_ejecuta,
+        }
+        glob = self.globals
+        stack: list = [root]
+        pop, extend = stack.pop, stack.extend
+        self._push = stack.append
+        while stack:
+            n = pop()
+            if n.__class__ is tuple:        # acción diferida: (método, argumento)
+                n[0](n[1])
+                continue
+            k = n.kind
+            if k == "ID":                   # _use() en línea: es el caso más común
+                scope = self.scope
+                sym = scope.names.get(n.value)
+                if sym is None and scope is not glob:
+                    sym = glob.names.get(n.value)
+                    if sym is not None:
+                        sym.captured = True
+                if sym is None:
+                    n.sym = n.addr = None
+                else:
+                    n.addr = sym.addr
+                    n.sym = sym if sym.kind != "implicit" else None
+            elif n.children:
+                visit = special.get(k)
+                if visit is None:
+                    extend(reversed(n.children))
+                else:
+                    visit(n)
+        return self.globals
+
+    def _visit_assign(self, n: Node):
+        # la expresión se resuelve antes de declarar: `inic x = x + 1`
+        ch = n.children
+        self._push((self._inic if n.kind == "INIC" else self._haz, ch[0]))
+        for c in reversed(ch[1:]):
+            self._push(c)
+
+    def _visit_inc(self, n: Node):
+        ch = n.children
+        self._inc(ch[0])
+        for c in reversed(ch[1:]):
+            self._push(c)
+
+    def _visit_call(self, n: Node):
+        # CALL de sentencia: el primer hijo es el nombre del procedimiento;
+        # CALL de expresión (AZAR, ...): todos los hijos son argumentos
+        ch = n.children if n.value is not None else n.children[1:]
+        for c in reversed(ch):
+            self._push(c)
+
+    def _visit_ejecuta(self, n: Node):
+        if n.children[0].kind != "ID":      # EJECUTA nombre: no es una variable
+            for c in reversed(n.children):
+                self._push(c)
+
+    # ---------- scopes ----------
+    def _enter(self, n: Node):
+        ch = n.children
+        if len(ch) < 3 or ch[1].kind != "PARAMS":
+            return  # semantics lo reporta como definición inválida
+        # (el cuerpo puede no ser STMTS: ASTOptimizer desarma los bloques
+        # de una sola sentencia)
+        name_node, params, body = ch[0], ch[1].children, ch[2]
+        proc = Symbol(str(name_node.value), "proc", line=n.line,
+                      arity=sum(1 for p in params if p.kind == "ID"))
+        proc.scope = Scope(proc)
+        name_node.sym, name_node.addr = proc, None
+        for pid in params:
+            if pid.kind == "ID":
+                sym = pid.sym = proc.scope.declare(str(pid.value), "param", pid.line)
+                pid.addr = sym.addr
+        self._push((self._leave, self.scope))
+        self.scope = proc.scope
+        self._push(body)
+
+    def _leave(self, scope: Scope):
+        self.scope = scope
+
+    def _lookup(self, name: str) -> Optional[Symbol]:
+        scope = self.scope
+        sym = scope.names.get(name)
+        if sym is None and scope is not self.globals:
+            sym = self.globals.names.get(name)
+            if sym is not None:
+                sym.captured = True
+        return sym
+
+    # ---------- referencias ----------
+    def _inic(self, ident: Node):
+        sym = ident.sym = self.scope.declare(str(ident.value), "var", ident.line)
+        ident.addr = sym.addr
+
+    def _haz(self, ident: Node):
+        name = str(ident.value)
+        sym = self._lookup(name)
+        if sym is None:
+            sym = self.scope.declare(name, "var", ident.line)
+        elif sym.kind == "implicit":
+            sym.kind = "var"
+        ident.sym, ident.addr = sym, sym.addr
+
+    def _inc(self, ident: Node):
+        name = str(ident.value)
+        sym = self._lookup(name)
+        if sym is None:
+            sym = self.scope.declare(name, "implicit", ident.line)
+        ident.addr = sym.addr
+        ident.sym = sym if sym.kind != "implicit" else None
+
+
+def resolve(root: Node) -> Scope:
+    """Resuelve el árbol y devuelve el scope global."""
+    return Resolver().resolve(root)
@@ -1,325 +1,510 @@
 # frontend/semantics.py
+"""
+Análisis semántico: tipos y símbolos.
+
+Cada kind tiene su regla en una tabla (_EXPR, _BEXPR, _STMT) en vez de una
+cadena de if/elif. El análisis deja anotado el AST, una sola vez por nodo:
+
+- Node.ty:  tipo resuelto de cada expresión ("int", "bool", "unknown"),
+            en el contexto en que se analizó (numérico o booleano);
+- Node.sym: el Symbol de cada ID (variables, parámetros, nombres de
+            procedimiento en PARA/CALL/EJECUTA); None si no está declarado.
+
+Los símbolos de variables y parámetros, y qué está al alcance en cada
+punto, vienen de frontend/resolver.py: analyze() resuelve el árbol primero
+y las reglas solo leen Node.sym (sin buscar en una pila de scopes). Los
+pases posteriores pueden leer esas anotaciones en lugar de volver a
+recorrer o buscar en la tabla de símbolos.
+"""
 from __future__ import annotations
-from typing import Dict, Literal, Optional
+from typing import Literal, Optional
 from .ast import Node
 from .diagnostics import Diagnostics
+from .resolver import Symbol, resolve
+from .callgraph import CallGraph, build_call_graph
 
 Type = Literal["int","bool", "unknown"]  # por ahora solo numéricos (entrega 1)
 
 class Symtab:
-    def __init__(self) -> None:
-        self.vars: list[dict[str, str]] = [{}]  # nombre -> tipo
-        self.procs: dict[str, int] = {}
+    """Procedimientos del programa, todos desde el principio (la tabla de
+    frontend/callgraph.py): una llamada anterior a su PARA también se
+    verifica. Las variables las resuelve frontend/resolver.py."""
+    def __init__(self, graph: Optional[CallGraph] = None) -> None:
+        self.procs: dict[str, Symbol] = {}
+        if graph is not None:
+            for info in graph.procs.values():
+                self.add_proc(info.sym)
+
+    def add_proc(self, sym: Symbol) -> Symbol:
+        self.procs[sym.name] = sym
+        return sym
+
+    def lookup_proc(self, name: str) -> Symbol | None:
+        return self.procs.get(name)
 
-    def push(self):
-        self.vars.append({})
+    def get_proc_arity(self, name: str) -> int | None:
+        sym = self.procs.get(name)
+        return sym.arity if sym is not None else None
+
+
+class _Rules(dict):
+    """Tabla kind -> regla, con una regla por defecto para kinds sin entrada."""
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+def _rule(table: _Rules, *kinds: str):
+    def register(fn):
+        for k in kinds:
+            table[k] = fn
+        return fn
+    return register
+
+# =====================================================
+# Expresiones
+# =====================================================
+# Cada kind tiene una regla, (post, hijos, tabla): qué hijos tipar, con qué
+# tabla, y la función post(n, st, di) que lee el .ty ya puesto en los hijos
+# y devuelve el tipo del nodo. Las hojas tienen la regla fija en la tabla;
+# el resto, una función rule(n) que la arma mirando el nodo (aridad, nombre
+# del operador). Ninguna regla emite diagnósticos al expandir: los errores
+# de aridad salen de un post, en la posición del nodo que no se expandió.
+#
+# _type_of() aplica las reglas recursivamente hasta _MAX_DEPTH niveles; más
+# abajo sigue _type_of_deep(), que hace lo mismo sin recursión: expande en
+# preorden (hijos de derecha a izquierda) y aplica los post en orden
+# inverso, que es el postorden de izquierda a derecha. En los dos casos los
+# diagnósticos salen en el orden de un recorrido recursivo.
+
+def _unknown(n, st, di):
+    return "unknown"
 
-    def pop(self):
-        if len(self.vars) > 1:
-            self.vars.pop()
+def _int(n, st, di):
+    return "int"
 
-    def set_var(self, name: str, ty: str):
-        self.vars[-1][name] = ty
+def _bexpr_other(n, st, di):
+    # Paréntesis u otros
+    if n.kind not in ("PROGRAM","STMTS"):
+        di.warn(n.line, f"Expresión booleana desconocida de tipo '{n.kind}'")
+    return "unknown"
 
-    def get_var(self, name: str) -> str | None:
-        for scope in reversed(self.vars):
-            if name in scope:
-                return scope[name]
-        return None
+_NO_KIDS = ()
+_LEAF_UNKNOWN = (_unknown, _NO_KIDS, None)
+
+_EXPR = _Rules(_LEAF_UNKNOWN)
+_BEXPR = _Rules((_bexpr_other, _NO_KIDS, None))
+
+_MAX_DEPTH = 200
+
+def _type_of(root: Node, rules: _Rules, st: Symtab, di: Diagnostics, depth: int = 0) -> Type:
+    r = rules.get(root.kind, rules.default)
+    if r.__class__ is not tuple:
+        r = r(root)
+    post, kids, table = r
+    if kids:
+        if depth < _MAX_DEPTH:
+            depth += 1
+            for c in kids:
+                r = table.get(c.kind, table.default)
+                if r.__class__ is tuple and not r[1]:    # hoja: sin recursión
+                    c.ty = r[0](c, st, di)
+                else:
+                    _type_of(c, table, st, di, depth)
+        else:
+            for c in kids:
+                _type_of_deep(c, table, st, di)
+    ty = root.ty = post(root, st, di)
+    return ty
+
+def _type_of_deep(root: Node, rules: _Rules, st: Symtab, di: Diagnostics) -> Type:
+    order = []
+    stack = [(root, rules)]
+    pop, push, add = stack.pop, stack.append, order.append
+    while stack:
+        n, rules = pop()
+        r = rules.get(n.kind, rules.default)
+        if r.__class__ is not tuple:
+            r = r(n)
+        add((n, r[0]))
+        table = r[2]
+        for c in r[1]:
+            push((c, table))
+    for n, post in reversed(order):
+        n.ty = post(n, st, di)
+    return root.ty
+
+# ---------- hojas ----------
+def _id_post(n, st, di):
+    sym = n.sym
+    return sym.ty if sym is not None else "unknown"
+
+_EXPR["NUM"] = (_int, _NO_KIDS, None)
+_EXPR["STR"] = _LEAF_UNKNOWN
+_EXPR["ID"] = (_id_post, _NO_KIDS, None)
+
+# ---------- aritmética ----------
+def _neg_missing(n, st, di):
+    di.error(n.line, "Operador unario sin operando")
+    return "unknown"
 
-    def set_proc(self, name: str, arity: int):
-        self.procs[name] = arity
+def _neg_post(n, st, di):
+    return n.children[0].ty
 
-    def get_proc_arity(self, name: str) -> int | None:
-        return self.procs.get(name)
+@_rule(_EXPR, "NEG")
+def _expr_neg(n):
+    if not n.children:
+        return _neg_missing, _NO_KIDS, None
+    return _neg_post, n.children[:1], _EXPR
 
-def type_of_bexpr(n: Node, st: Symtab, di: Diagnostics) -> Type:
-    if n.kind == "RELOP":
-        if len(n.children) != 2:
-            di.error(n.line, f"{n.value} requiere 2 operandos")
-            return "unknown"
-        lt = type_of_expr(n.children[0], st, di)
-        rt = type_of_expr(n.children[1], st, di)
-        if lt != "int" or rt != "int":
-            di.error(n.line, f"{n.value} requiere operandos numéricos")
-            return "unknown"
-        return "bool"
-    if n.kind == "BOOLBIN":
-        if len(n.children) != 2:
-            di.error(n.line, f"Operador lógico '{n.value}' requiere 2 operandos")
-            return "unknown"
-        lt = type_of_bexpr(n.children[0], st, di)
-        rt = type_of_bexpr(n.children[1], st, di)
-        if lt != "bool" or rt != "bool":
-            di.error(n.line, f"Operador lógico '{n.value}' requiere booleanos")
-            return "unknown"
-        return "bool"
-    # Paréntesis u otros
-    if n.kind not in ("PROGRAM","STMTS"):
-        di.warn(n.line, f"Expresión booleana desconocida de tipo '{n.kind}'")
+def _both_int(n) -> bool:
+    a, b = n.children
+    return a.ty == "int" and b.ty == "int"
+
+def _binop_arity(n, st, di):
+    di.error(n.line, f"Operación '{n.value}' requiere 2 operandos")
     return "unknown"
 
-def type_of_expr(n: Node, st: Symtab, di: Diagnostics) -> Type:
-    if n.kind == "NUM":
-        return "int"
-    if n.kind == "STR":
+def _binop_post(n, st, di):
+    if not _both_int(n):
+        di.error(n.line, f"Operación '{n.value}' requiere operandos numéricos")
         return "unknown"
-    if n.kind == "ID":
-        ty = st.get_var(str(n.value))
-        return ty or "unknown"
-    if n.kind == "NEG":
-        if not n.children:
-            di.error(n.line, "Operador unario sin operando")
-            return "unknown"
-        return type_of_expr(n.children[0], st, di)
-    if n.kind == "BINOP":
-        if len(n.children) != 2:
-            di.error(n.line, f"Operación '{n.value}' requiere 2 operandos")
-            return "unknown"
-        lt = type_of_expr(n.children[0], st, di)
-        rt = type_of_expr(n.children[1], st, di)
-        if lt != "int" or rt != "int":
-            di.error(n.line, f"Operación '{n.value}' requiere operandos numéricos")
-            return "unknown"
-        return "int"
-    if n.kind == "POW":
+    return "int"
+
+@_rule(_EXPR, "BINOP")
+def _expr_binop(n):
+    if len(n.children) != 2:
+        return _binop_arity, _NO_KIDS, None
+    return _binop_post, n.children, _EXPR
+
+def _pow_arity(n, st, di):
+    di.error(n.line, "POTENCIA requiere 2 operandos")
+    return "unknown"
+
+def _pow_post(n, st, di):
+    if not _both_int(n):
+        di.error(n.line, "POTENCIA requiere operandos numéricos")
+        return "unknown"
+    return "int"
+
+@_rule(_EXPR, "POW")
+def _expr_pow(n):
+    if len(n.children) != 2:
+        return _pow_arity, _NO_KIDS, None
+    return _pow_post, n.children, _EXPR
+
+# ---------- CALL en expresión: AZAR y operadores con nombre ----------
+def _azar_arity(n, st, di):
+    di.error(n.line, "AZAR requiere 1 argumento numérico")
+    return "unknown"
+
+def _azar_post(n, st, di):
+    return "int" if n.children[0].ty == "int" else "unknown"
+
+def _word_op_arity(n, st, di):
+    di.error(n.line, f"{n.value} requiere 2 operandos")
+    return "unknown"
+
+def _word_op_post(n, st, di):
+    if not _both_int(n):
+        di.error(n.line, f"{n.value} requiere operandos numéricos")
+        return "unknown"
+    return "int"
+
+_WORD_OPS = ("PRODUCTO", "POTENCIA", "DIVISION", "SUMA", "DIFERENCIA")
+
+@_rule(_EXPR, "CALL")
+def _expr_call(n):
+    op = n.value
+    if op == "AZAR":
+        if len(n.children) != 1:
+            return _azar_arity, _NO_KIDS, None
+        return _azar_post, n.children, _EXPR
+    if op in _WORD_OPS:
         if len(n.children) != 2:
-            di.error(n.line, "POTENCIA requiere 2 operandos")
-            return "unknown"
-        lt = type_of_expr(n.children[0], st, di)
-        rt = type_of_expr(n.children[1], st, di)
-        if lt != "int" or rt != "int":
-            di.error(n.line, "POTENCIA requiere operandos numéricos")
-            return "unknown"
-        return "int"
-    if n.kind == "CALL":
-        op = n.value
-        if op == "AZAR":
-            if len(n.children) != 1:
-                di.error(n.line, "AZAR requiere 1 argumento numérico")
-                return "unknown"
-            t = type_of_expr(n.children[0], st, di)
-            return "int" if t == "int" else "unknown"
-        if op in ("PRODUCTO", "POTENCIA", "DIVISION", "SUMA", "DIFERENCIA"):
-            if len(n.children) != 2:
-                di.error(n.line, f"{op} requiere 2 operandos")
-                return "unknown"
-            lt = type_of_expr(n.children[0], st, di)
-            rt = type_of_expr(n.children[1], st, di)
-            if lt != "int" or rt != "int":
-                di.error(n.line, f"{op} requiere operandos numéricos")
-                return "unknown"
-            return "int"
-        # Si es una llamada a procedimiento (stmt : ID), aquí no debería entrar
-        # (solo aparece como stmt). Devolvemos unknown por si aparece en expr.
+            return _word_op_arity, _NO_KIDS, None
+        return _word_op_post, n.children, _EXPR
+    # Si es una llamada a procedimiento (stmt : ID), aquí no debería entrar
+    # (solo aparece como stmt). Devolvemos unknown por si aparece en expr.
+    return _LEAF_UNKNOWN
+
+# ---------- contexto booleano ----------
+def _relop_arity(n, st, di):
+    di.error(n.line, f"{n.value} requiere 2 operandos")
+    return "unknown"
+
+def _relop_post(n, st, di):
+    if not _both_int(n):
+        di.error(n.line, f"{n.value} requiere operandos numéricos")
         return "unknown"
+    return "bool"
 
-    # fallback
+@_rule(_BEXPR, "RELOP")
+def _bexpr_relop(n):
+    if len(n.children) != 2:
+        return _relop_arity, _NO_KIDS, None
+    return _relop_post, n.children, _EXPR
+
+def _boolbin_arity(n, st, di):
+    di.error(n.line, f"Operador lógico '{n.value}' requiere 2 operandos")
     return "unknown"
 
+def _boolbin_post(n, st, di):
+    a, b = n.children
+    if a.ty != "bool" or b.ty != "bool":
+        di.error(n.line, f"Operador lógico '{n.value}' requiere booleanos")
+        return "unknown"
+    return "bool"
 
-def check_stmt(n, st, di):
-    k = n.kind
-
-    # Bloques de sentencias
-    if k in ("STMTS", "PROGRAM"):
-        for c in n.children:
-            check_stmt(c, st, di)
-
-    # Declaración con inicialización
-    elif k == "INIC":
-        ident = n.children[0]  # Node("ID", nombre)
-        expr = n.children[1]
-        t = type_of_expr(expr, st, di)
-        if t == "unknown":
-            di.warn(expr.line, f"No se puede inferir tipo de la expresión para '{ident.value}'")
-        st.set_var(str(ident.value), "int" if t == "int" else "unknown")
-
-    # Incremento
-    elif k == "INC":
-        ident = n.children[0]
-        name = str(ident.value)
-        ty = st.get_var(name)
-        if ty is None:
-            di.error(ident.line, f"Variable '{name}' no declarada antes de INC")
-        elif ty != "int":
-            di.error(ident.line, f"INC requiere variable numérica: '{name}'")
-        if len(n.children) == 2:
-            t = type_of_expr(n.children[1], st, di)
-            if t != "int":
-                di.error(n.children[1].line, "El incremento de INC debe ser numérico")
-
-    # Posiciones
-    elif k in ("PONPOS", "PONXY"):
-        tx = type_of_expr(n.children[0], st, di)
-        ty = type_of_expr(n.children[1], st, di)
-        if tx != "int" or ty != "int":
-            di.error(n.line, "Las coordenadas deben ser numéricas")
-
-    elif k in ("PONX", "PONY", "PONRUMBO"):
-        t = type_of_expr(n.children[0], st, di)
-        if t != "int":
-            di.error(n.line, f"{k} requiere un valor numérico")
+@_rule(_BEXPR, "BOOLBIN")
+def _bexpr_boolbin(n):
+    if len(n.children) != 2:
+        return _boolbin_arity, _NO_KIDS, None
+    return _boolbin_post, n.children, _BEXPR
 
-    # Movimiento / rotaciones
-    elif k in ("AV", "RE", "GD", "GI"):
-        t = type_of_expr(n.children[0], st, di)
-        if t != "int":
-            di.error(n.line, f"{k} requiere una expresión numérica")
-
-    # Lápiz y pantalla
-    elif k in ("BL", "SB", "OT", "RUMBO", "CENTRO"):
-        pass  # no requieren validación adicional
-
-    elif k == "PONCL":
-        if n.children:
-            c = n.children[0]
-            if c.kind not in ("ID", "STR"):
-                di.warn(n.line, "PONCL espera un nombre de color o cadena")
-
-    # Condicional simple
-    elif k == "SI":
-        tb = type_of_bexpr(n.children[0], st, di)
-        if tb != "bool":
-            di.error(n.line, "La condición de 'SI' debe ser booleana")
-        check_stmt(n.children[1], st, di)
-
-    # Bucles
-    elif k == "PARA":
-        if len(n.children) < 3 or n.children[1].kind != "PARAMS" or n.children[2].kind != "STMTS":
-            di.error(n.line, "Definición de procedimiento inválida")
-        else:
-            name_node = n.children[0]  # ID(nombre)
-            params = n.children[1].children  # lista de IDs
-            body = n.children[2]
-
-            # Registrar procedimiento y su aridad
-            proc_name = str(name_node.value)
-            arity = sum(1 for p in params if p.kind == "ID")
-            st.set_proc(proc_name, arity)
-
-            # Scope para params (tipo int en esta entrega)
-            st.push()
-            for pid in params:
-                if pid.kind == "ID":
-                    st.set_var(str(pid.value), "int")
-
-            check_stmt(body, st, di)
-            st.pop()
-
-
-    elif k == "MIENTRAS":
-        tb = type_of_bexpr(n.children[0], st, di)
-        if tb != "bool":
-            di.error(n.line, "La condición de MIENTRAS debe ser booleana")
-        check_stmt(n.children[1], st, di)
-
-    elif k == "HAZ":
-        ident = n.children[0]  # Node("ID", nombre)
-        expr = n.children[1]
-        t = type_of_expr(expr, st, di)
-        if t == "unknown":
-            di.warn(expr.line, f"No se puede inferir tipo de la expresión para '{ident.value}'")
-        st.set_var(str(ident.value), "int" if t == "int" else "unknown")
-
-    elif k == "HAZ_HASTA":
-        check_stmt(n.children[0], st, di)  # bloque
-        tb = type_of_bexpr(n.children[1], st, di)
-        if tb != "bool":
-            di.error(n.line, "La condición de HASTA debe ser booleana")
-
-
-    elif k == "HAZ_MIENTRAS":
-        check_stmt(n.children[0], st, di)
-        tb = type_of_bexpr(n.children[1], st, di)
-        if tb != "bool":
-            di.error(n.line, "La condición de MIENTRAS debe ser booleana")
-
-
-    elif k == "REPITE":
-        t = type_of_expr(n.children[0], st, di)
+def type_of_expr(n: Node, st: Symtab, di: Diagnostics) -> Type:
+    return _type_of(n, _EXPR, st, di)
+
+def type_of_bexpr(n: Node, st: Symtab, di: Diagnostics) -> Type:
+    return _type_of(n, _BEXPR, st, di)
+
+# =====================================================
+# Sentencias
+# =====================================================
+# Una regla de sentencia recibe (n, st, di) y tipa sus expresiones con
+# type_of_expr/type_of_bexpr. Las que contienen sentencias devuelven un
+# iterador de hijos: un bloque, iter(children); PARA, iter((cuerpo,)); el
+# resto son generadores que ceden cada sentencia hija (`yield hijo`) y
+# siguen después de que se revisó. check_stmt los recorre con una pila de iteradores (el mismo
+# protocolo que run() de frontend/visitor.py, sin valores de retorno), así
+# la profundidad de anidamiento no usa la pila de Python.
+
+def _stmt_unknown(n, st, di):
+    di.error(n.line, f"Instrucción no reconocida: {n.kind}")
+
+_STMT = _Rules(_stmt_unknown)
+
+# Bloques de sentencias
+@_rule(_STMT, "STMTS", "PROGRAM")
+def _stmt_block(n, st, di):
+    return iter(n.children)
+
+# Declaración con inicialización (INIC) y asignación (HAZ)
+@_rule(_STMT, "INIC", "HAZ")
+def _stmt_assign(n, st, di):
+    ident = n.children[0]  # Node("ID", nombre)
+    expr = n.children[1]
+    t = type_of_expr(expr, st, di)
+    if t == "unknown":
+        di.warn(expr.line, f"No se puede inferir tipo de la expresión para '{ident.value}'")
+    ident.sym.ty = "int" if t == "int" else "unknown"
+
+# Incremento
+@_rule(_STMT, "INC")
+def _stmt_inc(n, st, di):
+    ident = n.children[0]
+    name = str(ident.value)
+    sym = ident.sym
+    if sym is None:
+        di.error(ident.line, f"Variable '{name}' no declarada antes de INC")
+    elif sym.ty != "int":
+        di.error(ident.line, f"INC requiere variable numérica: '{name}'")
+    if len(n.children) == 2:
+        t = type_of_expr(n.children[1], st, di)
         if t != "int":
-            di.error(n.line, "REPITE requiere una expresión numérica para el conteo")
-        check_stmt(n.children[1], st, di)
+            di.error(n.children[1].line, "El incremento de INC debe ser numérico")
+
+# Posiciones
+@_rule(_STMT, "PONPOS", "PONXY")
+def _stmt_position(n, st, di):
+    tx = type_of_expr(n.children[0], st, di)
+    ty = type_of_expr(n.children[1], st, di)
+    if tx != "int" or ty != "int":
+        di.error(n.line, "Las coordenadas deben ser numéricas")
+
+@_rule(_STMT, "PONX", "PONY", "PONRUMBO")
+def _stmt_set_value(n, st, di):
+    t = type_of_expr(n.children[0], st, di)
+    if t != "int":
+        di.error(n.line, f"{n.kind} requiere un valor numérico")
+
+# Movimiento / rotaciones
+@_rule(_STMT, "AV", "RE", "GD", "GI")
+def _stmt_move(n, st, di):
+    t = type_of_expr(n.children[0], st, di)
+    if t != "int":
+        di.error(n.line, f"{n.kind} requiere una expresión numérica")
+
+# Lápiz y pantalla
+@_rule(_STMT, "BL", "SB", "OT", "RUMBO", "CENTRO")
+def _stmt_no_args(n, st, di):
+    pass  # no requieren validación adicional
+
+@_rule(_STMT, "PONCL")
+def _stmt_color(n, st, di):
+    if n.children:
+        c = n.children[0]
+        if c.kind not in ("ID", "STR"):
+            di.warn(n.line, "PONCL espera un nombre de color o cadena")
+
+# Condicional simple
+@_rule(_STMT, "SI")
+def _stmt_si(n, st, di):
+    tb = type_of_bexpr(n.children[0], st, di)
+    if tb != "bool":
+        di.error(n.line, "La condición de 'SI' debe ser booleana")
+    yield n.children[1]
+
+# Procedimientos
+@_rule(_STMT, "PARA")
+def _stmt_para(n, st, di):
+    if len(n.children) < 3 or n.children[1].kind != "PARAMS" or n.children[2].kind != "STMTS":
+        di.error(n.line, "Definición de procedimiento inválida")
+        return
+    name_node = n.children[0]  # ID(nombre), ya con su Symbol del resolver
+    params = n.children[1].children  # lista de IDs
+    body = n.children[2]
+
+    # Ya registrado por la tabla de procedimientos; si la tabla tiene otro,
+    # este es una redefinición
+    first = st.lookup_proc(str(name_node.value))
+    if first is not None and first is not name_node.sym:
+        di.error(n.line, f"Procedimiento '{name_node.value}' ya definido en la línea {first.line}")
+
+    # Parámetros: tipo int en esta entrega
+    for pid in params:
+        if pid.kind == "ID":
+            pid.sym.ty = "int"
+
+    return iter((body,))
+
+# Bucles
+@_rule(_STMT, "MIENTRAS")
+def _stmt_mientras(n, st, di):
+    tb = type_of_bexpr(n.children[0], st, di)
+    if tb != "bool":
+        di.error(n.line, "La condición de MIENTRAS debe ser booleana")
+    yield n.children[1]
+
+@_rule(_STMT, "HAZ_HASTA")
+def _stmt_haz_hasta(n, st, di):
+    yield n.children[0]  # bloque
+    tb = type_of_bexpr(n.children[1], st, di)
+    if tb != "bool":
+        di.error(n.line, "La condición de HASTA debe ser booleana")
+
+@_rule(_STMT, "HAZ_MIENTRAS")
+def _stmt_haz_mientras(n, st, di):
+    yield n.children[0]
+    tb = type_of_bexpr(n.children[1], st, di)
+    if tb != "bool":
+        di.error(n.line, "La condición de MIENTRAS debe ser booleana")
+
+@_rule(_STMT, "REPITE")
+def _stmt_repite(n, st, di):
+    t = type_of_expr(n.children[0], st, di)
+    if t != "int":
+        di.error(n.line, "REPITE requiere una expresión numérica para el conteo")
+    yield n.children[1]
+
+# Temporización / procedimientos
+@_rule(_STMT, "ESPERA")
+def _stmt_espera(n, st, di):
+    t = type_of_expr(n.children[0], st, di)
+    if t != "int":
+        di.error(n.line, "ESPERA requiere un valor numérico")
+
+@_rule(_STMT, "EJECUTA")
+def _stmt_ejecuta(n, st, di):
+    if not n.children:
+        di.error(n.line, "EJECUTA requiere un bloque o un identificador")
+        return
+    ident = n.children[0]
+    if ident.kind == "ID":
+        # Llamada a procedimiento por nombre → aceptada
+        ident.sym = st.lookup_proc(str(ident.value))
+    elif ident.kind == "STMTS":
+        # Bloque de sentencias → validar su contenido
+        yield ident
+    else:
+        di.error(ident.line or n.line, "EJECUTA requiere un bloque [...] o un identificador de procedimiento")
 
-    # Temporización / procedimientos
-    elif k == "ESPERA":
-        t = type_of_expr(n.children[0], st, di)
+# Operadores aritméticos como palabras clave
+@_rule(_STMT, "PRODUCTO", "POTENCIA", "DIVISION", "SUMA", "DIFERENCIA", "AZAR")
+def _stmt_word_op(n, st, di):
+    for c in n.children:
+        t = type_of_expr(c, st, di)
         if t != "int":
-            di.error(n.line, "ESPERA requiere un valor numérico")
+            di.error(c.line, f"{n.kind} requiere operandos numéricos")
+
+# Operadores lógicos / comparaciones
+@_rule(_STMT, "IGUALES", "MAYORQ", "MENORQ", "Y", "O")
+def _stmt_compare(n, st, di):
+    lt = type_of_expr(n.children[0], st, di)
+    rt = type_of_expr(n.children[1], st, di)
+    if lt != "int" or rt != "int":
+        di.error(n.line, f"{n.kind} requiere operandos numéricos")
+
+@_rule(_STMT, "CALL")
+def _stmt_call(n, st, di):
+    # hijos: [ ID(nombre) ] o [ ID(nombre), ARGS(...) ]
+    if not n.children:
+        di.error(n.line, "Llamada inválida")
+        return
+    name_node = n.children[0]
+    if name_node.kind != "ID":
+        di.error(n.line, "Llamada inválida: falta nombre de procedimiento")
+        return
+    pname = str(name_node.value)
+    proc = name_node.sym = st.lookup_proc(pname)
+    # la tabla tiene todos los PARA del programa: si no está, no existe
+    if proc is None:
+        di.error(n.line, f"Procedimiento '{pname}' no declarado")
+        return
+    declared_arity = proc.arity
+    # contar args reales (si hay ARGS)
+    passed_arity = 0
+    if len(n.children) >= 2 and n.children[1].kind == "ARGS":
+        passed_arity = len(n.children[1].children)
+        # tipar cada arg como expr numérica (esta entrega)
+        for arg in n.children[1].children:
+            if type_of_expr(arg, st, di) != "int":
+                di.error(arg.line, f"Argumento no numérico en llamada a '{pname}'")
+    if passed_arity != declared_arity:
+        di.error(n.line,
+                 f"Llamada a '{pname}' con {passed_arity} argumento(s); se esperaban {declared_arity}")
 
 
-    elif k == "EJECUTA":
-        if not n.children:
-            di.error(n.line, "EJECUTA requiere un bloque o un identificador")
-        else:
-            ident = n.children[0]
-            if ident.kind == "ID":
-                # Llamada a procedimiento por nombre → aceptada
-                pass
-            elif ident.kind == "STMTS":
-                # Bloque de sentencias → validar su contenido
-                check_stmt(ident, st, di)
-            else:
-                di.error(ident.line or n.line, "EJECUTA requiere un bloque [...] o un identificador de procedimiento")
-
-
-    # Operadores aritméticos como palabras clave
-    elif k in ("PRODUCTO", "POTENCIA", "DIVISION", "SUMA", "DIFERENCIA", "AZAR"):
-        for c in n.children:
-            t = type_of_expr(c, st, di)
-            if t != "int":
-                di.error(c.line, f"{k} requiere operandos numéricos")
-
-    # Operadores lógicos / comparaciones
-    elif k in ("IGUALES", "MAYORQ", "MENORQ", "Y", "O"):
-        lt = type_of_expr(n.children[0], st, di)
-        rt = type_of_expr(n.children[1], st, di)
-        if lt != "int" or rt != "int":
-            di.error(n.line, f"{k} requiere operandos numéricos")
-
-
-    elif k == "CALL":
-        # hijos: [ ID(nombre) ] o [ ID(nombre), ARGS(...) ]
-        if not n.children:
-            di.error(n.line, "Llamada inválida")
+def check_stmt(n, st, di):
+    # supone el árbol ya resuelto (resolver.resolve); analyze() lo hace
+    rules, default = _STMT, _STMT.default
+    stack = [iter((n,))]
+    push, pop = stack.append, stack.pop
+    while stack:
+        for node in stack[-1]:
+            kids = rules.get(node.kind, default)(node, st, di)
+            if kids is not None:
+                push(kids)
+                break
         else:
-            name_node = n.children[0]
-            if name_node.kind != "ID":
-                di.error(n.line, "Llamada inválida: falta nombre de procedimiento")
-            else:
-                pname = str(name_node.value)
-                declared_arity = st.get_proc_arity(pname)
-                # si no está declarado, en esta entrega no rechazamos, solo avisamos (opcional)
-                if declared_arity is None:
-                    # di.warn(n.line, f"Procedimiento '{pname}' no declarado")
-                    pass
-                else:
-                    # contar args reales (si hay ARGS)
-                    passed_arity = 0
-                    if len(n.children) >= 2 and n.children[1].kind == "ARGS":
-                        passed_arity = len(n.children[1].children)
-                        # tipar cada arg como expr numérica (esta entrega)
-                        for arg in n.children[1].children:
-                            if type_of_expr(arg, st, di) != "int":
-                                di.error(arg.line, f"Argumento no numérico en llamada a '{pname}'")
-                    if passed_arity != declared_arity:
-                        di.error(n.line,
-                                 f"Llamada a '{pname}' con {passed_arity} argumento(s); se esperaban {declared_arity}")
-    else:
-        di.error(n.line, f"Instrucción no reconocida: {k}")
+            pop()
 
 
-def analyze(root: Node) -> Diagnostics:
+def analyze(root: Node, st: Optional[Symtab] = None) -> Diagnostics:
     di = Diagnostics()
-    st = Symtab()
+    resolve(root)
+    graph = build_call_graph(root)
+    if st is None:
+        st = Symtab(graph)
+    else:
+        for info in graph.procs.values():
+            st.add_proc(info.sym)
     check_stmt(root, st, di)
     return di
 
 # Runner opcional: python -m frontend.semantics <archivo.logo>
 if __name__ == "__main__":
     import sys
-    from .parser import parse_text
+    from .parser import parse_file
     from .exporter import save_ast_json, save_diags_txt
 
     if len(sys.argv) != 2:
@@ -327,10 +512,7 @@ if __name__ == "__main__":
         sys.exit(1)
 
     src_path = sys.argv[1]
-    with open(src_path, "r", encoding="utf-8") as f:
-        text = f.read()
-
-    ast = parse_text(text)
+    ast = parse_file(src_path)
     diags = analyze(ast)
 
     # Salida en consola (como antes)
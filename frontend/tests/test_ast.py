@@ -0,0 +1,27 @@
+# frontend/tests/test_ast.py
+"""Igualdad estructural de Node."""
+from frontend.ast import Node
+
+
+def _chain(depth: int, leaf) -> Node:
+    node = Node("NUM", leaf, [], 1)
+    for _ in range(depth):
+        node = Node("NEG", None, [node], 1)
+    return node
+
+
+def test_igualdad_profunda():
+    # 100k niveles: más que el límite de recursión de Python
+    assert _chain(100_000, 1) == _chain(100_000, 1)
+    assert _chain(100_000, 1) != _chain(100_000, 2)
+
+
+def test_igualdad():
+    a = Node("BINOP", "+", [Node("ID", "x", [], 1), Node("NUM", 2, [], 1)], 1)
+    b = Node("BINOP", "+", [Node("ID", "x", [], 1), Node("NUM", 2, [], 1)], 1)
+    assert a == b
+    assert a != Node("BINOP", "+", [Node("ID", "x", [], 1)], 1)
+    assert a != Node("BINOP", "-", b.children, 1)
+    assert Node("SI", None, [a, None], 1) == Node("SI", None, [b, None], 1)
+    assert Node("SI", None, [a, None], 1) != Node("SI", None, [b, a], 1)
+    assert (a == 3) is False
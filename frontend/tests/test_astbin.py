@@ -0,0 +1,35 @@
+# frontend/tests/test_astbin.py
+"""Ida y vuelta del AST binario (escrito desde FlatAST)."""
+import glob
+
+from frontend.ast import Node
+from frontend.astbin import decode_ast, encode_ast, encode_flat
+from frontend.flatast import FlatAST
+from frontend.parser import parse_file
+
+
+def test_ida_y_vuelta_ejemplos():
+    paths = glob.glob("examples/*.logo") + glob.glob("optimizer/tests/*.logo")
+    assert paths
+    for path in paths:
+        tree = parse_file(path)
+        assert decode_ast(encode_ast(tree)) == tree, path
+
+
+def test_valores_y_lineas():
+    tree = Node("STMTS", None, [
+        Node("AV", None, [Node("NUM", -7, [], 5)], 5),
+        Node("AV", None, [Node("FLOAT", 2.5, [], 3)], 3),
+        Node("SI", None, [Node("BOOL", True, [], 0),
+                          Node("STMTS", None, [Node("ID", "x", [], 9)], 0)], 9),
+    ], 0)
+    data = encode_flat(FlatAST.from_node(tree))
+    assert data == encode_ast(tree)
+    assert decode_ast(data) == tree
+
+
+def test_arbol_profundo():
+    tree = Node("NUM", 1, [], 1)
+    for _ in range(50_000):
+        tree = Node("NEG", None, [tree], 1)
+    assert decode_ast(encode_ast(tree)) == tree
@@ -0,0 +1,32 @@
+# frontend/tests/test_lexer.py
+"""Columnas de los errores léxicos (LineIndex) en los tres lexers."""
+import re
+
+import pytest
+
+from frontend.lexer import LineIndex
+from frontend.parser import clone_lexer
+from frontend.tokenstream import tokenize
+
+_SRC = "// c\nav 10\n  gd 3 $ x\n"
+_MSG = re.escape("Carácter inesperado '$' en línea 3, col 7")
+
+
+def test_line_index():
+    index = LineIndex.from_text(_SRC)
+    assert index.position(0) == (1, 0)
+    assert index.position(_SRC.index("av")) == (2, 0)
+    assert index.position(_SRC.index("$")) == (3, 7)
+
+
+@pytest.mark.parametrize("mode", ["ply", "fast"])
+def test_columna_error(mode):
+    lex = clone_lexer(mode)
+    lex.input(_SRC)
+    with pytest.raises(SyntaxError, match=_MSG):
+        list(iter(lex.token, None))
+
+
+def test_columna_error_tokenize():
+    with pytest.raises(SyntaxError, match=_MSG):
+        tokenize(_SRC)
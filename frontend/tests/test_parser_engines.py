@@ -0,0 +1,60 @@
+# frontend/tests/test_parser_engines.py
+"""PLY y el descendente recursivo (frontend/rdparser.py) dan el mismo AST,
+o el mismo error de sintaxis (como benchmarks/parser_engines.py)."""
+import glob
+import os
+import random
+
+import pytest
+
+from frontend.exporter import ast_to_dict
+from frontend.parser import parse_text
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_FILES = sorted(glob.glob(os.path.join(_ROOT, "examples", "*.logo"))) + \
+    sorted(glob.glob(os.path.join(_ROOT, "optimizer", "tests", "*.logo")))
+
+_ERRORS = (
+    "// sin cierre\nREPITE 3 [ AV 10\n",
+    "// sin argumento\nAV\n",
+    "// corchete de más\nAV 10 ]\n",
+    "// y es palabra reservada\nINIC y = 3\n",
+    "// para sin fin\nPARA p [n] AV n\n",
+)
+
+
+def _outcome(text: str, engine: str):
+    try:
+        return "ok", ast_to_dict(parse_text(text, engine))
+    except SyntaxError as e:
+        return "error", str(e)
+
+
+@pytest.mark.parametrize("path", _FILES, ids=lambda p: os.path.relpath(p, _ROOT))
+def test_mismo_ast(path):
+    text = open(path, encoding="utf-8").read()
+    assert _outcome(text, "rd") == _outcome(text, "ply")
+
+
+@pytest.mark.parametrize("text", _ERRORS)
+def test_mismo_error(text):
+    ply = _outcome(text, "ply")
+    assert ply[0] == "error"
+    assert _outcome(text, "rd") == ply
+
+
+@pytest.mark.parametrize("path", _FILES, ids=lambda p: os.path.relpath(p, _ROOT))
+def test_mutaciones(path):
+    # tokens borrados o duplicados: casi todas son errores de sintaxis
+    rng = random.Random(path)
+    words = open(path, encoding="utf-8").read().split()
+    for _ in range(40):
+        w = list(words)
+        for _ in range(rng.randint(1, 3)):
+            i = rng.randrange(len(w))
+            if rng.random() < 0.5:
+                del w[i]
+            else:
+                w.insert(i, w[rng.randrange(len(w))])
+        text = " ".join(w)
+        assert _outcome(text, "rd") == _outcome(text, "ply"), text
@@ -0,0 +1,121 @@
+# frontend/tokenstream.py
+"""
+Flujo de tokens en columnas (struct-of-arrays).
+
+En lugar de un LexToken por token, `tokenize` guarda cada campo en un arreglo
+propio:
+
+- types:  código pequeño (array 'B') = índice en TOKEN_TYPES
+          (los nombres de `tokens` del lexer, seguidos de los literales)
+- values: valor del token (lexemas y números repetidos se comparten)
+- lines:  línea (1-based)
+- starts / ends: offsets [start, end) en el texto
+
+Las columnas numéricas son arrays 'I' (4 bytes): textos de hasta 4 GiB.
+
+El índice de inicios de línea se construye una sola vez durante el escaneo;
+`position(offset)` da (línea, columna) con búsqueda binaria.
+"""
+from __future__ import annotations
+from array import array
+from typing import Iterator
+
+import ply.lex as lex
+
+from .lexer import (tokens, literals, LineIndex, _FAST_RE, _G_NL, _G_NUM, _G_STRING, _G_ID,
+                    _G_LIT, _G_ERR, _id_cache, _id_type)
+
+TOKEN_TYPES: tuple[str, ...] = tuple(tokens) + tuple(literals)
+TYPE_CODE: dict[str, int] = {t: i for i, t in enumerate(TOKEN_TYPES)}
+
+
+class TokenArrays:
+    """Tokens de un texto guardados por columnas."""
+
+    __slots__ = ("text", "types", "values", "lines", "starts", "ends", "line_index")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.types = array('B')
+        self.values: list = []
+        self.lines = array('I')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.line_index = LineIndex()
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def type_name(self, i: int) -> str:
+        return TOKEN_TYPES[self.types[i]]
+
+    def position(self, offset: int) -> tuple[int, int]:
+        return self.line_index.position(offset)
+
+    def column(self, i: int) -> int:
+        return self.position(self.starts[i])[1]
+
+    def lextokens(self) -> Iterator[lex.LexToken]:
+        """LexTokens equivalentes a los del lexer PLY, para alimentar a los parsers."""
+        names = TOKEN_TYPES
+        LexToken = lex.LexToken
+        for ty, value, line, start in zip(self.types, self.values, self.lines, self.starts):
+            tok = LexToken()
+            tok.type = names[ty]
+            tok.value = value
+            tok.lineno = line
+            tok.lexpos = start
+            yield tok
+
+
+def tokenize(text: str) -> TokenArrays:
+    """Tokeniza `text` completo con la misma regex y validación que FastLexer.
+
+    Lanza SyntaxError con los mismos mensajes que el lexer.
+    """
+    out = TokenArrays(text)
+    types, values, lines, starts, ends = out.types, out.values, out.lines, out.starts, out.ends
+    line_starts = out.line_index.starts
+    code = TYPE_CODE
+    lineno = 1
+    num_code, str_code = code['NUM'], code['STRING']
+    cache = _id_cache
+    # lexema -> (código, valor compartido) para ids, palabras clave y números
+    interned: dict[str, tuple[int, object]] = {}
+    for m in _FAST_RE.finditer(text):
+        g = m.lastindex
+        if g == _G_ID or g == _G_NUM:
+            lexeme = m.group(g)
+            hit = interned.get(lexeme)
+            if hit is None:
+                if g == _G_ID:
+                    ttype = cache.get(lexeme) or _id_type(lexeme)
+                    hit = (code[ttype], lexeme)
+                else:
+                    hit = (num_code, float(lexeme) if '.' in lexeme else int(lexeme))
+                interned[lexeme] = hit
+            ty, value = hit
+        elif g == _G_LIT:
+            value = m.group(g)
+            ty = code[value]
+        elif g == _G_NL:
+            s = m.start(g)
+            for k in range(s, m.end()):
+                line_starts.append(k + 1)
+            lineno += m.end() - s
+            continue
+        elif g == _G_STRING:
+            ty = str_code
+            value = bytes(m.group(g)[1:-1], "utf-8").decode("unicode_escape")
+        elif g == _G_ERR:
+            pos = m.start(g)
+            col = pos - line_starts[-1]
+            raise SyntaxError(f"Carácter inesperado '{m.group(g)}' en línea {lineno}, col {col}")
+        else:  # comentario o espacios finales
+            continue
+        types.append(ty)
+        values.append(value)
+        lines.append(lineno)
+        starts.append(m.start(g))
+        ends.append(m.end())
+    return out
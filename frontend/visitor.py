@@ -0,0 +1,148 @@
+# frontend/visitor.py
+"""
+Recorridos del AST sin recursión de Python.
+
+Los pases se siguen escribiendo como siempre (un método por kind que visita
+a sus hijos y combina resultados), pero en lugar de llamarse a sí mismos
+*ceden* el trabajo pendiente con `yield`:
+
+    def visit_BINOP(self, node):
+        left = yield node.children[0]
+        right = yield node.children[1]
+        return Node("BINOP", node.value, [left, right], node.line)
+
+run() ejecuta esos generadores sobre una pila explícita: cada `yield x`
+suspende al método, se evalúa x y el resultado vuelve como valor del yield.
+La profundidad del árbol solo cuesta memoria (un generador suspendido por
+nivel), nunca marcos de la pila de C ni el límite de recursión.
+
+Qué se puede ceder:
+- un generador: se ejecuta como sub-llamada (`t = yield _type_of_expr(n, ...)`);
+- cualquier otra cosa (un Node, None): se entrega a la función `dispatch`
+  de run(), que devuelve un generador o directamente el resultado. Sin
+  `dispatch` el valor vuelve tal cual, así una regla puede ser una función
+  normal que resuelve las hojas en el acto y solo devuelve un generador
+  cuando tiene hijos que visitar (evita un generador por hoja).
+
+Una excepción en un hijo se relanza dentro del padre en el punto del yield,
+así que un try/except alrededor de `yield` se comporta igual que con
+recursión.
+
+Visitor/Transformer empaquetan el despacho `visit_<KIND>` / generic_visit.
+Los recorridos sin estado (Node.pretty, exporter.ast_to_dict) no necesitan
+generadores: usan directamente una pila de (nodo, contexto).
+"""
+from __future__ import annotations
+from types import GeneratorType
+from typing import Any, Callable, Optional
+
+from .ast import Node
+
+
+def run(start: Any, dispatch: Optional[Callable[[Any], Any]] = None) -> Any:
+    """Ejecuta `start` (un generador-visitante o un valor ya calculado) y
+    devuelve su resultado."""
+    if start.__class__ is not GeneratorType:
+        return start
+    stack = [start]
+    push, pop = stack.append, stack.pop
+    gen_type = GeneratorType
+    value = None
+    error = None
+    while stack:
+        gen = stack[-1]
+        try:
+            if error is None:
+                item = gen.send(value)
+            else:
+                exc, error = error, None
+                item = gen.throw(exc)
+        except StopIteration as stop:
+            pop()
+            value = stop.value
+            continue
+        except BaseException as exc:
+            pop()
+            if not stack:
+                raise
+            error = exc
+            continue
+
+        if item.__class__ is not gen_type:
+            if dispatch is None:
+                value = item      # sub-llamada que resolvió sin ceder
+                continue
+            try:
+                item = dispatch(item)
+            except BaseException as exc:
+                error = exc
+                continue
+            if item.__class__ is not gen_type:
+                value = item
+                continue
+        push(item)
+        value = None
+    return value
+
+
+class Visitor:
+    """Despacho por kind a `visit_<KIND>(node)`; sin método se usa
+    generic_visit(). Los métodos pueden ser generadores (ceden hijos) o
+    funciones normales (hojas). `visit()` es el punto de entrada."""
+
+    _methods: dict = {}   # kind -> nombre del método; uno por subclase
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._methods = {}
+
+    def visit(self, node: Node) -> Any:
+        return run(self.dispatch(node), self.dispatch)
+
+    def dispatch(self, node: Node) -> Any:
+        if node is None:
+            return None
+        methods = self._methods
+        name = methods.get(node.kind)
+        if name is None:
+            name = f"visit_{node.kind}"
+            if not hasattr(self, name):
+                name = "generic_visit"
+            methods[node.kind] = name
+        if name == "generic_visit" and not node.children:
+            return self.generic_leaf(node)
+        return getattr(self, name)(node)
+
+    def generic_leaf(self, node: Node) -> Any:
+        """Resultado de generic_visit para una hoja, sin crear un generador."""
+        return None
+
+    def generic_visit(self, node: Node):
+        """Visita los hijos en orden y no devuelve nada."""
+        for child in node.children:
+            yield child
+
+
+class Transformer(Visitor):
+    """Visitor que devuelve un árbol: generic_visit reconstruye el nodo solo si
+    algún hijo cambió (por identidad) y descarta los hijos que devuelven None."""
+
+    def generic_visit(self, node: Node):
+        new_children = []
+        changed = False
+        for child in node.children:
+            new_child = yield child
+            if new_child is not None:
+                new_children.append(new_child)
+                # identidad, no igualdad: `!=` comparaba todo el subárbol
+                if new_child is not child:
+                    changed = True
+            else:
+                changed = True
+        if changed:
+            return Node(node.kind, node.value, new_children, node.line)
+        return node
+
+    def generic_leaf(self, node: Node) -> Node:
+        return node
+
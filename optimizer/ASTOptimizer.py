@@ -1,6 +1,24 @@
+from types import GeneratorType
+
 from frontend.ast import Node
+from frontend.visitor import Transformer, run
+from optimizer.ASTUtils import binop_i32, has_call, num_value, pow_i32, wrap_i32
+
+# Expresiones (y listas de argumentos/parámetros): sin "fold" ni "algebra"
+# ninguna regla mira dentro de ellas, así que el worklist no entra.
+_EXPRESSION_KINDS = frozenset((
+    "BINOP", "POW", "NEG", "RELOP", "BOOLBIN", "NUM", "STR", "ID", "BOOL",
+    "CALL", "ARGS", "PARAMS",
+))
+# Sentencias con un bloque que "dce" puede dejar vacío: el bloque queda
+# como STMTS sin hijos para que el nodo conserve su forma.
+_BLOCK_HOLDERS = frozenset(("PARA", "EJECUTA", "HAZ_HASTA", "HAZ_MIENTRAS"))
+# "strength": exponente máximo de POTENCIA que se reescribe como cadena de
+# productos. Hasta 3 la cadena hace las mismas multiplicaciones que el
+# cuadrado y multiplicación del generador de IR; más arriba hace más.
+POW_CHAIN_MAX = 3
 
-class ASTOptimizer:
+class ASTOptimizer(Transformer):
     """
     Optimizador de AST para el compilador Logo.
     Implementa múltiples pasadas de optimización:
@@ -8,56 +26,187 @@ class ASTOptimizer:
     - Dead Code Elimination (eliminación de código muerto)
     - Algebraic Simplification (simplificación algebraica)
     - Control Flow Optimization (optimización de flujo de control)
+
+    Los visit_* son generadores (frontend/visitor.py): `yield hijo` devuelve el
+    hijo ya optimizado sin recursión, así que la profundidad del AST no está
+    limitada por la pila de Python.
+
+    Estrategias (`strategy`):
+    - "worklist" (por defecto): una sola pasada de abajo hacia arriba. Las
+      reglas de un nodo solo dependen de sus hijos, que ya están optimizados
+      cuando corren; si una regla reescribe el nodo en otro nuevo (GI 45 ->
+      GD -45), se vuelven a aplicar las reglas solo a ese resultado, con sus
+      hijos marcados como ya resueltos, hasta que no cambie. El padre corre
+      después y ve el resultado final.
+    - "fixpoint": la versión anterior; repite el recorrido de todo el árbol
+      hasta que `optimizations_applied` deja de cambiar.
+
+    `groups` elige qué reglas aplica (por defecto todas); así cada grupo es
+    un pase separado de optimizer/PassManager.py:
+    - "fold": plegado de constantes (aritmética, relacionales, Y/O);
+    - "algebra": identidades (x + 0, x * 1, -(-x), true Y x, x iguales? x...);
+    - "normalize": RE n -> AV -n, GI n -> GD -n, GD n -> GD n mod 360;
+    - "dce": SI/MIENTRAS/HAZ.HASTA/HAZ.MIENTRAS con condición constante,
+      REPITE 0/1, AV/RE/GD/GI 0
+      y limpieza de bloques (vacíos, EMPTY, un solo hijo);
+    - "strength": POTENCIA x n con n constante chico -> x * x * ... (hasta
+      POW_CHAIN_MAX factores); el resto lo genera en línea el generador de IR.
+
+    `memo` (worklist): un dict que sobrevive entre corridas con las mismas
+    reglas. Cada corrida anota ahí los nodos que dejó en forma normal y la
+    siguiente no vuelve a entrar en ellos: como ningún pase modifica nodos
+    (se reconstruyen), un subárbol idéntico por identidad sigue normal, y
+    volver a correr un pase después de que otro tocó el árbol cuesta lo que
+    cambió, no el árbol entero.
     """
-    
-    def __init__(self):
+
+    STRATEGIES = ("worklist", "fixpoint")
+    GROUPS = ("fold", "algebra", "normalize", "dce", "strength")
+
+    def __init__(self, strategy: str = "worklist", groups=None, memo=None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Estrategia de optimización desconocida: {strategy!r}")
+        groups = self.GROUPS if groups is None else tuple(groups)
+        for group in groups:
+            if group not in self.GROUPS:
+                raise ValueError(f"Grupo de reglas desconocido: {group!r}")
+        self.strategy = strategy
+        self.fold = "fold" in groups
+        self.algebra = "algebra" in groups
+        self.normalize = "normalize" in groups
+        self.dce = "dce" in groups
+        self.strength = "strength" in groups
+        self._opaque = _EXPRESSION_KINDS if not (self.fold or self.algebra or self.strength) else frozenset()
         self.optimizations_applied = 0
-        
+        self.visited = 0            # nodos despachados (reglas aplicadas + hojas)
+        self.passes = 0             # recorridos completos del árbol
+        self.resettled = 0          # reescrituras vueltas a optimizar (worklist)
+        # id() -> nodo ya en forma normal; guardar el nodo lo mantiene vivo
+        # y su id() no se reusa mientras está anotado
+        self._record = memo is not None
+        self._settled = memo if memo is not None else {}
+        self._rebuilt = None        # último nodo armado por _rebuild
+
     def optimize(self, node: Node) -> Node:
         """Punto de entrada principal para optimización"""
         if node is None:
             return None
-            
+
+        if self.strategy == "worklist":
+            self.passes += 1
+            try:
+                return self._worklist(node)
+            finally:
+                if not self._record:
+                    self._settled.clear()
+
         # Aplicar múltiples pasadas hasta que no haya cambios
         previous_optimizations = -1
         optimized_node = node
         
         while self.optimizations_applied != previous_optimizations:
             previous_optimizations = self.optimizations_applied
-            optimized_node = self.visit(optimized_node)
+            self.passes += 1
+            optimized_node = run(self._counting_dispatch(optimized_node), self._counting_dispatch)
             
         return optimized_node
-    
-    def visit(self, node: Node) -> Node:
-        """Dispatcher que decide qué método llamar según el tipo de nodo"""
-        if node is None:
-            return None
-            
-        method_name = f"visit_{node.kind}"
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
 
-    def generic_visit(self, node: Node) -> Node:
-        """Visita por defecto: procesa hijos recursivamente"""
-        optimized_children = []
-        changed = False
-        
-        for child in node.children:
-            optimized_child = self.visit(child)
-            if optimized_child is not None:
-                optimized_children.append(optimized_child)
-                if optimized_child != child:
-                    changed = True
+    def _counting_dispatch(self, node: Node):
+        if node is not None:
+            self.visited += 1
+        return self.dispatch(node)
+
+    # =====================================================
+    # WORKLIST
+    # =====================================================
+
+    def _worklist(self, root: Node) -> Node:
+        """run() de frontend/visitor.py especializado: al terminar la regla de
+        un nodo, si lo reescribió en otro nodo con hijos, se vuelve a encolar
+        solo ese resultado. Sus hijos ya están optimizados (o son hojas
+        nuevas), así que quedan marcados y no se vuelven a visitar. Los
+        ancestros que cambian solo porque cambió un hijo salen de _rebuild y
+        no vuelven a la cola."""
+        dispatch = self.dispatch
+        settled = self._settled
+        record = self._record
+        opaque = self._opaque
+        gen_type = GeneratorType
+        if id(root) in settled:
+            return root
+        self.visited += 1
+        first = dispatch(root)
+        if first.__class__ is not gen_type:
+            return first
+        gens, nodes = [first], [root]       # pila de reglas en curso y su nodo
+        value = None
+        visited = 0
+        while gens:
+            try:
+                item = gens[-1].send(value)
+            except StopIteration as stop:
+                gens.pop()
+                node = nodes.pop()
+                value = stop.value
+                # una reconstrucción (_rebuild) ya pasó por la regla con
+                # esos mismos hijos; solo una reescritura vuelve a la cola
+                if (value is not None and value is not node and value.children
+                        and value is not self._rebuilt):
+                    self.resettled += 1
+                    for child in value.children:
+                        if child is not None and child.children:    # las hojas son baratas
+                            settled[id(child)] = child
+                    visited += 1
+                    gens.append(dispatch(value))
+                    nodes.append(value)
+                    value = None
+                elif record and value is not None and value.children:
+                    settled[id(value)] = value
+                continue
+            # item: un hijo a optimizar
+            if item is None or item.kind in opaque or (settled and id(item) in settled):
+                value = item
+                continue
+            visited += 1
+            sub = dispatch(item)
+            if sub.__class__ is not gen_type:
+                value = sub                 # hoja
+                continue
+            gens.append(sub)
+            nodes.append(item)
+            value = None
+        self.visited += visited
+        return value
+
+    def _rebuild(self, node: Node, children: list) -> Node:
+        """El mismo nodo si ningún hijo cambió (como
+        Transformer.generic_visit); si no, uno nuevo con los hijos nuevos:
+        solo se crean nodos para lo reescrito y sus ancestros."""
+        old = node.children
+        if len(old) == len(children):
+            for a, b in zip(old, children):
+                if a is not b:
+                    break
             else:
-                # Child was eliminated (became None)
-                changed = True
-        
-        # Solo crear un nuevo nodo si algo cambió
-        if changed:
-            return Node(node.kind, node.value, optimized_children, node.line)
-        else:
-            return node
+                return node
+        new = self._rebuilt = Node(node.kind, node.value, children, node.line)
+        return new
+
+    def generic_visit(self, node: Node):
+        """Como Transformer.generic_visit (descarta los hijos None), pero
+        reconstruye con _rebuild. Un bloque vaciado queda como STMTS vacío."""
+        children = []
+        for child in node.children:
+            new_child = yield child
+            if new_child is not None:
+                children.append(new_child)
+            elif node.kind in _BLOCK_HOLDERS:
+                children.append(self._empty_block(node))
+        return self._rebuild(node, children)
 
+    def _empty_block(self, node: Node) -> Node:
+        return Node("STMTS", None, [], node.line)
+    
     # =====================================================
     # OPTIMIZACIONES DE EXPRESIONES ARITMÉTICAS
     # =====================================================
@@ -65,42 +214,30 @@ class ASTOptimizer:
     def visit_BINOP(self, node: Node) -> Node:
         """Optimiza operaciones binarias (+, -, *, /)"""
         if len(node.children) < 2:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        left = self.visit(node.children[0])
-        right = self.visit(node.children[1])
+        left = yield node.children[0]
+        right = yield node.children[1]
         op = node.value
         
-        # Constant Folding
-        if left.kind == "NUM" and right.kind == "NUM":
-            try:
-                if op == '+':
-                    result = left.value + right.value
-                elif op == '-':
-                    result = left.value - right.value
-                elif op == '*':
-                    result = left.value * right.value
-                elif op == '/':
-                    if right.value != 0:
-                        result = left.value / right.value
-                    else:
-                        # División por cero - mantener expresión original
-                        return Node(node.kind, node.value, [left, right], node.line)
-                else:
-                    return Node(node.kind, node.value, [left, right], node.line)
-                
-                self.optimizations_applied += 1
-                return Node("NUM", result, [], node.line)
-            except:
-                return Node(node.kind, node.value, [left, right], node.line)
+        # Constant Folding (en i32, como el código generado: / trunca y
+        # + - * dan la vuelta)
+        if self.fold and left.kind == "NUM" and right.kind == "NUM":
+            a, b = num_value(left), num_value(right)
+            # división por cero o INT_MIN / -1: se deja para el runtime
+            result = None if a is None or b is None else binop_i32(op, a, b)
+            if result is None:
+                return self._rebuild(node, [left, right])
+            self.optimizations_applied += 1
+            return Node("NUM", result, [], node.line)
         
         # Optimizaciones algebraicas
-        optimized = self._apply_algebraic_optimizations(op, left, right, node.line)
+        optimized = self.algebra and self._apply_algebraic_optimizations(op, left, right, node.line)
         if optimized:
             self.optimizations_applied += 1
             return optimized
             
-        return Node(node.kind, node.value, [left, right], node.line)
+        return self._rebuild(node, [left, right])
 
     def _apply_algebraic_optimizations(self, op: str, left: Node, right: Node, line: int) -> Node:
         """Aplica optimizaciones algebraicas comunes"""
@@ -118,15 +255,16 @@ class ASTOptimizer:
         elif op == '-':
             # x - 0 = x
             if right.kind == "NUM" and right.value == 0:
-                return right
+                return left
             # x - x = 0 (solo si es una variable, no expresión compleja)
             if left.kind == "ID" and right.kind == "ID" and left.value == right.value:
                 return Node("NUM", 0, [], line)
                 
         # Optimizaciones de multiplicación
         elif op == '*':
-            # x * 0 = 0
-            if (left.kind == "NUM" and left.value == 0) or (right.kind == "NUM" and right.value == 0):
+            # x * 0 = 0 (si x no llama a nada)
+            if (left.kind == "NUM" and left.value == 0 and not has_call(right)) or \
+                    (right.kind == "NUM" and right.value == 0 and not has_call(left)):
                 return Node("NUM", 0, [], line)
             # x * 1 = x
             if right.kind == "NUM" and right.value == 1:
@@ -140,8 +278,9 @@ class ASTOptimizer:
             # x / 1 = x
             if right.kind == "NUM" and right.value == 1:
                 return left
-            # 0 / x = 0 (si x != 0)
-            if left.kind == "NUM" and left.value == 0 and not (right.kind == "NUM" and right.value == 0):
+            # 0 / x = 0 (si x != 0 y no llama a nada)
+            if left.kind == "NUM" and left.value == 0 and not (right.kind == "NUM" and right.value == 0) \
+                    and not has_call(right):
                 return Node("NUM", 0, [], line)
                 
         return None
@@ -149,23 +288,34 @@ class ASTOptimizer:
     def visit_POW(self, node: Node) -> Node:
         """Optimiza operaciones de potencia"""
         if len(node.children) < 2:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        base = self.visit(node.children[0])
-        exponent = self.visit(node.children[1])
+        base = yield node.children[0]
+        exponent = yield node.children[1]
         
-        # Constant Folding
-        if base.kind == "NUM" and exponent.kind == "NUM":
-            try:
-                result = base.value ** exponent.value
+        # Constant Folding (en i32, como el código generado)
+        if self.fold and base.kind == "NUM" and exponent.kind == "NUM":
+            a, n = num_value(base), num_value(exponent)
+            if a is not None and n is not None:
                 self.optimizations_applied += 1
-                return Node("NUM", result, [], node.line)
-            except:
-                pass
-        
+                return Node("NUM", pow_i32(a, n), [], node.line)
+
+        # Reducción de fuerza: x^3 -> (x * x) * x
+        if self.strength and exponent.kind == "NUM" and base.kind in ("ID", "NUM"):
+            n = num_value(exponent)
+            if n is not None and 2 <= n <= POW_CHAIN_MAX:
+                chain = base
+                for _ in range(n - 1):
+                    chain = Node("BINOP", "*", [chain, base], node.line)
+                self.optimizations_applied += 1
+                return chain
+
+        if not self.algebra:
+            return self._rebuild(node, [base, exponent])
+
         # Optimizaciones algebraicas
         # x^0 = 1
-        if exponent.kind == "NUM" and exponent.value == 0:
+        if exponent.kind == "NUM" and exponent.value == 0 and not has_call(base):
             self.optimizations_applied += 1
             return Node("NUM", 1, [], node.line)
         # x^1 = x
@@ -177,30 +327,30 @@ class ASTOptimizer:
             self.optimizations_applied += 1
             return Node("NUM", 0, [], node.line)
         # 1^x = 1
-        if base.kind == "NUM" and base.value == 1:
+        if base.kind == "NUM" and base.value == 1 and not has_call(exponent):
             self.optimizations_applied += 1
             return Node("NUM", 1, [], node.line)
             
-        return Node(node.kind, node.value, [base, exponent], node.line)
+        return self._rebuild(node, [base, exponent])
 
     def visit_NEG(self, node: Node) -> Node:
         """Optimiza negación unaria"""
         if len(node.children) < 1:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        operand = self.visit(node.children[0])
+        operand = yield node.children[0]
         
         # Constant Folding
-        if operand.kind == "NUM":
+        if self.fold and operand.kind == "NUM" and num_value(operand) is not None:
             self.optimizations_applied += 1
-            return Node("NUM", -operand.value, [], node.line)
+            return Node("NUM", wrap_i32(-num_value(operand)), [], node.line)
             
         # Double negation: -(-x) = x
-        if operand.kind == "NEG" and len(operand.children) > 0:
+        if self.algebra and operand.kind == "NEG" and len(operand.children) > 0:
             self.optimizations_applied += 1
             return operand.children[0]
             
-        return Node(node.kind, node.value, [operand], node.line)
+        return self._rebuild(node, [operand])
 
     # =====================================================
     # OPTIMIZACIONES DE EXPRESIONES BOOLEANAS
@@ -209,14 +359,14 @@ class ASTOptimizer:
     def visit_BOOLBIN(self, node: Node) -> Node:
         """Optimiza operaciones booleanas binarias (Y, O)"""
         if len(node.children) < 2:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        left = self.visit(node.children[0])
-        right = self.visit(node.children[1])
+        left = yield node.children[0]
+        right = yield node.children[1]
         op = node.value
         
         # Constant Folding
-        if self._is_boolean_constant(left) and self._is_boolean_constant(right):
+        if self.fold and self._is_boolean_constant(left) and self._is_boolean_constant(right):
             left_val = self._get_boolean_value(left)
             right_val = self._get_boolean_value(right)
             
@@ -225,19 +375,22 @@ class ASTOptimizer:
             elif op == 'O':  # OR
                 result = left_val or right_val
             else:
-                return Node(node.kind, node.value, [left, right], node.line)
+                return self._rebuild(node, [left, right])
                 
             self.optimizations_applied += 1
             return Node("BOOL", result, [], node.line)
         
+        if not self.algebra:
+            return self._rebuild(node, [left, right])
+
         # Optimizaciones de cortocircuito
         if op == 'Y':  # AND
-            # false Y x = false
-            if self._is_boolean_constant(left) and not self._get_boolean_value(left):
+            # false Y x = false (Y evalúa los dos lados: x no puede llamar a nada)
+            if self._is_boolean_constant(left) and not self._get_boolean_value(left) and not has_call(right):
                 self.optimizations_applied += 1
                 return Node("BOOL", False, [], node.line)
             # x Y false = false
-            if self._is_boolean_constant(right) and not self._get_boolean_value(right):
+            if self._is_boolean_constant(right) and not self._get_boolean_value(right) and not has_call(left):
                 self.optimizations_applied += 1
                 return Node("BOOL", False, [], node.line)
             # true Y x = x
@@ -251,11 +404,11 @@ class ASTOptimizer:
                 
         elif op == 'O':  # OR
             # true O x = true
-            if self._is_boolean_constant(left) and self._get_boolean_value(left):
+            if self._is_boolean_constant(left) and self._get_boolean_value(left) and not has_call(right):
                 self.optimizations_applied += 1
                 return Node("BOOL", True, [], node.line)
             # x O true = true
-            if self._is_boolean_constant(right) and self._get_boolean_value(right):
+            if self._is_boolean_constant(right) and self._get_boolean_value(right) and not has_call(left):
                 self.optimizations_applied += 1
                 return Node("BOOL", True, [], node.line)
             # false O x = x
@@ -267,19 +420,19 @@ class ASTOptimizer:
                 self.optimizations_applied += 1
                 return left
                 
-        return Node(node.kind, node.value, [left, right], node.line)
+        return self._rebuild(node, [left, right])
 
     def visit_RELOP(self, node: Node) -> Node:
         """Optimiza operaciones relacionales (IGUALES, MENORQ, MAYORQ)"""
         if len(node.children) < 2:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        left = self.visit(node.children[0])
-        right = self.visit(node.children[1])
+        left = yield node.children[0]
+        right = yield node.children[1]
         op = node.value
         
         # Constant Folding
-        if left.kind == "NUM" and right.kind == "NUM":
+        if self.fold and left.kind == "NUM" and right.kind == "NUM":
             try:
                 if op == 'iguales?' or op == 'IGUALES':
                     result = left.value == right.value
@@ -288,13 +441,16 @@ class ASTOptimizer:
                 elif op == 'mayorque?' or op == 'MAYORQ':
                     result = left.value > right.value
                 else:
-                    return Node(node.kind, node.value, [left, right], node.line)
+                    return self._rebuild(node, [left, right])
                     
                 self.optimizations_applied += 1
                 return Node("BOOL", result, [], node.line)
             except:
                 pass
         
+        if not self.algebra:
+            return self._rebuild(node, [left, right])
+
         # x == x = true (solo para variables simples)
         if (op == 'iguales?' or op == 'IGUALES') and left.kind == "ID" and right.kind == "ID" and left.value == right.value:
             self.optimizations_applied += 1
@@ -305,7 +461,7 @@ class ASTOptimizer:
             self.optimizations_applied += 1
             return Node("BOOL", False, [], node.line)
             
-        return Node(node.kind, node.value, [left, right], node.line)
+        return self._rebuild(node, [left, right])
 
     # =====================================================
     # OPTIMIZACIONES DE CONTROL DE FLUJO
@@ -314,14 +470,24 @@ class ASTOptimizer:
     def visit_SI(self, node: Node) -> Node:
         """Optimiza condicionales SI"""
         if len(node.children) < 2:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        condition = self.visit(node.children[0])
-        then_branch = self.visit(node.children[1])
-        else_branch = self.visit(node.children[2]) if len(node.children) > 2 else None
+        condition = yield node.children[0]
+        then_branch = yield node.children[1]
+        else_branch = (yield node.children[2]) if len(node.children) > 2 else None
+
+        # Las dos ramas quedaron vacías: sin llamadas en la condición no
+        # queda nada que ejecutar
+        if then_branch is None and else_branch is None:
+            if self.dce and not has_call(condition):
+                self.optimizations_applied += 1
+                return None
+            then_branch = self._empty_block(node)
+        elif then_branch is None:
+            then_branch = self._empty_block(node)
         
         # Dead Code Elimination
-        if self._is_boolean_constant(condition):
+        if self.dce and self._is_boolean_constant(condition):
             if self._get_boolean_value(condition):
                 # Condición siempre verdadera
                 self.optimizations_applied += 1
@@ -336,34 +502,75 @@ class ASTOptimizer:
         if else_branch:
             children.append(else_branch)
             
-        return Node(node.kind, node.value, children, node.line)
+        return self._rebuild(node, children)
 
     def visit_MIENTRAS(self, node: Node) -> Node:
         """Optimiza bucles MIENTRAS"""
         if len(node.children) < 2:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        condition = self.visit(node.children[0])
-        body = self.visit(node.children[1])
+        condition = yield node.children[0]
+        body = yield node.children[1]
         
         # Dead Code Elimination
-        if self._is_boolean_constant(condition):
+        if self.dce and self._is_boolean_constant(condition):
             if not self._get_boolean_value(condition):
                 # Condición siempre falsa - bucle nunca se ejecuta
                 self.optimizations_applied += 1
                 return None
             # Si es siempre verdadera, mantener el bucle (podría ser bucle infinito intencional)
+
+        # Cuerpo vacío: el bucle se mantiene (puede no terminar)
+        if body is None:
+            body = self._empty_block(node)
         
-        return Node(node.kind, node.value, [condition, body], node.line)
+        return self._rebuild(node, [condition, body])
+
+    def visit_HAZ_HASTA(self, node: Node) -> Node:
+        """Optimiza bucles HAZ.HASTA (sale cuando la condición es verdadera)"""
+        return (yield from self._do_loop(node, True))
+
+    def visit_HAZ_MIENTRAS(self, node: Node) -> Node:
+        """Optimiza bucles HAZ.MIENTRAS (sale cuando la condición es falsa)"""
+        return (yield from self._do_loop(node, False))
+
+    def _do_loop(self, node: Node, exit_value: bool) -> Node:
+        """El cuerpo corre antes de mirar la condición: si la condición es
+        constante y sale, es el cuerpo una vez; si no sale, el bucle se
+        mantiene (como MIENTRAS cierto)."""
+        if len(node.children) < 2:
+            return (yield from self.generic_visit(node))
+
+        body = yield node.children[0]
+        condition = yield node.children[1]
+        if body is None:
+            body = self._empty_block(node)
+
+        if self.dce and self._is_boolean_constant(condition) \
+                and self._get_boolean_value(condition) == exit_value:
+            self.optimizations_applied += 1
+            return body
+
+        return self._rebuild(node, [body, condition])
 
     def visit_REPITE(self, node: Node) -> Node:
         """Optimiza bucles REPITE"""
         if len(node.children) < 2:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        count = self.visit(node.children[0])
-        body = self.visit(node.children[1])
+        count = yield node.children[0]
+        body = yield node.children[1]
         
+        if body is None:
+            # Cuerpo vacío: solo queda evaluar la cuenta
+            if self.dce and not has_call(count):
+                self.optimizations_applied += 1
+                return None
+            body = self._empty_block(node)
+
+        if not self.dce:
+            return self._rebuild(node, [count, body])
+
         # Si el contador es 0, eliminar el bucle
         if count.kind == "NUM" and count.value <= 0:
             self.optimizations_applied += 1
@@ -374,7 +581,7 @@ class ASTOptimizer:
             self.optimizations_applied += 1
             return body
             
-        return Node(node.kind, node.value, [count, body], node.line)
+        return self._rebuild(node, [count, body])
 
     # =====================================================
     # OPTIMIZACIONES DE COMANDOS LOGO
@@ -383,75 +590,75 @@ class ASTOptimizer:
     def visit_AV(self, node: Node) -> Node:
         """Optimiza comando AVANZA"""
         if len(node.children) < 1:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        distance = self.visit(node.children[0])
+        distance = yield node.children[0]
         
         # Si la distancia es 0, eliminar el comando
-        if distance.kind == "NUM" and distance.value == 0:
+        if self.dce and distance.kind == "NUM" and distance.value == 0:
             self.optimizations_applied += 1
             return None
             
-        return Node(node.kind, node.value, [distance], node.line)
+        return self._rebuild(node, [distance])
 
     def visit_RE(self, node: Node) -> Node:
         """Optimiza comando RETROCEDE"""
         if len(node.children) < 1:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        distance = self.visit(node.children[0])
+        distance = yield node.children[0]
         
         # Si la distancia es 0, eliminar el comando
-        if distance.kind == "NUM" and distance.value == 0:
+        if self.dce and distance.kind == "NUM" and distance.value == 0:
             self.optimizations_applied += 1
             return None
             
         # RE x = AV -x
-        if distance.kind == "NUM":
+        if self.normalize and distance.kind == "NUM":
             self.optimizations_applied += 1
             return Node("AV", None, [Node("NUM", -distance.value, [], distance.line)], node.line)
             
-        return Node(node.kind, node.value, [distance], node.line)
+        return self._rebuild(node, [distance])
 
     def visit_GD(self, node: Node) -> Node:
         """Optimiza comando GIRA DERECHA"""
         if len(node.children) < 1:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        angle = self.visit(node.children[0])
+        angle = yield node.children[0]
         
         # Si el ángulo es 0, eliminar el comando
-        if angle.kind == "NUM" and angle.value == 0:
+        if self.dce and angle.kind == "NUM" and angle.value == 0:
             self.optimizations_applied += 1
             return None
         
         # Normalizar ángulos (opcional)
-        if angle.kind == "NUM":
+        if self.normalize and angle.kind == "NUM":
             normalized_angle = angle.value % 360
             if normalized_angle != angle.value:
                 self.optimizations_applied += 1
                 return Node(node.kind, node.value, [Node("NUM", normalized_angle, [], angle.line)], node.line)
             
-        return Node(node.kind, node.value, [angle], node.line)
+        return self._rebuild(node, [angle])
 
     def visit_GI(self, node: Node) -> Node:
         """Optimiza comando GIRA IZQUIERDA"""
         if len(node.children) < 1:
-            return self.generic_visit(node)
+            return (yield from self.generic_visit(node))
             
-        angle = self.visit(node.children[0])
+        angle = yield node.children[0]
         
         # Si el ángulo es 0, eliminar el comando
-        if angle.kind == "NUM" and angle.value == 0:
+        if self.dce and angle.kind == "NUM" and angle.value == 0:
             self.optimizations_applied += 1
             return None
         
         # GI x = GD -x
-        if angle.kind == "NUM":
+        if self.normalize and angle.kind == "NUM":
             self.optimizations_applied += 1
             return Node("GD", None, [Node("NUM", -angle.value, [], angle.line)], node.line)
             
-        return Node(node.kind, node.value, [angle], node.line)
+        return self._rebuild(node, [angle])
 
     # =====================================================
     # OPTIMIZACIONES DE LISTAS DE COMANDOS
@@ -459,10 +666,13 @@ class ASTOptimizer:
     
     def visit_STMTS(self, node: Node) -> Node:
         """Optimiza listas de comandos, eliminando comandos vacíos"""
+        if not self.dce:
+            return (yield from self.generic_visit(node))
+
         optimized_children = []
         
         for child in node.children:
-            optimized_child = self.visit(child)
+            optimized_child = yield child
             # Solo agregar hijos que no sean vacíos o None
             if optimized_child and optimized_child.kind != "EMPTY":
                 optimized_children.append(optimized_child)
@@ -476,7 +686,7 @@ class ASTOptimizer:
         if len(optimized_children) == 1:
             return optimized_children[0]
             
-        return Node(node.kind, node.value, optimized_children, node.line)
+        return self._rebuild(node, optimized_children)
 
     # =====================================================
     # MÉTODOS AUXILIARES
@@ -497,5 +707,7 @@ class ASTOptimizer:
     def get_optimization_stats(self) -> dict:
         """Retorna estadísticas de optimización"""
         return {
-            "optimizations_applied": self.optimizations_applied
+            "optimizations_applied": self.optimizations_applied,
+            "visited": self.visited,
+            "passes": self.passes,
         }
\ No newline at end of file
@@ -0,0 +1,261 @@
+# optimizer/ASTUtils.py
+"""
+Piezas comunes de los pases del optimizador.
+
+- Pass: la interfaz que corre optimizer/PassManager.py.
+- rebuild(): reconstruye un nodo solo si cambió algún hijo (por identidad),
+  como ASTOptimizer._rebuild: lo que no se tocó se comparte con el árbol
+  original.
+- Aritmética de 32 bits: el código generado trabaja todo en i32 (NUM se
+  trunca a entero, / es sdiv, + - * dan la vuelta), así que un pase que
+  calcula valores en tiempo de compilación tiene que usar estas funciones y
+  no la aritmética de Python.
+- Efectos: qué variables (por dirección del resolver) puede modificar una
+  sentencia, contando las globales que modifican los procedimientos que
+  llama.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from frontend.ast import Node
+from frontend.callgraph import CallGraph
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+# una llamada a un procedimiento desconocido puede modificar cualquier global
+ANY_GLOBAL = (0, -1)
+
+# Hijos que son bloques de sentencias (None = todos), igual que en
+# frontend/callgraph.py. En un árbol optimizado el bloque puede ser una
+# sentencia suelta.
+BLOCKS = {
+    "PROGRAM": None, "STMTS": None,
+    "SI": (1, 2), "MIENTRAS": (1,), "REPITE": (1,),
+    "HAZ_HASTA": (0,), "HAZ_MIENTRAS": (0,), "EJECUTA": (0,),
+}
+LOOPS = frozenset(("MIENTRAS", "REPITE", "HAZ_HASTA", "HAZ_MIENTRAS"))
+ASSIGNS = frozenset(("INIC", "HAZ", "INC"))
+
+# Relacionales y lógicos: el parser deja la palabra (IGUALES, MENORQ, ...)
+# o el operador infijo ('iguales?', ...) según la sintaxis usada.
+RELOPS = {
+    "IGUALES": "==", "iguales?": "==", "==": "==", "=": "==",
+    "MENORQ": "<", "menorque?": "<", "<": "<",
+    "MAYORQ": ">", "mayorque?": ">", ">": ">",
+}
+
+
+class Pass:
+    """Un pase: run(root) devuelve el árbol nuevo y deja `visited` (nodos
+    que miró) y `rewrites` (reescrituras que hizo) de esa corrida; el
+    PassManager los pone en 0 antes de cada una.
+
+    `memo`: si el PassManager lo va a correr más de una vez le pone un dict
+    vacío; un pase que lo use puede saltar lo que ya procesó."""
+    name = ""
+    description = ""
+    memo = None
+
+    def __init__(self):
+        self.visited = 0
+        self.rewrites = 0
+
+    def run(self, root: Node) -> Node:
+        raise NotImplementedError
+
+
+def rebuild(node: Node, children: List[Node]) -> Node:
+    """El mismo nodo si los hijos son los mismos objetos; si no, uno nuevo."""
+    old = node.children
+    if len(old) == len(children):
+        for a, b in zip(old, children):
+            if a is not b:
+                break
+        else:
+            return node
+    return Node(node.kind, node.value, children, node.line)
+
+
+# ---------- aritmética i32 ----------
+
+def wrap_i32(v: int) -> int:
+    return ((v - INT_MIN) & 0xFFFFFFFF) + INT_MIN
+
+def num_value(node: Node) -> Optional[int]:
+    """Valor de un NUM tal como lo emite el generador de IR (int() y i32)."""
+    try:
+        return wrap_i32(int(node.value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def binop_i32(op: str, a: int, b: int) -> Optional[int]:
+    """a op b como lo calcula el código generado; None si no se puede saber
+    en compilación (división por cero o INT_MIN / -1, que atrapan)."""
+    if op == "+":
+        return wrap_i32(a + b)
+    if op == "-":
+        return wrap_i32(a - b)
+    if op == "*":
+        return wrap_i32(a * b)
+    if op == "/":
+        if b == 0 or (a == INT_MIN and b == -1):
+            return None
+        q = abs(a) // abs(b)            # sdiv trunca hacia cero
+        return q if (a < 0) == (b < 0) else -q
+    return None
+
+def pow_i32(a: int, b: int) -> int:
+    """a ** b como lo calcula el código generado (POTENCIA en línea):
+    multiplicaciones en i32; con exponente negativo 0, salvo base 1 o -1
+    (como la división entera)."""
+    if b < 0:
+        if a == 1:
+            return 1
+        return (1 if b % 2 == 0 else -1) if a == -1 else 0
+    r = 1
+    while b:
+        if b & 1:
+            r = wrap_i32(r * a)
+        a = wrap_i32(a * a)
+        b >>= 1
+    return r
+
+def relop(op: str, a: int, b: int) -> Optional[bool]:
+    kind = RELOPS.get(op)
+    if kind == "==":
+        return a == b
+    if kind == "<":
+        return a < b
+    if kind == ">":
+        return a > b
+    return None
+
+def truthy(v) -> bool:
+    """Condición: un relacional da bool; un número es verdadero si != 0."""
+    return v if isinstance(v, bool) else v != 0
+
+
+# ---------- efectos ----------
+
+def proc_effects(graph: CallGraph) -> Dict[str, Set[Tuple[int, int]]]:
+    """Globales (direcciones de profundidad 0) que puede modificar cada
+    procedimiento, directamente o por los que llama. Requiere un árbol ya
+    resuelto. Las componentes del grafo vienen con los llamados primero, así
+    que basta una vuelta; dentro de una componente recursiva todos comparten
+    el mismo conjunto."""
+    effects: Dict[str, Set[Tuple[int, int]]] = {}
+    for scc in graph.sccs:
+        mods: Set[Tuple[int, int]] = set()
+        for info in scc:
+            mods |= {a for a in _direct_writes(info.node.children[2]) if a[0] == 0}
+            for callee in info.callees:
+                if callee not in graph.procs:
+                    mods.add(ANY_GLOBAL)
+                elif callee in effects:
+                    mods |= effects[callee]
+        for info in scc:
+            effects[info.name] = mods
+    return effects
+
+def _direct_writes(body: Node) -> Iterable[Tuple[int, int]]:
+    stack = [body]
+    while stack:
+        n = stack.pop()
+        k = n.kind
+        if k in ASSIGNS:
+            addr = n.children[0].addr
+            if addr is not None:
+                yield addr
+            continue
+        blocks = BLOCKS.get(k, ())
+        if blocks is None:
+            stack.extend(n.children)
+        elif blocks:
+            ch = n.children
+            stack.extend(ch[i] for i in blocks if i < len(ch))
+
+
+class Effects:
+    """Variables que puede modificar una sentencia (con todo lo que tiene
+    adentro y lo que llama). Los bloques se memorizan por identidad, así
+    que preguntar por bucles anidados cuesta una sola vuelta por el árbol.
+    Un PARA no ejecuta su cuerpo donde está definido: no tiene efectos."""
+
+    def __init__(self, graph: CallGraph, procs: Optional[Dict[str, Set[Tuple[int, int]]]] = None):
+        self.graph = graph
+        self.procs = proc_effects(graph) if procs is None else procs
+        self._memo: Dict[int, frozenset] = {}
+
+    def call(self, name: str) -> Set[Tuple[int, int]]:
+        mods = self.procs.get(name)
+        return mods if mods is not None else {ANY_GLOBAL}
+
+    def of(self, node: Node) -> frozenset:
+        memo = self._memo
+        hit = memo.get(id(node))
+        if hit is not None:
+            return hit
+        # post-orden con pila explícita; solo los bloques van al memo, las
+        # sentencias simples se suman al combinar a su padre
+        stack = [(node, False)]
+        while stack:
+            n, ready = stack.pop()
+            blocks = self._blocks(n)
+            if not ready:
+                stack.append((n, True))
+                stack.extend((c, False) for c in blocks
+                             if c.kind in BLOCKS and id(c) not in memo)
+                continue
+            mods = set(self._own(n))
+            for c in blocks:
+                if c.kind in BLOCKS:
+                    mods |= memo[id(c)]
+                else:
+                    mods.update(self._own(c))
+            memo[id(n)] = frozenset(mods)
+        return memo[id(node)]
+
+    def _blocks(self, n: Node) -> List[Node]:
+        if n.kind == "EJECUTA" and n.children and n.children[0].kind == "ID":
+            return []
+        blocks = BLOCKS.get(n.kind, ())
+        if blocks is None:
+            return list(n.children)
+        ch = n.children
+        return [ch[i] for i in blocks if i < len(ch)]
+
+    def _own(self, n: Node) -> Iterable[Tuple[int, int]]:
+        k = n.kind
+        if k in ASSIGNS:
+            addr = n.children[0].addr
+            return (addr,) if addr is not None else ()
+        if k == "CALL" and n.value is None and n.children:
+            return self.call(str(n.children[0].value))
+        if k == "EJECUTA" and n.children and n.children[0].kind == "ID":
+            return self.call(str(n.children[0].value))
+        return ()
+
+
+def kill(env: Dict[Tuple[int, int], int], mods: Iterable[Tuple[int, int]]):
+    """Olvida en `env` los valores de las variables de `mods`."""
+    for addr in mods:
+        if addr == ANY_GLOBAL:
+            for key in [k for k in env if k[0] == 0]:
+                del env[key]
+        else:
+            env.pop(addr, None)
+
+
+def has_call(expr: Node) -> bool:
+    """¿La expresión llama a algo (AZAR, ...)? Una llamada tiene efectos y
+    no se puede descartar ni repetir aunque su valor no se use."""
+    stack = [expr]
+    while stack:
+        n = stack.pop()
+        if n is None:
+            continue
+        if n.kind == "CALL":
+            return True
+        stack.extend(n.children)
+    return False
@@ -0,0 +1,324 @@
+# optimizer/CommonSubexpr.py
+"""
+Eliminación de subexpresiones comunes ("cse").
+
+IntermediateCodeGen calcula cada aparición de una expresión por separado:
+dos PRODUCTO lado lado en la misma lista de sentencias son dos veces los
+load y la multiplicación. Este pase busca, en cada lista de sentencias (un
+bloque: el programa, el cuerpo de un PARA, de un bucle, de una rama de un
+SI), las expresiones aritméticas que se repiten con el mismo valor, las
+calcula una vez en una variable nueva antes de la primera sentencia que
+las usa y en las apariciones pone esa variable:
+
+    AV (x + a) * 2  GD 90  AV (x + a) * 2
+      ->  INIC _cse0 = (x + a) * 2  AV _cse0  GD 90  AV _cse0
+
+Solo cuentan NUM, ID, BINOP, POW y NEG (como "licm"). Dos expresiones son
+la misma si tienen la misma clave estructural: el operador y las claves de
+los operandos (de + y * en cualquier orden), y para una variable su
+dirección del resolver y cuántas veces se modificó hasta ahí en el
+bloque. Así un INIC/INC/HAZ de x (o un bucle, un SI o una llamada que
+pueden modificarla, según Effects) separa lo que la usa antes de lo que la
+usa después. AZAR y RUMBO le preguntan al runtime y cada llamada es
+distinta: nunca se juntan (lo que está dentro de sus argumentos sí).
+
+Se miran solo las expresiones que la sentencia calcula una vez cada vez que
+corre: los argumentos de un comando o una llamada, el valor de un
+INIC/HAZ/INC, la condición de un SI y la cuenta de un REPITE. La
+condición de un MIENTRAS o de HAZ.HASTA se calcula en cada vuelta y los
+bloques de adentro son otros bloques. Como la sentencia ya calculaba la
+expresión, calcularla justo antes no agrega nada que pueda fallar (una
+división por cero, por ejemplo).
+
+Se elige la expresión más grande que se repite: si (a + b) * c aparece
+dos veces, a + b no hace falta aparte. Una variable nueva cuesta un
+store y un load, así que solo salen expresiones de al menos un operador
+con dos operandos y alguna variable (lo de solo números es de "fold").
+
+Los recorridos son generadores (frontend/visitor.py) o pilas explícitas:
+no hay recursión de Python.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+from frontend import visitor
+from frontend.ast import Node
+from frontend.callgraph import build_call_graph
+from frontend.resolver import resolve
+from optimizer.ASTUtils import Pass, Effects, ANY_GLOBAL, BLOCKS, num_value, rebuild
+
+# sentencias cuyos hijos no son expresiones
+_OPAQUE = frozenset(("PONCL", "PARAMS", "EMPTY", "PARA", "PROGRAM", "STMTS",
+                     "MIENTRAS", "HAZ_HASTA", "HAZ_MIENTRAS", "EJECUTA"))
+_PURE = frozenset(("BINOP", "POW", "NEG"))
+_COMMUTATIVE = frozenset(("+", "*"))
+
+# info de un subárbol puro: (clave, ¿tiene variables?, tamaño)
+Info = Tuple[int, bool, int]
+
+
+class CommonSubexpressionElimination(Pass):
+    name = "cse"
+    description = "subexpresiones comunes"
+
+    PREFIX = "_cse"
+
+    def __init__(self):
+        super().__init__()
+        self.effects: Optional[Effects] = None
+        self.keys: Dict[tuple, int] = {}
+        self._next = 0
+
+    def run(self, root: Node) -> Node:
+        if root is None:
+            return None
+        resolve(root)
+        self.effects = Effects(build_call_graph(root))
+        self.keys = {}
+        self._next = _first_free(root, self.PREFIX)
+        return visitor.run(self._stmt(root))
+
+    def fresh(self) -> str:
+        name = f"{self.PREFIX}{self._next}"
+        self._next += 1
+        return name
+
+    def key(self, t: tuple) -> int:
+        k = self.keys.get(t)
+        if k is None:
+            k = self.keys[t] = len(self.keys)
+        return k
+
+    # =====================================================
+    # SENTENCIAS
+    # =====================================================
+
+    def _stmt(self, node: Node):
+        self.visited += 1
+        k = node.kind
+        if k == "PARA":
+            ch = node.children
+            if len(ch) < 3 or ch[1].kind != "PARAMS":
+                return node
+            body = yield self._stmt(ch[2])
+            return rebuild(node, [ch[0], ch[1], body, *ch[3:]])
+        if k in ("PROGRAM", "STMTS"):
+            return (yield self._block(node))
+        blocks = BLOCKS.get(k, ())
+        if not blocks or (k == "EJECUTA" and node.children and node.children[0].kind == "ID"):
+            return node
+        out = list(node.children)
+        for i in blocks:
+            if i < len(out) and out[i] is not None:
+                out[i] = yield self._stmt(out[i])
+        return rebuild(node, out)
+
+    def _block(self, node: Node):
+        """Primero los bloques de adentro (cada uno es su propia región),
+        después las expresiones de las sentencias de este."""
+        out = []
+        for c in node.children:
+            out.append(c if c is None else (yield self._stmt(c)))
+        stmts = _Region(self).rewrite(out)
+        if len(stmts) == len(node.children):
+            return rebuild(node, stmts)
+        return Node(node.kind, node.value, stmts, node.line)
+
+
+class _Region:
+    """Las subexpresiones comunes de una lista de sentencias."""
+
+    def __init__(self, owner: CommonSubexpressionElimination):
+        self.owner = owner
+        self.effects = owner.effects
+        self.version: Dict[Tuple[int, int], int] = {}   # dirección -> modificaciones
+        self.epoch = 0          # llamadas que pueden modificar cualquier global
+        self.names: Dict[int, str] = {}                 # clave elegida -> variable
+
+    def rewrite(self, stmts: List[Node]) -> List[Node]:
+        # 1) claves de cada sentencia y apariciones de cada clave
+        infos: List[Dict[int, Optional[Info]]] = []
+        count: Dict[int, int] = {}
+        first: Dict[int, Tuple[int, int, Node]] = {}    # clave -> (sentencia, tamaño, nodo)
+        for i, s in enumerate(stmts):
+            memo: Dict[int, Optional[Info]] = {}
+            infos.append(memo)
+            if s is None:
+                continue
+            roots = _roots(s)
+            for r in roots:
+                self._info(r, memo)
+            # de arriba abajo: una expresión que ya apareció no se abre (lo
+            # de adentro lo cubre su variable)
+            stack = list(roots)
+            while stack:
+                n = stack.pop()
+                if n is None:
+                    continue
+                info = memo.get(id(n))
+                if info is not None and n.kind in _PURE and info[1] and info[2] >= 3:
+                    c = count.get(info[0], 0)
+                    count[info[0]] = c + 1
+                    if c:
+                        continue
+                    first[info[0]] = (i, info[2], n)
+                stack.extend(n.children)
+            self._kill(self.effects.of(s))
+        chosen = sorted((first[k] for k, c in count.items() if c > 1), key=lambda f: (f[0], f[1]))
+        if not chosen:
+            return stmts
+        # 2) INIC de cada variable antes de su primera sentencia (las de
+        # adentro primero) y las apariciones reemplazadas
+        inits: Dict[int, List[Node]] = {}
+        for i, _, n in chosen:
+            memo = infos[i]
+            key = memo[id(n)][0]
+            value = self._replace(n, memo, False)
+            name = self.names[key] = self.owner.fresh()
+            inits.setdefault(i, []).append(Node("INIC", None, [Node("ID", name, [], n.line), value], n.line))
+        out = []
+        for i, s in enumerate(stmts):
+            out.extend(inits.get(i, ()))
+            if s is not None:
+                roots = _roots(s)
+                s = _with_roots(s, [self._replace(r, infos[i], True) for r in roots]) if roots else s
+            out.append(s)
+        return out
+
+    def _kill(self, mods):
+        version = self.version
+        for addr in mods:
+            if addr == ANY_GLOBAL:
+                self.epoch += 1
+            else:
+                version[addr] = version.get(addr, 0) + 1
+
+    # =====================================================
+    # EXPRESIONES
+    # =====================================================
+
+    def _info(self, node: Node, memo: Dict[int, Optional[Info]]):
+        """Llena `memo` (id del nodo -> Info, o None si no es puro) en
+        post-orden con pila explícita."""
+        if node is None or id(node) in memo:
+            return
+        stack = [(node, False)]
+        while stack:
+            n, ready = stack.pop()
+            ch = n.children
+            if not ready:
+                if ch:
+                    stack.append((n, True))
+                    stack.extend((c, False) for c in ch if c is not None and id(c) not in memo)
+                else:
+                    memo[id(n)] = self._leaf(n)
+                continue
+            self.owner.visited += 1
+            infos = [None if c is None else memo[id(c)] for c in ch]
+            k = n.kind
+            if k not in _PURE or None in infos or len(infos) != (1 if k == "NEG" else 2):
+                memo[id(n)] = None
+                continue
+            keys = [info[0] for info in infos]
+            if k == "BINOP" and n.value in _COMMUTATIVE:
+                keys.sort()
+            memo[id(n)] = (self.owner.key((k, n.value, *keys)), any(info[1] for info in infos),
+                           1 + sum(info[2] for info in infos))
+
+    def _leaf(self, node: Node) -> Optional[Info]:
+        self.owner.visited += 1
+        k = node.kind
+        if k == "NUM":
+            v = num_value(node)
+            return None if v is None else (self.owner.key(("NUM", v)), False, 1)
+        if k == "ID":
+            addr = node.addr
+            if addr is None:
+                return None
+            epoch = self.epoch if addr[0] == 0 else 0
+            return (self.owner.key(("ID", addr, self.version.get(addr, 0), epoch)), True, 1)
+        return None
+
+    def _replace(self, node: Node, memo: Dict[int, Optional[Info]], whole: bool) -> Node:
+        """`node` con cada subexpresión elegida cambiada por su variable;
+        `whole`: también el nodo mismo (no, para el valor de su INIC)."""
+        if node is None:
+            return None
+        if whole:
+            sub = self._sub(node, memo)
+            if sub is not None:
+                return sub
+        if not node.children:
+            return node
+        stack = [[node, 0, []]]
+        while True:
+            top = stack[-1]
+            n, i, res = top
+            ch = n.children
+            if i < len(ch):
+                top[1] = i + 1
+                c = ch[i]
+                sub = None if c is None else self._sub(c, memo)
+                if sub is not None:
+                    res.append(sub)
+                elif c is not None and c.children:
+                    stack.append([c, 0, []])
+                else:
+                    res.append(c)
+                continue
+            stack.pop()
+            new = rebuild(n, res)
+            if not stack:
+                return new
+            stack[-1][2].append(new)
+
+    def _sub(self, node: Node, memo) -> Optional[Node]:
+        info = memo.get(id(node))
+        name = None if info is None else self.names.get(info[0])
+        if name is None:
+            return None
+        self.owner.rewrites += 1
+        return Node("ID", name, [], node.line)
+
+
+def _roots(stmt: Node) -> List[Node]:
+    """Las expresiones que la sentencia calcula una vez cada vez que corre."""
+    k = stmt.kind
+    ch = stmt.children
+    if k in _OPAQUE or not ch:
+        return []
+    if k in ("REPITE", "SI"):
+        return [ch[0]]
+    if k == "CALL" and stmt.value is None:
+        return list(ch[1].children) if len(ch) > 1 and ch[1] is not None else []
+    if k in ("INIC", "HAZ", "INC"):
+        return list(ch[1:])
+    return list(ch)
+
+
+def _with_roots(stmt: Node, roots: List[Node]) -> Node:
+    """La sentencia con las expresiones de _roots() cambiadas."""
+    k = stmt.kind
+    ch = stmt.children
+    if k in ("REPITE", "SI"):
+        return rebuild(stmt, [roots[0], *ch[1:]])
+    if k == "CALL" and stmt.value is None:
+        return rebuild(stmt, [ch[0], rebuild(ch[1], roots), *ch[2:]])
+    if k in ("INIC", "HAZ", "INC"):
+        return rebuild(stmt, [ch[0], *roots])
+    return rebuild(stmt, roots)
+
+
+def _first_free(root: Node, prefix: str) -> int:
+    """Primer número libre para las variables `prefix`N (por si el árbol ya
+    pasó por este pase)."""
+    top = -1
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if n.kind == "ID" and isinstance(n.value, str) and n.value.startswith(prefix):
+            tail = n.value[len(prefix):]
+            if tail.isdigit():
+                top = max(top, int(tail))
+        stack.extend(c for c in n.children if c is not None)
+    return top + 1
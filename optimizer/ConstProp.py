@@ -0,0 +1,307 @@
+# optimizer/ConstProp.py
+"""
+Propagación de constantes sensible al flujo.
+
+Recorre las sentencias en orden de ejecución llevando un entorno
+dirección -> valor con las variables cuyo valor se conoce en ese punto
+(las direcciones son las del resolver, así que una local de un PARA y una
+global con el mismo nombre no se confunden):
+
+- INIC x = e fija x si e se conoce; HAZ/INC x [e] suman e (1 si falta),
+  como el código generado. Si algo no se conoce, x se olvida.
+- SI con condición conocida sigue solo la rama que corre; si no, analiza
+  las dos por separado y se queda con lo que coincide.
+- Un bucle olvida al entrar todo lo que modifica su cuerpo (incluidas las
+  globales que modifican los procedimientos que llama), así el cuerpo y la
+  condición se analizan con lo que vale en cualquier vuelta. Al salir:
+  REPITE n >= 1, HAZ.HASTA y HAZ.MIENTRAS quedan con lo del final del
+  cuerpo (corren al menos una vez); MIENTRAS y REPITE de cuenta
+  desconocida lo combinan con lo de la entrada. REPITE n <= 0 y MIENTRAS
+  con condición falsa no corren.
+- Una llamada olvida las globales que puede modificar el procedimiento
+  (todas, si no está definido).
+- El cuerpo de un PARA se analiza aparte, sin saber nada de sus
+  parámetros ni de las globales.
+
+Cada uso de una variable conocida se reemplaza por NUM, y una expresión
+aritmética que queda conocida por eso se reemplaza entera por su valor.
+Los valores se calculan en i32 como el código generado (ASTUtils), no con
+la aritmética de Python del plegado de constantes: (x / 2) * 2 con x = 5
+da 4. Las expresiones solo de literales las deja para "fold", y las
+condiciones quedan con sus operandos sustituidos para que "fold" y "dce"
+las resuelvan.
+
+Los recorridos son generadores (frontend/visitor.py): no hay recursión de
+Python ni en sentencias ni en expresiones.
+"""
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+
+from frontend import visitor
+from frontend.ast import Node
+from frontend.resolver import resolve
+from frontend.callgraph import build_call_graph
+from optimizer.ASTUtils import (Pass, Effects, rebuild, kill, num_value, wrap_i32,
+                                binop_i32, pow_i32, relop, truthy)
+
+Env = Dict[Tuple[int, int], int]
+
+# sentencias cuyos hijos no son expresiones a sustituir
+_OPAQUE = frozenset(("PONCL", "PARAMS", "EMPTY"))
+
+
+class ConstantPropagation(Pass):
+    name = "constprop"
+    description = "propagación de constantes"
+
+    def __init__(self):
+        super().__init__()
+        self.effects: Optional[Effects] = None
+        self._handlers = {
+            "PROGRAM": self._block, "STMTS": self._block,
+            "INIC": self._inic, "HAZ": self._add, "INC": self._add,
+            "SI": self._si, "REPITE": self._repite, "MIENTRAS": self._mientras,
+            "HAZ_HASTA": self._haz_loop, "HAZ_MIENTRAS": self._haz_loop,
+            "EJECUTA": self._ejecuta, "CALL": self._call, "PARA": self._para,
+        }
+
+    def run(self, root: Node) -> Node:
+        if root is None:
+            return None
+        resolve(root)
+        self.effects = Effects(build_call_graph(root))
+        return visitor.run(self._stmt(root, {}))
+
+    # =====================================================
+    # SENTENCIAS
+    # =====================================================
+
+    def _stmt(self, node: Node, env: Env):
+        """El nodo nuevo, o un generador que lo devuelve. Deja en `env` el
+        estado después de la sentencia."""
+        if node is None:
+            return None
+        self.visited += 1
+        handler = self._handlers.get(node.kind)
+        if handler is not None:
+            return handler(node, env)
+        if node.kind in _OPAQUE or not node.children:
+            return node
+        # comando con argumentos (AV, PONPOS, ESPERA, ...)
+        return rebuild(node, [self._expr(c, env)[0] for c in node.children])
+
+    def _block(self, node: Node, env: Env):
+        out = []
+        for c in node.children:
+            out.append((yield self._stmt(c, env)))
+        return rebuild(node, out)
+
+    def _inic(self, node: Node, env: Env):
+        ch = node.children
+        if len(ch) < 2:
+            return node
+        expr, v = self._expr(ch[1], env)
+        addr = ch[0].addr
+        if addr is not None:
+            if v is None or v.__class__ is bool:
+                env.pop(addr, None)
+            else:
+                env[addr] = v
+        return rebuild(node, [ch[0], expr, *ch[2:]])
+
+    def _add(self, node: Node, env: Env):
+        # HAZ x e e INC x [e]: x += e (1 si no hay expresión)
+        ch = node.children
+        if not ch:
+            return node
+        if len(ch) > 1:
+            expr, v = self._expr(ch[1], env)
+            node = rebuild(node, [ch[0], expr, *ch[2:]])
+        else:
+            v = 1
+        addr = ch[0].addr
+        if addr is not None:
+            cur = env.get(addr)
+            if cur is None or v is None or v.__class__ is bool:
+                env.pop(addr, None)
+            else:
+                env[addr] = wrap_i32(cur + v)
+        return node
+
+    def _si(self, node: Node, env: Env):
+        ch = node.children
+        if len(ch) < 2:
+            return node
+        cond, c = self._cond(ch[0], env)
+        then, other = ch[1], (ch[2] if len(ch) > 2 else None)
+        if c is True:
+            then = yield self._stmt(then, env)
+        elif c is False:
+            if other is not None:
+                other = yield self._stmt(other, env)
+        else:
+            alt = dict(env)
+            then = yield self._stmt(then, env)
+            if other is not None:
+                other = yield self._stmt(other, alt)
+            _merge(env, alt)
+        return rebuild(node, [cond, then] if other is None else [cond, then, other])
+
+    def _repite(self, node: Node, env: Env):
+        ch = node.children
+        if len(ch) < 2:
+            return node
+        count, n = self._expr(ch[0], env)   # se evalúa una vez, antes del bucle
+        if n is not None and n <= 0:
+            return rebuild(node, [count, ch[1]])
+        entry = dict(env)
+        kill(env, self.effects.of(ch[1]))
+        body = yield self._stmt(ch[1], env)
+        if n is None:
+            _merge(env, entry)
+        return rebuild(node, [count, body])
+
+    def _mientras(self, node: Node, env: Env):
+        ch = node.children
+        if len(ch) < 2:
+            return node
+        entry = dict(env)
+        kill(env, self.effects.of(ch[1]))
+        cond, c = self._cond(ch[0], env)
+        if c is False:
+            env.update(entry)
+            return rebuild(node, [cond, ch[1]])
+        body = yield self._stmt(ch[1], env)
+        _merge(env, entry)
+        return rebuild(node, [cond, body])
+
+    def _haz_loop(self, node: Node, env: Env):
+        # HAZ.HASTA / HAZ.MIENTRAS: el cuerpo corre al menos una vez y la
+        # condición se evalúa al final de cada vuelta
+        ch = node.children
+        if len(ch) < 2:
+            return node
+        kill(env, self.effects.of(ch[0]))
+        body = yield self._stmt(ch[0], env)
+        cond, _ = self._cond(ch[1], env)
+        return rebuild(node, [body, cond])
+
+    def _ejecuta(self, node: Node, env: Env):
+        ch = node.children
+        if not ch:
+            return node
+        if ch[0].kind == "ID":                  # EJECUTA nombre: una llamada
+            kill(env, self.effects.call(str(ch[0].value)))
+            return node
+        block = yield self._stmt(ch[0], env)
+        return rebuild(node, [block, *ch[1:]])
+
+    def _call(self, node: Node, env: Env):
+        ch = node.children
+        if node.value is not None or not ch:   # AZAR & cía. como sentencia
+            return rebuild(node, [self._expr(c, env)[0] for c in ch])
+        out = list(ch)
+        if len(ch) > 1 and ch[1] is not None:
+            out[1] = rebuild(ch[1], [self._expr(a, env)[0] for a in ch[1].children])
+        kill(env, self.effects.call(str(ch[0].value)))
+        return rebuild(node, out)
+
+    def _para(self, node: Node, env: Env):
+        ch = node.children
+        if len(ch) < 3 or ch[1].kind != "PARAMS":
+            return node
+        body = yield self._stmt(ch[2], {})
+        return rebuild(node, [ch[0], ch[1], body, *ch[3:]])
+
+    # =====================================================
+    # EXPRESIONES
+    # =====================================================
+
+    def _cond(self, node: Node, env: Env):
+        expr, v = self._expr(node, env)
+        return expr, (None if v is None else truthy(v))
+
+    def _expr(self, node: Node, env: Env):
+        """(expresión sustituida, valor o None). Post-orden con pila
+        explícita; las hojas se resuelven sin apilarse."""
+        ch = node.children
+        if not ch:
+            return self._leaf(node, env)
+        for c in ch:
+            if c is None or c.children:
+                break
+        else:                               # solo hojas: lo más común
+            return self._combine(node, [self._leaf(c, env) for c in ch])
+        stack = [[node, 0, []]]     # nodo, próximo hijo, resultados de los hijos
+        while True:
+            top = stack[-1]
+            n, i, res = top
+            ch = n.children
+            if i < len(ch):
+                top[1] = i + 1
+                c = ch[i]
+                if c is None:
+                    res.append((None, None))
+                elif c.children:
+                    stack.append([c, 0, []])
+                else:
+                    res.append(self._leaf(c, env))
+                continue
+            stack.pop()
+            out = self._combine(n, res)
+            if not stack:
+                return out
+            stack[-1][2].append(out)
+
+    def _leaf(self, node: Node, env: Env):
+        self.visited += 1
+        k = node.kind
+        if k == "NUM":
+            return node, num_value(node)
+        if k == "ID":
+            addr = node.addr
+            v = env.get(addr) if addr is not None else None
+            if v is None:
+                return node, None
+            self.rewrites += 1
+            return Node("NUM", v, [], node.line), v
+        if k == "BOOL":
+            return node, bool(node.value)
+        return node, None
+
+    def _combine(self, node: Node, res):
+        self.visited += 1
+        k = node.kind
+        vals = [v for _, v in res]
+        v = None
+        if None not in vals:
+            if k == "BINOP" and len(vals) == 2 and not _has_bool(vals):
+                v = binop_i32(str(node.value), vals[0], vals[1])
+            elif k == "NEG" and len(vals) == 1 and not _has_bool(vals):
+                v = wrap_i32(-vals[0])
+            elif k == "POW" and len(vals) == 2 and not _has_bool(vals):
+                v = pow_i32(vals[0], vals[1])
+            elif k == "RELOP" and len(vals) == 2 and not _has_bool(vals):
+                v = relop(str(node.value), vals[0], vals[1])
+            elif k == "BOOLBIN" and len(vals) == 2:
+                op = str(node.value).upper()
+                if op == "Y":
+                    v = truthy(vals[0]) and truthy(vals[1])
+                elif op == "O":
+                    v = truthy(vals[0]) or truthy(vals[1])
+        new = rebuild(node, [c for c, _ in res])
+        if v is not None and new is not node and k in ("BINOP", "NEG", "POW"):
+            # algún operando era una variable conocida: la expresión entera
+            # se reemplaza por su valor i32
+            self.rewrites += 1
+            return Node("NUM", v, [], node.line), v
+        return new, v
+
+
+def _has_bool(vals) -> bool:
+    return any(v.__class__ is bool for v in vals)
+
+def _merge(env: Env, other: Env):
+    """env <- lo que vale igual en env y en other."""
+    for addr in [a for a, v in env.items() if other.get(a) != v]:
+        del env[addr]
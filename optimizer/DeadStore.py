@@ -0,0 +1,377 @@
+# optimizer/DeadStore.py
+"""
+Stores muertos y variables sin usar ("dse").
+
+Después de "constprop" muchas variables ya no se leen (cada uso quedó como
+NUM), pero el código generado igual les hace un alloca y un store, y
+calcula su valor. Este pase recorre cada lista de sentencias de atrás
+hacia adelante llevando las variables vivas (las que algo puede leer antes
+de que un INIC las vuelva a escribir) y saca las escrituras que nadie lee:
+
+    INIC lado = 2  AV 2  GD 90        ->  AV 2  GD 90
+    INIC x = AZAR 10  AV 5            ->  EVAL [AZAR 10]  AV 5
+
+- INIC x = e escribe x sin leerla. HAZ x e e INC x [e] en el código
+  generado suman (x := x + e), así que también la leen: un INIC seguido de
+  un HAZ no está muerto, pero si x no se lee después se van los dos (el
+  HAZ en una corrida, el INIC en la siguiente).
+- Un SI junta lo vivo de sus dos ramas. Al final del cuerpo de un bucle
+  está vivo lo de después del bucle, lo que lee la condición y lo que el
+  cuerpo lee antes de volver a escribirlo con un INIC (la vuelta
+  siguiente): es el punto fijo, sin iterar. Para eso un bucle de adentro
+  cuenta como si leyera todo lo que lee en alguna parte.
+- Una llamada lee las globales que lee el procedimiento, directamente o
+  por los que llama (todas, si no está definido). Al terminar el cuerpo de
+  un PARA siguen vivas todas las globales; sus locales no.
+- Lo que el valor tiene que hacer igual se queda: las llamadas a AZAR (cada
+  una es un comando al runtime) pasan a una sentencia EVAL, que las evalúa
+  y descarta el resultado.
+
+El INIC, HAZ o INC que declara la variable (su primera aparición en el
+texto, como la ve frontend/resolver.py) no se puede borrar si la variable
+aparece en otro lado: un PARA de más adelante solo ve las globales
+declaradas antes, y dentro de un PARA sin el INIC una variable con el
+nombre de una global pasaría a ser la global. Esa escritura queda como
+INIC x = 0. Una variable que no se lee nunca desaparece con todos sus INIC.
+
+`rewrites` cuenta los stores muertos: los que se sacaron (INIC, HAZ o INC)
+y los que declaran y quedaron en 0. El pase corre hasta que una vuelta no
+cambia nada.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from frontend import visitor
+from frontend.ast import Node
+from frontend.callgraph import CallGraph, build_call_graph
+from frontend.resolver import resolve
+from optimizer.ASTUtils import Pass, ANY_GLOBAL, ASSIGNS, LOOPS, rebuild
+
+MAX_ROUNDS = 8      # vueltas como máximo (cada una saca una capa)
+
+Addr = Tuple[int, int]
+
+
+class DeadStoreElimination(Pass):
+    name = "dse"
+    description = "stores muertos y variables sin usar"
+
+    def __init__(self):
+        super().__init__()
+        self.procs: Dict[str, Set[Addr]] = {}
+        self.reads: Dict[object, int] = {}      # variable -> lecturas
+        self.first: Dict[object, int] = {}      # variable -> id del ID que la declara
+        self._owner: Optional[Node] = None      # el PARA que se está recorriendo
+        self._memo: Dict[int, frozenset] = {}     # bucle -> lo que lee
+        self._blocks: Dict[int, tuple] = {}     # bloque -> _exposed()
+
+    def run(self, root: Node) -> Node:
+        if root is None:
+            return None
+        for _ in range(MAX_ROUNDS):
+            before = self.rewrites
+            resolve(root)
+            self.procs = proc_reads(build_call_graph(root))
+            self._references(root)
+            self._owner = None
+            self._memo = {}
+            self._blocks = {}
+            root, _ = visitor.run(self._stmt(root, set()))
+            if self.rewrites == before:
+                break
+        return root
+
+    def _var(self, addr: Addr):
+        """Clave de una variable: las locales de PARA distintos tienen las
+        mismas direcciones."""
+        return addr if addr[0] == 0 else (id(self._owner), addr)
+
+    # =====================================================
+    # REFERENCIAS
+    # =====================================================
+
+    def _references(self, root: Node):
+        """Cuenta las lecturas de cada variable y anota la primera aparición
+        de cada una, en el orden del resolver (el valor de un INIC/HAZ
+        antes que la variable; en INC la variable primero)."""
+        reads: Dict[object, int] = {}
+        first: Dict[object, int] = {}
+        stack: list = [(root, None, False)]
+        while stack:
+            n, owner, target = stack.pop()
+            if n is None:
+                continue
+            k = n.kind
+            if k == "ID":
+                if n.addr is not None:
+                    var = n.addr if n.addr[0] == 0 else (id(owner), n.addr)
+                    first.setdefault(var, id(n))
+                    if target != "INIC":
+                        reads[var] = reads.get(var, 0) + 1
+                continue
+            ch = n.children
+            if k == "PARA":
+                if len(ch) >= 3 and ch[1].kind == "PARAMS":
+                    stack.append((ch[2], n, False))
+                    stack.extend((p, n, "INIC") for p in reversed(ch[1].children))
+                continue
+            if k in ("INIC", "HAZ") and ch:
+                stack.append((ch[0], owner, k))
+                stack.extend((c, owner, False) for c in reversed(ch[1:]))
+                continue
+            if k == "INC" and ch:
+                stack.extend((c, owner, False) for c in reversed(ch[1:]))
+                stack.append((ch[0], owner, k))
+                continue
+            if k == "CALL" and n.value is None or k == "EJECUTA" and ch and ch[0].kind == "ID":
+                ch = ch[1:]
+            stack.extend((c, owner, False) for c in reversed(ch))
+        self.reads, self.first = reads, first
+
+    # =====================================================
+    # SENTENCIAS (de atrás hacia adelante)
+    # =====================================================
+
+    def _stmt(self, node: Node, live: Set):
+        """(sentencia nueva, vivas antes de ella). La sentencia puede ser
+        None (se borró) o una lista (se reemplazó por varias)."""
+        if node is None:
+            return None, live
+        self.visited += 1
+        k = node.kind
+        ch = node.children
+        if k in ("PROGRAM", "STMTS"):
+            return (yield self._block(node, live))
+        if k == "PARA":
+            if len(ch) < 3 or ch[1].kind != "PARAMS":
+                return node, live
+            outer, self._owner = self._owner, node
+            body, _ = yield self._stmt(ch[2], {ANY_GLOBAL})
+            self._owner = outer
+            return rebuild(node, [ch[0], ch[1], _as_block(body, ch[2]), *ch[3:]]), live
+        if k in ASSIGNS:
+            return self._assign(node, live)
+        if k == "SI" and len(ch) >= 2:
+            then, then_live = yield self._stmt(ch[1], live)
+            out = [ch[0], _as_block(then, ch[1])]
+            if len(ch) > 2 and ch[2] is not None:
+                other, live = yield self._stmt(ch[2], live)
+                out.append(_as_block(other, ch[2]))
+            return rebuild(node, out), _uses(ch[0], then_live | live)
+        if k in LOOPS and len(ch) >= 2:
+            # al final del cuerpo está vivo lo de después del bucle, la
+            # condición y lo que el cuerpo lee antes de escribirlo (la
+            # próxima vuelta)
+            i, cond = (0, 1) if k in ("HAZ_HASTA", "HAZ_MIENTRAS") else (1, 0)
+            exposed, _ = yield self._exposed(ch[i])
+            end = live | exposed
+            if k != "REPITE":
+                end = _uses(ch[cond], end)
+            body, start = yield self._stmt(ch[i], end)
+            out = list(ch)
+            out[i] = _as_block(body, ch[i])
+            before = end | start
+            return rebuild(node, out), _uses(ch[0], before) if k == "REPITE" else before
+        if k == "EJECUTA" and ch and ch[0].kind != "ID":
+            body, live = yield self._stmt(ch[0], live)
+            return rebuild(node, [_as_block(body, ch[0]), *ch[1:]]), live
+        if k == "EJECUTA" and ch:
+            return node, live | self.procs.get(str(ch[0].value), {ANY_GLOBAL})
+        if k == "CALL" and node.value is None and ch:
+            live = live | self.procs.get(str(ch[0].value), {ANY_GLOBAL})
+            return node, _uses(ch[1:], live)
+        return node, _uses(ch, live)
+
+    def _block(self, node: Node, live: Set):
+        out = []
+        changed = False
+        for c in reversed(node.children):
+            new, live = yield self._stmt(c, live)
+            if new.__class__ is list:
+                out.extend(reversed(new))
+                changed = True
+            elif new is not None:
+                out.append(new)
+                changed |= new is not c
+            else:
+                changed = True
+        if not changed:
+            return node, live
+        out.reverse()
+        return Node(node.kind, node.value, out, node.line), live
+
+    def _assign(self, node: Node, live: Set):
+        ch = node.children
+        ident = ch[0]
+        addr = ident.addr
+        if addr is None or addr in live or (addr[0] == 0 and ANY_GLOBAL in live):
+            if node.kind != "INIC":
+                live = live | {addr}
+            elif addr is not None:
+                live = live - {addr}
+            return node, _uses(ch[1:], live)
+        # nadie lee lo que escribe
+        var = self._var(addr)
+        calls = [c for e in ch[1:] for c in _calls(e)]
+        keep = [Node("EVAL", None, calls, node.line)] if calls else []
+        live = _uses(calls, live)
+        if self.first.get(var) == id(ident) and self.reads.get(var, 0):
+            # declara una variable que se usa en otro lado: queda el INIC
+            if node.kind == "INIC" and len(ch) == 2 and not ch[1].children and not calls:
+                return node, _uses(ch[1:], live)
+            self.rewrites += 1
+            return keep + [Node("INIC", None, [ident, Node("NUM", 0, [], node.line)], node.line)], live
+        self.rewrites += 1
+        return keep or None, live
+
+    def _exposed(self, node: Node):
+        """(variables que `node` puede leer antes de escribirlas con un
+        INIC, variables que escribe seguro con un INIC). Sin reescribir
+        nada; de un bucle de adentro cuenta todo lo que lee."""
+        if node is None:
+            return frozenset(), frozenset()
+        k = node.kind
+        ch = node.children
+        if k in ("PROGRAM", "STMTS"):
+            hit = self._blocks.get(id(node))
+            if hit is None:
+                reads, writes = frozenset(), frozenset()
+                for c in reversed(ch):
+                    r, w = yield self._exposed(c)
+                    reads = r | (reads - w)
+                    writes = writes | w
+                hit = self._blocks[id(node)] = (reads, writes)
+            return hit
+        if k == "PARA":
+            return frozenset(), frozenset()
+        if k in ASSIGNS and ch:
+            addr = ch[0].addr
+            if k != "INIC":
+                return frozenset(_uses(ch, set())), frozenset()
+            return frozenset(_uses(ch[1:], set())), frozenset(() if addr is None else (addr,))
+        if k == "SI" and len(ch) >= 2:
+            r, w = yield self._exposed(ch[1])
+            if len(ch) > 2 and ch[2] is not None:
+                r2, w2 = yield self._exposed(ch[2])
+                r, w = r | r2, w & w2
+            else:
+                w = frozenset()
+            return frozenset(_uses(ch[0], r)), w
+        if k in LOOPS:
+            return self._loop_reads(node), frozenset()
+        if k == "EJECUTA" and ch and ch[0].kind != "ID":
+            return (yield self._exposed(ch[0]))
+        if k == "EJECUTA" and ch:
+            return frozenset(self.procs.get(str(ch[0].value), {ANY_GLOBAL})), frozenset()
+        if k == "CALL" and node.value is None and ch:
+            reads = self.procs.get(str(ch[0].value), {ANY_GLOBAL})
+            return frozenset(_uses(ch[1:], set(reads))), frozenset()
+        return frozenset(_uses(ch, set())), frozenset()
+
+    def _loop_reads(self, loop: Node) -> frozenset:
+        """Variables que el bucle puede leer en alguna vuelta (las
+        globales que leen los procedimientos que llama incluidas)."""
+        hit = self._memo.get(id(loop))
+        if hit is not None:
+            return hit
+        out: Set = set()
+        stack = [loop]
+        while stack:
+            n = stack.pop()
+            if n is None:
+                continue
+            k = n.kind
+            ch = n.children
+            if k == "ID":
+                if n.addr is not None:
+                    out.add(n.addr)
+                continue
+            if k == "PARA":
+                continue
+            if k in LOOPS and n is not loop and id(n) in self._memo:
+                out |= self._memo[id(n)]
+                continue
+            if k == "INIC" and ch:
+                ch = ch[1:]
+            elif (k == "CALL" and n.value is None or k == "EJECUTA" and ch and ch[0].kind == "ID") and ch:
+                out |= self.procs.get(str(ch[0].value), {ANY_GLOBAL})
+                ch = ch[1:]
+            stack.extend(ch)
+        hit = self._memo[id(loop)] = frozenset(out)
+        return hit
+
+
+def proc_reads(graph: CallGraph) -> Dict[str, Set[Addr]]:
+    """Globales que puede leer cada procedimiento, directamente o por los
+    que llama (como ASTUtils.proc_effects con las escrituras)."""
+    reads: Dict[str, Set[Addr]] = {}
+    for scc in graph.sccs:
+        out: Set[Addr] = set()
+        for info in scc:
+            out |= {a for a in _direct_reads(info.node.children[2]) if a[0] == 0}
+            for callee in info.callees:
+                if callee not in graph.procs:
+                    out.add(ANY_GLOBAL)
+                elif callee in reads:
+                    out |= reads[callee]
+        for info in scc:
+            reads[info.name] = out
+    return reads
+
+
+def _direct_reads(body: Node) -> Iterable[Addr]:
+    stack = [body]
+    while stack:
+        n = stack.pop()
+        if n is None or n.kind == "PARA":
+            continue
+        if n.kind == "ID":
+            if n.addr is not None:
+                yield n.addr
+            continue
+        stack.extend(n.children[1:] if n.kind == "INIC" else n.children)
+
+
+def _uses(exprs: Iterable[Node], live: Set) -> Set:
+    """`live` más las variables que leen las expresiones."""
+    if isinstance(exprs, Node):
+        exprs = (exprs,)
+    out = None
+    stack = list(exprs)
+    while stack:
+        n = stack.pop()
+        if n is None:
+            continue
+        if n.kind == "ID":
+            if n.addr is not None and n.addr not in live:
+                if out is None:
+                    out = set(live)
+                out.add(n.addr)
+            continue
+        stack.extend(n.children)
+    return live if out is None else out
+
+
+def _calls(expr: Node) -> List[Node]:
+    """Las llamadas de la expresión (AZAR, ...), en el orden en que se
+    evalúan; una llamada dentro de los argumentos de otra va con ella."""
+    out = []
+    stack = [expr]
+    while stack:
+        n = stack.pop()
+        if n is None:
+            continue
+        if n.kind == "CALL":
+            out.append(n)
+            continue
+        stack.extend(reversed(n.children))
+    return out
+
+
+def _as_block(new, old: Node) -> Node:
+    """Lo que dejó _stmt() en el lugar de un bloque."""
+    if new is None:
+        return Node("STMTS", None, [], old.line)
+    if new.__class__ is list:
+        return Node("STMTS", None, new, old.line)
+    return new
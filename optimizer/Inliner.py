@@ -0,0 +1,357 @@
+# optimizer/Inliner.py
+"""
+Inlining y especialización de procedimientos (PARA).
+
+Cada llamada a un PARA es una llamada de LLVM con un alloca por parámetro
+y por local; los programas de figuras llaman miles de veces a
+procedimientos de dos o tres comandos. Guiado por el grafo de llamadas
+(frontend/callgraph.py):
+
+- Inlining: una llamada a un procedimiento no recursivo cuyo cuerpo tiene
+  a lo sumo INLINE_BUDGET nodos se reemplaza por el cuerpo. Los parámetros
+  pasan a ser variables nuevas inicializadas con los argumentos, en orden
+  (INIC lado.i3 = <arg>), y las locales del cuerpo se renombran igual; las
+  globales quedan con su nombre.
+- Especialización: una llamada que no se expande y tiene argumentos
+  numéricos constantes pasa a llamar a un clon del procedimiento sin esos
+  parámetros, que empieza con INIC parámetro = valor. El clon se define
+  justo después del original y sirve para todas las llamadas con los
+  mismos valores (a lo sumo MAX_CLONES por procedimiento). Así
+  "constprop", "fold", "dce" y "peephole" trabajan sobre el cuerpo con
+  los valores conocidos; también vale para procedimientos recursivos (las
+  llamadas de adentro del clon siguen yendo al original, y si quedan
+  constantes se especializan en la ronda siguiente).
+
+Los nombres nuevos (lado.i3, cuadro.k1) no los acepta el lexer (un
+número después del punto), así que no chocan con nada del programa.
+
+El cuerpo expandido tiene que significar lo mismo donde se pega, así que
+una llamada se expande solo si:
+
+- viene después del PARA en el orden en que el resolver recorre el
+  programa (las globales que ve el cuerpo ya están declaradas ahí);
+- dentro de otro procedimiento, ninguna global que usa el cuerpo tiene el
+  nombre de una local o un parámetro del que llama;
+- todas las variables del cuerpo se resuelven y no define otro PARA.
+
+Las locales de un procedimiento no se inicializan al entrar (son allocas
+del código generado), así que reusar la misma variable en cada pasada por
+el cuerpo expandido no cambia nada de lo que está definido. Una local que
+el cuerpo declara solo dentro de un SI o un bucle se declara además al
+principio (INIC x.i3 = 0), para que siga declarada si "dce" borra ese
+bloque.
+
+Con "constprop" forma una etapa de -O2: uno deja constantes los
+argumentos, el otro expande o especializa, y el primero propaga en el
+cuerpo nuevo.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+
+from frontend import visitor
+from frontend.ast import Node
+from frontend.callgraph import CallGraph, ProcInfo, build_call_graph
+from frontend.hashcons import structural_size
+from frontend.resolver import resolve
+from optimizer.ASTUtils import Pass, BLOCKS, num_value, rebuild
+
+INLINE_BUDGET = 40          # nodos del cuerpo de un procedimiento que se expande
+SPECIALIZE_BUDGET = 400     # nodos del cuerpo de un procedimiento que se clona
+MAX_CLONES = 4              # clones por procedimiento
+MAX_ROUNDS = 8              # vueltas de una corrida (cadenas de llamadas expandidas)
+
+
+class Inliner(Pass):
+    name = "inline"
+    description = "inlining y especialización de procedimientos"
+
+    def __init__(self):
+        super().__init__()
+        # (procedimiento, ((índice, valor), ...)) -> nombre del clon; se
+        # mantiene entre rondas de la misma etapa
+        self.clones: Dict[Tuple[str, tuple], str] = {}
+        self._count: Dict[str, int] = {}
+        self._next = None
+        # de esta corrida
+        self.graph: Optional[CallGraph] = None
+        self._plan: Dict[int, tuple] = {}
+        self._new: Dict[str, List[Tuple[str, tuple]]] = {}
+
+    def run(self, root: Node) -> Node:
+        if root is None:
+            return None
+        if self._next is None:
+            self._next = _first_free(root)
+        # un cuerpo expandido puede traer llamadas que también se expanden:
+        # se repite hasta que no quede nada (la salida tiene que ser estable
+        # para el mismo pase, ver PassManager)
+        for _ in range(MAX_ROUNDS):
+            resolve(root)
+            self.graph = build_call_graph(root)
+            self._plan = {}
+            self._new = {}
+            self._decide(root)
+            if not self._plan:
+                break
+            root = visitor.run(self._stmt(root))
+        return root
+
+    # =====================================================
+    # QUÉ HACER CON CADA LLAMADA
+    # =====================================================
+
+    def _decide(self, root: Node):
+        """Recorre el programa en el orden del resolver y deja en _plan, por
+        nodo CALL, ("inline", info) o ("clone", nombre, constantes)."""
+        g = self.graph
+        seen: Set[str] = set()          # PARA ya recorridos
+        sizes: Dict[str, int] = {}
+        stack: list = [(root, None)]
+        while stack:
+            n, owner = stack.pop()
+            self.visited += 1
+            k = n.kind
+            if k == "PARA":
+                ch = n.children
+                if len(ch) < 3 or ch[1].kind != "PARAMS":
+                    continue
+                name = str(ch[0].value)
+                info = g.get(name)
+                if info is None or info.node is not n:
+                    continue                # duplicado: semantics lo reporta
+                seen.add(name)
+                stack.append((ch[2], info))
+                continue
+            if k == "CALL" and n.value is None:
+                self._call(n, owner, seen, sizes)
+                continue
+            blocks = BLOCKS.get(k, ())
+            ch = n.children
+            if blocks is None:
+                stack.extend((c, owner) for c in reversed(ch) if c is not None)
+            elif blocks and not (k == "EJECUTA" and ch and ch[0].kind == "ID"):
+                stack.extend((ch[i], owner) for i in reversed(blocks) if i < len(ch) and ch[i] is not None)
+
+    def _call(self, node: Node, owner: Optional[ProcInfo], seen: Set[str], sizes: Dict[str, int]):
+        ch = node.children
+        name = str(ch[0].value)
+        info = self.graph.get(name)
+        args = list(ch[1].children) if len(ch) > 1 and ch[1] is not None else []
+        if info is None or len(args) != info.arity:
+            return
+        size = sizes.get(name)
+        if size is None:
+            size = sizes[name] = structural_size(info.node.children[2])
+        if (size <= INLINE_BUDGET and name in seen and not self.graph.is_recursive(name)
+                and _inlinable(info, owner)):
+            self._plan[id(node)] = ("inline", info)
+            return
+        consts = tuple((i, num_value(a)) for i, a in enumerate(args)
+                       if a.kind == "NUM" and num_value(a) is not None)
+        if not consts or size > SPECIALIZE_BUDGET:
+            return
+        key = (name, consts)
+        clone = self.clones.get(key)
+        if clone is None or clone not in self.graph:
+            if self._count.get(name, 0) >= MAX_CLONES:
+                return
+            self._count[name] = self._count.get(name, 0) + 1
+            clone = self.clones[key] = f"{name}.k{self._count[name]}"
+            while clone in self.graph:      # el árbol ya tenía clones
+                self._count[name] += 1
+                clone = self.clones[key] = f"{name}.k{self._count[name]}"
+            self._new.setdefault(name, []).append((clone, consts))
+        self._plan[id(node)] = ("clone", clone, consts)
+
+    # =====================================================
+    # REESCRITURA
+    # =====================================================
+
+    def _stmt(self, node: Node):
+        k = node.kind
+        if k in ("PROGRAM", "STMTS"):
+            return (yield self._block(node))
+        if k == "CALL" and node.value is None:
+            plan = self._plan.get(id(node))
+            if plan is None:
+                return node
+            self.rewrites += 1
+            if plan[0] == "inline":
+                return self._inline(node, plan[1])
+            _, clone, consts = plan
+            drop = {i for i, _ in consts}
+            args = node.children[1]
+            kept = [a for i, a in enumerate(args.children) if i not in drop]
+            return Node("CALL", None, [Node("ID", clone, [], node.children[0].line),
+                                       Node(args.kind, args.value, kept, args.line)], node.line)
+        if k == "PARA":
+            ch = node.children
+            if len(ch) < 3 or ch[1].kind != "PARAMS":
+                return node
+            body = yield self._stmt(ch[2])
+            return rebuild(node, [ch[0], ch[1], body, *ch[3:]])
+        blocks = BLOCKS.get(k, ())
+        if not blocks or (k == "EJECUTA" and node.children and node.children[0].kind == "ID"):
+            return node
+        out = list(node.children)
+        for i in blocks:
+            if i < len(out) and out[i] is not None:
+                out[i] = yield self._stmt(out[i])
+        return rebuild(node, out)
+
+    def _block(self, node: Node):
+        out = []
+        changed = False
+        for c in node.children:
+            if c is None:
+                out.append(c)
+                continue
+            new = yield self._stmt(c)
+            changed |= new is not c
+            if c.kind == "CALL" and new.kind == "STMTS":
+                out.extend(new.children)        # cuerpo expandido
+            else:
+                out.append(new)
+            if c.kind == "PARA":
+                # los clones van justo después del original
+                info = self.graph.get(str(c.children[0].value)) if len(c.children) >= 3 else None
+                if info is not None and info.node is c:
+                    for clone, consts in self._new.get(info.name, ()):
+                        out.append(self._clone(new, clone, consts))
+                        changed = True
+        if not changed:
+            return node
+        return Node(node.kind, node.value, out, node.line)
+
+    def _inline(self, call: Node, info: ProcInfo) -> Node:
+        """STMTS [INIC parámetros..., cuerpo con las locales renombradas]."""
+        k = self._next
+        self._next += 1
+        params, body = info.node.children[1], info.node.children[2]
+        ch = call.children
+        args = ch[1].children if len(ch) > 1 and ch[1] is not None else []     # `p` sin [ ]
+        rename = {}
+        out = []
+        for p, a in zip([p for p in params.children if p.kind == "ID"], args):
+            new = rename[str(p.value)] = f"{p.value}.i{k}"
+            out.append(Node("INIC", None, [Node("ID", new, [], call.line), a], call.line))
+        top = {str(s.children[0].value) for s in (body.children if body.kind == "STMTS" else [body])
+               if s.kind in ("INIC", "HAZ", "INC")}
+        for n in _locals(body):
+            if n not in rename:
+                rename[n] = f"{n}.i{k}"
+                if n not in top:
+                    # declarada solo adentro de un SI o un bucle: si "dce"
+                    # borra ese bloque, el uso de más abajo quedaría sin
+                    # declarar (en el PARA pasaría a ser la global)
+                    out.append(Node("INIC", None, [Node("ID", rename[n], [], call.line),
+                                                   Node("NUM", 0, [], call.line)], call.line))
+        copy = _copy(body, rename)
+        out.extend(copy.children if copy.kind == "STMTS" else [copy])
+        return Node("STMTS", None, out, call.line)
+
+    def _clone(self, para: Node, name: str, consts: tuple) -> Node:
+        params = [p for p in para.children[1].children if p.kind == "ID"]
+        drop = dict(consts)
+        kept = [Node("ID", p.value, [], p.line) for i, p in enumerate(params) if i not in drop]
+        inits = [Node("INIC", None, [Node("ID", params[i].value, [], para.line),
+                                     Node("NUM", v, [], para.line)], para.line)
+                 for i, v in consts]
+        body = _copy(para.children[2], {})
+        stmts = body.children if body.kind == "STMTS" else [body]
+        return Node("PARA", None, [Node("ID", name, [], para.children[0].line),
+                                   Node("PARAMS", None, kept, para.children[1].line),
+                                   Node("STMTS", None, [*inits, *stmts], para.line)], para.line)
+
+
+def _inlinable(info: ProcInfo, owner: Optional[ProcInfo]) -> bool:
+    """¿El cuerpo significa lo mismo pegado en `owner` (None = main)?"""
+    globals_used = set()
+    for n, is_var in _ids(info.node.children[2]):
+        if n.kind == "PARA":
+            return False
+        if not is_var:
+            continue
+        if n.addr is None:
+            return False
+        if n.addr[0] == 0:
+            globals_used.add(str(n.value))
+    if owner is None or not globals_used:
+        return True
+    scope = owner.sym.scope if owner.sym is not None else None
+    return scope is not None and not (globals_used & set(scope.names))
+
+def _ids(body: Node):
+    """(nodo, ¿es una variable?) para cada ID del cuerpo (y cada PARA
+    anidado, con False). Los nombres de procedimiento y los colores de
+    PONCL no son variables."""
+    stack = [body]
+    while stack:
+        n = stack.pop()
+        k = n.kind
+        if k == "PARA":
+            yield n, False
+            continue
+        if k == "ID":
+            yield n, True
+            continue
+        if k == "PONCL":
+            continue
+        ch = n.children
+        if k == "CALL" and n.value is None:
+            yield ch[0], False
+            ch = ch[1:]
+        elif k == "EJECUTA" and ch and ch[0].kind == "ID":
+            yield ch[0], False
+            continue
+        stack.extend(c for c in ch if c is not None)
+
+def _locals(body: Node) -> List[str]:
+    """Nombres de las variables locales (profundidad 1) del cuerpo, sin
+    repetir."""
+    names = {}
+    for n, is_var in _ids(body):
+        if is_var and n.addr is not None and n.addr[0] == 1:
+            names[str(n.value)] = None
+    return list(names)
+
+def _copy(body: Node, rename: Dict[str, str]) -> Node:
+    """Copia del cuerpo con IDs nuevos (el resolver anota direcciones en
+    los ID: el cuerpo copiado no puede compartirlos con el original) y las
+    locales de `rename` renombradas. Post-orden con pila explícita."""
+    done: Dict[int, Node] = {}
+    stack = [(body, False, False)]
+    while stack:
+        n, expanded, is_name = stack.pop()
+        if n.kind == "ID":
+            # solo las locales: en `inic x = x + 1` el x de la derecha
+            # puede ser la global con el mismo nombre
+            local = not is_name and n.addr is not None and n.addr[0] == 1
+            value = rename.get(str(n.value), n.value) if local else n.value
+            done[id(n)] = Node("ID", value, [], n.line)
+            continue
+        ch = n.children
+        if not ch or n.kind == "PONCL":
+            done[id(n)] = n
+            continue
+        if not expanded:
+            stack.append((n, True, False))
+            # el nombre de una llamada no es una variable
+            named = (n.kind == "CALL" and n.value is None) or (n.kind == "EJECUTA" and ch[0].kind == "ID")
+            stack.extend((c, False, named and i == 0) for i, c in enumerate(ch) if c is not None)
+            continue
+        done[id(n)] = Node(n.kind, n.value, [done[id(c)] if c is not None else None for c in ch], n.line)
+    return done[id(body)]
+
+def _first_free(root: Node) -> int:
+    """Primer número libre para las variables nombre.iN."""
+    top = -1
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if n.kind == "ID" and isinstance(n.value, str) and ".i" in n.value:
+            tail = n.value.rsplit(".i", 1)[1]
+            if tail.isdigit():
+                top = max(top, int(tail))
+        stack.extend(c for c in n.children if c is not None)
+    return top + 1
@@ -0,0 +1,432 @@
+# optimizer/LoopOpt.py
+"""
+Optimizaciones de bucles.
+
+"unroll" (LoopUnroll): un REPITE de cuenta constante se reemplaza por n
+copias de su cuerpo si el resultado no pasa de `budget` nodos
+(UNROLL_BUDGET por defecto). El código generado de un REPITE es un
+contador en memoria con load/compare/store por vuelta; desenrollado quedan
+solo los comandos, y los pases que vienen después ven las copias una al
+lado de la otra. Las copias comparten los nodos del cuerpo (nada se
+modifica en el lugar). Los bucles de adentro se desenrollan primero. Un
+cuerpo con un PARA no se copia (el procedimiento quedaría definido n
+veces).
+
+"licm" (LoopInvariantMotion): una expresión aritmética dentro de un bucle
+cuyas variables no modifica el bucle (ni los procedimientos que llama) da
+lo mismo en todas las vueltas. Se calcula una vez antes del bucle en una
+variable nueva (INIC _inv0 = PRODUCTO lado lado) y adentro se usa esa
+variable:
+
+    REPITE n [ AV lado * lado GD 90 ]
+      ->  INIC _inv0 = lado * lado  REPITE n [ AV _inv0 GD 90 ]
+
+Se mueve la expresión más grande posible que tenga al menos una variable
+(las de solo números son de "fold"); la misma expresión dos veces en el
+bucle usa la misma variable. Solo cuenta lo puro: NUM, ID, BINOP, POW y
+NEG. AZAR y RUMBO le preguntan al runtime (mandan un comando) y no se
+mueven.
+
+Antes del bucle la expresión se calcula aunque el bucle no dé ninguna
+vuelta. Sumar, restar y multiplicar en i32 no fallan nunca, pero dividir
+por cero (o INT_MIN / -1) es comportamiento indefinido en el IR: una
+división solo se mueve si el divisor es un número distinto de 0 y de -1,
+o si el programa original la iba a calcular sí o sí al llegar al bucle:
+
+- en la condición de un MIENTRAS (se evalúa al entrar);
+- en el cuerpo de un REPITE de cuenta >= 1, HAZ.HASTA o HAZ.MIENTRAS, en
+  una sentencia de primer nivel (no dentro de un SI ni de otro bucle) a la
+  que se llega sin pasar por un bucle ni una llamada (que podrían no
+  terminar);
+- en la condición de HAZ.HASTA/HAZ.MIENTRAS si todo el cuerpo es así.
+
+Nunca se saca una división de un MIENTRAS que puede no correr.
+
+Los bucles se procesan de adentro hacia afuera: lo invariante en el de
+adentro queda en un INIC antes de él, y si también es invariante en el de
+afuera ese INIC sale de los dos. Cada bucle mira solo su nivel (lo que
+quedó adentro de un bucle interno depende de él), así que el pase es
+lineal aun con bucles muy anidados.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+from frontend import visitor
+from frontend.ast import Node
+from frontend.callgraph import build_call_graph
+from frontend.hashcons import structural_size
+from frontend.resolver import resolve
+from optimizer.ASTUtils import Pass, Effects, ANY_GLOBAL, BLOCKS, LOOPS, num_value, rebuild
+
+UNROLL_BUDGET = 64      # nodos del REPITE desenrollado, como máximo
+
+
+class LoopUnroll(Pass):
+    name = "unroll"
+    description = "desenrollado de REPITE chicos"
+
+    def __init__(self, budget: Optional[int] = None):
+        super().__init__()
+        self.budget = UNROLL_BUDGET if budget is None else budget
+
+    def run(self, root: Node) -> Node:
+        if root is None:
+            return None
+        return visitor.run(self._stmt(root))
+
+    def _stmt(self, node: Node):
+        self.visited += 1
+        k = node.kind
+        if k == "PARA":
+            ch = node.children
+            if len(ch) < 3 or ch[1].kind != "PARAMS":
+                return node
+            return self._children(node, (2,))
+        blocks = BLOCKS.get(k, ())
+        if blocks is None:
+            return self._children(node, range(len(node.children)))
+        if not blocks or (k == "EJECUTA" and node.children and node.children[0].kind == "ID"):
+            return node
+        if k == "REPITE":
+            return self._repite(node)
+        return self._children(node, blocks)
+
+    def _children(self, node: Node, idx):
+        out = list(node.children)
+        for i in idx:
+            if i < len(out) and out[i] is not None:
+                out[i] = yield self._stmt(out[i])
+        return rebuild(node, out)
+
+    def _repite(self, node: Node):
+        node = yield self._children(node, (1,))
+        ch = node.children
+        if len(ch) < 2 or ch[0].kind != "NUM":
+            return node
+        n = num_value(ch[0])
+        body = ch[1]
+        if n is None or n < 2:
+            return node         # 0 y 1 los resuelve "dce"
+        stmts = body.children if body.kind == "STMTS" else [body]
+        size = structural_size(body)
+        if n * size > self.budget or _has_para(body):
+            return node
+        self.rewrites += 1
+        return Node("STMTS", None, list(stmts) * n, node.line)
+
+
+def _has_para(node: Node) -> bool:
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if n.kind == "PARA":
+            return True
+        blocks = BLOCKS.get(n.kind, ())
+        if blocks is None:
+            stack.extend(n.children)
+        else:
+            stack.extend(n.children[i] for i in blocks if i < len(n.children))
+    return False
+
+
+# sentencias cuyos hijos no son expresiones
+_OPAQUE = frozenset(("PONCL", "PARAMS", "EMPTY", "PARA"))
+_PURE = frozenset(("NUM", "ID", "BINOP", "POW", "NEG"))
+
+
+class LoopInvariantMotion(Pass):
+    name = "licm"
+    description = "expresiones invariantes fuera de los bucles"
+
+    PREFIX = "_inv"
+
+    def __init__(self):
+        super().__init__()
+        self.effects: Optional[Effects] = None
+        self.temps: set = set()     # variables creadas en esta corrida
+        self._next = 0
+
+    def run(self, root: Node) -> Node:
+        if root is None:
+            return None
+        resolve(root)
+        self.effects = Effects(build_call_graph(root))
+        self.temps = set()
+        self._next = _first_free(root, self.PREFIX)
+        return visitor.run(self._stmt(root))
+
+    def fresh(self) -> str:
+        name = f"{self.PREFIX}{self._next}"
+        self._next += 1
+        self.temps.add(name)
+        return name
+
+    # =====================================================
+    # SENTENCIAS
+    # =====================================================
+
+    def _stmt(self, node: Node):
+        """El nodo nuevo. Un bucle del que salió algo vuelve como STMTS
+        [INIC ..., bucle]."""
+        self.visited += 1
+        k = node.kind
+        if k == "PARA":
+            ch = node.children
+            if len(ch) < 3 or ch[1].kind != "PARAMS":
+                return node
+            body = yield self._stmt(ch[2])
+            return rebuild(node, [ch[0], ch[1], body, *ch[3:]])
+        if k in ("PROGRAM", "STMTS"):
+            return (yield self._block(node))
+        blocks = BLOCKS.get(k, ())
+        if not blocks or (k == "EJECUTA" and node.children and node.children[0].kind == "ID"):
+            return node
+        # efectos del bucle original: los del nuevo son los mismos más las
+        # variables nuevas, y así el memo de Effects sirve para todo el árbol
+        mods = self.effects.of(node) if k in LOOPS else None
+        out = list(node.children)
+        for i in blocks:
+            if i < len(out) and out[i] is not None:
+                out[i] = yield self._stmt(out[i])
+        node = rebuild(node, out)
+        if mods is None:
+            return node
+        return (yield self._hoist(node, mods))
+
+    def _block(self, node: Node):
+        out = []
+        for c in node.children:
+            if c is None:
+                out.append(c)
+                continue
+            new = yield self._stmt(c)
+            if c.kind in LOOPS and new.kind == "STMTS":
+                out.extend(new.children)
+            else:
+                out.append(new)
+        if len(out) == len(node.children):
+            return rebuild(node, out)
+        return Node(node.kind, node.value, out, node.line)
+
+    def _hoist(self, loop: Node, mods):
+        """Saca las invariantes de `loop` (con los bucles de adentro ya
+        procesados)."""
+        ch = loop.children
+        if len(ch) < 2 or any(c is None for c in ch):
+            return loop
+        k = loop.kind
+        body_i, cond_i = (0, 1) if k in ("HAZ_HASTA", "HAZ_MIENTRAS") else (1, 0)
+        runs = k != "MIENTRAS" and (k != "REPITE" or (ch[0].kind == "NUM" and (num_value(ch[0]) or 0) >= 1))
+        job = _Hoist(self, mods)
+        out = list(ch)
+        out[body_i], whole = yield job.block(ch[body_i], runs)
+        if k != "REPITE":       # la cuenta de REPITE se calcula una sola vez
+            out[cond_i] = job.expr(ch[cond_i], k == "MIENTRAS" or (runs and whole))
+        if not job.inits:
+            return loop
+        return Node("STMTS", None, [*job.inits, rebuild(loop, out)], loop.line)
+
+
+class _Hoist:
+    """Lo que sale de un bucle: reemplaza en el cuerpo y la condición cada
+    invariante por su variable y junta los INIC. Los bucles de adentro ya
+    se procesaron: lo que les quedó depende de ellos (y entonces también de
+    este), así que de ellos solo se mira la cuenta de un REPITE; los INIC
+    que dejaron antes de sí se sacan enteros si su expresión es invariante
+    acá también."""
+
+    def __init__(self, owner: LoopInvariantMotion, mods):
+        self.owner = owner
+        self.mods = mods
+        self.any_global = ANY_GLOBAL in mods
+        self.inits: List[Node] = []
+        self.names: Dict[int, str] = {}     # clave de la expresión -> variable
+        self.keys: Dict[tuple, int] = {}
+
+    def block(self, node: Node, runs: bool):
+        """(bloque reescrito, ¿se llega al final sin pasar por un bucle ni
+        una llamada?). `runs`: el bloque corre seguro al llegar al bucle; sus
+        sentencias de primer nivel pueden mover divisiones hasta la primera
+        que podría no terminar."""
+        stmts = node.children if node.kind == "STMTS" else [node]
+        out = []
+        safe = runs
+        for s in stmts:
+            if s is None:
+                out.append(s)
+                continue
+            new = yield self.stmt(s, safe)
+            if new is not None:
+                out.append(new)
+            if safe and not _terminates(s):
+                safe = False
+        if node.kind == "STMTS":
+            new = rebuild(node, out) if len(out) == len(stmts) else Node("STMTS", None, out, node.line)
+        else:
+            new = out[0] if out else Node("STMTS", None, [], node.line)
+        return new, safe
+
+    def stmt(self, node: Node, div_ok: bool):
+        """Una sentencia del cuerpo; None si era un INIC que salió entero."""
+        self.owner.visited += 1
+        k = node.kind
+        ch = node.children
+        if k in _OPAQUE or not ch:
+            return node
+        if k in LOOPS:
+            if k == "REPITE":
+                return rebuild(node, [self.expr(ch[0], div_ok), *ch[1:]])
+            return node
+        if k in ("PROGRAM", "STMTS"):
+            return (yield self.block(node, False))[0]
+        if k == "EJECUTA":
+            if ch[0].kind == "ID":
+                return node
+            block, _ = yield self.block(ch[0], div_ok)
+            return rebuild(node, [block, *ch[1:]])
+        if k == "SI":
+            out = [self.expr(ch[0], div_ok)]
+            for c in ch[1:]:
+                out.append(c if c is None else (yield self.block(c, False))[0])
+            return rebuild(node, out)
+        if k == "CALL" and node.value is None:
+            if len(ch) > 1 and ch[1] is not None:
+                args = rebuild(ch[1], [self.expr(a, div_ok) for a in ch[1].children])
+                return rebuild(node, [ch[0], args, *ch[2:]])
+            return node
+        if k == "INIC" and len(ch) == 2 and ch[0].value in self.owner.temps:
+            new, info = self._post(ch[1])
+            if self._movable(new, info, div_ok):
+                # el INIC que dejó un bucle de adentro sale entero
+                self.names.setdefault(info[0], ch[0].value)
+                self.inits.append(rebuild(node, [ch[0], new]))
+                self.owner.rewrites += 1
+                return None
+            return rebuild(node, [ch[0], new])
+        if k in ("INIC", "HAZ", "INC"):
+            return rebuild(node, [ch[0], *(self.expr(c, div_ok) for c in ch[1:])])
+        return rebuild(node, [self.expr(c, div_ok) for c in ch])
+
+    # =====================================================
+    # EXPRESIONES
+    # =====================================================
+
+    def expr(self, node: Node, div_ok: bool) -> Node:
+        """La expresión con sus invariantes reemplazadas. `div_ok`: la
+        expresión se evalúa seguro al llegar al bucle (una división puede
+        salir)."""
+        if node is None:
+            return None
+        new, info = self._post(node)
+        if self._movable(new, info, div_ok):
+            return self._replace(new, info)
+        return new
+
+    def _post(self, node: Node):
+        """(nodo, info) en post-orden con pila explícita. info es None si el
+        subárbol no es puro e invariante; si no, (clave, ¿tiene variables?,
+        ¿tiene operadores?, ¿divide por algo que puede ser 0 o -1?)."""
+        if not node.children:
+            return node, self._leaf(node)
+        stack = [[node, 0, []]]
+        while True:
+            top = stack[-1]
+            n, i, res = top
+            ch = n.children
+            if i < len(ch):
+                top[1] = i + 1
+                c = ch[i]
+                if c is None:
+                    res.append((None, None))
+                elif c.children:
+                    stack.append([c, 0, []])
+                else:
+                    res.append((c, self._leaf(c)))
+                continue
+            stack.pop()
+            out = self._combine(n, res)
+            if not stack:
+                return out
+            stack[-1][2].append(out)
+
+    def _leaf(self, node: Node):
+        self.owner.visited += 1
+        k = node.kind
+        if k == "NUM":
+            v = num_value(node)
+            return None if v is None else (self._key(("NUM", v)), False, False, False)
+        if k == "ID":
+            addr = node.addr
+            if addr is None or addr in self.mods or (self.any_global and addr[0] == 0):
+                return None
+            return (self._key(("ID", addr)), True, False, False)
+        return None
+
+    def _combine(self, node: Node, res):
+        self.owner.visited += 1
+        k = node.kind
+        infos = [info for _, info in res]
+        if k in _PURE and None not in infos and len(res) == (1 if k == "NEG" else 2):
+            unsafe = any(info[3] for info in infos)
+            if k == "BINOP" and node.value == "/":
+                d = num_value(res[1][0]) if res[1][0].kind == "NUM" else None
+                unsafe = unsafe or d is None or d == 0 or d == -1
+            key = self._key((k, node.value, *(info[0] for info in infos)))
+            info = (key, any(i[1] for i in infos), True, unsafe)
+            return rebuild(node, [c for c, _ in res]), info
+        # este nodo se queda: cada hijo que puede salir, a su variable (sin
+        # divisiones inseguras: el hijo de un nodo que se queda puede ser
+        # el operando de algo que no se evalúa siempre)
+        kids = [self._replace(c, info) if self._movable(c, info, False) else c for c, info in res]
+        return rebuild(node, kids), None
+
+    @staticmethod
+    def _movable(node: Node, info, div_ok: bool) -> bool:
+        return (info is not None and info[1] and info[2] and node.kind not in ("ID", "NUM")
+                and (div_ok or not info[3]))
+
+    def _replace(self, node: Node, info) -> Node:
+        name = self.names.get(info[0])
+        if name is None:
+            name = self.names[info[0]] = self.owner.fresh()
+            self.inits.append(Node("INIC", None, [Node("ID", name, [], node.line), node], node.line))
+        self.owner.rewrites += 1
+        return Node("ID", name, [], node.line)
+
+    def _key(self, t: tuple) -> int:
+        k = self.keys.get(t)
+        if k is None:
+            k = self.keys[t] = len(self.keys)
+        return k
+
+
+def _terminates(stmt: Node) -> bool:
+    """¿La sentencia termina seguro? (no tiene bucles ni llamadas)"""
+    stack = [stmt]
+    while stack:
+        n = stack.pop()
+        k = n.kind
+        if k in LOOPS or (k == "CALL" and n.value is None) or \
+                (k == "EJECUTA" and n.children and n.children[0].kind == "ID"):
+            return False
+        blocks = BLOCKS.get(k, ())
+        if blocks is None:
+            stack.extend(c for c in n.children if c is not None)
+        else:
+            stack.extend(n.children[i] for i in blocks if i < len(n.children) and n.children[i] is not None)
+    return True
+
+
+def _first_free(root: Node, prefix: str) -> int:
+    """Primer número libre para las variables `prefix`N (por si el árbol ya
+    pasó por este pase)."""
+    top = -1
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if n.kind == "ID" and isinstance(n.value, str) and n.value.startswith(prefix):
+            tail = n.value[len(prefix):]
+            if tail.isdigit():
+                top = max(top, int(tail))
+        stack.extend(c for c in n.children if c is not None)
+    return top + 1
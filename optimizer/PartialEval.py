@@ -0,0 +1,413 @@
+# optimizer/PartialEval.py
+"""
+Evaluación parcial del programa entero: la traza del dibujo en compilación.
+
+La mayoría de los programas no tiene nada que solo se sepa al correr: sin
+AZAR lo que dibujan queda fijo en compilación. evaluate(árbol) corre el AST optimizado
+con la semántica del código generado (aritmética i32 de ASTUtils, una
+dirección del resolver por variable, un frame por llamada, BOOLBIN sin
+cortocircuito) y en lugar de mandar comandos simula la tortuga de
+Executable/drawing.py y anota una traza plana:
+
+    MOVETO x y    tramo recto hasta el punto (x, y), dibuja si el lápiz está
+                  apoyado
+    JUMP x y      salto sin dibujar (PONPOS, PONX, PONY, CENTRO)
+    HEADING h     rumbo del sprite (solo cuando cambió antes de lo que sigue)
+    PENUP, PENDOWN, COLOR n, HIDE, DELAY ms   como en el runtime
+
+Las coordenadas son absolutas. drawing.py arranca en el centro del lienzo y
+PONPOS usa píxeles del lienzo, así que cada eje lleva su ancla: "c-12.5" es
+relativo al centro (se resuelve con el tamaño del lienzo al reproducir) y
+"340" es un píxel del lienzo.
+
+Si el programa necesita el runtime (AZAR, una variable sin valor, una división por cero, EJECUTA de un nombre, ...) o se pasa de
+STEP_BUDGET sentencias ejecutadas o de MAX_DEPTH llamadas anidadas,
+evaluate() levanta NotStatic con el motivo y hay que compilarlo como
+siempre. App guarda la traza en out/trace.txt y "Ejecutar" la reproduce
+directamente (drawing.replay_trace), sin ensamblador, enlazador ni proceso
+aparte:
+
+    python -m optimizer.PartialEval [-O0|-O1|-O2] archivo.logo [--out traza.txt]
+
+Los recorridos son generadores (frontend/visitor.py): ni los bloques ni
+las llamadas usan recursión de Python.
+"""
+from __future__ import annotations
+import math
+import os
+from typing import List, Optional
+
+from frontend import visitor
+from frontend.ast import Node
+from frontend.resolver import resolve
+from frontend.callgraph import build_call_graph
+from optimizer.ASTUtils import num_value, wrap_i32, binop_i32, pow_i32, relop, truthy
+
+STEP_BUDGET = 1_000_000
+MAX_DEPTH = 10_000
+
+# PONCL "nombre": los mismos valores que IntermediateCodeGen (el resto, 0)
+_COLOR_NAMES = {"negro": 0, "rojo": 1, "azul": 2, "verde": 3}
+
+
+class NotStatic(Exception):
+    """El programa no se puede evaluar en compilación (el motivo es el
+    mensaje): hay que compilarlo."""
+
+
+class Trace:
+    """Las entradas de la traza, en orden, y las sentencias que costó."""
+
+    def __init__(self, entries: List[str], steps: int):
+        self.entries = entries
+        self.steps = steps
+
+    def __len__(self):
+        return len(self.entries)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# traza LogoTec: {len(self.entries)} entradas, {self.steps} pasos\n")
+            for e in self.entries:
+                f.write(e + "\n")
+
+
+def evaluate(root: Optional[Node], budget: int = STEP_BUDGET) -> Trace:
+    """La traza de `root`; NotStatic si depende del runtime."""
+    ev = _Evaluator(root, budget)
+    if root is not None:
+        visitor.run(ev._stmt(root))
+    ev.turtle.flush()
+    return Trace(ev.turtle.entries, ev.steps)
+
+
+def _num(v: float) -> str:
+    s = f"{v:.6f}".rstrip("0").rstrip(".")
+    return "0" if s == "-0" else s
+
+
+class _Turtle:
+    """El estado de la tortuga de drawing.py. Cada eje es (valor, anclado al
+    centro)."""
+
+    def __init__(self):
+        self.entries: List[str] = []
+        self.x = (0.0, True)
+        self.y = (0.0, True)
+        self.h = 0.0
+        self.shown = 0.0          # último rumbo anotado
+
+    def _coord(self, axis) -> str:
+        v, centered = axis
+        return ("c" if centered else "") + _num(v)
+
+    def emit(self, entry: str):
+        self.flush()
+        self.entries.append(entry)
+
+    def flush(self):
+        if self.h != self.shown:
+            self.entries.append(f"HEADING {_num(self.h)}")
+            self.shown = self.h
+
+    def move(self, d: int):
+        if d == 0:
+            return
+        rad = math.radians(self.h)
+        self.x = (self.x[0] + d * math.cos(rad), self.x[1])
+        self.y = (self.y[0] - d * math.sin(rad), self.y[1])
+        self.emit(f"MOVETO {self._coord(self.x)} {self._coord(self.y)}")
+
+    def turn(self, deg: int):
+        self.h = (self.h + deg) % 360.0
+
+    def jump(self, x=None, y=None):
+        if x is not None:
+            self.x = x
+        if y is not None:
+            self.y = y
+        self.emit(f"JUMP {self._coord(self.x)} {self._coord(self.y)}")
+
+
+class _Evaluator:
+    def __init__(self, root: Optional[Node], budget: int):
+        self.budget = budget
+        self.steps = 0
+        self.depth = 0
+        self.turtle = _Turtle()
+        if root is None:
+            return
+        scope = resolve(root)
+        self.graph = build_call_graph(root)
+        # las globales usadas desde un PARA son globales de LLVM (empiezan
+        # en 0); el resto son allocas de main sin valor hasta el primer INIC
+        self.globals = [0 if sym.captured else None for sym in scope.slots]
+        self.frame = self.globals
+        self._handlers = {
+            "PROGRAM": self._block, "STMTS": self._block,
+            "INIC": self._store, "ASSIGN": self._store, "HAZ": self._add, "INC": self._add,
+            "SI": self._si, "REPITE": self._repite, "MIENTRAS": self._mientras,
+            "HAZ_HASTA": self._haz_loop, "HAZ_MIENTRAS": self._haz_loop,
+            "EJECUTA": self._ejecuta, "CALL": self._call, "PARA": self._skip,
+            "RUMBO": self._skip,    # la respuesta no se usa: no dibuja nada
+        }
+
+    # =====================================================
+    # SENTENCIAS
+    # =====================================================
+
+    def _step(self):
+        self.steps += 1
+        if self.steps > self.budget:
+            raise NotStatic(f"más de {self.budget:,} pasos")
+
+    def _stmt(self, node: Node):
+        """Ejecuta la sentencia; un generador si tiene bloques adentro."""
+        self._step()
+        handler = self._handlers.get(node.kind)
+        if handler is not None:
+            return handler(node)
+        return self._command(node)
+
+    def _block(self, node: Node):
+        for c in node.children:
+            yield self._stmt(c)
+
+    def _skip(self, node: Node):
+        return None
+
+    def _command(self, node: Node):
+        k = node.kind
+        t = self.turtle
+        ch = node.children
+        if k in ("AV", "RE"):
+            d = self._int(ch[0])
+            t.move(d if k == "AV" else -d)
+        elif k in ("GD", "GI"):
+            d = self._int(ch[0])
+            t.turn(-d if k == "GD" else d)
+        elif k in ("PONPOS", "PONXY"):
+            x, y = self._int(ch[0]), self._int(ch[1])
+            t.jump((float(x), False), (float(y), False))
+        elif k == "PONX":
+            t.jump(x=(float(self._int(ch[0])), False))
+        elif k == "PONY":
+            t.jump(y=(float(self._int(ch[0])), False))
+        elif k == "CENTRO":
+            t.jump((0.0, True), (0.0, True))
+        elif k == "PONRUMBO":
+            t.h = self._int(ch[0]) % 360.0
+        elif k == "BL":
+            t.emit("PENUP")
+        elif k == "SB":
+            t.emit("PENDOWN")
+        elif k == "OT":
+            t.emit("HIDE")
+        elif k == "PONCL":
+            arg = ch[0]
+            c = _COLOR_NAMES.get(arg.value, 0) if arg.kind == "STR" else self._int(arg)
+            t.emit(f"COLOR {c}")
+        elif k == "ESPERA":
+            t.emit(f"DELAY {self._int(ch[0])}")
+        elif k == "EVAL":
+            for c in ch:
+                self._int(c)
+        else:
+            raise NotStatic(f"{k} (línea {node.line}) no se evalúa en compilación")
+        return None
+
+    def _store(self, node: Node):
+        ident, expr = node.children[:2]
+        self._set(ident, self._int(expr))
+
+    def _add(self, node: Node):
+        # HAZ x e e INC x [e]: x += e (1 si no hay expresión)
+        ch = node.children
+        inc = self._int(ch[1]) if len(ch) > 1 else 1
+        self._set(ch[0], wrap_i32(self._get(ch[0]) + inc))
+
+    def _si(self, node: Node):
+        ch = node.children
+        if self._cond(ch[0]):
+            yield self._stmt(ch[1])
+        elif len(ch) > 2:
+            yield self._stmt(ch[2])
+
+    def _repite(self, node: Node):
+        n = self._int(node.children[0])     # se evalúa una vez, antes del bucle
+        body = node.children[1]
+        for _ in range(n):
+            self._step()
+            yield self._stmt(body)
+
+    def _mientras(self, node: Node):
+        cond, body = node.children
+        while self._cond(cond):
+            self._step()
+            yield self._stmt(body)
+
+    def _haz_loop(self, node: Node):
+        # HAZ.HASTA repite hasta que la condición se cumple; HAZ.MIENTRAS,
+        # mientras se cumpla. El cuerpo corre al menos una vez.
+        body, cond = node.children
+        until = node.kind == "HAZ_HASTA"
+        while True:
+            self._step()
+            yield self._stmt(body)
+            if self._cond(cond) == until:
+                break
+
+    def _ejecuta(self, node: Node):
+        block = node.children[0]
+        if block.kind == "ID":
+            raise NotStatic(f"EJECUTA {block.value} (línea {node.line})")
+        yield self._stmt(block)
+
+    def _call(self, node: Node):
+        if node.value is not None:
+            raise NotStatic(f"{node.value} (línea {node.line}) depende del runtime")
+        name = str(node.children[0].value)
+        info = self.graph.get(name)
+        if info is None:
+            raise NotStatic(f"procedimiento '{name}' no definido")
+        args = node.children[1].children if len(node.children) > 1 and node.children[1] is not None else []
+        values = [self._int(a) for a in args]
+        name_node, params, body = info.node.children[:3]
+        frame = [None] * len(name_node.sym.scope)
+        for p, v in zip(params.children, values):
+            frame[p.addr[1]] = v
+        if self.depth >= MAX_DEPTH:
+            raise NotStatic(f"más de {MAX_DEPTH:,} llamadas anidadas")
+        saved = self.frame
+        self.frame = frame
+        self.depth += 1
+        try:
+            yield self._stmt(body)
+        finally:
+            self.frame = saved
+            self.depth -= 1
+
+    # =====================================================
+    # VARIABLES Y EXPRESIONES
+    # =====================================================
+
+    def _get(self, ident: Node) -> int:
+        addr = ident.addr
+        v = None
+        if addr is not None:
+            v = (self.frame if addr[0] else self.globals)[addr[1]]
+        if v is None:
+            raise NotStatic(f"'{ident.value}' (línea {ident.line}) no tiene valor")
+        return v
+
+    def _set(self, ident: Node, v: int):
+        addr = ident.addr
+        if addr is None:
+            raise NotStatic(f"'{ident.value}' (línea {ident.line}) no está declarada")
+        (self.frame if addr[0] else self.globals)[addr[1]] = v
+
+    def _int(self, node: Node) -> int:
+        v = self._expr(node)
+        return int(v)
+
+    def _cond(self, node: Node) -> bool:
+        return truthy(self._expr(node))
+
+    def _expr(self, node: Node):
+        """Valor de la expresión (int, o bool para relacionales). Post-orden
+        con pila explícita, como ConstProp._expr."""
+        ch = node.children
+        if not ch:
+            return self._leaf(node)
+        for c in ch:
+            if c.children:
+                break
+        else:                               # solo hojas: lo más común
+            return self._combine(node, [self._leaf(c) for c in ch])
+        stack = [[node, 0, []]]     # nodo, próximo hijo, valores de los hijos
+        while True:
+            top = stack[-1]
+            n, i, vals = top
+            ch = n.children
+            if i < len(ch):
+                top[1] = i + 1
+                c = ch[i]
+                if c.children:
+                    stack.append([c, 0, []])
+                else:
+                    vals.append(self._leaf(c))
+                continue
+            stack.pop()
+            out = self._combine(n, vals)
+            if not stack:
+                return out
+            stack[-1][2].append(out)
+
+    def _leaf(self, node: Node):
+        k = node.kind
+        if k == "NUM":
+            v = num_value(node)
+            if v is None:
+                raise NotStatic(f"número inválido {node.value!r} (línea {node.line})")
+            return v
+        if k == "ID":
+            return self._get(node)
+        if k == "BOOL":
+            return bool(node.value)
+        return self._combine(node, [])
+
+    def _combine(self, node: Node, vals):
+        k = node.kind
+        if k == "BINOP":
+            v = binop_i32(str(node.value), int(vals[0]), int(vals[1]))
+            if v is None:
+                raise NotStatic(f"división inválida {vals[0]} / {vals[1]} (línea {node.line})")
+            return v
+        if k == "NEG":
+            return wrap_i32(-int(vals[0]))
+        if k == "RELOP":
+            v = relop(str(node.value), int(vals[0]), int(vals[1]))
+            if v is None:
+                raise NotStatic(f"relacional {node.value} (línea {node.line})")
+            return v
+        if k == "BOOLBIN":
+            op = str(node.value).upper()
+            if op == "Y":
+                return truthy(vals[0]) and truthy(vals[1])
+            if op == "O":
+                return truthy(vals[0]) or truthy(vals[1])
+        if k == "POW":
+            return pow_i32(int(vals[0]), int(vals[1]))
+        if k == "CALL":
+            raise NotStatic(f"{node.value} (línea {node.line}) depende del runtime")
+        raise NotStatic(f"{k} (línea {node.line}) no se evalúa en compilación")
+
+
+# Runner: python -m optimizer.PartialEval [-O0|-O1|-O2] archivo.logo [--out traza.txt]
+if __name__ == "__main__":
+    import argparse
+    from frontend.parser import parse_file
+    from optimizer.PassManager import LEVELS, optimize
+
+    ap = argparse.ArgumentParser(prog="python -m optimizer.PartialEval",
+                                 description="Evalúa un programa Logo en compilación e imprime su traza.")
+    ap.add_argument("archivo")
+    ap.add_argument("-O", dest="level", default="2", choices=[str(k) for k in LEVELS],
+                    help="nivel de optimización (por defecto -O2)")
+    ap.add_argument("--budget", type=int, default=STEP_BUDGET, metavar="N",
+                    help=f"sentencias máximas a ejecutar (por defecto {STEP_BUDGET:,})")
+    ap.add_argument("--out", metavar="TXT", help="guardar la traza en un archivo")
+    args = ap.parse_args()
+
+    tree, _ = optimize(parse_file(args.archivo), args.level)
+    try:
+        trace = evaluate(tree, args.budget)
+    except NotStatic as e:
+        print(f"no se puede evaluar en compilación: {e}")
+        raise SystemExit(1)
+    if args.out:
+        trace.save(args.out)
+    else:
+        print("\n".join(trace.entries))
+    print(f"-- {len(trace)} entradas, {trace.steps:,} pasos")
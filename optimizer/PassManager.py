@@ -0,0 +1,255 @@
+# optimizer/PassManager.py
+"""
+Pases del optimizador y niveles -O.
+
+Cada optimización es un pase con nombre (PASSES). Un nivel (LEVELS) es una
+lista de etapas y cada etapa una tupla de pases:
+
+- una etapa de un solo pase corre una vez (cada pase ya llega solo a su
+  punto fijo: ASTOptimizer usa la estrategia worklist);
+- los pases de una etapa de varios se habilitan entre sí, así que se
+  corren en ronda hasta que todos vieron el árbol final: la ronda termina
+  cuando len(etapa) pases seguidos no reescriben nada.
+
+Las etapas van en orden de dependencia: "fold" y "algebra" se alimentan
+mutuamente ((x * 0) - 3 -> 0 - 3 -> -3, (2 - 2) * x -> 0 * x -> 0), y con
+ellos va "strength" (POTENCIA x 2 -> x * x, que "fold" y "algebra" siguen
+simplificando). "normalize" (GD 360 -> GD 0) y "dce" (SI falso, AV 0, ...)
+no crean nada nuevo para los de antes, así que corren una sola vez al final.
+"constprop" (optimizer/ConstProp.py) va primero: calcula él mismo los
+valores que sustituye, y lo que deja constante lo terminan los demás. Con
+él va "inline" (optimizer/Inliner.py): "constprop" deja constantes los
+argumentos de una llamada, "inline" la expande o la manda a un clon
+especializado y "constprop" propaga en el cuerpo nuevo.
+"peephole" (optimizer/TurtlePeephole.py) comparte la última etapa con
+"dce": al borrar un SI o un AV 0, "dce" deja comandos juntos que
+"peephole" puede fusionar, y una fusión puede dejar algo que "dce" borra.
+Con ellos va "dse" (optimizer/DeadStore.py): las variables que los demás
+dejaron sin leer se van al final, y un bloque que queda vacío (o dos
+comandos que quedan juntos) vuelve a "dce" y "peephole".
+"licm" y "unroll" (optimizer/LoopOpt.py) van antes: "licm" primero, para
+que las copias de un REPITE desenrollado usen la variable ya calculada
+afuera, y los dos antes de "peephole", que junta los comandos que quedan
+seguidos. El tamaño máximo de un REPITE desenrollado es
+LoopOpt.UNROLL_BUDGET (--unroll-budget N en la línea de comandos).
+"cse" (optimizer/CommonSubexpr.py) va después de los dos: junta lo que se
+repite en las copias de un REPITE desenrollado, y lo invariante ya salió
+de los bucles con "licm".
+
+Cada pase de una etapa de varios recuerda los nodos que ya dejó en forma
+normal (ASTOptimizer memo): volver a correrlo cuesta lo que cambió desde
+la corrida anterior.
+
+Niveles:
+    -O0  nada (el árbol del parser tal cual)
+    -O1  plegado de constantes y código muerto: lo barato
+    -O2  todo
+
+PassManager.run() devuelve el árbol optimizado y deja en `stats` el tiempo,
+los nodos visitados y las reescrituras de cada pase (sumando todas sus
+corridas; las de "dse" son los stores muertos que sacó). format_report()
+lo arma como tabla para App y la línea de comandos:
+
+    python -m optimizer.PassManager [-O0|-O1|-O2] [--disable pase,...]
+                                    [--unroll-budget N] archivo.logo
+"""
+from __future__ import annotations
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from frontend.ast import Node
+from optimizer.ASTOptimizer import ASTOptimizer
+from optimizer.ASTUtils import Pass
+from optimizer.CommonSubexpr import CommonSubexpressionElimination
+from optimizer.ConstProp import ConstantPropagation
+from optimizer.DeadStore import DeadStoreElimination
+from optimizer.Inliner import Inliner
+from optimizer import LoopOpt
+from optimizer.LoopOpt import LoopInvariantMotion, LoopUnroll
+from optimizer.TurtlePeephole import TurtlePeephole
+
+
+class RulePass(Pass):
+    """Un grupo de reglas de ASTOptimizer corrido como pase propio."""
+
+    def __init__(self, name: str, description: str, group: str):
+        super().__init__()
+        self.name = name
+        self.description = description
+        self.group = group
+
+    def run(self, root: Node) -> Node:
+        opt = ASTOptimizer(groups=(self.group,), memo=self.memo)
+        out = opt.optimize(root)
+        self.visited = opt.visited
+        self.rewrites = opt.optimizations_applied
+        return out
+
+
+# nombre -> fábrica del pase, en el orden en que se listan en el reporte
+PASSES: Dict[str, Callable[[], Pass]] = {
+    "constprop": ConstantPropagation,
+    "inline": Inliner,
+    "fold": lambda: RulePass("fold", "plegado de constantes", "fold"),
+    "algebra": lambda: RulePass("algebra", "simplificación algebraica", "algebra"),
+    "normalize": lambda: RulePass("normalize", "normalización de comandos", "normalize"),
+    "dce": lambda: RulePass("dce", "código muerto y flujo de control", "dce"),
+    "strength": lambda: RulePass("strength", "reducción de fuerza de POTENCIA", "strength"),
+    "licm": LoopInvariantMotion,
+    "unroll": LoopUnroll,
+    "cse": CommonSubexpressionElimination,
+    "peephole": TurtlePeephole,
+    "dse": DeadStoreElimination,
+}
+
+LEVELS: Dict[int, Tuple[Tuple[str, ...], ...]] = {
+    0: (),
+    1: (("fold",), ("dce",)),
+    2: (("constprop", "inline"), ("fold", "algebra", "strength"), ("normalize",), ("licm",), ("unroll",), ("cse",),
+        ("dce", "peephole", "dse")),
+}
+
+MAX_ROUNDS = 8   # tope de rondas por etapa, por si dos pases se deshacen entre sí
+
+
+class PassStats:
+    """Totales de un pase en una corrida del PassManager."""
+    __slots__ = ("name", "description", "runs", "seconds", "visited", "rewrites")
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.runs = 0
+        self.seconds = 0.0
+        self.visited = 0
+        self.rewrites = 0
+
+    def __repr__(self):
+        return (f"PassStats({self.name}: {self.runs} corrida(s), {self.seconds * 1000:.2f} ms, "
+                f"{self.visited} visitados, {self.rewrites} reescrituras)")
+
+
+def parse_level(text) -> int:
+    """'-O2', 'O2', '2' o 2 -> 2."""
+    s = str(text).strip().lstrip("-").upper().lstrip("O")
+    try:
+        level = int(s) if s else 2
+    except ValueError:
+        raise ValueError(f"Nivel de optimización inválido: {text!r}") from None
+    if level not in LEVELS:
+        raise ValueError(f"Nivel de optimización inválido: {text!r} (opciones: "
+                         + ", ".join(f"-O{k}" for k in LEVELS) + ")")
+    return level
+
+
+class PassManager:
+    def __init__(self, level=2, disable: Iterable[str] = ()):
+        self.level = parse_level(level)
+        self.disabled = set(disable)
+        for name in self.disabled:
+            if name not in PASSES:
+                raise ValueError(f"Pase desconocido: {name!r} (pases: {', '.join(PASSES)})")
+        self.pipeline: List[Tuple[str, ...]] = []
+        for stage in LEVELS[self.level]:
+            stage = tuple(name for name in stage if name not in self.disabled)
+            if stage:
+                self.pipeline.append(stage)
+        self.stats: Dict[str, PassStats] = {}
+        self.seconds = 0.0
+
+    def passes(self) -> List[str]:
+        return [name for stage in self.pipeline for name in stage]
+
+    def run(self, root: Optional[Node]) -> Optional[Node]:
+        self.stats = {}
+        t0 = time.perf_counter()
+        for stage in self.pipeline:
+            root = self._run_stage(stage, root)
+        self.seconds = time.perf_counter() - t0
+        return root
+
+    def _run_stage(self, stage: Tuple[str, ...], root: Optional[Node]) -> Optional[Node]:
+        passes = [PASSES[name]() for name in stage]
+        if len(passes) > 1:
+            for p in passes:
+                p.memo = {}
+        quiet = 0           # pases seguidos sin reescrituras
+        i = 0
+        while quiet < len(passes) and i < MAX_ROUNDS * len(passes) and root is not None:
+            p = passes[i % len(passes)]
+            i += 1
+            root = self._run_pass(p, root)
+            # la salida de un pase es estable para ese mismo pase
+            quiet = 1 if p.rewrites else quiet + 1
+        return root
+
+    def _run_pass(self, p: Pass, root: Node) -> Node:
+        st = self.stats.get(p.name)
+        if st is None:
+            st = self.stats[p.name] = PassStats(p.name, p.description)
+        # cada corrida cuenta desde 0: un pase que suma en vez de asignar
+        # arrastraría las reescrituras de antes y la etapa nunca terminaría
+        # antes de MAX_ROUNDS (además de contarlas dos veces en `stats`)
+        p.visited = p.rewrites = 0
+        t0 = time.perf_counter()
+        root = p.run(root)
+        st.seconds += time.perf_counter() - t0
+        st.runs += 1
+        st.visited += p.visited
+        st.rewrites += p.rewrites
+        return root
+
+    @property
+    def rewrites(self) -> int:
+        return sum(st.rewrites for st in self.stats.values())
+
+    def format_report(self) -> str:
+        lines = [f"Optimización -O{self.level}: {self.rewrites} reescrituras en {self.seconds * 1000:.2f} ms"]
+        if not self.stats:
+            lines.append("  (sin pases)")
+            return "\n".join(lines)
+        lines.append(f"  {'pase':<10} {'corridas':>8} {'ms':>9} {'visitados':>10} {'reescrituras':>12}")
+        for st in self.stats.values():
+            lines.append(f"  {st.name:<10} {st.runs:>8} {st.seconds * 1000:>9.2f} "
+                         f"{st.visited:>10,} {st.rewrites:>12,}")
+        return "\n".join(lines)
+
+
+def optimize(root: Optional[Node], level=2, disable: Iterable[str] = ()) -> Tuple[Optional[Node], PassManager]:
+    """Atajo: corre el nivel pedido y devuelve (árbol, manager con el reporte)."""
+    pm = PassManager(level, disable)
+    return pm.run(root), pm
+
+
+# Runner: python -m optimizer.PassManager [-O0|-O1|-O2] [--disable pase,...] [--unroll-budget N] archivo.logo
+if __name__ == "__main__":
+    import argparse
+    from frontend.parser import parse_file
+    from frontend.exporter import save_ast_json
+
+    ap = argparse.ArgumentParser(prog="python -m optimizer.PassManager",
+                                 description="Optimiza un programa Logo y reporta cada pase.")
+    ap.add_argument("archivo")
+    ap.add_argument("-O", dest="level", default="2", choices=[str(k) for k in LEVELS],
+                    help="nivel de optimización (por defecto -O2)")
+    ap.add_argument("--disable", default="", metavar="PASES",
+                    help="pases a desactivar, separados por coma (" + ", ".join(PASSES) + ")")
+    ap.add_argument("--unroll-budget", type=int, metavar="N",
+                    help=f"nodos máximos de un REPITE desenrollado (por defecto {LoopOpt.UNROLL_BUDGET})")
+    ap.add_argument("--ast", action="store_true", help="imprimir el AST optimizado")
+    ap.add_argument("--out", metavar="JSON", help="guardar el AST optimizado en JSON")
+    args = ap.parse_args()
+
+    if args.unroll_budget is not None:
+        LoopOpt.UNROLL_BUDGET = args.unroll_budget
+    tree = parse_file(args.archivo)
+    disable = [name.strip() for name in args.disable.split(",") if name.strip()]
+    try:
+        optimized, pm = optimize(tree, args.level, disable)
+    except ValueError as e:
+        ap.error(str(e))
+    if args.ast and optimized is not None:
+        print(optimized.pretty())
+    if args.out and optimized is not None:
+        save_ast_json(optimized, args.out)
+    print(pm.format_report())
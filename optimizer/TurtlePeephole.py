@@ -0,0 +1,326 @@
+# optimizer/TurtlePeephole.py
+"""
+Mirilla (peephole) sobre los comandos de la tortuga.
+
+Cada comando es una llamada al runtime, que la manda por TCP a drawing.py
+y espera su animación, así que vale la pena juntar los que van seguidos en
+el mismo bloque:
+
+- AV a AV b -> AV a+b (RE n cuenta como AV -n). Con el lápiz bajo
+  (dibujando) solo si a y b tienen el mismo signo: AV 10 AV -10 dibuja una
+  raya de ida y vuelta, no nada. Con el lápiz arriba cualquier par se junta
+  y si suman 0 desaparecen.
+- GD a GD b -> GD (a+b) mod 360 (GI n cuenta como GD -n); girar no dibuja.
+  Si suman un múltiplo de 360 desaparecen.
+- BL/SB que no cambian el estado del lápiz, o que otro BL/SB pisa antes de
+  moverse, se eliminan. Igual PONCL con el mismo color o pisado por otro
+  PONCL.
+- OT OT (cada OT invierte la visibilidad) se cancela.
+- Un STMTS anidado dentro de otro (lo que deja "dce" al resolver un SI) se
+  aplana para que sus comandos queden al lado de los de afuera.
+
+Lápiz, según drawing.py: BL manda PENUP, que deja pen=True (dibuja); SB
+manda PENDOWN (pen=False); al empezar pen=False. El estado se sigue en
+orden de ejecución como en optimizer/ConstProp.py: un bucle que cambia el
+lápiz (o el color) empieza su cuerpo sin saberlo, un SI se queda con lo que
+coincide en las dos ramas, una llamada lo olvida y el cuerpo de un PARA
+empieza sin saber nada.
+
+Solo se juntan argumentos NUM enteros: el código generado trunca cada NUM
+a i32 por separado (AV 2.5 AV 2.5 avanza 4, no 5).
+"""
+from __future__ import annotations
+from typing import Dict, Optional
+
+from frontend import visitor
+from frontend.ast import Node
+from optimizer.ASTUtils import Pass, BLOCKS, INT_MIN, INT_MAX, has_call, rebuild
+
+_MOVES = {"AV": 1, "RE": -1}
+_TURNS = {"GD": 1, "GI": -1}
+_PEN = {"BL": True, "SB": False}
+_UNKNOWN = object()     # color desconocido (None es un valor posible)
+
+
+class _State:
+    """Lo que se sabe del dibujo en un punto: pen True/False/None y el
+    color ((kind, valor) del argumento de PONCL) o _UNKNOWN."""
+    __slots__ = ("pen", "color")
+
+    def __init__(self, pen=None, color=_UNKNOWN):
+        self.pen = pen
+        self.color = color
+
+    def copy(self) -> "_State":
+        return _State(self.pen, self.color)
+
+    def merge(self, other: "_State"):
+        if self.pen != other.pen:
+            self.pen = None
+        if self.color != other.color:
+            self.color = _UNKNOWN
+
+    def apply(self, node: Node):
+        """El estado después de la sentencia `node` (si es BL, SB o PONCL)."""
+        k = node.kind
+        if k in _PEN:
+            self.pen = _PEN[k]
+        elif k == "PONCL" and node.children:
+            self.color = _color(node.children[0])
+
+    def forget(self, touched: frozenset):
+        if "pen" in touched:
+            self.pen = None
+        if "color" in touched:
+            self.color = _UNKNOWN
+
+
+class TurtlePeephole(Pass):
+    name = "peephole"
+    description = "fusión de comandos de la tortuga"
+
+    def __init__(self):
+        super().__init__()
+        self._touched: Dict[int, frozenset] = {}
+        self._handlers = {
+            "PROGRAM": self._block, "STMTS": self._block,
+            "SI": self._si, "EJECUTA": self._ejecuta, "CALL": self._call,
+            "PARA": self._para,
+            "REPITE": self._loop, "MIENTRAS": self._loop,
+            "HAZ_HASTA": self._loop, "HAZ_MIENTRAS": self._loop,
+        }
+
+    def run(self, root: Node) -> Node:
+        if root is None:
+            return None
+        self._touched.clear()
+        return visitor.run(self._stmt(root, _State(pen=False)))
+
+    # =====================================================
+    # SENTENCIAS
+    # =====================================================
+
+    def _stmt(self, node: Node, st: _State):
+        self.visited += 1
+        handler = self._handlers.get(node.kind)
+        if handler is not None:
+            return handler(node, st)
+        # una sentencia suelta (el cuerpo de un SI o un bucle que "dce" dejó
+        # sin STMTS) también cambia el lápiz o el color
+        st.apply(node)
+        return node
+
+    def _block(self, node: Node, st: _State):
+        out = []
+        changed = False
+        # (hijo, ¿viene de un STMTS aplanado?)
+        todo = [(c, False) for c in reversed(node.children)]
+        while todo:
+            child, inlined = todo.pop()
+            if child is None:
+                changed = True
+                continue
+            if child.kind == "STMTS" and node.kind == "STMTS" and not inlined:
+                self.rewrites += 1
+                changed = True
+                todo.extend((c, True) for c in reversed(child.children))
+                continue
+            if child.kind in self._handlers:
+                new = yield self._stmt(child, st)
+            else:
+                self.visited += 1
+                new = child             # el estado lo sigue _push
+            changed |= self._push(out, new, st) or new is not child
+        if not changed:
+            return node
+        return Node(node.kind, node.value, out, node.line)
+
+    def _push(self, out: list, node: Node, st: _State) -> bool:
+        """Agrega `node` al final de `out` juntándolo con el anterior si se
+        puede. True si lo juntó o lo descartó."""
+        k = node.kind
+        prev = out[-1] if out else None
+        pk = prev.kind if prev is not None else None
+
+        if k in _MOVES:
+            d = _int_arg(node)
+            if d is not None and pk in _MOVES:
+                p = _int_arg(prev)
+                if p is not None:
+                    a, b = p * _MOVES[pk], d * _MOVES[k]
+                    if st.pen is False or (a >= 0) == (b >= 0) or a == 0 or b == 0:
+                        return self._fuse(out, prev, "AV", a + b, node)
+            out.append(node)
+            return False
+
+        if k in _TURNS:
+            d = _int_arg(node)
+            if d is not None and pk in _TURNS:
+                p = _int_arg(prev)
+                if p is not None:
+                    return self._fuse(out, prev, "GD", (p * _TURNS[pk] + d * _TURNS[k]) % 360, node)
+            out.append(node)
+            return False
+
+        if k in _PEN:
+            pen = _PEN[k]
+            if st.pen is pen:
+                self.rewrites += 1
+                return True
+            st.apply(node)
+            if pk in _PEN:                  # el anterior no llegó a usarse
+                out[-1] = node
+                self.rewrites += 1
+                return True
+            out.append(node)
+            return False
+
+        if k == "PONCL" and node.children:
+            color = _color(node.children[0])
+            if color is not _UNKNOWN and st.color == color:
+                self.rewrites += 1
+                return True
+            st.apply(node)
+            if pk == "PONCL" and not has_call(prev.children[0]):
+                out[-1] = node
+                self.rewrites += 1
+                return True
+            out.append(node)
+            return False
+
+        if k == "OT" and pk == "OT":
+            out.pop()
+            self.rewrites += 1
+            return True
+
+        out.append(node)
+        return False
+
+    def _fuse(self, out: list, prev: Node, kind: str, value: int, node: Node) -> bool:
+        self.rewrites += 1
+        if value == 0:
+            out.pop()
+        elif INT_MIN <= value <= INT_MAX:
+            out[-1] = Node(kind, None, [Node("NUM", value, [], prev.line)], prev.line)
+        else:
+            self.rewrites -= 1
+            out.append(node)
+            return False
+        return True
+
+    def _si(self, node: Node, st: _State):
+        ch = node.children
+        if len(ch) < 2:
+            return node
+        other_st = st.copy()
+        then = yield self._stmt(ch[1], st)
+        other = (yield self._stmt(ch[2], other_st)) if len(ch) > 2 else None
+        st.merge(other_st)
+        return rebuild(node, [ch[0], then] if other is None else [ch[0], then, other])
+
+    def _loop(self, node: Node, st: _State):
+        ch = node.children
+        i = 0 if node.kind in ("HAZ_HASTA", "HAZ_MIENTRAS") else 1
+        if len(ch) < 2:
+            return node
+        # el cuerpo empieza con lo de la entrada o con lo que dejó la vuelta
+        # anterior
+        touched = self.touched(ch[i])
+        st.forget(touched)
+        body = yield self._stmt(ch[i], st)
+        # HAZ.* corre al menos una vez: queda lo del final del cuerpo; si no,
+        # puede quedar lo de la entrada
+        if i == 1 and not (node.kind == "REPITE" and (_num(ch[0]) or 0) >= 1):
+            st.forget(touched)
+        out = list(ch)
+        out[i] = body
+        return rebuild(node, out)
+
+    def _ejecuta(self, node: Node, st: _State):
+        ch = node.children
+        if not ch:
+            return node
+        if ch[0].kind == "ID":
+            st.forget(frozenset(("pen", "color")))
+            return node
+        block = yield self._stmt(ch[0], st)
+        return rebuild(node, [block, *ch[1:]])
+
+    def _call(self, node: Node, st: _State):
+        if node.value is None:
+            st.forget(frozenset(("pen", "color")))
+        return node
+
+    def _para(self, node: Node, st: _State):
+        ch = node.children
+        if len(ch) < 3 or ch[1].kind != "PARAMS":
+            return node
+        body = yield self._stmt(ch[2], _State())
+        return rebuild(node, [ch[0], ch[1], body, *ch[3:]])
+
+    # =====================================================
+    # QUÉ ESTADO PUEDE CAMBIAR UNA SENTENCIA
+    # =====================================================
+
+    def touched(self, node: Node) -> frozenset:
+        """{"pen", "color"} o parte: lo que puede cambiar `node` (con lo que
+        tiene adentro y lo que llama). Memorizado por bloque, post-orden con
+        pila explícita."""
+        memo = self._touched
+        hit = memo.get(id(node))
+        if hit is not None:
+            return hit
+        stack = [(node, False)]
+        while stack:
+            n, ready = stack.pop()
+            blocks = _blocks(n)
+            if not ready:
+                stack.append((n, True))
+                stack.extend((c, False) for c in blocks if c.kind in BLOCKS and id(c) not in memo)
+                continue
+            t = set(_own(n))
+            for c in blocks:
+                t.update(memo[id(c)] if c.kind in BLOCKS else _own(c))
+            memo[id(n)] = frozenset(t)
+        return memo[id(node)]
+
+
+def _blocks(n: Node):
+    if n.kind == "EJECUTA" and n.children and n.children[0].kind == "ID":
+        return ()
+    blocks = BLOCKS.get(n.kind, ())
+    if blocks is None:
+        return n.children
+    ch = n.children
+    return [ch[i] for i in blocks if i < len(ch)]
+
+def _own(n: Node):
+    k = n.kind
+    if k in _PEN:
+        return ("pen",)
+    if k == "PONCL":
+        return ("color",)
+    if (k == "CALL" and n.value is None) or (k == "EJECUTA" and n.children and n.children[0].kind == "ID"):
+        return ("pen", "color")
+    return ()
+
+def _color(arg: Node):
+    # un color con nombre o número es fijo; una variable puede cambiar entre
+    # dos PONCL iguales
+    return (arg.kind, arg.value) if arg.kind in ("STR", "NUM") else _UNKNOWN
+
+def _int_arg(node: Node) -> Optional[int]:
+    """El argumento si es un NUM entero (también 45.0); si no, None."""
+    if len(node.children) != 1:
+        return None
+    return _num(node.children[0])
+
+def _num(arg: Node) -> Optional[int]:
+    if arg.kind != "NUM" or arg.value.__class__ is bool:
+        return None
+    v = arg.value
+    if isinstance(v, int):
+        return v
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return None
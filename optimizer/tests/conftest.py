@@ -0,0 +1,28 @@
+# optimizer/tests/conftest.py
+"""Comparación con -O0: el programa optimizado tiene que dibujar lo mismo
+(benchmarks/peephole_bench.drawing) y pedir los mismos AZAR, en el mismo
+orden, que sin optimizar. Corre con el JIT de llvmlite
+(benchmarks/runtime_trace.py)."""
+import pytest
+
+from frontend.parser import parse_text
+from optimizer.PassManager import optimize
+from benchmarks.runtime_trace import trace
+from benchmarks.peephole_bench import drawing
+
+
+def _observed(tree):
+    cmds = list(trace(tree))
+    return drawing(cmds), [c for c in cmds if c.startswith("RANDINT")]
+
+
+@pytest.fixture
+def same_as_o0():
+    """same_as_o0(src, level=2, disable=()) -> (árbol optimizado, manager);
+    falla si el dibujo o los AZAR cambian."""
+    def check(src: str, level=2, disable=()):
+        tree = parse_text("// prueba\n" + src, "ply")
+        out, pm = optimize(tree, level, disable)
+        assert _observed(out) == _observed(tree)
+        return out, pm
+    return check
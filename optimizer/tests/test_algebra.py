@@ -0,0 +1,32 @@
+# optimizer/tests/test_algebra.py
+"""Las identidades que descartan un operando no descartan llamadas."""
+from frontend.parser import parse_text
+from optimizer.PassManager import optimize
+
+
+def _calls(src: str, level: int = 2) -> int:
+    tree, _ = optimize(parse_text("// algebra\n" + src, "ply"), level)
+    count, stack = 0, [tree]
+    while stack:
+        n = stack.pop()
+        count += n.kind == "CALL"
+        stack.extend(n.children)
+    return count
+
+
+def test_por_cero_conserva_azar():
+    assert _calls("av (AZAR 5) * 0") == 1
+    assert _calls("inic x = 0 av x * AZAR 5") == 1
+
+
+def test_cero_dividido_conserva_azar():
+    assert _calls("av 0 / (AZAR 5 + 1)") == 1
+
+
+def test_potencia_cero_conserva_azar():
+    assert _calls("av POTENCIA (AZAR 5) 0") == 1
+
+
+def test_sin_llamadas_se_simplifica():
+    tree, _ = optimize(parse_text("// algebra\ninic x = 3\nav x * 0 gd 90\n", "ply"), 2)
+    assert all(n.kind != "AV" for n in tree.children[0].children)
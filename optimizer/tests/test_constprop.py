@@ -0,0 +1,37 @@
+# optimizer/tests/test_constprop.py
+"""Propagación de constantes por INIC/INC/HAZ (optimizer/ConstProp.py)."""
+
+
+def _leaves(tree, kind):
+    out, stack = [], [tree]
+    while stack:
+        n = stack.pop()
+        if n.kind == kind:
+            out.append(n.value)
+        stack.extend(n.children)
+    return out
+
+
+def test_inic_haz_inc(same_as_o0):
+    tree, pm = same_as_o0("INIC lado = 50\nBL\nAV lado\nHAZ lado 5\nGD lado\n"
+                          "INC [lado 10]\nAV lado\n", disable=("dse",))
+    assert pm.stats["constprop"].rewrites == 3
+    assert _leaves(tree, "ID") == ["lado"] * 3    # solo los destinos de INIC/HAZ/INC
+
+
+def test_cuenta_de_repite(same_as_o0):
+    _, pm = same_as_o0("INIC n = 4\nBL\nREPITE n [ AV 10 GD 90 ]\n")
+    assert pm.stats["constprop"].rewrites == 1
+    assert pm.stats["unroll"].rewrites == 1
+
+
+def test_valor_que_cambia_en_el_bucle(same_as_o0):
+    # lado cambia dentro del REPITE: no es constante ni en el bucle ni después
+    tree, _ = same_as_o0("INIC lado = 2\nBL\nREPITE 3 [ AV lado INC [lado 2] ]\nAV lado\n",
+                         disable=("unroll",))
+    assert "lado" in _leaves(tree, "ID")
+
+
+def test_valor_del_runtime(same_as_o0):
+    _, pm = same_as_o0("INIC a = AZAR 9\nBL\nAV a\nSI IGUALES? a 0 [ HAZ a 3 ]\nGD a\n")
+    assert pm.stats["constprop"].rewrites == 0
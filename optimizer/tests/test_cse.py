@@ -0,0 +1,23 @@
+# optimizer/tests/test_cse.py
+"""Subexpresiones comunes (optimizer/CommonSubexpr.py)."""
+
+
+def test_expresion_repetida(same_as_o0):
+    tree, pm = same_as_o0("INIC a = AZAR 9\nBL\nAV (a + 1) * 2\nGD 90\nAV (a + 1) * 2\n")
+    # una reescritura por aparición reemplazada
+    assert pm.stats["cse"].rewrites == 2
+
+
+def test_operandos_conmutados(same_as_o0):
+    _, pm = same_as_o0("INIC a = AZAR 9\nBL\nAV (a * a) + 3\nRE 3 + (a * a)\n")
+    assert pm.stats["cse"].rewrites == 2
+
+
+def test_modificacion_en_el_medio(same_as_o0):
+    _, pm = same_as_o0("INIC a = AZAR 9\nBL\nAV a * 3\nINC [a]\nAV a * 3\n")
+    assert pm.stats["cse"].rewrites == 0
+
+
+def test_azar_no_se_junta(same_as_o0):
+    _, pm = same_as_o0("BL\nAV AZAR 3 + AZAR 3\nAV AZAR 3 * 2\nRE AZAR 3 * 2\n")
+    assert pm.stats["cse"].rewrites == 0
@@ -0,0 +1,40 @@
+# optimizer/tests/test_do_loops.py
+"""Bucles con condición constante después de constprop y fold."""
+import llvmlite.binding as llvm
+
+from frontend.parser import parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+
+
+def _compile(src: str, level: int = 2):
+    tree, _ = optimize(parse_text("// bucles\n" + src, "ply"), level)
+    llvm.parse_assembly(IntermediateCodeGen().generate(tree)).verify()
+    return tree
+
+
+def _kinds(tree) -> set:
+    out, stack = set(), [tree]
+    while stack:
+        n = stack.pop()
+        out.add(n.kind)
+        stack.extend(n.children)
+    return out
+
+
+def test_haz_hasta_constante_compila():
+    tree = _compile("BL\nINIC n = 3\nHAZ.HASTA [AV 1] HASTA MAYORQUE? n 2\n")
+    # sale después de la primera vuelta: queda el cuerpo
+    assert "HAZ_HASTA" not in _kinds(tree)
+
+
+def test_haz_mientras_constante_compila():
+    tree = _compile("INIC n = 3\nHAZ.MIENTRAS [AV 1] MIENTRAS MENORQUE? n 2\n")
+    assert "HAZ_MIENTRAS" not in _kinds(tree)
+
+
+def test_bucle_que_no_sale_compila():
+    # condición siempre verdadera: el bucle se mantiene con un BOOL
+    tree = _compile("INIC n = 3\nMIENTRAS IGUALES? n 3 [ GD 1 ]\n"
+                    "HAZ.HASTA [AV 1] HASTA MENORQUE? n 2\n")
+    assert {"MIENTRAS", "HAZ_HASTA", "BOOL"} <= _kinds(tree)
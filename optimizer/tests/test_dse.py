@@ -0,0 +1,37 @@
+# optimizer/tests/test_dse.py
+"""Stores muertos y variables sin uso (optimizer/DeadStore.py)."""
+
+
+def _count(tree, kind, value=None):
+    n, stack = 0, [tree]
+    while stack:
+        node = stack.pop()
+        n += node.kind == kind and (value is None or node.value == value)
+        stack.extend(node.children)
+    return n
+
+
+def test_variable_sin_uso(same_as_o0):
+    tree, pm = same_as_o0("INIC c = 3 * 4\nBL\nAV 10\n")
+    assert pm.stats["dse"].rewrites == 1
+    assert _count(tree, "INIC") == 0
+
+
+def test_store_pisado(same_as_o0):
+    # el segundo INIC b se pisa antes de leerse (HAZ e INC leen la variable)
+    tree, pm = same_as_o0("INIC a = AZAR 9\nINIC b = a\nBL\nAV b\nINIC b = a * 2\n"
+                          "INIC b = a + 5\nHAZ b a\nGD b\n", disable=("constprop",))
+    assert pm.stats["dse"].rewrites == 1
+    assert _count(tree, "INIC") == 3
+
+
+def test_azar_se_sigue_pidiendo(same_as_o0):
+    # el valor no se usa, pero el AZAR tiene que pedirse igual
+    tree, pm = same_as_o0("INIC a = AZAR 9\nINIC d = AZAR 4\nBL\nAV AZAR 5\n")
+    assert _count(tree, "CALL", "AZAR") == 3
+    assert pm.stats["dse"].rewrites == 2
+
+
+def test_store_leido_en_bucle(same_as_o0):
+    same_as_o0("INIC i = 0\nINIC x = 5\nBL\n"
+               "MIENTRAS MENORQUE? i 3 [ AV x HAZ x x + 10 INC [i] ]\n")
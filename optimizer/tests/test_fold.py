@@ -0,0 +1,36 @@
+# optimizer/tests/test_fold.py
+"""Plegado de constantes en i32, como el código generado."""
+from frontend.parser import parse_text
+from optimizer.PassManager import optimize
+
+
+def _av(src: str, level: int) -> list:
+    tree, _ = optimize(parse_text("// fold\n" + src, "ply"), level)
+    out, stack = [], [tree]
+    while stack:
+        n = stack.pop()
+        if n.kind == "AV":
+            out.append(n.children[0])
+        stack.extend(reversed(n.children))
+    return out
+
+
+def test_division_entera():
+    # sdiv trunca: 7 / 2 = 3, por 2 da 6 (antes 7 con la división de Python)
+    for level in (1, 2):
+        arg, = _av("av 7 / 2 * 2", level)
+        assert arg.kind == "NUM" and arg.value == 6
+    arg, = _av("av 0 - 7 / 2", 1)
+    assert arg.value == -3
+
+
+def test_desborde_da_la_vuelta():
+    arg, = _av("av 2147483647 + 1", 1)
+    assert arg.value == -2147483648
+    arg, = _av("av 65536 * 65537", 1)
+    assert arg.value == 65536
+
+
+def test_division_por_cero_no_se_pliega():
+    arg, = _av("av 5 / 0", 1)
+    assert arg.kind == "BINOP"
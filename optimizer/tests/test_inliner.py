@@ -0,0 +1,34 @@
+# optimizer/tests/test_inliner.py
+"""Expansión de llamadas (optimizer/Inliner.py)."""
+import llvmlite.binding as llvm
+
+from frontend.parser import parse_text
+from IR.IntermediateCodeGen import IntermediateCodeGen
+from optimizer.PassManager import optimize
+
+
+def test_llamada_sin_argumentos():
+    # `p` sin [ ] no tiene hijo ARGS
+    src = "// inline\nPARA p [] AV 10 GD 90 FIN\np\np\n"
+    for level in (0, 1, 2):
+        tree, pm = optimize(parse_text(src, "ply"), level)
+        llvm.parse_assembly(IntermediateCodeGen().generate(tree)).verify()
+    assert pm.stats["inline"].rewrites == 2
+
+
+def test_expande_y_especializa(same_as_o0):
+    _, pm = same_as_o0("PARA cuadro [l] REPITE 4 [ AV l GD 90 ] FIN\nBL\n"
+                       "cuadro [10]\ncuadro [AZAR 20]\n")
+    assert pm.stats["inline"].rewrites == 2
+
+
+def test_recursivo(same_as_o0):
+    # no se expande; la llamada con constantes va a un clon
+    same_as_o0("PARA rama [n l]\n"
+               "  SI MAYORQUE? n 0 [ AV l GI 25 rama [n - 1 l / 2] GD 50 rama [n - 1 l / 2] GI 25 RE l ]\n"
+               "FIN\nBL rama [4 40]\n")
+
+
+def test_locales_renombradas(same_as_o0):
+    # la local x del cuerpo no pisa la x global
+    same_as_o0("INIC x = 7\nPARA p [a] INIC x = a * 2 AV x FIN\nBL\np [3]\nAV x\np [x]\nGD x\n")
@@ -0,0 +1,28 @@
+# optimizer/tests/test_levels.py
+"""Niveles del PassManager: todos dibujan lo mismo que -O0."""
+import pytest
+
+from optimizer.PassManager import LEVELS, PASSES
+
+_SRC = (
+    "PARA cuadro [l] REPITE 4 [ AV l GD 90 ] FIN\n"
+    "INIC lado = 20\n"
+    "INIC a = AZAR 9\n"
+    "BL\n"
+    "cuadro [lado]\n"
+    "REPITE 3 [ AV (a + 1) * 2 GD 120 INC [lado 5] ]\n"
+    "SI MAYORQUE? a 4 [ PONCL \"rojo\" AV POTENCIA a 2 ]\n"
+    "cuadro [lado + a]\n"
+)
+
+
+@pytest.mark.parametrize("level", sorted(LEVELS))
+def test_nivel(same_as_o0, level):
+    _, pm = same_as_o0(_SRC, level)
+    assert pm.pipeline == list(LEVELS[level])
+
+
+@pytest.mark.parametrize("name", sorted(PASSES))
+def test_o2_sin_un_pase(same_as_o0, name):
+    _, pm = same_as_o0(_SRC, 2, disable=(name,))
+    assert name not in pm.stats
@@ -0,0 +1,44 @@
+# optimizer/tests/test_loops.py
+"""Desenrollado y movimiento de invariantes (optimizer/LoopOpt.py)."""
+from optimizer import LoopOpt
+
+
+def _count(tree, kind):
+    n, stack = 0, [tree]
+    while stack:
+        node = stack.pop()
+        n += node.kind == kind
+        stack.extend(node.children)
+    return n
+
+
+def test_desenrolla_repite_chico(same_as_o0):
+    tree, pm = same_as_o0("BL\nREPITE 4 [ AV 10 GD 90 ]\n", disable=("peephole",))
+    assert pm.stats["unroll"].rewrites == 1
+    assert _count(tree, "REPITE") == 0
+    assert _count(tree, "AV") == 4
+
+
+def test_no_desenrolla_sobre_el_presupuesto(same_as_o0, monkeypatch):
+    monkeypatch.setattr(LoopOpt, "UNROLL_BUDGET", 8)
+    tree, pm = same_as_o0("BL\nREPITE 40 [ AV 10 GD 9 ]\n")
+    assert pm.stats["unroll"].rewrites == 0
+    assert _count(tree, "REPITE") == 1
+
+
+def test_saca_invariante_de_mientras(same_as_o0):
+    tree, pm = same_as_o0("INIC a = AZAR 5\nINIC b = 0\nBL\n"
+                          "MIENTRAS MENORQUE? b 3 [ AV (a + 2) * 3 GD 90 INC [b] ]\n")
+    assert pm.stats["licm"].rewrites == 1
+
+
+def test_no_saca_lo_que_el_bucle_modifica(same_as_o0):
+    _, pm = same_as_o0("INIC a = AZAR 5\nINIC b = 0\nBL\n"
+                       "MIENTRAS MENORQUE? b 3 [ AV (a + 2) * 3 INC [a] INC [b] ]\n")
+    assert pm.stats["licm"].rewrites == 0
+
+
+def test_no_saca_azar(same_as_o0):
+    # cada vuelta pide un AZAR: sacarlo cambiaría la secuencia
+    _, pm = same_as_o0("INIC b = 0\nBL\nMIENTRAS MENORQUE? b 3 [ AV AZAR 9 + 1 INC [b] ]\n")
+    assert pm.stats["licm"].rewrites == 0
@@ -0,0 +1,34 @@
+# optimizer/tests/test_partial_eval.py
+"""Evaluación parcial (optimizer/PartialEval.py): la traza dibuja lo mismo
+que el programa sin optimizar compilado con el JIT."""
+import pytest
+
+from frontend.parser import parse_text
+from optimizer.PartialEval import NotStatic, evaluate
+from benchmarks.partial_eval_bench import trace_drawing
+from benchmarks.peephole_bench import drawing
+from benchmarks.runtime_trace import trace
+
+_PROGRAMS = [
+    "BL\nREPITE 4 [ AV 50 GD 90 ]\n",
+    "INIC lado = 2\nBL\nREPITE 60 [ AV lado GD 89 INC [lado 2] "
+    "SI IGUALES? lado 40 [ PONCL \"rojo\" ] ]\n",
+    "PARA rama [n l]\n"
+    "  SI MAYORQUE? n 0 [ AV l GI 25 rama [n - 1 l * 3 / 4] GD 50 rama [n - 1 l * 3 / 4] GI 25 RE l ]\n"
+    "FIN\nBL rama [5 40]\n",
+    "INIC i = 0\nBL\nHAZ.HASTA [ AV 10 GD 45 SB AV 5 BL INC [i] ] HASTA MAYORQUE? i 7\n"
+    "PONXY 10 20\nPONRUMBO 30\nAV 15\n",
+]
+
+
+@pytest.mark.parametrize("src", _PROGRAMS)
+def test_traza_igual_a_o0(same_as_o0, src):
+    tree, _ = same_as_o0(src)
+    o0 = parse_text("// prueba\n" + src, "ply")
+    assert trace_drawing(evaluate(tree).entries) == drawing(list(trace(o0)))
+
+
+def test_azar_no_es_estatico(same_as_o0):
+    tree, _ = same_as_o0("BL\nAV AZAR 10\n")
+    with pytest.raises(NotStatic):
+        evaluate(tree)
@@ -0,0 +1,29 @@
+# optimizer/tests/test_passmanager.py
+"""Rondas de las etapas de varios pases."""
+from frontend.parser import parse_text
+from optimizer.PassManager import LEVELS, MAX_ROUNDS, PassManager
+
+
+def _run(src: str) -> PassManager:
+    pm = PassManager(2)
+    pm.run(parse_text("// pases\n" + src, "ply"))
+    return pm
+
+
+def test_etapa_sin_reescrituras_corre_una_ronda():
+    pm = _run("inic x = AZAR 5\nav x gd x\n")
+    for stage in LEVELS[2]:
+        for name in stage:
+            assert pm.stats[name].runs == 1, name
+            assert pm.stats[name].rewrites == 0, name
+
+
+def test_etapa_con_reescrituras_converge():
+    # inline expande la llamada y constprop propaga n = 3 en lo expandido;
+    # la ronda siguiente ninguno reescribe y la etapa termina, sin llegar a
+    # MAX_ROUNDS
+    pm = _run("para p [n] av n gd n fin\np [3]\n")
+    assert pm.stats["constprop"].runs == 2
+    assert pm.stats["inline"].runs == 2
+    # cada reescritura se cuenta una vez, en la corrida que la hizo
+    assert pm.stats["inline"].rewrites == 1
@@ -0,0 +1,23 @@
+# optimizer/tests/test_peephole.py
+"""Mirilla de comandos (optimizer/TurtlePeephole.py)."""
+
+
+def test_fusiona_con_el_lapiz_arriba(same_as_o0):
+    tree, pm = same_as_o0("AV 10 RE 5 GD 90 GI 30\n")
+    assert pm.stats["peephole"].rewrites == 2
+
+
+def test_bl_suelto_en_si(same_as_o0):
+    # "dce" deja el BL solo (sin STMTS) como cuerpo del SI: después el
+    # lápiz puede estar dibujando y AV 10 RE 5 es una raya de ida y vuelta
+    same_as_o0("INIC a = AZAR 1\nSI IGUALES? a 0 [ BL ]\nAV 10\nRE 5\n")
+
+
+def test_bl_suelto_en_ejecuta(same_as_o0):
+    same_as_o0("EJECUTA [ BL ]\nAV 10\nRE 5\n")
+
+
+def test_bl_suelto_en_repite(same_as_o0):
+    same_as_o0("INIC n = AZAR 1 + 1\nREPITE n [ BL ]\nAV 10\nRE 5\n")
+    same_as_o0("REPITE 3 [ BL ]\nAV 10\nRE 5\n", disable=("unroll",))
+    same_as_o0("INIC i = 0\nMIENTRAS MENORQUE? i 2 [ INC [i] PONCL \"rojo\" SB ]\nBL AV 10 RE 5\n")
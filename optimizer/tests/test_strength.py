@@ -0,0 +1,36 @@
+# optimizer/tests/test_strength.py
+"""POTENCIA: plegado en i32 y reducción de fuerza ("strength")."""
+from optimizer.ASTOptimizer import POW_CHAIN_MAX
+
+
+def _kinds(tree) -> list:
+    out, stack = [], [tree]
+    while stack:
+        n = stack.pop()
+        out.append(n.kind)
+        stack.extend(n.children)
+    return out
+
+
+def test_exponentes_chicos(same_as_o0):
+    tree, pm = same_as_o0("INIC x = AZAR 7\nBL\nAV POTENCIA x 2\nGD POTENCIA x 3\n")
+    assert pm.stats["strength"].rewrites == 2
+    assert "POW" not in _kinds(tree)
+
+
+def test_exponente_grande_queda(same_as_o0):
+    n = POW_CHAIN_MAX + 1
+    tree, pm = same_as_o0(f"INIC x = AZAR 7\nBL\nAV POTENCIA x {n}\n")
+    assert pm.stats["strength"].rewrites == 0
+    assert "POW" in _kinds(tree)
+
+
+def test_constantes_y_casos_triviales(same_as_o0):
+    tree, _ = same_as_o0("INIC x = AZAR 7\nBL\nAV POTENCIA 2 5\nAV POTENCIA x 0\n"
+                         "GD POTENCIA x 1\nAV POTENCIA 3 20\n")
+    assert "POW" not in _kinds(tree)
+
+
+def test_base_con_azar(same_as_o0):
+    # AZAR 9 ^ 2 no es AZAR 9 * AZAR 9: se piden dos valores distintos
+    same_as_o0("BL\nAV POTENCIA AZAR 9 2\nAV POTENCIA AZAR 9 0\n")